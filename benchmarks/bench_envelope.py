@@ -0,0 +1,39 @@
+"""
+Timing benchmark for saturation curve tracing.
+
+Traces the Peng-Robinson saturation curve of water from 0.5 Tc to the
+critical point by continuation, and compares it with solving each of
+the same temperatures from scratch with
+:func:`pytherm.envelope.saturation_point`.
+
+Usage::
+
+    python -m benchmarks.bench_envelope
+"""
+import time
+from pytherm.eos import PurePREOS
+from pytherm.envelope import phase_envelope, saturation_point
+
+
+def best_of(func, repeat=5):
+    times = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = func()
+        times.append(time.perf_counter() - start)
+    return result, min(times)
+
+
+def main():
+    eos = PurePREOS(Pc=22064000.0, Tc=647.096, omega=0.3443)
+    envelope, seconds = best_of(lambda: phase_envelope(eos))
+    print(f'continuation             {len(envelope.T):4d} points  {seconds * 1e3:8.2f} ms  '
+          f'(critical point T = {envelope.critical.T:.3f} K, P = {envelope.critical.P / 1e6:.4f} MPa)')
+
+    T = envelope.T[:-1]
+    _, seconds = best_of(lambda: [saturation_point(eos, T_i) for T_i in T])
+    print(f'point by point           {len(T):4d} points  {seconds * 1e3:8.2f} ms')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,72 @@
+"""
+Timing benchmark for isotherms and isochores of a cubic EOS.
+
+Sweeps 200 isotherms of methane (Peng-Robinson with a Péneloux shift)
+over 1,000 volumes and 1,000 pressures each, as in a compressor map,
+evaluating the pressure and all its derivatives and solving for the
+volume. Each sweep is timed calling the EOS directly and through
+:meth:`pytherm.eos.PExplicitEOS.at_T`, and likewise for 200 isochores
+through :meth:`pytherm.eos.PExplicitEOS.at_v`. The same sweeps are then
+repeated one float at a time, where the temperature-dependent terms are
+a larger share of the cost.
+
+Usage::
+
+    python -m benchmarks.bench_isotherm
+"""
+import time
+import numpy as np
+from pytherm.eos import PurePREOS
+
+
+def best_of(func, repeat=5):
+    times = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = func()
+        times.append(time.perf_counter() - start)
+    return result, min(times)
+
+
+def main(n_lines=200, n_points=1000):
+    Pc, Tc, omega = 4599000.0, 190.56, 0.011
+    eos = PurePREOS(Pc, Tc, omega, shift=PurePREOS.peneloux_shift(Pc, Tc, omega))
+    temperatures = np.linspace(200.0, 400.0, n_lines)
+    volumes = np.geomspace(1e-4, 1e-1, n_points)
+    pressures = np.geomspace(1e5, 2e7, n_points)
+
+    sweeps = {
+        'P': (lambda T: eos.P(T, volumes), lambda iso: iso.P(volumes)),
+        'derivatives': (lambda T: eos.derivatives(T, volumes), lambda iso: iso.derivatives(volumes)),
+        'v(P)': (lambda T: eos.v(pressures, T), lambda iso: iso.v(pressures)),
+    }
+    print(f'{n_lines} isotherms x {n_points} points')
+    for name, (direct, isothermal) in sweeps.items():
+        _, seconds_direct = best_of(lambda: [direct(T) for T in temperatures])
+        _, seconds_at_T = best_of(lambda: [isothermal(eos.at_T(T)) for T in temperatures])
+        print(f'  {name:12s} direct {seconds_direct * 1e3:8.2f} ms   at_T {seconds_at_T * 1e3:8.2f} ms')
+
+    print(f'{n_lines} isochores x {n_points} points')
+    T_grid = np.linspace(200.0, 400.0, n_points)
+    for name, direct, isochoric in (
+            ('P', lambda v: eos.P(T_grid, v), lambda iso: iso.P(T_grid)),
+            ('derivatives', lambda v: eos.derivatives(T_grid, v), lambda iso: iso.derivatives(T_grid))):
+        _, seconds_direct = best_of(lambda: [direct(v) for v in volumes[::n_points // n_lines]])
+        _, seconds_at_v = best_of(lambda: [isochoric(eos.at_v(v)) for v in volumes[::n_points // n_lines]])
+        print(f'  {name:12s} direct {seconds_direct * 1e3:8.2f} ms   at_v {seconds_at_v * 1e3:8.2f} ms')
+
+    print('one float at a time, per call')
+    T, v = 250.0, 1e-3
+    isotherm, isochore = eos.at_T(T), eos.at_v(v)
+    for name, direct, isothermal, isochoric in (
+            ('P', lambda: eos.P(T, v), lambda: isotherm.P(v), lambda: isochore.P(T)),
+            ('derivatives', lambda: eos.derivatives(T, v), lambda: isotherm.derivatives(v),
+             lambda: isochore.derivatives(T))):
+        seconds = [best_of(lambda: [func() for _ in range(n_points)])[1] / n_points
+                   for func in (direct, isothermal, isochoric)]
+        print(f'  {name:12s} direct {seconds[0] * 1e6:8.2f} us   at_T {seconds[1] * 1e6:8.2f} us   '
+              f'at_v {seconds[2] * 1e6:8.2f} us')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,55 @@
+"""
+Timing benchmark for ideal gas mixture properties.
+
+Builds a mixture of every GKKR substance and evaluates its heat
+capacity at 100,000 temperatures with
+:class:`pytherm.model.IdealGasMixture`, against calling each component's
+correlation in turn and summing. The enthalpy is timed against 20-point
+Gauss-Legendre quadrature of the component correlations.
+
+Usage::
+
+    python -m benchmarks.bench_mixture
+"""
+import time
+import numpy as np
+from pytherm.data import load_gkkr_data
+from pytherm.model import IdealGasMixture
+
+
+def best_of(func, repeat=5):
+    times = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = func()
+        times.append(time.perf_counter() - start)
+    return result, min(times)
+
+
+def main(n=100_000):
+    mixture = IdealGasMixture.from_gkkr(list(load_gkkr_data()))
+    x = np.random.default_rng(0).dirichlet(np.ones(len(mixture)))
+    T = np.linspace(mixture.T_min, mixture.T_max, n)
+    print(f'{len(mixture)} components x {n} temperatures')
+
+    expected, looped = best_of(lambda: sum(x_i * corr(T) for x_i, corr in zip(x, mixture.correlations)))
+    result, stacked = best_of(lambda: mixture.cp(T, x))
+    print(f'  cp   per component {looped * 1e3:8.2f} ms   stacked {stacked * 1e3:8.2f} ms   '
+          f'(max relative difference {np.max(np.abs(result / expected - 1)):.1e})')
+
+    nodes, weights = np.polynomial.legendre.leggauss(20)
+    half = (T - mixture.T_ref) / 2
+
+    def quadrature():
+        return half * sum(w * sum(x_i * corr(mixture.T_ref + half * (1 + node))
+                                  for x_i, corr in zip(x, mixture.correlations))
+                          for node, w in zip(nodes, weights))
+
+    expected, looped = best_of(quadrature, repeat=1)
+    result, stacked = best_of(lambda: mixture.h(T, x))
+    print(f'  h    quadrature    {looped * 1e3:8.2f} ms   stacked {stacked * 1e3:8.2f} ms   '
+          f'(max difference {np.max(np.abs(result - expected)):.1e} J/mol)')
+
+
+if __name__ == '__main__':
+    main()
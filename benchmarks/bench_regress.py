@@ -0,0 +1,54 @@
+"""
+Timing benchmark for correlation regression.
+
+Samples every GKKR correlation that pytherm implements at 50
+temperatures, with 0.01 % relative noise, and refits all of them at
+once with :func:`pytherm.regress.fit_correlations`, starting from the
+default starting values of each correlation class.
+
+Usage::
+
+    python -m benchmarks.bench_regress
+"""
+import time
+import numpy as np
+from pytherm.data import load_gkkr_data
+from pytherm.prop import CORRELATION_TYPES, corr_from_record
+from pytherm.regress import FitProblem, fit_correlations
+
+
+def problems(n=50, noise=1e-4):
+    rng = np.random.default_rng(0)
+    result = []
+    for substance, data in load_gkkr_data().items():
+        for records in data['Correlations'].values():
+            record = records[0]
+            if record['Type'] not in CORRELATION_TYPES:
+                continue
+            corr = corr_from_record(record, Tc=data['Tc'], Pc=data['Pc'])
+            fixed = {name: getattr(corr, name) for name in ('Tc', 'Pc', 'rho_c') if hasattr(corr, name)}
+            # Some GKKR ranges extend past the critical temperature
+            T_max = min(corr.T_max, fixed.get('Tc', np.inf) * (1 - 1e-6))
+            if T_max <= corr.T_min:
+                continue
+            T = np.linspace(corr.T_min, T_max, n)
+            values = corr(T) * (1 + noise * rng.standard_normal(n))
+            result.append(FitProblem(type(corr), T, values, fixed))
+    return result
+
+
+def main():
+    batch = problems()
+    start = time.perf_counter()
+    results = fit_correlations(batch)
+    seconds = time.perf_counter() - start
+    print(f'{len(batch)} correlations in {seconds:.2f} s')
+    for name, cls in CORRELATION_TYPES.items():
+        fitted = [result for result in results if type(result.correlation) is cls]
+        if fitted:
+            print(f'  {name:32s} {len(fitted):3d} fits, {sum(result.converged for result in fitted):3d} converged, '
+                  f'median rms {np.median([result.rms for result in fitted]):.1e}')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,52 @@
+"""
+Timing benchmark for parameter sensitivities.
+
+Computes the volumes of 10,000 methane states and their derivatives
+with respect to Pc, Tc and omega of the Peng-Robinson EOS, once with
+:func:`pytherm.sensitivity.sensitivities` and once by central finite
+differences, which rebuild the EOS and repeat the volume solve for each
+perturbed parameter.
+
+Usage::
+
+    python -m benchmarks.bench_sensitivity
+"""
+import time
+import numpy as np
+from pytherm.eos import PurePREOS
+from pytherm.sensitivity import sensitivities
+
+
+def best_of(func, repeat=5):
+    times = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = func()
+        times.append(time.perf_counter() - start)
+    return result, min(times)
+
+
+def finite_differences(params, P, T, h=1e-6):
+    grad = []
+    for name, value in params.items():
+        up = PurePREOS(**dict(params, **{name: value * (1 + h)})).v(P, T)
+        down = PurePREOS(**dict(params, **{name: value * (1 - h)})).v(P, T)
+        grad.append((up - down) / (2 * h * value))
+    return PurePREOS(**params).v(P, T), np.stack(grad, axis=-1)
+
+
+def main(n=10_000):
+    rng = np.random.default_rng(0)
+    P = rng.uniform(1e5, 2e7, n)
+    T = rng.uniform(120.0, 500.0, n)
+    params = {'Pc': 4599000.0, 'Tc': 190.56, 'omega': 0.011}
+
+    sens, seconds = best_of(lambda: sensitivities(PurePREOS, params, T, P=P, properties=('v',)))
+    print(f'jets                {n} states  {seconds * 1e3:8.2f} ms')
+    (_, grad), seconds = best_of(lambda: finite_differences(params, P, T))
+    print(f'finite differences  {n} states  {seconds * 1e3:8.2f} ms  '
+          f'(max relative difference {np.max(np.abs(sens["v"].grad / grad - 1)):.1e})')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,54 @@
+"""
+Latency and throughput benchmark for the batching property service.
+
+Runs many concurrent clients, each awaiting one property request at a
+time, against :class:`pytherm.service.PropertyService` with batching
+enabled and with ``max_batch_size=1`` (one EOS evaluation per request),
+and reports the throughput and the per-request latency percentiles.
+
+Usage::
+
+    python -m benchmarks.bench_service
+"""
+import asyncio
+import time
+import numpy as np
+from pytherm.model import FluidModel
+from pytherm.service import PropertyService
+
+
+async def client(service, P, T, latencies):
+    for P_i, T_i in zip(P, T):
+        start = time.perf_counter()
+        await service.props(P_i, T_i)
+        latencies.append(time.perf_counter() - start)
+
+
+async def run(model, n_clients, n_requests, **options):
+    rng = np.random.default_rng(0)
+    P = rng.uniform(1e4, 1e6, (n_clients, n_requests))
+    T = rng.uniform(500.0, 1000.0, (n_clients, n_requests))
+    latencies = []
+    start = time.perf_counter()
+    async with PropertyService(model, **options) as service:
+        await asyncio.gather(*(client(service, P[i], T[i], latencies) for i in range(n_clients)))
+    return service.stats, np.array(latencies), time.perf_counter() - start
+
+
+def summarize(name, stats, latencies, seconds):
+    print(f'{name:<24} {stats.requests / seconds:9,.0f} req/s  '
+          f'p50 {np.percentile(latencies, 50) * 1e3:7.2f} ms  '
+          f'p95 {np.percentile(latencies, 95) * 1e3:7.2f} ms  '
+          f'mean batch {stats.mean_batch_size:6.1f}')
+
+
+def main():
+    model = FluidModel.from_gkkr('Water')
+    n_clients, n_requests = 500, 20
+    print(f'{n_clients} concurrent clients, {n_requests} sequential requests each\n')
+    summarize('batched', *asyncio.run(run(model, n_clients, n_requests)))
+    summarize('max_batch_size=1', *asyncio.run(run(model, n_clients, n_requests, max_batch_size=1)))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,70 @@
+"""
+Iteration-count benchmark for the bracketed EOS inversions.
+
+Solves v(P, T) and T(P, v) for water (Peng-Robinson) over a P-T grid
+and reports statistics of the number of residual evaluations per point,
+alongside the secant iteration (``scipy.optimize.root_scalar``) seeded
+from the ideal gas law that the inversions replaced.
+
+Usage::
+
+    python -m benchmarks.bench_solvers
+"""
+import time
+import warnings
+import numpy as np
+from scipy.optimize import root_scalar
+from pytherm.data import R
+from pytherm.eos import PurePREOS, _flatten
+from pytherm.solve import newton_bracketed
+
+
+def secant_v(eos, P, T):
+    v0 = R * T / P
+    try:
+        with warnings.catch_warnings():
+            warnings.simplefilter('ignore')
+            sol = root_scalar(lambda v: eos.P(T, v) - P, x0=v0, x1=v0 * 1.1)
+    except (ValueError, ZeroDivisionError):
+        return np.nan, np.nan
+    return (sol.root, sol.function_calls) if sol.converged else (np.nan, sol.function_calls)
+
+
+def bracketed_v(eos, P, T):
+    (P, T), _ = _flatten(P, T)
+    lo, hi = eos._v_bracket(P, T)
+    return newton_bracketed(lambda v, idx: (eos.P(T[idx], v) - P[idx], eos.dP_dv_T(T[idx], v)),
+                            lo=lo, hi=hi, sign=1.0, x0=R * T / P, full_output=True)
+
+
+def summarize(name, n_evals, seconds):
+    n_evals = n_evals[np.isfinite(n_evals)]
+    print(f'{name:<28} mean {n_evals.mean():5.2f}  p95 {np.percentile(n_evals, 95):5.1f}  '
+          f'max {n_evals.max():4.0f}  time {seconds * 1e3:8.2f} ms')
+
+
+def main():
+    eos = PurePREOS(Pc=22064000.0, Tc=647.096, omega=0.3443)
+    P, T = np.meshgrid(np.geomspace(1e3, 1e8, 60), np.linspace(280.0, 1200.0, 60))
+    P, T = P.ravel(), T.ravel()
+    print(f'{P.size} points, P = 1 kPa - 100 MPa, T = 280 - 1200 K\n')
+
+    start = time.perf_counter()
+    v, n_evals = bracketed_v(eos, P, T)
+    summarize('bracketed Newton v(P, T)', n_evals.astype(float), time.perf_counter() - start)
+    print(f'{"":<28} (plus 2 evaluations per point to set up the bracket)')
+
+    start = time.perf_counter()
+    secant = np.array([secant_v(eos, P_i, T_i) for P_i, T_i in zip(P, T)])
+    summarize('secant v(P, T)', secant[:, 1], time.perf_counter() - start)
+    failed = np.isnan(secant[:, 0]) | ~np.isclose(secant[:, 0], v, rtol=1e-6)
+    print(f'{"":<28} secant failed or found a different root at {failed.sum()} points\n')
+
+    start = time.perf_counter()
+    T_solved = eos.T(P, v)
+    print(f'bracketed Newton T(P, v)     time {(time.perf_counter() - start) * 1e3:8.2f} ms, '
+          f'max rel. error {np.max(np.abs(T_solved / T - 1)):.1e}')
+
+
+if __name__ == '__main__':
+    main()
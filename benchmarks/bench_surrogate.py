@@ -0,0 +1,91 @@
+"""
+Timing benchmark for Chebyshev surrogates of correlations.
+
+Compiles the water vapor pressure (Wagner) and ideal gas heat capacity
+(Aly-Lee) correlations to the default relative tolerance of 1e-12, and
+times evaluating the originals and the surrogates at 200,000 random
+temperatures, at a single float, and on second-order jets. The
+surrogates' exact integrals are timed against Gauss-Legendre quadrature
+of the original heat capacity.
+
+Originals and surrogates are timed alternately, and the benchmark fails
+if a surrogate is not faster than its original on arrays or jets.
+
+Usage::
+
+    python -m benchmarks.bench_surrogate
+"""
+import time
+import numpy as np
+from pytherm.ad import Jet
+from pytherm.data import load_gkkr_substance
+from pytherm.prop import compile_surrogate, corr_from_record
+
+
+def best_of(func, repeat=5):
+    times = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = func()
+        times.append(time.perf_counter() - start)
+    return result, min(times)
+
+
+def per_call(func, n=2000):
+    _, seconds = best_of(lambda: [func() for _ in range(n)])
+    return seconds / n
+
+
+def faster(original, surrogate, repeat=20):
+    """
+    Best times of the original and the surrogate, timed alternately so
+    that both see the same load.
+    """
+    best = [float('inf'), float('inf')]
+    for _ in range(repeat):
+        for i, func in enumerate((original, surrogate)):
+            start = time.perf_counter()
+            func()
+            best[i] = min(best[i], time.perf_counter() - start)
+    assert best[1] < best[0], f'surrogate {best[1] * 1e3:.2f} ms, original {best[0] * 1e3:.2f} ms'
+    return best
+
+
+def main(n=200_000):
+    substance = load_gkkr_substance('Water')
+    rng = np.random.default_rng(0)
+    for name in ('Vapor Pressure', 'Ideal Gas cp'):
+        corr = corr_from_record(substance['Correlations'][name][0], Tc=substance['Tc'], Pc=substance['Pc'])
+        surrogate, seconds = best_of(lambda: compile_surrogate(corr))
+        print(f'{name}: {len(surrogate)} pieces, compiled in {seconds * 1e3:.1f} ms')
+
+        T = rng.uniform(corr.T_min, corr.T_max, n)
+        expected, result = corr(T), surrogate(T)
+        original, compiled = faster(lambda: corr(T), lambda: surrogate(T))
+        print(f'  {n} temperatures   original {original * 1e3:7.2f} ms   surrogate {compiled * 1e3:7.2f} ms   '
+              f'(max relative error {np.max(np.abs(result / expected - 1)):.1e})')
+
+        T_mid = (corr.T_min + corr.T_max) / 2
+        print(f'  one float           original {per_call(lambda: corr(T_mid)) * 1e6:7.2f} us   '
+              f'surrogate {per_call(lambda: surrogate(T_mid)) * 1e6:7.2f} us')
+
+        jet = Jet.seed(T[:10_000])[0]
+        original, compiled = faster(lambda: corr(jet), lambda: surrogate(jet))
+        print(f'  10000 jets          original {original * 1e3:7.2f} ms   surrogate {compiled * 1e3:7.2f} ms')
+
+    # Enthalpy changes from the heat capacity, exactly and by 20-point quadrature
+    T1, T2 = np.full(n, 298.15), T
+    nodes, weights = np.polynomial.legendre.leggauss(20)
+    half = (T2 - T1) / 2
+
+    def quadrature():
+        return half * sum(w * corr(T1 + half * (1 + x)) for x, w in zip(nodes, weights))
+
+    quad, original = best_of(quadrature)
+    exact, compiled = best_of(lambda: surrogate.integral(T1, T2))
+    print(f'  {n} integrals      quadrature {original * 1e3:7.2f} ms   surrogate {compiled * 1e3:7.2f} ms   '
+          f'(max relative difference {np.max(np.abs(exact / quad - 1)):.1e})')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,51 @@
+"""
+Timing benchmark for property tables.
+
+Fills a 500 x 400 pressure-temperature table of water with
+:func:`pytherm.table.generate`, in this process and sharded over all
+CPUs, against a hand-written loop over the nodes (timed on a subset)
+calling :meth:`pytherm.model.FluidModel.properties` one state at a time.
+
+Usage::
+
+    python -m benchmarks.bench_table
+"""
+import os
+import tempfile
+import time
+import numpy as np
+from pytherm import table
+from pytherm.model import FluidModel
+
+
+def best_of(func, repeat=3):
+    times = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = func()
+        times.append(time.perf_counter() - start)
+    return result, min(times)
+
+
+def main(n_P=500, n_T=400):
+    water = FluidModel.from_gkkr('Water')
+    P, T = np.geomspace(1e3, 1e8, n_P), np.linspace(280.0, 1200.0, n_T)
+    print(f'{n_P} x {n_T} nodes, {os.cpu_count()} CPUs')
+
+    def loop(n=2000):
+        for P_i, T_i in zip(P[np.arange(n) % n_P], T[np.arange(n) % n_T]):
+            water.properties(T_i, water.v(P_i, T_i))
+        return n
+
+    n, looped = best_of(loop, repeat=1)
+    print(f'  node loop          {n / looped:12,.0f} nodes/s')
+    with tempfile.TemporaryDirectory() as directory:
+        for workers in sorted({1, os.cpu_count() or 1}):
+            path = os.path.join(directory, 'water.npz')
+            stats, _ = best_of(lambda: table.generate(water, path, P, T, workers=workers))
+            print(f'  generate, {workers:2d} workers {stats.nodes_per_second:12,.0f} nodes/s   '
+                  f'({os.path.getsize(path) / 1e6:.1f} MB)')
+
+
+if __name__ == '__main__':
+    main()
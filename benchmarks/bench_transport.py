@@ -0,0 +1,43 @@
+"""
+Timing benchmark for transport properties.
+
+Evaluates the viscosity, thermal conductivity and surface tension of
+methane at 100,000 pipeline nodes (pressures from 1 to 10 MPa and
+temperatures from 250 to 320 K) with
+:meth:`pytherm.transport.TransportModel.properties_PT`, against a loop
+over the nodes, and times the density correction alone at given
+volumes.
+
+Usage::
+
+    python -m benchmarks.bench_transport
+"""
+import time
+import numpy as np
+from pytherm.transport import TransportModel
+
+
+def best_of(func, repeat=5):
+    times = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = func()
+        times.append(time.perf_counter() - start)
+    return result, min(times)
+
+
+def main(n=100_000, n_loop=2000):
+    model = TransportModel.from_gkkr('Methane')
+    rng = np.random.default_rng(0)
+    P, T = rng.uniform(1e6, 1e7, n), rng.uniform(250.0, 320.0, n)
+    v = model.fluid.v(P, T)
+
+    _, batched = best_of(lambda: model.properties_PT(P, T))
+    _, looped = best_of(lambda: [model.properties_PT(P[i], T[i]) for i in range(n_loop)], repeat=1)
+    print(f'{n} nodes   batched {batched * 1e3:8.2f} ms   loop {looped / n_loop * n * 1e3:8.2f} ms (extrapolated)')
+    _, properties = best_of(lambda: model.properties(T, v))
+    print(f'  of which properties at known volumes {properties * 1e3:8.2f} ms')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,65 @@
+"""
+Timing benchmark for the compact encoding of models.
+
+Encodes a GKKR fluid model and a heat capacity surrogate with
+:mod:`pytherm.wire`, and compares their size and decoding time with
+ordinary pickles of the same objects (all attributes, including derived
+ones) and with building them from scratch, as a worker process would
+otherwise have to.
+
+Usage::
+
+    python -m benchmarks.bench_wire
+"""
+import io
+import pickle
+import time
+from pytherm import wire
+from pytherm.model import FluidModel
+from pytherm.prop import compile_surrogate
+
+
+class AttributePickler(pickle.Pickler):
+    # Pickles objects by their attributes, as without pytherm.wire
+    def reducer_override(self, obj):
+        if isinstance(obj, wire.Serializable):
+            return object.__reduce_ex__(obj, pickle.HIGHEST_PROTOCOL)
+        return NotImplemented
+
+
+def attribute_pickle(obj):
+    buffer = io.BytesIO()
+    AttributePickler(buffer, pickle.HIGHEST_PROTOCOL).dump(obj)
+    return buffer.getvalue()
+
+
+def best_of(func, repeat=5, number=100):
+    times = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        for _ in range(number):
+            result = func()
+        times.append((time.perf_counter() - start) / number)
+    return result, min(times)
+
+
+def compare(label, build):
+    obj = build()
+    data, attributes = wire.dumps(obj), attribute_pickle(obj)
+    _, built = best_of(build, number=10)
+    _, decoded = best_of(lambda: wire.loads(data))
+    _, unpickled = best_of(lambda: pickle.loads(attributes))
+    print(f'{label}')
+    print(f'  size     wire {len(data):8d} B    pickle {len(attributes):8d} B')
+    print(f'  time     wire {decoded * 1e6:8.1f} us   pickle {unpickled * 1e6:8.1f} us   '
+          f'build {built * 1e6:8.1f} us')
+
+
+def main():
+    compare('FluidModel.from_gkkr (Water)', lambda: FluidModel.from_gkkr('Water'))
+    cp_ideal = FluidModel.from_gkkr('Water')._cp_ideal
+    compare('compile_surrogate (Water cp)', lambda: compile_surrogate(cp_ideal))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,250 @@
+"""
+Forward-mode automatic differentiation to second order.
+
+A :class:`Jet` carries the value of a quantity together with its
+gradient and Hessian with respect to a fixed set of independent
+variables. Arithmetic on jets propagates all of them at once, so
+evaluating an ordinary function (e.g. :meth:`pytherm.eos.EOS.P`) on
+seeded jets yields every first and second derivative in a single pass,
+with no truncation error.
+
+Jets wrap NumPy arrays element-wise, and NumPy ufuncs such as
+:func:`numpy.exp` dispatch to them, so vectorized code can be
+differentiated without modification.
+"""
+from typing import Optional
+import numpy as np
+
+
+# NumPy ufuncs that jets support, mapped to the forward and reflected
+# methods implementing them (binary) or the function implementing them
+# (unary, filled in below the function definitions).
+_BINARY_UFUNCS = {
+    np.add: ('__add__', '__radd__'),
+    np.subtract: ('__sub__', '__rsub__'),
+    np.multiply: ('__mul__', '__rmul__'),
+    np.true_divide: ('__truediv__', '__rtruediv__'),
+    np.power: ('__pow__', '__rpow__'),
+}
+_UNARY_UFUNCS = {}
+
+
+class Jet:
+    """
+    Truncated second-order Taylor expansion of a quantity in ``n``
+    independent variables.
+
+    Derivative axes are stored last, i.e. for a value of shape ``S`` the
+    gradient has shape ``S + (n,)`` and the Hessian ``S + (n, n)``. A
+    jet with no Hessian only propagates first derivatives, which is
+    cheaper when second derivatives are not needed.
+    """
+    def __init__(self, val, grad, hess: Optional[np.ndarray] = None):
+        """
+        Args:
+            val: Value of the quantity.
+            grad: Gradient, with the derivative axis last.
+            hess: Hessian, with the two derivative axes last. If None,
+                only first derivatives are propagated.
+        """
+        self.val = np.asarray(val, dtype=float)
+        self.grad = np.asarray(grad, dtype=float)
+        self.hess = None if hess is None else np.asarray(hess, dtype=float)
+
+    @classmethod
+    def seed(cls, *values, order: int = 2):
+        """
+        Create jets for independent variables.
+
+        Args:
+            *values: Values of the independent variables (floats or
+                arrays).
+            order: Highest derivative order to propagate (1 or 2).
+
+        Returns:
+            One jet per value, with a unit gradient in its own
+            direction.
+        """
+        n = len(values)
+        jets = []
+        for i, value in enumerate(values):
+            value = np.asarray(value, dtype=float)
+            grad = np.zeros(value.shape + (n,))
+            grad[..., i] = 1.0
+            hess = np.zeros(value.shape + (n, n)) if order == 2 else None
+            jets.append(cls(value, grad, hess))
+        return jets
+
+    def __array_ufunc__(self, ufunc, method, *inputs, **kwargs):
+        if method != '__call__' or kwargs:
+            return NotImplemented
+        if ufunc in _UNARY_UFUNCS:
+            return _UNARY_UFUNCS[ufunc](*inputs)
+        if ufunc in _BINARY_UFUNCS:
+            a, b = inputs
+            forward, reflected = _BINARY_UFUNCS[ufunc]
+            return getattr(a, forward)(b) if isinstance(a, Jet) else getattr(b, reflected)(a)
+        return NotImplemented
+
+    def _broadcast(self, shape):
+        """
+        Broadcast the derivatives to a (possibly larger) value shape.
+        """
+        n = self.grad.shape[-1]
+        grad = np.broadcast_to(self.grad, shape + (n,))
+        hess = None if self.hess is None else np.broadcast_to(self.hess, shape + (n, n))
+        return grad, hess
+
+    def _chain(self, f0, f1, f2):
+        """
+        Apply a scalar function with value `f0` and first and second
+        derivatives `f1` and `f2` (evaluated at ``self.val``).
+        """
+        grad = f1[..., None] * self.grad
+        if self.hess is None:
+            return Jet(f0, grad)
+        outer = self.grad[..., :, None] * self.grad[..., None, :]
+        return Jet(f0, grad, f1[..., None, None] * self.hess + f2[..., None, None] * outer)
+
+    # Arithmetic
+
+    def __neg__(self):
+        return Jet(-self.val, -self.grad, None if self.hess is None else -self.hess)
+
+    def __pos__(self):
+        return self
+
+    def __add__(self, other):
+        if isinstance(other, Jet):
+            hess = None if self.hess is None or other.hess is None else self.hess + other.hess
+            return Jet(self.val + other.val, self.grad + other.grad, hess)
+        val = self.val + other
+        return Jet(val, *self._broadcast(val.shape))
+
+    __radd__ = __add__
+
+    def __sub__(self, other):
+        return self + (-other)
+
+    def __rsub__(self, other):
+        return (-self) + other
+
+    def __mul__(self, other):
+        if isinstance(other, Jet):
+            grad = self.val[..., None] * other.grad + other.val[..., None] * self.grad
+            if self.hess is None or other.hess is None:
+                return Jet(self.val * other.val, grad)
+            cross = self.grad[..., :, None] * other.grad[..., None, :]
+            hess = self.val[..., None, None] * other.hess + other.val[..., None, None] * self.hess + \
+                cross + np.swapaxes(cross, -1, -2)
+            return Jet(self.val * other.val, grad, hess)
+        other = np.asarray(other, dtype=float)
+        return Jet(self.val * other, other[..., None] * self.grad,
+                   None if self.hess is None else other[..., None, None] * self.hess)
+
+    __rmul__ = __mul__
+
+    def reciprocal(self):
+        inv = 1.0 / self.val
+        return self._chain(inv, -inv ** 2, 2.0 * inv ** 3)
+
+    def __truediv__(self, other):
+        if isinstance(other, Jet):
+            return self * other.reciprocal()
+        return self * (1.0 / np.asarray(other, dtype=float))
+
+    def __rtruediv__(self, other):
+        return self.reciprocal() * other
+
+    def __pow__(self, power):
+        if isinstance(power, Jet):
+            return exp(power * log(self))
+        p = float(power)
+        if p == 2.0:
+            return self * self
+        return self._chain(self.val ** p, p * self.val ** (p - 1.0), p * (p - 1.0) * self.val ** (p - 2.0))
+
+    def __rpow__(self, base):
+        return exp(self * np.log(base))
+
+    def __repr__(self):
+        return f'Jet(val={self.val!r}, grad={self.grad!r}, hess={self.hess!r})'
+
+
+# Elementary functions. These accept jets or plain floats/arrays, so
+# code written with them works whether or not it is being differentiated.
+
+def exp(x):
+    if not isinstance(x, Jet):
+        return np.exp(x)
+    f = np.exp(x.val)
+    return x._chain(f, f, f)
+
+
+def log(x):
+    if not isinstance(x, Jet):
+        return np.log(x)
+    inv = 1.0 / x.val
+    return x._chain(np.log(x.val), inv, -inv ** 2)
+
+
+def log1p(x):
+    if not isinstance(x, Jet):
+        return np.log1p(x)
+    inv = 1.0 / (1.0 + x.val)
+    return x._chain(np.log1p(x.val), inv, -inv ** 2)
+
+
+def sqrt(x):
+    if not isinstance(x, Jet):
+        return np.sqrt(x)
+    f = np.sqrt(x.val)
+    return x._chain(f, 0.5 / f, -0.25 / (f * x.val))
+
+
+def sinh(x):
+    if not isinstance(x, Jet):
+        return np.sinh(x)
+    f, g = np.sinh(x.val), np.cosh(x.val)
+    return x._chain(f, g, f)
+
+
+def cosh(x):
+    if not isinstance(x, Jet):
+        return np.cosh(x)
+    f, g = np.cosh(x.val), np.sinh(x.val)
+    return x._chain(f, g, f)
+
+
+def tanh(x):
+    if not isinstance(x, Jet):
+        return np.tanh(x)
+    f = np.tanh(x.val)
+    d = 1.0 - f ** 2
+    return x._chain(f, d, -2.0 * f * d)
+
+
+def _square(x):
+    return x * x
+
+
+_UNARY_UFUNCS.update({
+    np.negative: Jet.__neg__,
+    np.positive: Jet.__pos__,
+    np.reciprocal: Jet.reciprocal,
+    np.square: _square,
+    np.exp: exp,
+    np.log: log,
+    np.log1p: log1p,
+    np.sqrt: sqrt,
+    np.sinh: sinh,
+    np.cosh: cosh,
+    np.tanh: tanh,
+})
+
+
+def value(x):
+    """
+    Value of `x`, whether or not it is a jet.
+    """
+    return x.val if isinstance(x, Jet) else x
@@ -0,0 +1,354 @@
+"""
+Bulk thermodynamic consistency checks for equations of state.
+
+:func:`check_eos` samples thousands of (T, v) states, evaluates an
+equation of state's analytic derivatives, inversions and integrals at
+all of them in a few vectorized calls, and compares them with
+independent references: finite differences of the lower-order methods,
+Maxwell relations, and Gauss-Legendre quadrature. The report lists the
+worst relative error of each check and the state where it occurs, so a
+single run both gates an implementation in CI and points at the method
+to fix::
+
+    report = check_eos(PurePREOS(Pc=22064000.0, Tc=647.096, omega=0.3443),
+                       T_range=(300.0, 2000.0))
+    print(report.summary())
+
+Usage from the command line, for the GKKR substances::
+
+    python -m pytherm.consistency Water --eos PR SRK --n 10000
+"""
+import argparse
+import inspect
+import sys
+from typing import Callable, List, NamedTuple, Optional, Sequence, Tuple
+import numpy as np
+from .constants import R
+from .eos import (EOS, HelmholtzEOS, PExplicitEOS, PurePREOS, PurePR78EOS, PureRKEOS, PureSRKEOS,
+                  PureVdWEOS)
+from .util import skip_validation
+
+
+def derivative(func: Callable, x0, dx, points: int = 5):
+    """
+    First derivative by central finite differences, element-wise for
+    array arguments.
+
+    Args:
+        func: Vectorized function of one variable
+        x0: Point(s) at which to differentiate
+        dx: Step size(s)
+        points: Stencil size, 3 (second-order accurate) or 5 (fourth
+            order)
+
+    Returns:
+        Estimate of the derivative at `x0`
+    """
+    if points == 3:
+        return (func(x0 + dx) - func(x0 - dx)) / (2 * dx)
+    if points == 5:
+        return (func(x0 - 2 * dx) - 8 * func(x0 - dx) + 8 * func(x0 + dx) - func(x0 + 2 * dx)) / (12 * dx)
+    raise ValueError('points must be 3 or 5')
+
+
+class CheckResult(NamedTuple):
+    """
+    Outcome of one consistency check over all sampled states.
+    """
+    name: str
+    max_error: float
+    T: float
+    v: float
+    n_failed: int
+    n_points: int
+
+    @property
+    def passed(self) -> bool:
+        return self.n_failed == 0
+
+
+class ConsistencyReport(NamedTuple):
+    """
+    Results of :func:`check_eos`.
+    """
+    eos: str
+    rtol: float
+    checks: Tuple[CheckResult, ...]
+
+    @property
+    def passed(self) -> bool:
+        return all(check.passed for check in self.checks)
+
+    @property
+    def failures(self) -> Tuple[CheckResult, ...]:
+        return tuple(check for check in self.checks if not check.passed)
+
+    def summary(self) -> str:
+        """
+        Format the report as a table, one check per line.
+        """
+        lines = [f'{self.eos}: {"passed" if self.passed else "FAILED"} (rtol {self.rtol:g})',
+                 f'  {"check":<34} {"max error":>10} {"failed":>13}  {"worst at":<}']
+        for check in self.checks:
+            lines.append(f'  {check.name:<34} {check.max_error:10.2e} '
+                         f'{f"{check.n_failed}/{check.n_points}":>13}  '
+                         f'T = {check.T:.6g} K, v = {check.v:.6g} m^3/mol')
+        return '\n'.join(lines)
+
+
+def sample_states(eos: PExplicitEOS, n: int, T_range: Tuple[float, float],
+                  P_range: Tuple[float, float] = (1e3, 1e9), seed: int = 0) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Draw random states covering the valid domain of an EOS: temperatures
+    uniform over `T_range`, and volumes log-uniform from the ideal gas
+    volume at the lowest pressure down to the ideal gas volume at the
+    highest pressure, or 5 % above the EOS's minimum volume if that is
+    larger.
+
+    Args:
+        eos: Equation of state
+        n: Number of states
+        T_range: Lowest and highest temperature [K]
+        P_range: Pressures [Pa] that bound the volume range
+        seed: Random seed, so that repeated runs sample the same states
+
+    Returns:
+        Temperatures [K] and specific volumes [m^3/mol]
+    """
+    rng = np.random.default_rng(seed)
+    T = rng.uniform(*T_range, n)
+    v_min = np.maximum(1.05 * eos._v_lower(T), R * T / P_range[1])
+    v_max = R * T / P_range[0]
+    v = np.exp(rng.uniform(np.log(v_min), np.log(v_max)))
+    return T, v
+
+
+def _relative_error(value, reference, scale) -> np.ndarray:
+    """
+    Element-wise error relative to the reference, or to the natural
+    scale of the quantity where that is larger, so that quantities that
+    pass through or are identically zero (e.g. ∂P/∂v at a spinodal, or
+    the second temperature derivative of a van der Waals EOS) are
+    compared on their typical size.
+    """
+    return np.abs(value - reference) / np.maximum(np.abs(reference), scale)
+
+
+def _gauss_legendre(func: Callable, a: np.ndarray, b: np.ndarray, order: int = 24) -> np.ndarray:
+    """
+    Integrate a vectorized function from `a` to `b`, element-wise.
+    """
+    nodes, weights = np.polynomial.legendre.leggauss(order)
+    half, mid = (b - a) / 2, (b + a) / 2
+    return half * sum(w * func(mid + half * x) for x, w in zip(nodes, weights))
+
+
+def _steps(eos: PExplicitEOS, T: np.ndarray, v: np.ndarray, h: float) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Finite-difference steps in T and v. Volume steps are relative to the
+    distance from the EOS's minimum volume, where the pressure diverges.
+    """
+    return h * T, h * (v - eos._v_lower(T))
+
+
+def _invert_T(eos: PExplicitEOS, P: np.ndarray, v: np.ndarray) -> np.ndarray:
+    """
+    Invert for temperature, returning NaN for the states where the
+    inversion fails. A batch that fails is split in half until the
+    failing states are isolated.
+    """
+    try:
+        return eos.T(P, v)
+    except (RuntimeError, ValueError):
+        if P.size == 1:
+            return np.full(1, np.nan)
+        half = P.size // 2
+        return np.concatenate([_invert_T(eos, P[:half], v[:half]), _invert_T(eos, P[half:], v[half:])])
+
+
+def _pexplicit_checks(eos: PExplicitEOS, T: np.ndarray, v: np.ndarray, h: float):
+    """
+    Checks that apply to every pressure-explicit EOS, as (name, value,
+    reference, scale, mask) tuples. `scale` is the natural size of the
+    quantity (see :func:`_relative_error`) and `mask` selects the states
+    the check applies to, or is None for all of them.
+    """
+    dT, dv = _steps(eos, T, v, h)
+    # Ideal gas pressure, as the scale of the pressure derivatives
+    P_scale = R * T / v
+    checks = [
+        ('dP_dT_v', eos.dP_dT_v(T, v), derivative(lambda x: eos.P(x, v), T, dT), P_scale / T, None),
+        ('dP_dv_T', eos.dP_dv_T(T, v), derivative(lambda x: eos.P(T, x), v, dv), P_scale / v, None),
+        ('d2P_dT2_v', eos.d2P_dT2_v(T, v), derivative(lambda x: eos.dP_dT_v(x, v), T, dT),
+         P_scale / T ** 2, None),
+        ('d2P_dTdv', eos.d2P_dTdv(T, v), derivative(lambda x: eos.dP_dT_v(T, x), v, dv),
+         P_scale / (T * v), None),
+        ('d2P_dTdv = d2P_dvdT', eos.d2P_dTdv(T, v), derivative(lambda x: eos.dP_dv_T(x, v), T, dT),
+         P_scale / (T * v), None),
+        ('d2P_dv2_T', eos.d2P_dv2_T(T, v), derivative(lambda x: eos.dP_dv_T(T, x), v, dv),
+         P_scale / v ** 2, None),
+    ]
+
+    P = eos.P(T, v)
+    positive = P > 0.0
+    T_inverted = np.full_like(T, np.nan)
+    T_inverted[positive] = _invert_T(eos, P[positive], v[positive])
+    checks.append(('T(P, v) inverts P(T, v)', T_inverted, T, T, positive))
+
+    if type(eos).integrate_du_dv_T is not PExplicitEOS.integrate_du_dv_T:
+        checks.append(('integrate_du_dv_T', eos.integrate_du_dv_T(T, v, 2 * v),
+                       _gauss_legendre(lambda x: eos.du_dv_T(T, x), v, 2 * v), R * T, None))
+    if type(eos).integrate_dh_dP_T is not PExplicitEOS.integrate_dh_dP_T:
+        checks.append(('integrate_dh_dP_T', eos.integrate_dh_dP_T(T, v, 2 * v),
+                       _gauss_legendre(lambda x: eos.dh_dP_T(T, x), v, 2 * v), R * T, None))
+    return checks
+
+
+def _helmholtz_checks(eos: HelmholtzEOS, T: np.ndarray, v: np.ndarray, h: float):
+    """
+    Checks of the reduced Helmholtz energy derivatives and the residual
+    properties derived from them.
+    """
+    tau, delta = eos._T_red / T, 1.0 / (v * eos._rho_red)
+    a = eos.alphar(tau, delta)
+    props = eos.residual_properties(T, v)
+    dT, dv = _steps(eos, T, v, h)
+    dtau, ddelta = h * tau, delta * dv / v
+    # ln φ contains ln z, which varies over a volume change of P/|(∂P/∂v)_T|.
+    # In a dense liquid that is far smaller than the distance from the
+    # minimum volume, and a step relative to the latter is dominated by
+    # truncation error.
+    dv_ln_phi = np.minimum(dv, h * np.abs(props.P / props.dP_dv_T))
+
+    def s_res_v(T, v):
+        # Residual entropy at constant volume, R(τα^r_τ - α^r)
+        tau = eos._T_red / T
+        a = eos.alphar(tau, 1.0 / (v * eos._rho_red))
+        return R * (tau * a.alpha_t - a.alpha)
+
+    # α^r is of order δ at low density, and its δ-derivatives of order 1
+    return [
+        ('alphar: alpha_d', a.alpha_d, derivative(lambda x: eos.alphar(tau, x).alpha, delta, ddelta), 1.0, None),
+        ('alphar: alpha_dd', a.alpha_dd, derivative(lambda x: eos.alphar(tau, x).alpha_d, delta, ddelta),
+         1.0, None),
+        ('alphar: alpha_t', a.alpha_t, derivative(lambda x: eos.alphar(x, delta).alpha, tau, dtau),
+         delta / tau, None),
+        ('alphar: alpha_tt', a.alpha_tt, derivative(lambda x: eos.alphar(x, delta).alpha_t, tau, dtau),
+         delta / tau ** 2, None),
+        ('alphar: alpha_dt', a.alpha_dt, derivative(lambda x: eos.alphar(x, delta).alpha_d, tau, dtau),
+         1.0 / tau, None),
+        ('P from alphar', props.P, eos.P(T, v), R * T / v, None),
+        ('cv_res = (du_res/dT)_v', props.cv_res,
+         derivative(lambda x: eos.residual_properties(x, v).u_res, T, dT), R, None),
+        ('Maxwell (ds/dv)_T = (dP/dT)_v', derivative(lambda x: s_res_v(T, x), v, dv) + R / v,
+         props.dP_dT_v, R / v, None),
+        ('(dln_phi/dv)_T = (z-1)/P (dP/dv)_T',
+         derivative(lambda x: eos.residual_properties(T, x).ln_phi, v, dv_ln_phi),
+         (props.z - 1.0) / props.P * props.dP_dv_T, 1.0 / v, props.z > 0.01),
+    ]
+
+
+def check_eos(eos: PExplicitEOS, T_range: Tuple[float, float], n: int = 5000, rtol: float = 1e-6,
+              P_range: Tuple[float, float] = (1e3, 1e9), step: float = 2e-4,
+              seed: int = 0) -> ConsistencyReport:
+    """
+    Check an equation of state for thermodynamic consistency at `n`
+    random states (see :func:`sample_states`).
+
+    For every pressure-explicit EOS, the analytic first and second
+    pressure derivatives are compared with five-point finite differences
+    of the next lower derivative (both orders of the mixed derivative),
+    :meth:`~pytherm.eos.EOS.T` is checked to invert
+    :meth:`~pytherm.eos.EOS.P`, and overridden volume integrals are
+    compared with Gauss-Legendre quadrature of their integrands. For a
+    :class:`~pytherm.eos.HelmholtzEOS`, the derivatives of
+    :math:`α^r`, the heat capacity, the Maxwell relation
+    :math:`(∂s/∂v)_T = (∂P/∂T)_v` and the pressure dependence of the
+    fugacity coefficient are checked as well.
+
+    Argument validation is skipped during the checks.
+
+    Args:
+        eos: Equation of state to check
+        T_range: Lowest and highest temperature [K]
+        n: Number of states
+        rtol: Largest relative error that passes
+        P_range: Pressures [Pa] that bound the sampled volumes
+        step: Finite-difference step, relative to the temperature and to
+            the distance from the minimum volume (for the fugacity
+            coefficient, to :math:`P/|(∂P/∂v)_T|` where that is smaller)
+        seed: Random seed for the states
+
+    Returns:
+        The worst error of each check, and where it occurs
+    """
+    with skip_validation(), np.errstate(divide='ignore', invalid='ignore'):
+        T, v = sample_states(eos, n, T_range, P_range, seed)
+        checks = _pexplicit_checks(eos, T, v, step)
+        if isinstance(eos, HelmholtzEOS):
+            checks += _helmholtz_checks(eos, T, v, step)
+
+    results = []
+    for name, value, reference, scale, mask in checks:
+        idx = np.arange(n) if mask is None else np.flatnonzero(mask)
+        value, reference, scale = (np.broadcast_to(x, T.shape)[idx] for x in (value, reference, scale))
+        error = _relative_error(value, reference, scale)
+        error = np.where(np.isnan(error), np.inf, error)
+        worst = int(np.argmax(error)) if idx.size else 0
+        results.append(CheckResult(
+            name=name,
+            max_error=float(error[worst]) if idx.size else 0.0,
+            T=float(T[idx[worst]]) if idx.size else np.nan,
+            v=float(v[idx[worst]]) if idx.size else np.nan,
+            n_failed=int(np.count_nonzero(error > rtol)),
+            n_points=int(idx.size),
+        ))
+    return ConsistencyReport(eos=type(eos).__name__, rtol=rtol, checks=tuple(results))
+
+
+EOS_CLASSES = {
+    'PR': PurePREOS,
+    'PR78': PurePR78EOS,
+    'SRK': PureSRKEOS,
+    'RK': PureRKEOS,
+    'VdW': PureVdWEOS,
+}
+
+
+def _eos_from_gkkr(name: str, eos_class) -> EOS:
+    from .data import load_gkkr_substance
+    substance = load_gkkr_substance(name)
+    constants = {'Pc': substance['Pc'] * 1e5, 'Tc': substance['Tc'], 'omega': substance['omega']}
+    params = inspect.signature(eos_class).parameters
+    return eos_class(**{key: value for key, value in constants.items() if key in params})
+
+
+def main(argv: Optional[Sequence[str]] = None) -> List[ConsistencyReport]:
+    parser = argparse.ArgumentParser(
+        prog='python -m pytherm.consistency',
+        description='Check cubic equations of state for GKKR substances for thermodynamic consistency.')
+    parser.add_argument('substances', nargs='+', help='GKKR substance names, e.g. Water')
+    parser.add_argument('--eos', nargs='+', default=list(EOS_CLASSES), choices=list(EOS_CLASSES),
+                        help='equations of state to check (default: all)')
+    parser.add_argument('--n', type=int, default=5000, help='number of sampled states (default: 5000)')
+    parser.add_argument('--rtol', type=float, default=1e-6, help='relative tolerance (default: 1e-6)')
+    parser.add_argument('--T-range', type=float, nargs=2, metavar=('T_MIN', 'T_MAX'),
+                        help='temperature range [K] (default: 0.4 Tc to 4 Tc)')
+    args = parser.parse_args(argv)
+
+    reports = []
+    for substance in args.substances:
+        for eos_name in args.eos:
+            eos = _eos_from_gkkr(substance, EOS_CLASSES[eos_name])
+            T_range = args.T_range or (0.4 * eos._Tc, 4.0 * eos._Tc)
+            report = check_eos(eos, T_range, n=args.n, rtol=args.rtol)
+            print(f'{substance} ', end='')
+            print(report.summary())
+            reports.append(report)
+    if not all(report.passed for report in reports):
+        sys.exit(1)
+    return reports
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,7 @@
+"""
+Physical constants, kept free of imports so that any module can use
+them without slowing down importing pytherm.
+"""
+
+# Molar gas constant [J/mol/K]
+R = 8.3144622
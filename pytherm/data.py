@@ -1,9 +1,31 @@
-import json
+import os
 
+# R is re-exported here, where it used to be defined
+from .constants import R
 
-R = 8.3144622
+GKKR_PATH = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'data', 'gkkr.json')
 
 
 def load_gkkr_data():
-    with open('data/gkkr.json') as file:
-        return json.load(file)
\ No newline at end of file
+    import json
+    with open(GKKR_PATH) as file:
+        return json.load(file)
+
+
+def load_gkkr_substance(name: str) -> dict:
+    """
+    Load the GKKR data for one substance.
+
+    Args:
+        name: Substance name, e.g. 'Water' (case-insensitive)
+
+    Returns:
+        Substance record, with Tc in K, Pc in bar, vc in cm^3/mol and M
+        in g/mol, and its correlations under 'Correlations'
+    """
+    data = load_gkkr_data()
+    names = {key.lower(): key for key in data}
+    try:
+        return data[names[name.lower()]]
+    except KeyError:
+        raise KeyError(f'No GKKR data for {name!r}') from None
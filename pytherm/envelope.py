@@ -0,0 +1,397 @@
+"""
+Saturation curves and critical points of pure fluids.
+
+The two-phase boundary of a pure fluid is the curve along which liquid
+and vapor have equal pressure and equal Gibbs energy. Writing both in
+terms of the reduced residual Helmholtz energy of a
+:class:`pytherm.eos.HelmholtzEOS`, with :math:`p = δ(1 + δα^r_δ)` the
+reduced pressure :math:`P/(ρ_\\text{red}RT)`,
+
+.. math::
+    \\frac{p(τ, δ_l)}{p(τ, δ_v)} - 1 = 0
+
+    g(τ, δ_l) - g(τ, δ_v) = 0, \\quad g = α^r + δα^r_δ + \\ln δ
+
+gives two equations in the three unknowns
+:math:`X = (\\ln δ_l, \\ln δ_v, \\ln τ)`, and every entry of their
+Jacobian is a first or second derivative of :math:`α^r`, i.e. comes from
+the same call to :meth:`~pytherm.eos.HelmholtzEOS.alphar`.
+
+:func:`phase_envelope` traces the curve by natural-parameter
+continuation: a third equation fixes whichever of the unknowns is
+changing fastest along the curve, the tangent :math:`dX/dS` extrapolates
+each solved point into the starting guess for the next, and the step
+size grows or shrinks with the number of Newton iterations needed.
+Close to the critical point the density gap :math:`\\ln(δ_l/δ_v)` is
+the fastest-changing unknown and becomes the specification, so the
+trace never has to solve the (singular) point itself: the critical point
+is located separately by :func:`critical_point`, from the criticality
+conditions :math:`(∂P/∂ρ)_T = (∂^2P/∂ρ^2)_T = 0`.
+"""
+from typing import NamedTuple, Optional, Tuple
+import numpy as np
+from .ad import Jet
+from .constants import R
+from .eos import HelmholtzEOS
+from .solve import expand_bracket, newton_bracketed
+from .util import args_must_be_positive, check_bounds
+
+
+class CriticalPoint(NamedTuple):
+    """
+    Critical point of an equation of state.
+    """
+    T: float
+    P: float
+    v: float
+
+
+class PhaseEnvelope(NamedTuple):
+    """
+    Saturation curve from :func:`phase_envelope`, ordered by increasing
+    temperature and ending at the critical point.
+    """
+    T: np.ndarray
+    P: np.ndarray
+    v_liq: np.ndarray
+    v_vap: np.ndarray
+    critical: CriticalPoint
+
+    @property
+    def cricondenbar(self) -> Tuple[float, float]:
+        """
+        Temperature and pressure of the highest-pressure point. For a
+        pure fluid this is the critical point.
+        """
+        i = np.argmax(self.P)
+        return self.T[i], self.P[i]
+
+    @property
+    def cricondentherm(self) -> Tuple[float, float]:
+        """
+        Temperature and pressure of the highest-temperature point. For a
+        pure fluid this is the critical point.
+        """
+        i = np.argmax(self.T)
+        return self.T[i], self.P[i]
+
+
+def _residual(eos: HelmholtzEOS, x: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Equal-pressure and equal-Gibbs-energy residuals at
+    ``x = (ln δ_l, ln δ_v, ln τ)``, and their 2x3 Jacobian.
+    """
+    delta, tau = np.exp(x[:2]), np.full(2, np.exp(x[2]))
+    a = eos.alphar(tau, delta)
+
+    p = delta * (1.0 + delta * a.alpha_d)
+    K = 1.0 + 2.0 * delta * a.alpha_d + delta ** 2 * a.alpha_dd
+    g = a.alpha + delta * a.alpha_d + x[:2]
+    dp_dtau = tau * delta ** 2 * a.alpha_dt
+    dg_dtau = tau * (a.alpha_t + delta * a.alpha_dt)
+
+    F = np.array([p[0] / p[1] - 1.0, g[0] - g[1]])
+    J = np.array([
+        [delta[0] * K[0] / p[1], -p[0] * delta[1] * K[1] / p[1] ** 2,
+         (dp_dtau[0] * p[1] - p[0] * dp_dtau[1]) / p[1] ** 2],
+        [K[0], -K[1], dg_dtau[0] - dg_dtau[1]],
+    ])
+    return F, J
+
+
+def _augmented(J: np.ndarray, k: int) -> np.ndarray:
+    """
+    Jacobian with the specification equation ``X[k] = S`` appended.
+    """
+    spec = np.zeros(3)
+    spec[k] = 1.0
+    return np.vstack([J, spec])
+
+
+def _newton(eos: HelmholtzEOS, x: np.ndarray, k: int, tol: float = 1e-8,
+            maxiter: int = 12) -> Tuple[Optional[np.ndarray], int]:
+    """
+    Solve the saturation equations with ``X[k]`` held at its value in
+    `x`. Convergence is quadratic, so the error after the last step,
+    of size below `tol`, is of order ``tol ** 2``.
+
+    Returns:
+        The solution and the number of iterations, or None if Newton's
+        method diverged, left the physical region or collapsed onto the
+        trivial solution :math:`δ_l = δ_v`.
+    """
+    x = x.copy()
+    for i in range(1, maxiter + 1):
+        with np.errstate(invalid='ignore', divide='ignore'):
+            F, J = _residual(eos, x)
+        if not (np.all(np.isfinite(F)) and np.all(np.isfinite(J))):
+            return None, i
+        try:
+            dx = np.linalg.solve(_augmented(J, k), -np.append(F, 0.0))
+        except np.linalg.LinAlgError:
+            return None, i
+        x += np.clip(dx, -1.0, 1.0)
+        if np.max(np.abs(dx)) < tol:
+            if x[0] - x[1] < 1e-6:
+                return None, i
+            return x, i
+    return None, maxiter
+
+
+def _branch_root(eos: HelmholtzEOS, P: float, T: float, lo: float, hi: float) -> float:
+    """
+    Volume at pressure `P` on a monotonic branch of the isotherm,
+    bracketed by `lo` and `hi`.
+    """
+    T = np.array([T])
+    return newton_bracketed(lambda v, idx: (eos.P(T, v) - P, eos.dP_dv_T(T, v)),
+                            lo=np.array([lo]), hi=np.array([hi]), sign=1.0)[0]
+
+
+def _initial_guess(eos: HelmholtzEOS, T: float) -> np.ndarray:
+    """
+    Starting point for the saturation equations at a subcritical
+    temperature, from the liquid and vapor roots at an estimate of the
+    saturation pressure.
+
+    Where the liquid spinodal pressure is negative, the liquid is solved
+    at zero pressure, and the vapor treated as an ideal gas in
+    equilibrium with it:
+    :math:`P^\\text{sat} ≈ ρ_l RT \\exp(α^r_l - 1)`. Otherwise the
+    pressure midway between the spinodal pressures is used.
+    """
+    v_liq_spinodal, v_vap_spinodal = (float(v) for v in eos.spinodal_v(T))
+    if not np.isfinite(v_vap_spinodal):
+        raise ValueError(f'The isotherm at T = {T} K has no van der Waals loop')
+    v_lower = float(eos._v_lower(T))
+    P_liq_spinodal, P_vap_spinodal = eos.P(T, v_liq_spinodal), eos.P(T, v_vap_spinodal)
+
+    if P_liq_spinodal < 0.0:
+        v_liq = _branch_root(eos, 0.0, T, v_lower, v_liq_spinodal)
+        alpha = eos._alphar_Tv(T, v_liq).alpha
+        P = min(R * T / v_liq * np.exp(alpha - 1.0), 0.5 * P_vap_spinodal)
+    else:
+        P = 0.5 * (P_liq_spinodal + P_vap_spinodal)
+
+    v_liq = _branch_root(eos, P, T, v_lower, v_liq_spinodal)
+    hi = expand_bracket(lambda v, idx: eos.P(T, v) - P, np.array([v_vap_spinodal + R * T / P]))[0]
+    v_vap = _branch_root(eos, P, T, v_vap_spinodal, hi)
+    return np.log([1.0 / (v_liq * eos._rho_red), 1.0 / (v_vap * eos._rho_red), eos._T_red / T])
+
+
+def _state(eos: HelmholtzEOS, x: np.ndarray) -> Tuple[float, float, float, float]:
+    """
+    Temperature, pressure and phase volumes at a solution `x`.
+    """
+    T = eos._T_red / np.exp(x[2])
+    v_liq, v_vap = 1.0 / (np.exp(x[:2]) * eos._rho_red)
+    return T, eos.P(T, v_vap), v_liq, v_vap
+
+
+@args_must_be_positive('T')
+def saturation_point(eos: HelmholtzEOS, T: float) -> Tuple[float, float, float]:
+    """
+    Calculate the saturation pressure and the coexisting liquid and
+    vapor volumes at one temperature.
+
+    Args:
+        eos: Equation of state with a van der Waals loop below its
+            critical temperature (see
+            :meth:`~pytherm.eos.PExplicitEOS.spinodal_v`)
+        T: Temperature, below the critical temperature [K]
+
+    Returns:
+        Saturation pressure [Pa], and liquid and vapor specific volumes
+        [m^3/mol]
+    """
+    x, _ = _newton(eos, _initial_guess(eos, T), k=2, maxiter=50)
+    if x is None:
+        raise RuntimeError(f'Failed to solve the saturation equations at T = {T} K')
+    return _state(eos, x)[1:]
+
+
+def critical_point(eos: HelmholtzEOS, T: Optional[float] = None, v: Optional[float] = None,
+                   tol: float = 1e-12, maxiter: int = 50) -> CriticalPoint:
+    """
+    Locate the critical point of an equation of state, where
+    :math:`(∂P/∂ρ)_T = (∂^2P/∂ρ^2)_T = 0`, or in reduced form
+
+    .. math::
+        1 + 2δα^r_δ + δ^2α^r_{δδ} = 0
+
+        2α^r_δ + 4δα^r_{δδ} + δ^2α^r_{δδδ} = 0
+
+    The third and fourth density derivatives of :math:`α^r` that these
+    and their Jacobian need are obtained by evaluating
+    :meth:`~pytherm.eos.HelmholtzEOS.alphar` on jets.
+
+    Args:
+        eos: Equation of state
+        T: Initial guess for the critical temperature [K]. Defaults to
+            the reducing temperature of the EOS.
+        v: Initial guess for the critical volume [m^3/mol]. Defaults to
+            four times the reducing volume (about right for cubics, whose
+            reducing volume is the co-volume).
+        tol: Relative tolerance on temperature and density
+        maxiter: Maximum number of Newton iterations
+
+    Returns:
+        Critical temperature [K], pressure [Pa] and volume [m^3/mol]
+    """
+    tau = 1.0 if T is None else eos._T_red / T
+    delta = 0.25 if v is None else 1.0 / (v * eos._rho_red)
+
+    for _ in range(maxiter):
+        tau_jet, delta_jet = Jet.seed(tau, delta)
+        a = eos.alphar(tau_jet, delta_jet)
+        alpha_ddd = Jet(a.alpha_dd.grad[..., 1], a.alpha_dd.hess[..., 1, :])
+        c1 = 1.0 + 2.0 * delta_jet * a.alpha_d + delta_jet ** 2 * a.alpha_dd
+        c2 = 2.0 * a.alpha_d + 4.0 * delta_jet * a.alpha_dd + delta_jet ** 2 * alpha_ddd
+
+        step = np.linalg.solve(np.array([c1.grad, c2.grad]), -np.array([c1.val, c2.val]))
+        # Limit each step to a 20 % change, to stay in the physical region
+        step *= min(1.0, 0.2 / np.max(np.abs(step / (tau, delta))))
+        tau, delta = tau + step[0], delta + step[1]
+        if np.max(np.abs(step / (tau, delta))) < tol:
+            break
+    else:
+        raise RuntimeError(f'Failed to locate the critical point after {maxiter} iterations')
+
+    T, v = eos._T_red / tau, 1.0 / (delta * eos._rho_red)
+    return CriticalPoint(T=T, P=eos.P(T, v), v=v)
+
+
+@args_must_be_positive('T_start')
+def phase_envelope(eos: HelmholtzEOS, T_start: Optional[float] = None, max_step: float = 0.5,
+                   gap_end: float = 0.05, maxpoints: int = 1000) -> PhaseEnvelope:
+    """
+    Trace the saturation curve of a pure fluid from `T_start` up to the
+    critical point, by continuation (see the module docstring).
+
+    Each step is sized so that no unknown changes by more than the
+    current step size. The step grows by half after a point converges in
+    three Newton iterations or fewer, shrinks after a slow point and is
+    halved and retried when Newton's method fails. Tracing stops once the
+    density gap :math:`\\ln(δ_l/δ_v)` falls to `gap_end`, and the critical
+    point is then solved from an extrapolation of the last two points.
+
+    For a pure fluid the cricondenbar and cricondentherm coincide with
+    the critical point; the :class:`PhaseEnvelope` properties find them
+    as the extremes of the traced curve.
+
+    Args:
+        eos: Equation of state with a van der Waals loop below its
+            critical temperature
+        T_start: Lowest temperature of the curve [K]. Defaults to half
+            the reducing temperature of the EOS (the critical temperature
+            of a cubic).
+        max_step: Largest step in any of :math:`\\ln δ_l`,
+            :math:`\\ln δ_v` and :math:`\\ln τ`
+        gap_end: Density gap :math:`\\ln(δ_l/δ_v)` at which tracing hands
+            over to :func:`critical_point`
+        maxpoints: Maximum number of points on the curve
+
+    Returns:
+        The saturation curve, including the critical point
+    """
+    if T_start is None:
+        T_start = 0.5 * eos._T_red
+    x, _ = _newton(eos, _initial_guess(eos, T_start), k=2, maxiter=50)
+    if x is None:
+        raise RuntimeError(f'Failed to solve the saturation equations at T = {T_start} K')
+
+    points = [x]
+    k, step = 2, 0.05
+    while len(points) < maxpoints:
+        gap = x[0] - x[1]
+        if gap <= gap_end * (1.0 + 1e-9):
+            break
+        # Tangent dX/dS, rescaled to unit change in the fastest-changing
+        # unknown, which becomes the new specification
+        _, J = _residual(eos, x)
+        tangent = np.linalg.solve(_augmented(J, k), np.array([0.0, 0.0, 1.0]))
+        k = int(np.argmax(np.abs(tangent)))
+        tangent /= tangent[k]
+        # Step in the direction that closes the density gap, without
+        # overshooting gap_end
+        dgap = tangent[0] - tangent[1]
+        dS = -np.sign(dgap) * min(step, (gap - gap_end) / abs(dgap))
+
+        x_new, iterations = _newton(eos, x + dS * tangent, k)
+        if x_new is None:
+            step *= 0.5
+            if step < 1e-6:
+                raise RuntimeError(f'Continuation failed at T = {eos._T_red / np.exp(x[2])} K')
+            continue
+        x = x_new
+        points.append(x)
+        if iterations <= 3:
+            step = min(1.5 * step, max_step)
+        elif iterations > 5:
+            step *= 0.7
+
+    # Near the critical point T - Tc is even in the density gap, so
+    # extrapolate T(gap) quadratically to zero gap from the last two points
+    (g1, T1), (g2, T2) = ((p[0] - p[1], eos._T_red / np.exp(p[2])) for p in points[-2:])
+    T_guess = (T1 * g2 ** 2 - T2 * g1 ** 2) / (g2 ** 2 - g1 ** 2) if g1 != g2 else T2
+    v_guess = 1.0 / (np.exp(0.5 * (points[-1][0] + points[-1][1])) * eos._rho_red)
+    critical = critical_point(eos, T_guess, v_guess)
+
+    T, P, v_liq, v_vap = (np.append(column, value) for column, value in
+                          zip(zip(*(_state(eos, p) for p in points)), (critical.T, critical.P, critical.v, critical.v)))
+    return PhaseEnvelope(T=T, P=P, v_liq=v_liq, v_vap=v_vap, critical=critical)
+
+
+@args_must_be_positive('T')
+def saturation_pressure(eos: HelmholtzEOS, T, envelope: Optional[PhaseEnvelope] = None):
+    """
+    Saturation pressure at any number of temperatures, interpolated
+    along a traced saturation curve instead of solving the equilibrium at
+    each one.
+
+    The curve is interpolated with cubic Hermite polynomials in
+    :math:`(1/T, \\ln P)`, with the slopes from the Clapeyron equation
+    at each traced point,
+
+    .. math::
+        \\frac{d \\ln P}{d(1/T)} = -\\frac{h^r_v - h^r_l}{R(z_v - z_l)}
+
+    which is accurate to about :math:`10^{-6}` relative to
+    :func:`saturation_point` between the points of
+    :func:`phase_envelope`.
+
+    Args:
+        eos: Equation of state with a van der Waals loop below its
+            critical temperature
+        T: Temperature [K]
+        envelope: Saturation curve of the EOS. Defaults to tracing one
+            from the lowest temperature (or half the reducing
+            temperature, if lower).
+
+    Returns:
+        Saturation pressure [Pa], NaN at and above the critical
+        temperature
+    """
+    T = np.asarray(T, dtype=float)
+    if envelope is None:
+        envelope = phase_envelope(eos, T_start=min(np.min(T), 0.5 * eos._T_red))
+    check_bounds('T', T, envelope.T[0])
+
+    T_sat, P_sat = envelope.T[:-1], envelope.P[:-1]
+    liq = eos.residual_properties(T_sat, envelope.v_liq[:-1])
+    vap = eos.residual_properties(T_sat, envelope.v_vap[:-1])
+    # Decreasing in 1/T, so reverse to interpolate in increasing x
+    x = np.append(1.0 / T_sat, 1.0 / envelope.critical.T)[::-1]
+    y = np.log(np.append(P_sat, envelope.critical.P))[::-1]
+    slope = np.append(-(vap.h_res - liq.h_res) / (R * (vap.z - liq.z)), np.nan)[::-1]
+    # The Clapeyron slope is 0/0 at the critical point, so use the secant
+    slope[0] = (y[1] - y[0]) / (x[1] - x[0])
+
+    supercritical = T >= envelope.critical.T
+    xq = 1.0 / np.where(supercritical, envelope.critical.T, T)
+    i = np.clip(np.searchsorted(x, xq) - 1, 0, len(x) - 2)
+    h = x[i + 1] - x[i]
+    t = (xq - x[i]) / h
+    ln_P = ((1 + 2 * t) * y[i] + t * h * slope[i]) * (1 - t) ** 2 + (
+        (3 - 2 * t) * y[i + 1] + (t - 1) * h * slope[i + 1]) * t ** 2
+    return np.where(supercritical, np.nan, np.exp(ln_P))[()]
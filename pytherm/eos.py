@@ -1,7 +1,78 @@
 from abc import ABC, abstractmethod
-from scipy.optimize import root_scalar
-from scipy.integrate import quad
-from .data import R
+import copy
+from functools import cached_property
+import threading
+from typing import Callable, Dict, NamedTuple, Optional, Sequence, Tuple, Union
+import numpy as np
+from .ad import Jet, value
+from .constants import R
+from .solve import expand_bracket, newton_bracketed
+from .util import args_must_be_positive
+from .wire import Serializable, register
+
+
+def _flatten(*args):
+    """
+    Broadcast the arguments against each other and flatten them to 1-D
+    float arrays. Also returns the broadcast shape, so that results can
+    be restored to it with :func:`_restore`.
+    """
+    arrays = np.broadcast_arrays(*(np.asarray(arg, dtype=float) for arg in args))
+    return [array.ravel() for array in arrays], arrays[0].shape
+
+
+def _restore(x: np.ndarray, shape: tuple):
+    """
+    Reshape a flat result array to `shape`, unwrapping 0-d results to
+    scalars.
+    """
+    return x.reshape(shape)[()]
+
+
+class PDerivatives(NamedTuple):
+    """
+    Pressure and all of its first and second partial derivatives with
+    respect to temperature and specific volume at a state.
+    """
+    P: float
+    dP_dT_v: float
+    dP_dv_T: float
+    d2P_dT2_v: float
+    d2P_dTdv: float
+    d2P_dv2_T: float
+
+
+class HelmholtzDerivatives(NamedTuple):
+    """
+    Reduced residual Helmholtz energy :math:`α^r = a^r/RT` and its
+    partial derivatives up to second order with respect to the inverse
+    reduced temperature :math:`τ = T_\\text{red}/T` and the reduced
+    density :math:`δ = ρ/ρ_\\text{red}`.
+    """
+    alpha: float
+    alpha_d: float
+    alpha_dd: float
+    alpha_t: float
+    alpha_tt: float
+    alpha_dt: float
+
+
+class ResidualProperties(NamedTuple):
+    """
+    Properties of a fluid at a state that follow from the equation of
+    state alone. Residual (departure) properties are relative to the
+    ideal gas at the same temperature and pressure.
+    """
+    P: float
+    z: float
+    dP_dT_v: float
+    dP_dv_T: float
+    u_res: float
+    h_res: float
+    s_res: float
+    cv_res: float
+    cp_res: float
+    ln_phi: float
 
 
 class EOS(ABC):
@@ -71,14 +142,128 @@ class EOS(ABC):
 
 
 class PExplicitEOS(EOS):
+    """
+    Base class for equations of state written explicitly in pressure,
+    :math:`P = P(T, v)`.
+
+    Temperature and volume are found by inverting :meth:`P` with a
+    safeguarded Newton iteration (:func:`pytherm.solve.newton_bracketed`)
+    on a bracket derived from the EOS itself:
+
+    * :math:`T > 0`, with :math:`(∂P/∂T)_v > 0` so that :math:`P(T)` is
+      monotonic along an isochore.
+    * :math:`v > v_\\text{min}(T)` (:meth:`_v_lower`, e.g. the co-volume
+      :math:`b` of a cubic EOS), where the pressure is assumed to
+      diverge to :math:`+∞`.
+    * The spinodal volumes (:meth:`spinodal_v`), where
+      :math:`(∂P/∂v)_T = 0`. These split a subcritical isotherm into
+      monotonic liquid, unstable and vapor branches.
+
+    All inversions accept NumPy arrays as well as floats.
+    """
+    @args_must_be_positive('P', 'v')
     def T(self, P: float, v: float) -> float:
-        T0 = P * v / R
-        return root_scalar(lambda T: self.P(T, v) - P, x0=T0, x1=T0 + 1.0).root
-
+        (P, v), shape = _flatten(P, v)
+
+        def residual(T, idx):
+            return self.P(T, v[idx]) - P[idx]
+
+        # P(T) increases monotonically along an isochore, so the root is
+        # bracketed by stepping away from the ideal gas estimate (with the
+        # excluded volume removed) until the residual changes sign.
+        v_lower = self._v_lower(P * v / R)
+        if np.any(v <= v_lower):
+            raise ValueError('v must be greater than the lower volume bound of the EOS (e.g. the co-volume b of '
+                             'a cubic EOS)')
+        T0 = P * (v - v_lower) / R
+        below = residual(T0, np.arange(T0.size)) < 0.0
+        lo, hi = T0.copy(), T0.copy()
+        up, down = np.flatnonzero(below), np.flatnonzero(~below)
+        hi[up] = expand_bracket(lambda T, idx: -residual(T, up[idx]), 2.0 * T0[up])
+        lo[down] = expand_bracket(lambda T, idx: residual(T, down[idx]), 0.5 * T0[down], factor=0.5)
+
+        T = newton_bracketed(lambda T, idx: (residual(T, idx), self.dP_dT_v(T, v[idx])),
+                             lo=lo, hi=hi, sign=-1.0, x0=np.sqrt(lo * hi))
+        return _restore(T, shape)
+
+    @args_must_be_positive('P', 'T')
     def v(self, P: float, T: float) -> float:
-        v0 = R * T / P
-        return root_scalar(lambda v: self.P(T, v) - P, x0=v0, x1=v0 * 1.1).root
+        """
+        Calculate the specific volume of a fluid at the specified
+        pressure and temperature.
+
+        Where the isotherm has three volume roots at the given pressure,
+        the vapor (largest) root is returned, i.e. the liquid root is
+        only returned if the pressure is above the vapor spinodal.
+
+        Args:
+            P: Pressure [Pa]
+            T: Temperature [K]
+
+        Returns:
+            Specific Volume [m^3/mol]
+        """
+        (P, T), shape = _flatten(P, T)
+        lo, hi = self._v_bracket(P, T)
+        v = newton_bracketed(lambda v, idx: (self.P(T[idx], v) - P[idx], self.dP_dv_T(T[idx], v)),
+                             lo=lo, hi=hi, sign=1.0, x0=R * T / P)
+        return _restore(v, shape)
+
+    def _v_lower(self, T: float) -> float:
+        """
+        Lower bound on the specific volume, at which the pressure
+        diverges to :math:`+∞`. The default is zero.
+
+        Args:
+            T: Temperature [K]
+
+        Returns:
+            Minimum specific volume [m^3/mol]
+        """
+        return np.zeros_like(np.asarray(T, dtype=float))
+
+    @args_must_be_positive('T')
+    def spinodal_v(self, T: float) -> Tuple[float, float]:
+        """
+        Calculate the liquid and vapor spinodal volumes, i.e. the local
+        minimum and maximum of the isotherm :math:`P(v)` where
+        :math:`(∂P/∂v)_T = 0`.
+
+        The default implementation assumes isotherms have no van der
+        Waals loop and returns NaN. EOS whose isotherms do have one
+        should override this so that :meth:`v` can bracket the vapor
+        root.
+
+        Args:
+            T: Temperature [K]
+
+        Returns:
+            Liquid and vapor spinodal volumes [m^3/mol], NaN where the
+            isotherm has no spinodal (e.g. above the critical
+            temperature).
+        """
+        nan = np.full_like(np.asarray(T, dtype=float), np.nan)
+        return nan, nan
 
+    def _v_bracket(self, P: np.ndarray, T: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Bracket the volume root selected by :meth:`v`, with
+        :math:`P(v) - P` positive at the lower end and negative at the
+        upper end.
+        """
+        lo = self._v_lower(T) + np.zeros_like(P)
+        hi = expand_bracket(lambda v, idx: self.P(T[idx], v) - P[idx], lo + R * T / P)
+
+        v_liq, v_vap = self.spinodal_v(T)
+        has_loop = np.isfinite(v_vap)
+        P_vap = self.P(T[has_loop], v_vap[has_loop])
+        vapor_exists = np.zeros_like(has_loop)
+        vapor_exists[has_loop] = P[has_loop] < P_vap
+        lo = np.where(has_loop & vapor_exists, v_vap, lo)
+        hi = np.where(has_loop & ~vapor_exists, v_liq, hi)
+        return lo, hi
+
+    @args_must_be_positive('T', 'v')
     def z(self, T: float, v: float) -> float:
         """
         Calculate the compressibility factor of a fluid at the given
@@ -95,13 +280,14 @@ class PExplicitEOS(EOS):
 
     # First-order P-v-T derivatives
 
-    @abstractmethod
     def dP_dT_v(self, T: float, v: float) -> float:
         """
         First derivative of pressure with respect to temperature at
         constant volume.
 
-        Should be derived from the equation of state itself.
+        The default implementation differentiates :meth:`P`
+        automatically; subclasses may override it with the derivative
+        of the equation of state itself.
 
         Args:
             T: Temperature [K]
@@ -110,15 +296,16 @@ class PExplicitEOS(EOS):
         Returns:
             ∂P/∂T at constant volume [Pa/K]
         """
-        ...
+        return self._P_jet(T, v, order=1).grad[..., 0][()]
 
-    @abstractmethod
     def dP_dv_T(self, T: float, v: float) -> float:
         """
         First derivative of pressure with respect to volume at
         constant temperature.
 
-        Should be derived from the equation of state itself.
+        The default implementation differentiates :meth:`P`
+        automatically; subclasses may override it with the derivative
+        of the equation of state itself.
 
         Args:
             T: Temperature [K]
@@ -127,7 +314,7 @@ class PExplicitEOS(EOS):
         Returns:
             ∂P/∂v at constant temperature [Pa*mol/m^3]
         """
-        ...
+        return self._P_jet(T, v, order=1).grad[..., 1][()]
 
     def dT_dP_v(self, T: float, v: float) -> float:
         """
@@ -187,13 +374,14 @@ class PExplicitEOS(EOS):
 
     # Second-order P-v-T derivatives
 
-    @abstractmethod
     def d2P_dT2_v(self, T: float, v: float) -> float:
         """
         Second derivative of pressure with respect to temperature at
         constant volume.
 
-        Should be derived from the equation of state.
+        The default implementation differentiates :meth:`P`
+        automatically; subclasses may override it with the derivative
+        of the equation of state itself.
 
         Args:
             T: Temperature [K]
@@ -202,7 +390,110 @@ class PExplicitEOS(EOS):
         Returns:
             ∂²P/∂T² at constant volume [Pa/K²]
         """
-        ...
+        return self._P_jet(T, v, order=2).hess[..., 0, 0][()]
+
+    def d2P_dTdv(self, T: float, v: float) -> float:
+        """
+        Mixed second derivative of pressure with respect to temperature
+        and volume.
+
+        The default implementation differentiates :meth:`P`
+        automatically; subclasses may override it with the derivative
+        of the equation of state itself.
+
+        Args:
+            T: Temperature [K]
+            v: Specific Volume [m^3/mol]
+
+        Returns:
+            ∂²P/∂T∂v [Pa*mol/m^3/K]
+        """
+        return self._P_jet(T, v, order=2).hess[..., 0, 1][()]
+
+    def d2P_dv2_T(self, T: float, v: float) -> float:
+        """
+        Second derivative of pressure with respect to volume at
+        constant temperature.
+
+        The default implementation differentiates :meth:`P`
+        automatically; subclasses may override it with the derivative
+        of the equation of state itself.
+
+        Args:
+            T: Temperature [K]
+            v: Specific Volume [m^3/mol]
+
+        Returns:
+            ∂²P/∂v² at constant temperature [Pa*mol²/m^6]
+        """
+        return self._P_jet(T, v, order=2).hess[..., 1, 1][()]
+
+    def derivatives(self, T: float, v: float) -> PDerivatives:
+        """
+        Calculate the pressure and all of its first and second
+        derivatives at once.
+
+        Derivatives are taken from a single evaluation of :meth:`P` on
+        second-order jets (see :mod:`pytherm.ad`), except for those a
+        subclass overrides analytically, which take precedence.
+
+        Args:
+            T: Temperature [K]
+            v: Specific Volume [m^3/mol]
+
+        Returns:
+            Pressure and its derivatives, in the units of the
+            corresponding methods.
+        """
+        jet = self._P_jet(T, v, order=2)
+        derivs = PDerivatives(P=jet.val[()],
+                              dP_dT_v=jet.grad[..., 0][()],
+                              dP_dv_T=jet.grad[..., 1][()],
+                              d2P_dT2_v=jet.hess[..., 0, 0][()],
+                              d2P_dTdv=jet.hess[..., 0, 1][()],
+                              d2P_dv2_T=jet.hess[..., 1, 1][()])
+        overridden = {name: getattr(self, name)(T, v) for name in derivs._fields[1:]
+                      if getattr(type(self), name) is not getattr(PExplicitEOS, name)}
+        return derivs._replace(**overridden)
+
+    def _P_jet(self, T: float, v: float, order: int) -> Jet:
+        """
+        Evaluate :meth:`P` on jets seeded in (T, v).
+        """
+        T, v = np.broadcast_arrays(np.asarray(T, dtype=float), np.asarray(v, dtype=float))
+        return self.P(*Jet.seed(T, v, order=order))
+
+    @args_must_be_positive('T')
+    def at_T(self, T: float) -> 'Isotherm':
+        """
+        Restrict the EOS to one temperature, e.g. for an isothermal
+        sweep over volume or pressure. Quantities that depend only on
+        temperature (such as :math:`a(T)` of a :class:`CubicEOS`) are
+        computed once, here, where the EOS supports it.
+
+        Args:
+            T: Temperature [K]
+
+        Returns:
+            The isotherm
+        """
+        return Isotherm(self, T)
+
+    @args_must_be_positive('v')
+    def at_v(self, v: float) -> 'Isochore':
+        """
+        Restrict the EOS to one specific volume, e.g. for an isochoric
+        sweep over temperature or pressure. Quantities that depend only
+        on volume (such as the denominators of a :class:`CubicEOS`) are
+        computed once, here, where the EOS supports it.
+
+        Args:
+            v: Specific Volume [m^3/mol]
+
+        Returns:
+            The isochore
+        """
+        return Isochore(self, v)
 
     # Additional first-order derivatives
 
@@ -243,6 +534,7 @@ class PExplicitEOS(EOS):
         Returns:
             Change in internal energy [J/mol]
         """
+        from scipy.integrate import quad
         return quad(lambda v: self.du_dv_T(T, v), v1, v2)[0]
 
     def dh_dP_T(self, T: float, v: float) -> float:
@@ -282,189 +574,2039 @@ class PExplicitEOS(EOS):
         Returns:
             Change in enthalpy [J/mol]
         """
+        from scipy.integrate import quad
         return quad(lambda v: self.dh_dP_T(T, v), v1, v2)[0]
 
 
-# class EOSIdeal(EOS):
-#     """
-#     Class modeling the ideal gas law.
-#
-#     .. math:: Pv = RT
-#
-#     By definition, the compressibility factor (z) for an ideal gas is
-#     always one.
-#     """
-#
-#     def P(self, T: float, v: float) -> float:
-#         return R * T / v
-#
-#     def T(self, P: float, v: float) -> float:
-#         return P * v / R
-#
-#     def v(self, P: float, T: float) -> float:
-#         return R * T / P
-#
-#     def z(self, P: float, T: float, v: float) -> float:
-#         return 1.0
-#
-#     def dP_dT_v(self, P: float, T: float, v: float) -> float:
-#         return R / v
-#
-#
-# class EOSVirial2ndOrder(EOS):
-#     """
-#     Class modeling the virial equation of state, truncated after the
-#     second term.
-#
-#     Calculations are based on the Leiden form of the equation:
-#
-#     .. math::
-#         PV = zRT
-#
-#         z = 1 + \\frac{B \\left( T \\right)}{v}
-#     """
-#     def __init__(self, B: Callable[[float], float]):
-#         """
-#         Initialize the EOS with the desired parameters.
-#
-#         Args:
-#             B: A function representing the second virial "coefficient",
-#                 B(T). Takes in a temperature [K] and returns a
-#                 coefficient [dimensionless].
-#         """
-#         self._B = B
-#
-#     def P(self, T: float, v: float) -> float:
-#         return (1 + self._B(T) / v)* R * T / v
-#
-#     def T(self, P: float, v: float) -> float:
-#         def func(T: float):
-#             return T - P * v / R / (1 + self._B(T) / v)
-#         x0 = P * v / R
-#         return root_scalar(func, x0=x0, x1=x0+1.0).root
-#
-#     def v(self, P: float, T: float) -> float:
-#         def func(v: float):
-#             return v - R * T / P * (1 + self._B(T) / v)
-#         v0 = R * T / P
-#         return root_scalar(func, x0=v0, x1=v0*1.1).root
-#
-#     def dP_dT_v(self, P: float, T: float, v: float) -> float:
-#         return R * T
-
-
-class PurePREOS(PExplicitEOS):
+class Isotherm:
     """
-    Class modeling the Peng-Robinson equation of state for a pure
-    (single-component) fluid.
+    Equation of state restricted to one temperature, created by
+    :meth:`PExplicitEOS.at_T`.
 
-    .. math::
-        z = \\frac{v}{v - b} - \\frac{a \\left( T \\right) v}
-            {RT \\left[ v \\left( v + b \\right) + b \\left( v - b \\right) \\right]}
+    Methods are those of the EOS with the temperature argument removed,
+    and accept arrays of volumes or pressures.
+    """
+    def __init__(self, eos: PExplicitEOS, T: float):
+        """
+        Args:
+            eos: Equation of state
+            T: Temperature [K]
+        """
+        if not isinstance(T, float) and np.ndim(T) != 0:
+            raise ValueError('An isotherm has a single temperature')
+        self.eos = eos
+        self.T = T
 
-        P = \\frac{RT}{v - b} - \\frac{a \\left( T \\right)}
-            {v \\left( v + b \\right) + b \\left( v - b \\right)}
+    def __repr__(self):
+        return f'{type(self).__name__}({self.eos!r}, T={self.T!r})'
 
-        a \\left( T \\right) = C_a α \\left( T \\right)
+    @property
+    def _eos(self) -> PExplicitEOS:
+        # EOS to evaluate at T, which subclasses may replace with a
+        # cheaper one that agrees with it there
+        return self.eos
 
-        α \\left( T \\right) = \\left[1 + C_α \\left( 1 - T_r^{0.5} \\right) \\right]^2
+    def P(self, v: float) -> float:
+        return self._eos.P(self.T, v)
 
-        C_a = 0.45724 \\frac{R^2 T_c^2}{P_c}
+    def v(self, P: float) -> float:
+        return self._eos.v(P, self.T)
 
-        C_α = 0.37464 + 1.54226 ω - 0.26992 ω^2
+    def z(self, v: float) -> float:
+        return self._eos.z(self.T, v)
 
-        b = 0.0778 \\frac{R T_c}{P_c}
+    def spinodal_v(self) -> Tuple[float, float]:
+        return self._eos.spinodal_v(self.T)
+
+    def dP_dT_v(self, v: float) -> float:
+        return self._eos.dP_dT_v(self.T, v)
+
+    def dP_dv_T(self, v: float) -> float:
+        return self._eos.dP_dv_T(self.T, v)
+
+    def d2P_dT2_v(self, v: float) -> float:
+        return self._eos.d2P_dT2_v(self.T, v)
+
+    def d2P_dTdv(self, v: float) -> float:
+        return self._eos.d2P_dTdv(self.T, v)
+
+    def d2P_dv2_T(self, v: float) -> float:
+        return self._eos.d2P_dv2_T(self.T, v)
+
+    def derivatives(self, v: float) -> PDerivatives:
+        return self._eos.derivatives(self.T, v)
+
+    def residual_properties(self, v: float) -> ResidualProperties:
+        return self._eos.residual_properties(self.T, v)
+
+
+class Isochore:
     """
+    Equation of state restricted to one specific volume, created by
+    :meth:`PExplicitEOS.at_v`.
 
-    def __init__(self, Pc: float, Tc: float, omega: float):
+    Methods are those of the EOS with the volume argument removed, and
+    accept arrays of temperatures or pressures.
+    """
+    def __init__(self, eos: PExplicitEOS, v: float):
         """
-        Initialize the EOS with the desired parameters.
-
         Args:
-            Pc: Fluid critical pressure [Pa]
-            Tc: Fluid critical temperature [K]
-            omega: Fluid accentric factor [dimensionless]
+            eos: Equation of state
+            v: Specific Volume [m^3/mol]
         """
-        self._Pc = Pc
-        self._Tc = Tc
-        self._omega = omega
+        if not isinstance(v, float) and np.ndim(v) != 0:
+            raise ValueError('An isochore has a single specific volume')
+        self.eos = eos
+        self.v = v
 
-        self._C_alpha = 0.37464 + 1.54226 * omega - 0.26992 * omega ** 2
-        self._C_a = 0.45724 * R ** 2 * Tc ** 2 / Pc
-        self._b = 0.0778 * R * Tc / Pc
+    def __repr__(self):
+        return f'{type(self).__name__}({self.eos!r}, v={self.v!r})'
 
-    def _a(self, T: float) -> float:
-        Tr = T / self._Tc
-        return self._C_a * (1 + self._C_alpha * (1 - Tr ** 0.5)) ** 2
+    def P(self, T: float) -> float:
+        return self.eos.P(T, self.v)
 
-    def _da_dT(self, T: float) -> float:
-        sqrt_Tr = (T / self._Tc) ** 0.5
-        return -self._C_a * self._C_alpha * sqrt_Tr * (1 + self._C_alpha * (1 - sqrt_Tr)) / T
+    def T(self, P: float) -> float:
+        return self.eos.T(P, self.v)
 
-    def _d2a_dT2(self, T: float) -> float:
-        sqrt_Tr = (T / self._Tc) ** 0.5
-        return 0.5 * self._C_a * self._C_alpha * sqrt_Tr * (1 + self._C_alpha) / T**2
+    def z(self, T: float) -> float:
+        return self.eos.z(T, self.v)
+
+    def dP_dT_v(self, T: float) -> float:
+        return self.eos.dP_dT_v(T, self.v)
+
+    def dP_dv_T(self, T: float) -> float:
+        return self.eos.dP_dv_T(T, self.v)
+
+    def d2P_dT2_v(self, T: float) -> float:
+        return self.eos.d2P_dT2_v(T, self.v)
+
+    def d2P_dTdv(self, T: float) -> float:
+        return self.eos.d2P_dTdv(T, self.v)
+
+    def d2P_dv2_T(self, T: float) -> float:
+        return self.eos.d2P_dv2_T(T, self.v)
+
+    def derivatives(self, T: float) -> PDerivatives:
+        return self.eos.derivatives(T, self.v)
+
+    def residual_properties(self, T: float) -> ResidualProperties:
+        return self.eos.residual_properties(T, self.v)
+
+
+class HelmholtzEOS(PExplicitEOS):
+    """
+    Base class for equations of state defined by their reduced residual
+    Helmholtz energy, :math:`α^r(τ, δ) = a^r/RT`, with
+    :math:`τ = T_\\text{red}/T` and :math:`δ = ρ/ρ_\\text{red}`.
 
+    Concrete classes implement :meth:`alphar` (returning :math:`α^r` and
+    all its derivatives up to second order at once) and set the reducing
+    temperature ``_T_red`` [K] and molar density ``_rho_red``
+    [mol/m^3]. Every other property follows from one call to
+    :meth:`alphar`:
+
+    .. math::
+        z = 1 + δα^r_δ
+
+        \\left(\\frac{∂P}{∂T}\\right)_v = ρR \\left(1 + δα^r_δ - δτα^r_{δτ}\\right)
+
+        \\left(\\frac{∂P}{∂v}\\right)_T = -ρ^2 RT \\left(1 + 2δα^r_δ + δ^2α^r_{δδ}\\right)
+
+        \\frac{u^r}{RT} = τα^r_τ
+
+        \\frac{h^r}{RT} = τα^r_τ + δα^r_δ
+
+        \\frac{s^r}{R} = τα^r_τ - α^r + \\ln z
+
+        \\frac{c_v^r}{R} = -τ^2α^r_{ττ}
+
+        \\ln φ = α^r + z - 1 - \\ln z
+    """
+    _T_red: float
+    _rho_red: float
+
+    @abstractmethod
+    def alphar(self, tau: float, delta: float) -> HelmholtzDerivatives:
+        """
+        Calculate the reduced residual Helmholtz energy and its partial
+        derivatives.
+
+        Args:
+            tau: Inverse reduced temperature [dimensionless]
+            delta: Reduced density [dimensionless]
+
+        Returns:
+            :math:`α^r` and its derivatives up to second order
+        """
+        ...
+
+    def _alphar_Tv(self, T: float, v: float) -> HelmholtzDerivatives:
+        return self.alphar(self._T_red / T, 1.0 / (v * self._rho_red))
+
+    @args_must_be_positive('T', 'v')
     def P(self, T: float, v: float) -> float:
-        return R*T/(v-self._b) - self._a(T)/(v*(v+self._b) + self._b*(v-self._b))
+        a = self._alphar_Tv(T, v)
+        delta = 1.0 / (v * self._rho_red)
+        return R * T / v * (1.0 + delta * a.alpha_d)
 
     def dP_dT_v(self, T: float, v: float) -> float:
+        a = self._alphar_Tv(T, v)
+        delta, tau = 1.0 / (v * self._rho_red), self._T_red / T
+        return R / v * (1.0 + delta * a.alpha_d - delta * tau * a.alpha_dt)
+
+    def dP_dv_T(self, T: float, v: float) -> float:
+        a = self._alphar_Tv(T, v)
+        delta = 1.0 / (v * self._rho_red)
+        return -R * T / v ** 2 * (1.0 + 2.0 * delta * a.alpha_d + delta ** 2 * a.alpha_dd)
+
+    def integrate_du_dv_T(self, T: float, v1: float, v2: float) -> float:
         """
-        First derivative of pressure with respect to temperature at
-        constant volume.
+        Integral of :math:`(\\frac{du}{dv})_T` between initial and final
+        specific volumes, i.e. the change in residual internal energy
+        along the isotherm.
 
         .. math::
-            \\left(\\frac{∂P}{∂T}\\right)_v = \\frac{R}{v-b} -
-            \\frac{\\left(∂a(T)/∂T\\right)_v}{v \\left( v + b \\right) + b \\left( v - b \\right)}
+            \\int_{v_1}^{v_2}\\left( \\frac{∂u}{∂v} \\right)_T \\text{d}v =
+            RTτ \\left[ α^r_τ(τ, δ_2) - α^r_τ(τ, δ_1) \\right]
+
+        Args:
+            T: Temperature [K]
+            v1: Specific volume at initial state [m^3/mol]
+            v2: Specific volume at final state [m^3/mol]
+        Returns:
+            Change in internal energy [J/mol]
+        """
+        tau = self._T_red / T
+        return R * T * tau * (self._alphar_Tv(T, v2).alpha_t - self._alphar_Tv(T, v1).alpha_t)
 
-            \\left(∂a(T)/∂T\\right)_v =
-            \\frac{C_a C_α T_r^{0.5} \\left[1 + C_α \\left(1-T_r^{0.5}\\right) \\right]}{T}
+    @args_must_be_positive('T', 'v')
+    def residual_properties(self, T: float, v: float) -> ResidualProperties:
+        """
+        Calculate pressure, its first derivatives, and the residual
+        thermodynamic properties from a single evaluation of
+        :meth:`alphar`.
 
         Args:
             T: Temperature [K]
             v: Specific Volume [m^3/mol]
 
         Returns:
-            ∂P/∂T at constant volume [Pa/K]
+            Pressure [Pa], compressibility factor [dimensionless],
+            ∂P/∂T [Pa/K], ∂P/∂v [Pa*mol/m^3], residual internal energy
+            and enthalpy [J/mol], residual entropy and heat capacities
+            [J/mol/K] and the natural log of the fugacity coefficient
+            [dimensionless].
         """
-        return R / (v - self._b) - self._da_dT(T) / (v * (v + self._b) + self._b * (v - self._b))
+        tau, delta = self._T_red / T, 1.0 / (v * self._rho_red)
+        a = self.alphar(tau, delta)
+
+        z = 1.0 + delta * a.alpha_d
+        dP_dT_v = R / v * (1.0 + delta * a.alpha_d - delta * tau * a.alpha_dt)
+        dP_dv_T = -R * T / v ** 2 * (1.0 + 2.0 * delta * a.alpha_d + delta ** 2 * a.alpha_dd)
+        ln_z = np.log(z)
+        cv_res = -R * tau ** 2 * a.alpha_tt
+        return ResidualProperties(
+            P=z * R * T / v,
+            z=z,
+            dP_dT_v=dP_dT_v,
+            dP_dv_T=dP_dv_T,
+            u_res=R * T * tau * a.alpha_t,
+            h_res=R * T * (tau * a.alpha_t + delta * a.alpha_d),
+            s_res=R * (tau * a.alpha_t - a.alpha + ln_z),
+            cv_res=cv_res,
+            cp_res=cv_res - T * dP_dT_v ** 2 / dP_dv_T - R,
+            ln_phi=a.alpha + z - 1.0 - ln_z,
+        )
+
+
+class EOSIdeal(HelmholtzEOS):
+    """
+    Class modeling the ideal gas law.
+
+    .. math:: Pv = RT
+
+    By definition, the compressibility factor (z) for an ideal gas is
+    always one, and all residual properties are zero. Every inversion is
+    closed-form.
+    """
+    _T_red = 1.0
+    _rho_red = 1.0
+
+    def alphar(self, tau: float, delta: float) -> HelmholtzDerivatives:
+        zero = np.zeros(np.broadcast(tau, delta).shape)[()]
+        return HelmholtzDerivatives(zero, zero, zero, zero, zero, zero)
+
+    @args_must_be_positive('T', 'v')
+    def P(self, T: float, v: float) -> float:
+        return R * T / v
+
+    @args_must_be_positive('P', 'v')
+    def T(self, P: float, v: float) -> float:
+        return P * v / R
+
+    @args_must_be_positive('P', 'T')
+    def v(self, P: float, T: float) -> float:
+        return R * T / P
+
+    @args_must_be_positive('T', 'v')
+    def z(self, T: float, v: float) -> float:
+        return np.ones(np.broadcast(T, v).shape)[()]
+
+    def dP_dT_v(self, T: float, v: float) -> float:
+        return R / v + 0.0 * T
 
     def dP_dv_T(self, T: float, v: float) -> float:
-        """
-        First derivative of pressure with respect to specific volume at
-        constant temperature.
+        return -R * T / v ** 2
 
-        .. math::
-            \\left(\\frac{∂P}{∂v}\\right)_T = - \\frac{RT}{(v-b)^2} +
-            \\frac{2a(T) (v+b)}{\\left[ v \\left( v + b \\right) + b \\left( v - b \\right) \\right]^2}
+    def d2P_dT2_v(self, T: float, v: float) -> float:
+        return 0.0 * T * v
+
+    def d2P_dTdv(self, T: float, v: float) -> float:
+        return -R / v ** 2 + 0.0 * T
+
+    def d2P_dv2_T(self, T: float, v: float) -> float:
+        return 2 * R * T / v ** 3
+
+
+class VirialCoefficient(ABC):
+    """
+    Temperature dependence of the second virial coefficient,
+    :math:`B(T)`.
 
+    Concrete classes implement :meth:`__call__`. The derivatives default
+    to automatic differentiation, and are zero if :meth:`__call__` does
+    not depend on temperature.
+    """
+    @abstractmethod
+    def __call__(self, T: float) -> float:
+        """
         Args:
             T: Temperature [K]
-            v: Specific Volume [m^3/mol]
 
         Returns:
-            ∂P/∂v at constant temperature [Pa*mol/m^3]
+            B(T) [m^3/mol]
         """
-        return -R * T / (v - self._b) ** 2 + \
-            2 * self._a(T) * (v+self._b) / (v*(v+self._b) + self._b*(v-self._b)) ** 2
+        ...
 
-    def d2P_dT2_v(self, T: float, v: float) -> float:
+    def dB_dT(self, T: float) -> float:
         """
-        Second derivative of pressure with respect to temperature at
-        constant volume.
-
-        .. math::
-            \\left(\\frac{∂^2 P}{∂T^2}\\right)_v =
-            - \\frac{\\left(∂^2 a(T)/∂T^2\\right)_v}{v \\left( v + b \\right) + b \\left( v - b \\right)}
+        Args:
+            T: Temperature [K]
 
-            \\left(∂^2 a(T)/∂T^2\\right)_v =
-            \\frac{C_a C_α T_r^{0.5} \\left(1 + C_α\\right)}{2T^2}
+        Returns:
+            dB/dT [m^3/mol/K]
+        """
+        (T_jet,) = Jet.seed(T, order=1)
+        B = self(T_jet)
+        return B.grad[..., 0][()] if isinstance(B, Jet) else 0.0 * np.asarray(T, dtype=float)
 
+    def d2B_dT2(self, T: float) -> float:
+        """
         Args:
             T: Temperature [K]
-            v: Specific Volume [m^3/mol]
 
         Returns:
-            ∂²P/∂T² at constant volume [Pa/K²]
+            d²B/dT² [m^3/mol/K²]
+        """
+        (T_jet,) = Jet.seed(T, order=2)
+        B = self(T_jet)
+        return B.hess[..., 0, 0][()] if isinstance(B, Jet) else 0.0 * np.asarray(T, dtype=float)
+
+
+class _CallableVirialCoefficient(VirialCoefficient):
+    """
+    Adapter for a plain function :math:`B(T)`. Derivatives are found by
+    automatic differentiation, so the function should be written with
+    arithmetic and NumPy ufuncs.
+    """
+    def __init__(self, B: Callable[[float], float]):
+        self._B = B
+
+    def __call__(self, T: float) -> float:
+        return self._B(T)
+
+
+class AbbottVirialCoefficient(VirialCoefficient):
+    """
+    Abbott correlation for the second virial coefficient, in the
+    corresponding-states form of Pitzer.
+
+    .. math::
+        \\frac{B P_c}{R T_c} = B^0 + ω B^1
+
+        B^0 = 0.083 - \\frac{0.422}{T_r^{1.6}}
+
+        B^1 = 0.139 - \\frac{0.172}{T_r^{4.2}}
+    """
+    def __init__(self, Pc: float, Tc: float, omega: float):
+        """
+        Args:
+            Pc: Fluid critical pressure [Pa]
+            Tc: Fluid critical temperature [K]
+            omega: Fluid accentric factor [dimensionless]
+        """
+        self._Tc = Tc
+        self._omega = omega
+        self._C = R * Tc / Pc
+
+    def __call__(self, T: float) -> float:
+        Tr = T / self._Tc
+        return self._C * (0.083 - 0.422 * Tr ** -1.6 + self._omega * (0.139 - 0.172 * Tr ** -4.2))
+
+    def dB_dT(self, T: float) -> float:
+        Tr = T / self._Tc
+        return self._C * (0.6752 * Tr ** -2.6 + self._omega * 0.7224 * Tr ** -5.2) / self._Tc
+
+    def d2B_dT2(self, T: float) -> float:
+        Tr = T / self._Tc
+        return -self._C * (1.75552 * Tr ** -3.6 + self._omega * 3.75648 * Tr ** -6.2) / self._Tc ** 2
+
+
+class EOSVirial2ndOrder(HelmholtzEOS):
+    """
+    Class modeling the virial equation of state, truncated after the
+    second term.
+
+    Calculations are based on the Leiden form of the equation:
+
+    .. math::
+        Pv = zRT
+
+        z = 1 + \\frac{B \\left( T \\right)}{v}
+
+    which corresponds to :math:`α^r = Bρ`. Volume is found in closed
+    form from the quadratic :math:`Pv^2 - RTv - RTB = 0`; temperature
+    uses the bracketed Newton iteration of :class:`PExplicitEOS`, as
+    :math:`B(T)` is in general nonlinear.
+    """
+    _T_red = 1.0
+    _rho_red = 1.0
+
+    def __init__(self, B: Union[VirialCoefficient, Callable[[float], float]]):
+        """
+        Initialize the EOS with the desired parameters.
+
+        Args:
+            B: The second virial coefficient, B(T), either as a
+                :class:`VirialCoefficient` or as a function that takes
+                in a temperature [K] and returns a coefficient
+                [m^3/mol].
+        """
+        self._B = B if isinstance(B, VirialCoefficient) else _CallableVirialCoefficient(B)
+
+    def alphar(self, tau: float, delta: float) -> HelmholtzDerivatives:
+        T = self._T_red / tau
+        B, dB_dT, d2B_dT2 = self._B(T), self._B.dB_dT(T), self._B.d2B_dT2(T)
+        # dB/dτ and d²B/dτ², with T = T_red/τ
+        B_t = -dB_dT * T / tau
+        B_tt = (d2B_dT2 * T ** 2 + 2 * dB_dT * T) / tau ** 2
+        zero = 0.0 * (B * delta)
+        return HelmholtzDerivatives(
+            alpha=B * delta * self._rho_red,
+            alpha_d=B * self._rho_red + zero,
+            alpha_dd=zero,
+            alpha_t=B_t * delta * self._rho_red,
+            alpha_tt=B_tt * delta * self._rho_red,
+            alpha_dt=B_t * self._rho_red + zero,
+        )
+
+    @args_must_be_positive('T', 'v')
+    def P(self, T: float, v: float) -> float:
+        return (1 + self._B(T) / v) * R * T / v
+
+    @args_must_be_positive('P', 'T')
+    def v(self, P: float, T: float) -> float:
+        """
+        Calculate the specific volume of a fluid at the specified
+        pressure and temperature, as the larger root of
+        :math:`Pv^2 - RTv - RTB = 0`.
+
+        Args:
+            P: Pressure [Pa]
+            T: Temperature [K]
+
+        Returns:
+            Specific Volume [m^3/mol], NaN where
+            :math:`4BP/RT < -1` and the truncated series has no solution.
+        """
+        P, T = np.asarray(P, dtype=float), np.asarray(T, dtype=float)
+        with np.errstate(invalid='ignore'):
+            return (R * T / (2 * P) * (1 + np.sqrt(1 + 4 * self._B(T) * P / (R * T))))[()]
+
+    def dP_dT_v(self, T: float, v: float) -> float:
+        return R / v + R * (self._B(T) + T * self._B.dB_dT(T)) / v ** 2
+
+    def dP_dv_T(self, T: float, v: float) -> float:
+        return -R * T / v ** 2 - 2 * R * T * self._B(T) / v ** 3
+
+    def d2P_dT2_v(self, T: float, v: float) -> float:
+        return R * (2 * self._B.dB_dT(T) + T * self._B.d2B_dT2(T)) / v ** 2
+
+    def d2P_dTdv(self, T: float, v: float) -> float:
+        return -R / v ** 2 - 2 * R * (self._B(T) + T * self._B.dB_dT(T)) / v ** 3
+
+    def d2P_dv2_T(self, T: float, v: float) -> float:
+        return 2 * R * T / v ** 3 + 6 * R * T * self._B(T) / v ** 4
+
+
+class AlphaFunction(Serializable, ABC):
+    """
+    Temperature dependence of the attractive parameter of a cubic
+    equation of state, :math:`a(T) = a_c α(T)`.
+
+    Concrete classes implement :meth:`__call__`. The derivatives default
+    to automatic differentiation (see :mod:`pytherm.ad`), and may be
+    overridden with analytical expressions.
+    """
+    @abstractmethod
+    def __call__(self, T: float) -> float:
+        """
+        Args:
+            T: Temperature [K]
+
+        Returns:
+            α(T) [dimensionless]
+        """
+        ...
+
+    def dalpha_dT(self, T: float) -> float:
+        """
+        Args:
+            T: Temperature [K]
+
+        Returns:
+            dα/dT [1/K]
+        """
+        (T,) = Jet.seed(T, order=1)
+        return self(T).grad[..., 0][()]
+
+    def d2alpha_dT2(self, T: float) -> float:
+        """
+        Args:
+            T: Temperature [K]
+
+        Returns:
+            d²α/dT² [1/K²]
+        """
+        (T,) = Jet.seed(T, order=2)
+        return self(T).hess[..., 0, 0][()]
+
+
+@register(10)
+class SoaveAlpha(AlphaFunction):
+    """
+    Soave alpha function, used by the SRK and Peng-Robinson equations
+    of state with different correlations for :math:`m(ω)`.
+
+    .. math::
+        α(T) = \\left[1 + m \\left( 1 - T_r^{0.5} \\right) \\right]^2
+    """
+    def __init__(self, Tc: float, m: float):
+        """
+        Args:
+            Tc: Fluid critical temperature [K]
+            m: Soave parameter [dimensionless]
+        """
+        self._Tc = Tc
+        self._m = m
+
+    def _wire(self):
+        return (self._Tc, self._m), ()
+
+    def __call__(self, T: float) -> float:
+        Tr = T / self._Tc
+        return (1 + self._m * (1 - Tr ** 0.5)) ** 2
+
+    def dalpha_dT(self, T: float) -> float:
+        sqrt_Tr = (T / self._Tc) ** 0.5
+        return -self._m * sqrt_Tr * (1 + self._m * (1 - sqrt_Tr)) / T
+
+    def d2alpha_dT2(self, T: float) -> float:
+        sqrt_Tr = (T / self._Tc) ** 0.5
+        return 0.5 * self._m * sqrt_Tr * (1 + self._m) / T**2
+
+
+@register(11)
+class RKAlpha(AlphaFunction):
+    """
+    Original Redlich-Kwong alpha function.
+
+    .. math:: α(T) = T_r^{-0.5}
+    """
+    def __init__(self, Tc: float):
+        """
+        Args:
+            Tc: Fluid critical temperature [K]
+        """
+        self._Tc = Tc
+
+    def _wire(self):
+        return (self._Tc,), ()
+
+    def __call__(self, T: float) -> float:
+        return (T / self._Tc) ** -0.5
+
+    def dalpha_dT(self, T: float) -> float:
+        return -0.5 * (T / self._Tc) ** -0.5 / T
+
+    def d2alpha_dT2(self, T: float) -> float:
+        return 0.75 * (T / self._Tc) ** -0.5 / T**2
+
+
+@register(12)
+class ConstantAlpha(AlphaFunction):
+    """
+    Temperature-independent attractive parameter, as in the van der
+    Waals equation of state.
+
+    .. math:: α(T) = 1
+    """
+    def _wire(self):
+        return (), ()
+
+    def __call__(self, T: float) -> float:
+        return 1.0 + 0.0 * T
+
+    def dalpha_dT(self, T: float) -> float:
+        return 0.0 * T
+
+    def d2alpha_dT2(self, T: float) -> float:
+        return 0.0 * T
+
+
+@register(13)
+class TwuAlpha(AlphaFunction):
+    """
+    Twu (1991) alpha function, with fluid-specific parameters
+    :math:`L`, :math:`M` and :math:`N`.
+
+    .. math::
+        α(T) = T_r^{N(M-1)} \\exp\\left[ L \\left( 1 - T_r^{NM} \\right) \\right]
+    """
+    def __init__(self, Tc: float, L: float, M: float, N: float):
+        """
+        Args:
+            Tc: Fluid critical temperature [K]
+            L: Twu L parameter [dimensionless]
+            M: Twu M parameter [dimensionless]
+            N: Twu N parameter [dimensionless]
+        """
+        self._Tc = Tc
+        self._L = L
+        self._M = M
+        self._N = N
+
+    def _wire(self):
+        return (self._Tc, self._L, self._M, self._N), ()
+
+    def _dln_alpha_dT(self, T: float) -> float:
+        Tr_NM = (T / self._Tc) ** (self._N * self._M)
+        return (self._N * (self._M - 1) - self._L * self._N * self._M * Tr_NM) / T
+
+    def __call__(self, T: float) -> float:
+        Tr = T / self._Tc
+        return Tr ** (self._N * (self._M - 1)) * np.exp(self._L * (1 - Tr ** (self._N * self._M)))
+
+    def dalpha_dT(self, T: float) -> float:
+        return self(T) * self._dln_alpha_dT(T)
+
+    def d2alpha_dT2(self, T: float) -> float:
+        g = self._dln_alpha_dT(T)
+        Tr_NM = (T / self._Tc) ** (self._N * self._M)
+        dg_dT = -self._L * (self._N * self._M) ** 2 * Tr_NM / T**2 - g / T
+        return self(T) * (g ** 2 + dg_dT)
+
+
+@register(14)
+class MathiasCopemanAlpha(AlphaFunction):
+    """
+    Mathias-Copeman alpha function. Above the critical temperature only
+    the first coefficient is used, which reduces it to the Soave form.
+
+    .. math::
+        α(T) = \\left[1 + c_1 x + c_2 x^2 + c_3 x^3 \\right]^2
+
+        x = 1 - T_r^{0.5}
+    """
+    def __init__(self, Tc: float, c1: float, c2: float = 0.0, c3: float = 0.0):
+        """
+        Args:
+            Tc: Fluid critical temperature [K]
+            c1: First Mathias-Copeman coefficient [dimensionless]
+            c2: Second Mathias-Copeman coefficient [dimensionless]
+            c3: Third Mathias-Copeman coefficient [dimensionless]
+        """
+        self._Tc = Tc
+        self._c1 = c1
+        self._c2 = c2
+        self._c3 = c3
+
+    def _wire(self):
+        return (self._Tc, self._c1, self._c2, self._c3), ()
+
+    def _terms(self, T: float):
+        """
+        Calculate x, its first two temperature derivatives, and the
+        (Tr < 1)-masked higher coefficients.
+        """
+        T = np.asarray(T, dtype=float)
+        sqrt_Tr = (T / self._Tc) ** 0.5
+        subcritical = sqrt_Tr < 1
+        c2 = np.where(subcritical, self._c2, 0.0)
+        c3 = np.where(subcritical, self._c3, 0.0)
+        return 1 - sqrt_Tr, -0.5 * sqrt_Tr / T, 0.25 * sqrt_Tr / T**2, c2, c3
+
+    def __call__(self, T: float) -> float:
+        x, _, _, c2, c3 = self._terms(T)
+        return ((1 + self._c1 * x + c2 * x**2 + c3 * x**3) ** 2)[()]
+
+    def dalpha_dT(self, T: float) -> float:
+        x, dx, _, c2, c3 = self._terms(T)
+        s = 1 + self._c1 * x + c2 * x**2 + c3 * x**3
+        return (2 * s * (self._c1 + 2 * c2 * x + 3 * c3 * x**2) * dx)[()]
+
+    def d2alpha_dT2(self, T: float) -> float:
+        x, dx, d2x, c2, c3 = self._terms(T)
+        s = 1 + self._c1 * x + c2 * x**2 + c3 * x**3
+        ds_dx = self._c1 + 2 * c2 * x + 3 * c3 * x**2
+        ds = ds_dx * dx
+        d2s = (2 * c2 + 6 * c3 * x) * dx**2 + ds_dx * d2x
+        return (2 * (ds**2 + s * d2s))[()]
+
+
+class _FrozenAlpha(AlphaFunction):
+    """
+    Alpha function evaluated once, at a fixed temperature, for an EOS
+    that is only evaluated there (see :meth:`CubicEOS.at_T`).
+
+    Other temperatures are taken to be the same one up to rounding, so
+    floats and arrays get the stored values. Jets get the second-order
+    Taylor expansion about it, so that derivatives taken through the
+    alpha function are still exact.
+    """
+    def __init__(self, T0: float, alpha: float, dalpha_dT: float, d2alpha_dT2: float):
+        self._T0 = T0
+        self._coeffs = alpha, dalpha_dT, d2alpha_dT2
+
+    def __call__(self, T: float) -> float:
+        alpha, dalpha, d2alpha = self._coeffs
+        if isinstance(T, Jet):
+            dT = T - self._T0
+            return alpha + dT * (dalpha + 0.5 * d2alpha * dT)
+        return alpha + 0.0 * T
+
+    def dalpha_dT(self, T: float) -> float:
+        _, dalpha, d2alpha = self._coeffs
+        if isinstance(T, Jet):
+            return dalpha + d2alpha * (T - self._T0)
+        return dalpha + 0.0 * T
+
+    def d2alpha_dT2(self, T: float) -> float:
+        return self._coeffs[2] + 0.0 * T
+
+
+class VolumeShift(Serializable, ABC):
+    """
+    Péneloux-type volume translation :math:`c(T)` of a cubic equation of
+    state. The translated EOS is the original one evaluated at
+    :math:`v + c(T)`, which leaves the vapor pressure unchanged while
+    correcting liquid volumes.
+
+    Concrete classes implement :meth:`__call__`. The derivatives default
+    to automatic differentiation, as for :class:`AlphaFunction`.
+    """
+    @abstractmethod
+    def __call__(self, T: float) -> float:
+        """
+        Args:
+            T: Temperature [K]
+
+        Returns:
+            Volume shift c(T) [m^3/mol]
+        """
+        ...
+
+    def dc_dT(self, T: float) -> float:
+        """
+        Args:
+            T: Temperature [K]
+
+        Returns:
+            dc/dT [m^3/mol/K]
+        """
+        (T,) = Jet.seed(T, order=1)
+        return self(T).grad[..., 0][()]
+
+    def d2c_dT2(self, T: float) -> float:
+        """
+        Args:
+            T: Temperature [K]
+
+        Returns:
+            d²c/dT² [m^3/mol/K²]
+        """
+        (T,) = Jet.seed(T, order=2)
+        return self(T).hess[..., 0, 0][()]
+
+
+@register(20)
+class ConstantShift(VolumeShift):
+    """
+    Temperature-independent volume translation, :math:`c(T) = c`.
+    """
+    def __init__(self, c: float):
+        """
+        Args:
+            c: Volume shift [m^3/mol]
+        """
+        self._c = c
+
+    def _wire(self):
+        return (self._c,), ()
+
+    def __call__(self, T: float) -> float:
+        return self._c + 0.0 * T
+
+    def dc_dT(self, T: float) -> float:
+        return 0.0 * T
+
+    def d2c_dT2(self, T: float) -> float:
+        return 0.0 * T
+
+
+@register(21)
+class PolynomialShift(VolumeShift):
+    """
+    Temperature-dependent volume translation, polynomial in reduced
+    temperature.
+
+    .. math:: c(T) = \\sum_i c_i T_r^i
+    """
+    def __init__(self, Tc: float, coeffs):
+        """
+        Args:
+            Tc: Fluid critical temperature [K]
+            coeffs: Coefficients :math:`c_i` in order of increasing
+                power [m^3/mol]
+        """
+        self._Tc = Tc
+        self._coeffs = np.asarray(coeffs, dtype=float)
+
+    def _wire(self):
+        return (self._Tc, *self._coeffs), ()
+
+    @classmethod
+    def _from_wire(cls, params, children):
+        return cls(params[0], params[1:])
+
+    def __call__(self, T: float) -> float:
+        Tr = T / self._Tc
+        c = 0.0 * Tr + self._coeffs[-1]
+        for coeff in self._coeffs[-2::-1]:
+            c = c * Tr + coeff
+        return c
+
+    def dc_dT(self, T: float) -> float:
+        coeffs = np.polynomial.polynomial.polyder(self._coeffs)
+        return np.polynomial.polynomial.polyval(T / self._Tc, coeffs) / self._Tc
+
+    def d2c_dT2(self, T: float) -> float:
+        coeffs = np.polynomial.polynomial.polyder(self._coeffs, 2)
+        return np.polynomial.polynomial.polyval(T / self._Tc, coeffs) / self._Tc ** 2
+
+    @classmethod
+    def fit(cls, eos: 'CubicEOS', T, P, v, degree: int = 1) -> 'PolynomialShift':
+        """
+        Fit the volume shift that makes the liquid root of an
+        untranslated cubic EOS reproduce measured liquid volumes, e.g.
+        from a liquid density correlation evaluated along the vapor
+        pressure curve.
+
+        Args:
+            eos: Untranslated cubic equation of state
+            T: Temperatures of the data points [K]
+            P: Pressures of the data points [Pa]
+            v: Liquid specific volumes of the data points [m^3/mol]
+            degree: Degree of the polynomial in reduced temperature
+
+        Returns:
+            The least-squares volume shift
+        """
+        T = np.asarray(T, dtype=float)
+        v_liq, _ = eos.v_roots(P, T)
+        coeffs = np.polynomial.polynomial.polyfit(T / eos._Tc, v_liq - np.asarray(v, dtype=float), degree)
+        return cls(eos._Tc, coeffs)
+
+
+class _FrozenShift(VolumeShift):
+    """
+    Volume shift evaluated once, at a fixed temperature (see
+    :class:`_FrozenAlpha`).
+    """
+    def __init__(self, T0: float, c: float, dc_dT: float, d2c_dT2: float):
+        self._T0 = T0
+        self._coeffs = c, dc_dT, d2c_dT2
+
+    def __call__(self, T: float) -> float:
+        c, dc, d2c = self._coeffs
+        if isinstance(T, Jet):
+            dT = T - self._T0
+            return c + dT * (dc + 0.5 * d2c * dT)
+        return c + 0.0 * T
+
+    def dc_dT(self, T: float) -> float:
+        _, dc, d2c = self._coeffs
+        if isinstance(T, Jet):
+            return dc + d2c * (T - self._T0)
+        return dc + 0.0 * T
+
+    def d2c_dT2(self, T: float) -> float:
+        return self._coeffs[2] + 0.0 * T
+
+
+def _cubic_z_roots(B, c2, c1, c0, liquid: bool = True):
+    """
+    Smallest and largest physical roots of the monic cubic
+    :math:`z^3 + c_2 z^2 + c_1 z + c_0` in compressibility factor (see
+    :meth:`CubicEOS.z_roots`), for flat arrays of coefficients and
+    :math:`B = bP/RT`. The smallest root is None unless `liquid`.
+    """
+    # Depressed cubic t^3 + p t + q = 0, with z = t - c2/3
+    p = c1 - c2 ** 2 / 3
+    q = 2 * c2 ** 3 / 27 - c2 * c1 / 3 + c0
+    disc = (q / 2) ** 2 + (p / 3) ** 3
+    one_root = disc > 0
+
+    sqrt_disc = np.sqrt(np.where(one_root, disc, 0.0))
+    t_single = np.cbrt(-q / 2 + sqrt_disc) + np.cbrt(-q / 2 - sqrt_disc)
+    r = 2 * np.sqrt(np.maximum(-p / 3, 0.0))
+    with np.errstate(divide='ignore', invalid='ignore'):
+        cos_arg = np.clip(3 * q / (p * r), -1.0, 1.0)
+    theta = np.arccos(np.where(one_root, 0.0, cos_arg)) / 3
+    t_max = np.where(one_root, t_single, r * np.cos(theta))
+    z_vap, z_liq = t_max - c2 / 3, None
+    if liquid:
+        t_min = np.where(one_root, t_single, r * np.cos(theta - 4 * np.pi / 3))
+        z_liq = t_min - c2 / 3
+        # The smallest root can fall below the co-volume, in which case
+        # the middle (unstable) root is the smallest physical one.
+        t_mid = r * np.cos(theta - 2 * np.pi / 3)
+        z_liq = np.where(z_liq > B, z_liq, np.where(one_root, z_vap, t_mid - c2 / 3))
+
+    for _ in range(2):
+        for z in (z_liq, z_vap) if liquid else (z_vap,):
+            f = ((z + c2) * z + c1) * z + c0
+            df = (3 * z + 2 * c2) * z + c1
+            with np.errstate(divide='ignore', invalid='ignore'):
+                z -= np.where(df != 0.0, f / df, 0.0)
+    return z_liq, z_vap
+
+
+class CubicEOS(HelmholtzEOS, Serializable):
+    """
+    Generic two-parameter cubic equation of state for a pure fluid.
+
+    .. math::
+        P = \\frac{RT}{v - b} - \\frac{a \\left( T \\right)}
+            {\\left( v + δ_1 b \\right) \\left( v + δ_2 b \\right)}
+
+        a \\left( T \\right) = Ω_a \\frac{R^2 T_c^2}{P_c} α \\left( T \\right)
+
+        b = Ω_b \\frac{R T_c}{P_c}
+
+    Specific equations of state are parameter sets: class attributes
+    ``_delta_1``, ``_delta_2``, ``_Omega_a`` and ``_Omega_b``, plus an
+    :class:`AlphaFunction`. The volume solve, the residual Helmholtz
+    energy and all P-v-T derivatives are implemented once here, and
+    accept NumPy arrays.
+
+    In reduced Helmholtz form, with :math:`τ = T_c/T` and :math:`δ = bρ`,
+
+    .. math::
+        α^r = -\\ln(1 - δ) - \\frac{a(T)}{RTb} ψ(δ)
+
+        ψ(δ) = \\frac{1}{δ_1 - δ_2} \\ln \\frac{1 + δ_1 δ}{1 + δ_2 δ}
+
+    (:math:`ψ = δ/(1 + δ_1 δ)` when :math:`δ_1 = δ_2`.)
+
+    An optional :class:`VolumeShift` translates the equation along the
+    volume axis, :math:`P(T, v) = P_\\text{cubic}(T, v + c(T))`. The shift
+    is part of every method, so the translated volumes come out of the
+    same closed-form solve.
+    """
+    _delta_1: float
+    _delta_2: float
+    _Omega_a: float
+    _Omega_b: float
+    # Péneloux constants (k_1, k_2) with c = k_1 (k_2 - z_RA) RT_c/P_c,
+    # where available for the parameter set
+    _peneloux: Optional[Tuple[float, float]] = None
+
+    def __init__(self, Pc: float, Tc: float, alpha: AlphaFunction,
+                 shift: Optional[VolumeShift] = None):
+        """
+        Initialize the EOS with the desired parameters.
+
+        Args:
+            Pc: Fluid critical pressure [Pa]
+            Tc: Fluid critical temperature [K]
+            alpha: Temperature dependence of the attractive parameter
+            shift: Volume translation. If None, the EOS is untranslated.
+        """
+        self._Pc = Pc
+        self._Tc = Tc
+        self._alpha = alpha
+        self._shift = shift
+
+        self._C_a = self._Omega_a * R ** 2 * Tc ** 2 / Pc
+        self._b = self._Omega_b * R * Tc / Pc
+
+        self._T_red = Tc
+        self._rho_red = 1.0 / self._b
+
+    def _a(self, T: float) -> float:
+        return self._C_a * self._alpha(T)
+
+    def _da_dT(self, T: float) -> float:
+        return self._C_a * self._alpha.dalpha_dT(T)
+
+    def _d2a_dT2(self, T: float) -> float:
+        return self._C_a * self._alpha.d2alpha_dT2(T)
+
+    def _c(self, T: float) -> float:
+        return 0.0 * T if self._shift is None else self._shift(T)
+
+    def _dc_dT(self, T: float) -> float:
+        return 0.0 * T if self._shift is None else self._shift.dc_dT(T)
+
+    def _d2c_dT2(self, T: float) -> float:
+        return 0.0 * T if self._shift is None else self._shift.d2c_dT2(T)
+
+    @classmethod
+    def peneloux_shift(cls, Pc: float, Tc: float, omega: float) -> ConstantShift:
+        """
+        Estimate a constant volume shift from the Péneloux correlation,
+        using the Rackett compressibility estimate
+        :math:`z_{RA} = 0.29056 - 0.08775 ω`.
+
+        Args:
+            Pc: Fluid critical pressure [Pa]
+            Tc: Fluid critical temperature [K]
+            omega: Fluid accentric factor [dimensionless]
+
+        Returns:
+            The estimated volume shift
+
+        Raises:
+            ValueError: If there are no Péneloux constants for the class
+        """
+        if cls._peneloux is None:
+            raise ValueError(f'No Péneloux correlation for {cls.__name__}')
+        k1, k2 = cls._peneloux
+        return ConstantShift(k1 * (k2 - (0.29056 - 0.08775 * omega)) * R * Tc / Pc)
+
+    def _D(self, v: float) -> float:
+        """
+        Denominator of the attractive term, :math:`(v + δ_1 b)(v + δ_2 b)`.
+        """
+        return (v + self._delta_1 * self._b) * (v + self._delta_2 * self._b)
+
+    def _dD_dv(self, v: float) -> float:
+        return 2 * v + (self._delta_1 + self._delta_2) * self._b
+
+    # Partial derivatives of the untranslated EOS at w = v + c(T)
+
+    def _dP_dw(self, T: float, w: float) -> float:
+        return -R * T / (w - self._b) ** 2 + self._a(T) * self._dD_dv(w) / self._D(w) ** 2
+
+    def _d2P_dTdw(self, T: float, w: float) -> float:
+        return -R / (w - self._b) ** 2 + self._da_dT(T) * self._dD_dv(w) / self._D(w) ** 2
+
+    def _d2P_dw2(self, T: float, w: float) -> float:
+        D, dD_dw = self._D(w), self._dD_dv(w)
+        return 2 * R * T / (w - self._b) ** 3 + self._a(T) * (2 * D - 2 * dD_dw ** 2) / D ** 3
+
+    @args_must_be_positive('T', 'v')
+    def P(self, T: float, v: float) -> float:
+        w = v + self._c(T)
+        return R * T / (w - self._b) - self._a(T) / self._D(w)
+
+    def dP_dT_v(self, T: float, v: float) -> float:
+        """
+        First derivative of pressure with respect to temperature at
+        constant volume.
+
+        .. math::
+            \\left(\\frac{∂P}{∂T}\\right)_v = \\frac{R}{w-b} -
+            \\frac{a'(T)}{\\left( w + δ_1 b \\right) \\left( w + δ_2 b \\right)}
+            + \\left(\\frac{∂P}{∂v}\\right)_T c'(T)
+
+        with :math:`w = v + c(T)`.
+
+        Args:
+            T: Temperature [K]
+            v: Specific Volume [m^3/mol]
+
+        Returns:
+            ∂P/∂T at constant volume [Pa/K]
+        """
+        w = v + self._c(T)
+        return R / (w - self._b) - self._da_dT(T) / self._D(w) + self._dP_dw(T, w) * self._dc_dT(T)
+
+    def dP_dv_T(self, T: float, v: float) -> float:
+        """
+        First derivative of pressure with respect to specific volume at
+        constant temperature.
+
+        .. math::
+            \\left(\\frac{∂P}{∂v}\\right)_T = - \\frac{RT}{(w-b)^2} +
+            \\frac{a(T) \\left[ 2w + (δ_1 + δ_2) b \\right]}
+            {\\left( w + δ_1 b \\right)^2 \\left( w + δ_2 b \\right)^2}
+
+        with :math:`w = v + c(T)`.
+
+        Args:
+            T: Temperature [K]
+            v: Specific Volume [m^3/mol]
+
+        Returns:
+            ∂P/∂v at constant temperature [Pa*mol/m^3]
+        """
+        return self._dP_dw(T, v + self._c(T))
+
+    def d2P_dT2_v(self, T: float, v: float) -> float:
+        """
+        Second derivative of pressure with respect to temperature at
+        constant volume.
+
+        .. math::
+            \\left(\\frac{∂^2 P}{∂T^2}\\right)_v =
+            - \\frac{a''(T)}{\\left( w + δ_1 b \\right) \\left( w + δ_2 b \\right)}
+            + 2 P_{Tw} c' + P_{ww} c'^2 + P_w c''
+
+        with :math:`w = v + c(T)` and subscripts denoting partial
+        derivatives of the untranslated EOS.
+
+        Args:
+            T: Temperature [K]
+            v: Specific Volume [m^3/mol]
+
+        Returns:
+            ∂²P/∂T² at constant volume [Pa/K²]
+        """
+        w = v + self._c(T)
+        dc_dT = self._dc_dT(T)
+        return -self._d2a_dT2(T) / self._D(w) + 2 * self._d2P_dTdw(T, w) * dc_dT + \
+            self._d2P_dw2(T, w) * dc_dT ** 2 + self._dP_dw(T, w) * self._d2c_dT2(T)
+
+    def d2P_dTdv(self, T: float, v: float) -> float:
+        w = v + self._c(T)
+        return self._d2P_dTdw(T, w) + self._d2P_dw2(T, w) * self._dc_dT(T)
+
+    def d2P_dv2_T(self, T: float, v: float) -> float:
+        return self._d2P_dw2(T, v + self._c(T))
+
+    def derivatives(self, T: float, v: float) -> PDerivatives:
+        """
+        Calculate the pressure and all of its first and second
+        derivatives at once, analytically, evaluating each
+        temperature-dependent term once.
+
+        Args:
+            T: Temperature [K]
+            v: Specific Volume [m^3/mol]
+
+        Returns:
+            Pressure and its derivatives, in the units of the
+            corresponding methods.
+        """
+        return self._derivatives(T, v, self._a(T), self._da_dT(T), self._d2a_dT2(T),
+                                 self._c(T), self._dc_dT(T), self._d2c_dT2(T))
+
+    def _derivatives(self, T, v, a, da_dT, d2a_dT2, c, dc_dT, d2c_dT2) -> PDerivatives:
+        """
+        :meth:`derivatives` from precomputed temperature-dependent terms.
+        """
+        w = v + c
+        inv_wb = 1.0 / (w - self._b)
+        D, dD_dw = self._D(w), self._dD_dv(w)
+        inv_D = 1.0 / D
+        # Partial derivatives of the untranslated EOS at w
+        P_w = -R * T * inv_wb ** 2 + a * dD_dw * inv_D ** 2
+        P_Tw = -R * inv_wb ** 2 + da_dT * dD_dw * inv_D ** 2
+        P_ww = 2 * R * T * inv_wb ** 3 + a * (2 * D - 2 * dD_dw ** 2) * inv_D ** 3
+        return PDerivatives(P=R * T * inv_wb - a * inv_D,
+                            dP_dT_v=R * inv_wb - da_dT * inv_D + P_w * dc_dT,
+                            dP_dv_T=P_w,
+                            d2P_dT2_v=-d2a_dT2 * inv_D + 2 * P_Tw * dc_dT + P_ww * dc_dT ** 2 + P_w * d2c_dT2,
+                            d2P_dTdv=P_Tw + P_ww * dc_dT,
+                            d2P_dv2_T=P_ww)
+
+    @args_must_be_positive('T')
+    def at_T(self, T: float) -> Isotherm:
+        return _CubicIsotherm(self, T)
+
+    @args_must_be_positive('v')
+    def at_v(self, v: float) -> Isochore:
+        if self._shift is None or isinstance(self._shift, ConstantShift):
+            return _CubicIsochore(self, v)
+        return Isochore(self, v)
+
+    def alphar(self, tau: float, delta: float) -> HelmholtzDerivatives:
+        """
+        Calculate the reduced residual Helmholtz energy and its partial
+        derivatives.
+
+        For a translated EOS, :math:`α^r(τ, δ) = α^r_\\text{cubic}(τ, \\tilde{δ})
+        - \\ln(1 + sδ)` with :math:`s = c(T)/b` and
+        :math:`\\tilde{δ} = δ/(1 + sδ)`, and the derivatives follow by the
+        chain rule.
+
+        Args:
+            tau: Inverse reduced temperature, :math:`T_c/T` [dimensionless]
+            delta: Reduced density, :math:`bρ` [dimensionless]
+
+        Returns:
+            :math:`α^r` and its derivatives up to second order
+        """
+        if self._shift is None:
+            return self._alphar_untranslated(tau, delta)
+
+        T = self._T_red / tau
+        s = self._c(T) / self._b
+        s_t = -self._dc_dT(T) * T / tau / self._b
+        s_tt = (self._d2c_dT2(T) * T ** 2 + 2 * self._dc_dT(T) * T) / tau ** 2 / self._b
+
+        k = 1.0 / (1.0 + s * delta)
+        dt = delta * k
+        dt_d, dt_dd = k ** 2, -2 * s * k ** 3
+        dt_t = -delta ** 2 * s_t * k ** 2
+        dt_tt = -delta ** 2 * s_tt * k ** 2 + 2 * delta ** 3 * s_t ** 2 * k ** 3
+        dt_dt = -2 * delta * s_t * k ** 3
+
+        c = self._alphar_untranslated(tau, dt)
+        return HelmholtzDerivatives(
+            alpha=c.alpha - np.log1p(s * delta),
+            alpha_d=c.alpha_d * dt_d - s * k,
+            alpha_dd=c.alpha_dd * dt_d ** 2 + c.alpha_d * dt_dd + (s * k) ** 2,
+            alpha_t=c.alpha_t + c.alpha_d * dt_t - delta * s_t * k,
+            alpha_tt=c.alpha_tt + 2 * c.alpha_dt * dt_t + c.alpha_dd * dt_t ** 2 + c.alpha_d * dt_tt -
+            delta * s_tt * k + (delta * s_t * k) ** 2,
+            alpha_dt=c.alpha_dt * dt_d + c.alpha_dd * dt_d * dt_t + c.alpha_d * dt_dt - s_t * k ** 2,
+        )
+
+    def _alphar_untranslated(self, tau: float, delta: float) -> HelmholtzDerivatives:
+        """
+        Reduced residual Helmholtz energy of the untranslated EOS.
+
+        Writing :math:`φ(τ) = a(T)/RTb`, its temperature derivatives
+        follow from those of :math:`a(T)`:
+
+        .. math::
+            τφ_τ = \\frac{a - T a'}{RTb}, \\quad τ^2φ_{ττ} = \\frac{T a''}{Rb}
+
+        Args:
+            tau: Inverse reduced temperature, :math:`T_c/T` [dimensionless]
+            delta: Reduced density, :math:`bρ` [dimensionless]
+
+        Returns:
+            :math:`α^r` and its derivatives up to second order
+        """
+        T = self._T_red / tau
+        a, da_dT, d2a_dT2 = self._a(T), self._da_dT(T), self._d2a_dT2(T)
+        phi = a / (R * T * self._b)
+        phi_t = (a - T * da_dT) / (R * T * self._b) / tau
+        phi_tt = T * d2a_dT2 / (R * self._b) / tau ** 2
+
+        d1, d2 = self._delta_1, self._delta_2
+        if d1 == d2:
+            psi = delta / (1.0 + d1 * delta)
+        else:
+            psi = (np.log1p(d1 * delta) - np.log1p(d2 * delta)) / (d1 - d2)
+        psi_d = 1.0 / ((1.0 + d1 * delta) * (1.0 + d2 * delta))
+        psi_dd = -psi_d * (d1 / (1.0 + d1 * delta) + d2 / (1.0 + d2 * delta))
+
+        return HelmholtzDerivatives(
+            alpha=-np.log1p(-delta) - phi * psi,
+            alpha_d=1.0 / (1.0 - delta) - phi * psi_d,
+            alpha_dd=1.0 / (1.0 - delta) ** 2 - phi * psi_dd,
+            alpha_t=-phi_t * psi,
+            alpha_tt=-phi_tt * psi,
+            alpha_dt=-phi_t * psi_d,
+        )
+
+    def _v_lower(self, T: float) -> float:
+        return self._b - self._c(np.asarray(T, dtype=float))
+
+    @args_must_be_positive('T')
+    def spinodal_v(self, T: float) -> Tuple[float, float]:
+        """
+        Calculate the liquid and vapor spinodal volumes.
+
+        Setting :math:`(∂P/∂v)_T = 0` and writing :math:`V = v/b`,
+        :math:`A = a(T)/RTb`, :math:`u = δ_1 + δ_2` and
+        :math:`w = δ_1 δ_2` gives a quartic in :math:`V`,
+
+        .. math::
+            \\left( V^2 + uV + w \\right)^2 - A \\left( 2V + u \\right) \\left( V - 1 \\right)^2 = 0
+
+        whose two real roots above :math:`V = 1` are the spinodals. All
+        temperatures are solved at once from the eigenvalues of the
+        stacked companion matrices.
+
+        Args:
+            T: Temperature [K]
+
+        Returns:
+            Liquid and vapor spinodal volumes [m^3/mol], NaN above the
+            critical temperature.
+        """
+        T = np.asarray(T, dtype=float)
+        A = (self._a(T) / (R * T * self._b)).ravel()
+        u, w = self._delta_1 + self._delta_2, self._delta_1 * self._delta_2
+
+        companion = np.zeros((A.size, 4, 4))
+        companion[:, 1, 0] = companion[:, 2, 1] = companion[:, 3, 2] = 1.0
+        # Monic coefficients of V^0..V^3, negated in the last column
+        companion[:, 0, 3] = -(w ** 2 - A * u)
+        companion[:, 1, 3] = -(2 * u * w - A * (2 - 2 * u))
+        companion[:, 2, 3] = -(u ** 2 + 2 * w - A * (u - 4))
+        companion[:, 3, 3] = -(2 * u - 2 * A)
+        roots = np.linalg.eigvals(companion)
+
+        real = (np.abs(roots.imag) <= 1e-9 * np.abs(roots.real)) & (roots.real > 1.0)
+        V = np.sort(np.where(real, roots.real, np.nan), axis=1)
+        loop = real.sum(axis=1) == 2
+        V_liq = np.where(loop, V[:, 0], np.nan)
+        V_vap = np.where(loop, V[:, 1], np.nan)
+        c = self._c(T).ravel()
+        return _restore(V_liq * self._b - c, T.shape), _restore(V_vap * self._b - c, T.shape)
+
+    @args_must_be_positive('P', 'T')
+    def z_roots(self, P: float, T: float) -> Tuple[float, float]:
+        """
+        Solve the cubic in compressibility factor for its smallest and
+        largest physical roots,
+
+        .. math::
+            z^3 + \\left[ (u - 1)B - 1 \\right] z^2
+            + \\left[ A + (w - u)B^2 - uB \\right] z
+            - \\left[ AB + wB^2 + wB^3 \\right] = 0
+
+        with :math:`A = aP/(RT)^2`, :math:`B = bP/RT`,
+        :math:`u = δ_1 + δ_2` and :math:`w = δ_1 δ_2`. Roots are found
+        in closed form (Cardano's or the trigonometric formula) and
+        polished with two Newton steps, then translated by
+        :math:`-c(T)P/RT`.
+
+        Args:
+            P: Pressure [Pa]
+            T: Temperature [K]
+
+        Returns:
+            Liquid-like (smallest) and vapor-like (largest) compressibility
+            factors [dimensionless]. These are equal where the cubic has
+            only one real root.
+        """
+        (P, T), shape = _flatten(P, T)
+        A = self._a(T) * P / (R * T) ** 2
+        B = self._b * P / (R * T)
+        u, w = self._delta_1 + self._delta_2, self._delta_1 * self._delta_2
+        c2 = (u - 1) * B - 1
+        c1 = A + (w - u) * B ** 2 - u * B
+        c0 = -(A * B + w * B ** 2 + w * B ** 3)
+        z_liq, z_vap = _cubic_z_roots(B, c2, c1, c0)
+        shift = self._c(T) * P / (R * T)
+        return _restore(z_liq - shift, shape), _restore(z_vap - shift, shape)
+
+    @args_must_be_positive('P', 'T')
+    def v(self, P: float, T: float) -> float:
+        """
+        Calculate the specific volume of a fluid at the specified
+        pressure and temperature, from the closed-form roots of the
+        cubic (see :meth:`z_roots`).
+
+        Where the cubic has three physical roots the vapor (largest) root
+        is returned, i.e. the liquid root is only returned if the
+        pressure is above the vapor spinodal.
+
+        Args:
+            P: Pressure [Pa]
+            T: Temperature [K]
+
+        Returns:
+            Specific Volume [m^3/mol]
+        """
+        return self.z_roots(P, T)[1] * R * T / P
+
+    @args_must_be_positive('P', 'T')
+    def v_roots(self, P: float, T: float) -> Tuple[float, float]:
+        """
+        Calculate the liquid-like and vapor-like specific volumes at the
+        specified pressure and temperature.
+
+        Args:
+            P: Pressure [Pa]
+            T: Temperature [K]
+
+        Returns:
+            Smallest and largest physical volume roots [m^3/mol]. These
+            are equal where only one root exists.
+        """
+        z_liq, z_vap = self.z_roots(P, T)
+        return z_liq * R * T / P, z_vap * R * T / P
+
+
+class _CubicIsotherm(Isotherm):
+    """
+    Isotherm of a cubic EOS, with :math:`a(T)`, :math:`c(T)` and their
+    derivatives computed once, the derivatives on first use.
+
+    Pressure, its derivatives and the volume solve are evaluated directly
+    from them, the latter from the coefficients of the cubic in
+    :math:`z` written as polynomials in pressure. Spinodals and residual
+    properties use a copy of the EOS whose alpha function and volume
+    shift are replaced by their values at the temperature (see
+    :class:`_FrozenAlpha`).
+    """
+    def __init__(self, eos: CubicEOS, T: float):
+        super().__init__(eos, T)
+        T = float(T)
+        self._RT = R * T
+        self._alpha_T = eos._alpha(T)
+        self._a_T = eos._C_a * self._alpha_T
+        self._c_T = 0.0 if eos._shift is None else eos._shift(T)
+        self._delta_b = eos._delta_1 * eos._b, eos._delta_2 * eos._b, (eos._delta_1 + eos._delta_2) * eos._b
+        # Factors of the denominators, w - b and w + δ_i b with w = v + c,
+        # as offsets of v
+        self._offsets = self._c_T - eos._b, self._c_T + self._delta_b[0], self._c_T + self._delta_b[1]
+
+    @cached_property
+    def _alpha_terms(self) -> Tuple[float, float, float]:
+        alpha, T = self.eos._alpha, float(self.T)
+        return self._alpha_T, alpha.dalpha_dT(T), alpha.d2alpha_dT2(T)
+
+    @cached_property
+    def _shift_terms(self) -> Optional[Tuple[float, float, float]]:
+        shift, T = self.eos._shift, float(self.T)
+        return None if shift is None else (self._c_T, shift.dc_dT(T), shift.d2c_dT2(T))
+
+    @cached_property
+    def _terms(self) -> Tuple[float, ...]:
+        """
+        :math:`a(T)`, :math:`c(T)` and their first and second
+        derivatives, in the order of :meth:`CubicEOS._derivatives`.
+        """
+        C_a = self.eos._C_a
+        return (*(C_a * term for term in self._alpha_terms), *(self._shift_terms or (0.0, 0.0, 0.0)))
+
+    @cached_property
+    def _eos(self) -> CubicEOS:
+        eos = copy.copy(self.eos)
+        eos._alpha = _FrozenAlpha(self.T, *self._alpha_terms)
+        if eos._shift is not None:
+            eos._shift = _FrozenShift(self.T, *self._shift_terms)
+        return eos
+
+    @cached_property
+    def _cubic(self) -> Tuple[float, ...]:
+        """
+        Coefficients of :math:`B = bP/RT` and of the cubic in :math:`z` as
+        polynomials in pressure (see :meth:`CubicEOS.z_roots`): :math:`β`,
+        and :math:`k_i` with :math:`c_2 = k_0 P - 1`,
+        :math:`c_1 = (k_1 + k_2 P) P` and :math:`c_0 = (k_3 + k_4 P) P^2`.
+        """
+        beta = self.eos._b / self._RT
+        A_P = self._a_T / self._RT ** 2
+        u, w = self.eos._delta_1 + self.eos._delta_2, self.eos._delta_1 * self.eos._delta_2
+        return beta, (u - 1) * beta, A_P - u * beta, (w - u) * beta ** 2, -A_P * beta - w * beta ** 2, \
+            -w * beta ** 3
+
+    @args_must_be_positive('v')
+    def P(self, v: float) -> float:
+        offset_b, offset_1, offset_2 = self._offsets
+        return self._RT / (v + offset_b) - self._a_T / ((v + offset_1) * (v + offset_2))
+
+    @args_must_be_positive('P')
+    def v(self, P: float) -> float:
+        (P,), shape = _flatten(P)
+        beta, k0, k1, k2, k3, k4 = self._cubic
+        _, z_vap = _cubic_z_roots(beta * P, k0 * P - 1, (k1 + k2 * P) * P, (k3 + k4 * P) * (P * P), liquid=False)
+        return _restore(z_vap * self._RT / P - self._c_T, shape)
+
+    def z(self, v: float) -> float:
+        return self.P(v) * v / self._RT
+
+    def dP_dT_v(self, v: float) -> float:
+        return self.derivatives(v).dP_dT_v
+
+    def dP_dv_T(self, v: float) -> float:
+        return self.derivatives(v).dP_dv_T
+
+    def d2P_dT2_v(self, v: float) -> float:
+        return self.derivatives(v).d2P_dT2_v
+
+    def d2P_dTdv(self, v: float) -> float:
+        return self.derivatives(v).d2P_dTdv
+
+    def d2P_dv2_T(self, v: float) -> float:
+        return self.derivatives(v).d2P_dv2_T
+
+    @args_must_be_positive('v')
+    def derivatives(self, v: float) -> PDerivatives:
+        a, da_dT, d2a_dT2, c, dc_dT, d2c_dT2 = self._terms
+        delta_1b, delta_2b, delta_sum_b = self._delta_b
+        w = v + c
+        inv_wb = 1.0 / (w - self.eos._b)
+        D, dD_dw = (w + delta_1b) * (w + delta_2b), 2 * w + delta_sum_b
+        inv_D = 1.0 / D
+        # Partial derivatives of the untranslated EOS at w
+        P_w = -self._RT * inv_wb ** 2 + a * dD_dw * inv_D ** 2
+        P_Tw = -R * inv_wb ** 2 + da_dT * dD_dw * inv_D ** 2
+        P_ww = 2 * self._RT * inv_wb ** 3 + a * (2 * D - 2 * dD_dw ** 2) * inv_D ** 3
+        dP_dT_v, d2P_dT2_v, d2P_dTdv = R * inv_wb - da_dT * inv_D, -d2a_dT2 * inv_D, P_Tw
+        if dc_dT or d2c_dT2:
+            dP_dT_v = dP_dT_v + P_w * dc_dT
+            d2P_dT2_v = d2P_dT2_v + 2 * P_Tw * dc_dT + P_ww * dc_dT ** 2 + P_w * d2c_dT2
+            d2P_dTdv = d2P_dTdv + P_ww * dc_dT
+        return PDerivatives(P=self._RT * inv_wb - a * inv_D, dP_dT_v=dP_dT_v, dP_dv_T=P_w, d2P_dT2_v=d2P_dT2_v,
+                            d2P_dTdv=d2P_dTdv, d2P_dv2_T=P_ww)
+
+
+class _CubicIsochore(Isochore):
+    """
+    Isochore of a cubic EOS whose volume shift (if any) is constant, so
+    that the translated volume and the terms depending on it are
+    computed once.
+    """
+    def __init__(self, eos: CubicEOS, v: float):
+        super().__init__(eos, v)
+        w = v + eos._c(eos._Tc)
+        D, dD_dw = eos._D(w), eos._dD_dv(w)
+        self._inv_wb = 1.0 / (w - eos._b)
+        self._inv_D = 1.0 / D
+        self._dD_D2 = dD_dw / D ** 2
+        self._d2_D3 = (2 * D - 2 * dD_dw ** 2) / D ** 3
+
+    @args_must_be_positive('T')
+    def P(self, T: float) -> float:
+        return R * T * self._inv_wb - self.eos._a(T) * self._inv_D
+
+    @args_must_be_positive('T')
+    def dP_dT_v(self, T: float) -> float:
+        return R * self._inv_wb - self.eos._da_dT(T) * self._inv_D
+
+    @args_must_be_positive('T')
+    def dP_dv_T(self, T: float) -> float:
+        return -R * T * self._inv_wb ** 2 + self.eos._a(T) * self._dD_D2
+
+    @args_must_be_positive('T')
+    def d2P_dT2_v(self, T: float) -> float:
+        return -self.eos._d2a_dT2(T) * self._inv_D
+
+    @args_must_be_positive('T')
+    def d2P_dTdv(self, T: float) -> float:
+        return -R * self._inv_wb ** 2 + self.eos._da_dT(T) * self._dD_D2
+
+    @args_must_be_positive('T')
+    def d2P_dv2_T(self, T: float) -> float:
+        return 2 * R * T * self._inv_wb ** 3 + self.eos._a(T) * self._d2_D3
+
+    @args_must_be_positive('T')
+    def derivatives(self, T: float) -> PDerivatives:
+        a, da_dT = self.eos._a(T), self.eos._da_dT(T)
+        return PDerivatives(P=R * T * self._inv_wb - a * self._inv_D,
+                            dP_dT_v=R * self._inv_wb - da_dT * self._inv_D,
+                            dP_dv_T=-R * T * self._inv_wb ** 2 + a * self._dD_D2,
+                            d2P_dT2_v=-self.eos._d2a_dT2(T) * self._inv_D,
+                            d2P_dTdv=-R * self._inv_wb ** 2 + da_dT * self._dD_D2,
+                            d2P_dv2_T=2 * R * T * self._inv_wb ** 3 + a * self._d2_D3)
+
+
+@register(1)
+class PurePREOS(CubicEOS):
+    """
+    Class modeling the Peng-Robinson equation of state for a pure
+    (single-component) fluid.
+
+    .. math::
+        z = \\frac{v}{v - b} - \\frac{a \\left( T \\right) v}
+            {RT \\left[ v \\left( v + b \\right) + b \\left( v - b \\right) \\right]}
+
+        P = \\frac{RT}{v - b} - \\frac{a \\left( T \\right)}
+            {v \\left( v + b \\right) + b \\left( v - b \\right)}
+
+        a \\left( T \\right) = C_a α \\left( T \\right)
+
+        α \\left( T \\right) = \\left[1 + C_α \\left( 1 - T_r^{0.5} \\right) \\right]^2
+
+        C_a = 0.45724 \\frac{R^2 T_c^2}{P_c}
+
+        C_α = 0.37464 + 1.54226 ω - 0.26992 ω^2
+
+        b = 0.0778 \\frac{R T_c}{P_c}
+    """
+    _delta_1 = 1.0 + 2.0 ** 0.5
+    _delta_2 = 1.0 - 2.0 ** 0.5
+    _Omega_a = 0.45724
+    _Omega_b = 0.0778
+    _peneloux = (0.50033, 0.25969)
+
+    def __init__(self, Pc: float, Tc: float, omega: float, alpha: Optional[AlphaFunction] = None,
+                 shift: Optional[VolumeShift] = None):
+        """
+        Initialize the EOS with the desired parameters.
+
+        Args:
+            Pc: Fluid critical pressure [Pa]
+            Tc: Fluid critical temperature [K]
+            omega: Fluid accentric factor [dimensionless]
+            alpha: Alternative alpha function (e.g. :class:`TwuAlpha`)
+                to use in place of the Soave form above.
+            shift: Volume translation, e.g. from :meth:`peneloux_shift`
+                or :meth:`PolynomialShift.fit`.
+        """
+        self._omega = omega
+        self._C_alpha = self._m(omega)
+        super().__init__(Pc, Tc, SoaveAlpha(Tc, self._C_alpha) if alpha is None else alpha, shift)
+
+    def _wire(self):
+        return (self._Pc, self._Tc, self._omega), (self._alpha, self._shift)
+
+    @staticmethod
+    def _m(omega: float) -> float:
+        return 0.37464 + 1.54226 * omega - 0.26992 * omega ** 2
+
+
+@register(2)
+class PurePR78EOS(PurePREOS):
+    """
+    Class modeling the 1978 revision of the Peng-Robinson equation of
+    state for a pure fluid, which uses a different correlation for
+    :math:`C_α` for heavier components:
+
+    .. math::
+        C_α = 0.379642 + 1.48503 ω - 0.164423 ω^2 + 0.016666 ω^3
+        \\quad (ω > 0.491)
+    """
+    @staticmethod
+    def _m(omega: float) -> float:
+        if value(omega) <= 0.491:
+            return PurePREOS._m(omega)
+        return 0.379642 + 1.48503 * omega - 0.164423 * omega ** 2 + 0.016666 * omega ** 3
+
+
+@register(3)
+class PureSRKEOS(CubicEOS):
+    """
+    Class modeling the Soave-Redlich-Kwong equation of state for a pure
+    fluid.
+
+    .. math::
+        P = \\frac{RT}{v - b} - \\frac{a \\left( T \\right)}{v \\left( v + b \\right)}
+
+        a \\left( T \\right) = 0.42748 \\frac{R^2 T_c^2}{P_c}
+            \\left[1 + m \\left( 1 - T_r^{0.5} \\right) \\right]^2
+
+        m = 0.480 + 1.574 ω - 0.176 ω^2
+
+        b = 0.08664 \\frac{R T_c}{P_c}
+    """
+    _delta_1 = 1.0
+    _delta_2 = 0.0
+    _Omega_a = 0.42748
+    _Omega_b = 0.08664
+    _peneloux = (0.40768, 0.29441)
+
+    def __init__(self, Pc: float, Tc: float, omega: float, alpha: Optional[AlphaFunction] = None,
+                 shift: Optional[VolumeShift] = None):
+        """
+        Initialize the EOS with the desired parameters.
+
+        Args:
+            Pc: Fluid critical pressure [Pa]
+            Tc: Fluid critical temperature [K]
+            omega: Fluid accentric factor [dimensionless]
+            alpha: Alternative alpha function (e.g.
+                :class:`MathiasCopemanAlpha`) to use in place of the
+                Soave form above.
+            shift: Volume translation, e.g. from :meth:`peneloux_shift`.
+        """
+        self._omega = omega
+        m = 0.480 + 1.574 * omega - 0.176 * omega ** 2
+        super().__init__(Pc, Tc, SoaveAlpha(Tc, m) if alpha is None else alpha, shift)
+
+    def _wire(self):
+        return (self._Pc, self._Tc, self._omega), (self._alpha, self._shift)
+
+
+@register(4)
+class PureRKEOS(CubicEOS):
+    """
+    Class modeling the original Redlich-Kwong equation of state for a
+    pure fluid.
+
+    .. math::
+        P = \\frac{RT}{v - b} - \\frac{a_c T_r^{-0.5}}{v \\left( v + b \\right)}
+
+        a_c = 0.42748 \\frac{R^2 T_c^2}{P_c}
+
+        b = 0.08664 \\frac{R T_c}{P_c}
+    """
+    _delta_1 = 1.0
+    _delta_2 = 0.0
+    _Omega_a = 0.42748
+    _Omega_b = 0.08664
+
+    def __init__(self, Pc: float, Tc: float):
+        """
+        Initialize the EOS with the desired parameters.
+
+        Args:
+            Pc: Fluid critical pressure [Pa]
+            Tc: Fluid critical temperature [K]
+        """
+        super().__init__(Pc, Tc, RKAlpha(Tc))
+
+    def _wire(self):
+        return (self._Pc, self._Tc), ()
+
+
+@register(5)
+class PureVdWEOS(CubicEOS):
+    """
+    Class modeling the van der Waals equation of state for a pure fluid.
+
+    .. math::
+        P = \\frac{RT}{v - b} - \\frac{a}{v^2}
+
+        a = \\frac{27}{64} \\frac{R^2 T_c^2}{P_c}
+
+        b = \\frac{1}{8} \\frac{R T_c}{P_c}
+    """
+    _delta_1 = 0.0
+    _delta_2 = 0.0
+    _Omega_a = 27 / 64
+    _Omega_b = 1 / 8
+
+    def __init__(self, Pc: float, Tc: float):
+        """
+        Initialize the EOS with the desired parameters.
+
+        Args:
+            Pc: Fluid critical pressure [Pa]
+            Tc: Fluid critical temperature [K]
+        """
+        super().__init__(Pc, Tc, ConstantAlpha())
+
+    def _wire(self):
+        return (self._Pc, self._Tc), ()
+
+
+class CubicVirialCoefficient(VirialCoefficient):
+    """
+    Second virial coefficient implied by a cubic equation of state,
+
+    .. math:: B(T) = b - c(T) - \\frac{a(T)}{RT}
+
+    where :math:`c(T)` is the volume translation, if any. A virial
+    equation using it agrees with the cubic to second order in density.
+    """
+    def __init__(self, cubic: CubicEOS):
+        """
+        Args:
+            cubic: Cubic equation of state
+        """
+        self._cubic = cubic
+
+    def __call__(self, T: float) -> float:
+        cubic = self._cubic
+        return cubic._b - cubic._c(T) - cubic._a(T) / (R * T)
+
+    def dB_dT(self, T: float) -> float:
+        cubic = self._cubic
+        return -cubic._dc_dT(T) - cubic._da_dT(T) / (R * T) + cubic._a(T) / (R * T ** 2)
+
+    def d2B_dT2(self, T: float) -> float:
+        cubic = self._cubic
+        return -cubic._d2c_dT2(T) - cubic._d2a_dT2(T) / (R * T) + \
+            2 * cubic._da_dT(T) / (R * T ** 2) - 2 * cubic._a(T) / (R * T ** 3)
+
+    def C(self, T: float) -> float:
+        """
+        Third virial coefficient implied by the cubic,
+        :math:`C(T) = (b - c)^2 + a \\left[ 2c + (δ_1 + δ_2) b \\right] / RT`.
+
+        Args:
+            T: Temperature [K]
+
+        Returns:
+            C(T) [m^6/mol^2]
+        """
+        cubic = self._cubic
+        c = cubic._c(T)
+        u = cubic._delta_1 + cubic._delta_2
+        return (cubic._b - c) ** 2 + cubic._a(T) * (2 * c + u * cubic._b) / (R * T)
+
+
+class DispatchCounts:
+    """
+    Thread-safe counts of the elements each model of an
+    :class:`AdaptiveEOS` has evaluated.
+    """
+    def __init__(self, names: Sequence[str]):
+        """
+        Args:
+            names: Model names
+        """
+        self._lock = threading.Lock()
+        self._counts = dict.fromkeys(names, 0)
+
+    def __getstate__(self):
+        return self.snapshot()
+
+    def __setstate__(self, counts):
+        self._lock = threading.Lock()
+        self._counts = counts
+
+    def add(self, counts: Dict[str, int]):
+        """
+        Add to the counts of the named models.
+        """
+        with self._lock:
+            for name, n in counts.items():
+                self._counts[name] += n
+
+    def snapshot(self) -> Dict[str, int]:
+        """
+        Returns:
+            Dict of model name to count, copied
+        """
+        with self._lock:
+            return dict(self._counts)
+
+    def reset(self):
+        """
+        Set all counts back to zero.
+        """
+        with self._lock:
+            self._counts = dict.fromkeys(self._counts, 0)
+
+
+class AdaptiveEOS(PExplicitEOS):
+    """
+    Composite equation of state that evaluates each state with the
+    cheapest of the ideal gas law, the second-order virial equation and
+    a cubic equation of state that meets a requested accuracy.
+
+    The virial coefficients are those implied by the cubic
+    (:class:`CubicVirialCoefficient`), so the error in :math:`z` relative
+    to the cubic is estimated by the leading neglected terms of the
+    virial series in molar density: :math:`|Bρ + Cρ^2|` for the ideal gas
+    law and :math:`|Cρ^2|` for the truncated virial equation. Every
+    method selects on the same density, :math:`ρ = 1/v`, with the volume
+    estimated as :math:`RT/P + B` by :meth:`v`, so that a state routes
+    to the same model whichever pair of P, T and v it is given by. States where neither estimate is
+    within tolerance go to the cubic, as do states close to saturation
+    (:math:`T_r < 1` and :math:`P` above a fraction of the Edmister
+    estimate of the vapor pressure) or to the critical point, where the
+    series converges slowly or not at all regardless of the estimate.
+
+    All methods take arrays, and each element is dispatched separately.
+    If created with ``count_dispatch=True``, the number of elements
+    evaluated by each model is accumulated in :attr:`dispatch_counts`.
+    """
+    IDEAL, VIRIAL, CUBIC = 0, 1, 2
+    MODEL_NAMES = ('ideal', 'virial', 'cubic')
+
+    def __init__(self, cubic: CubicEOS, tol: float = 1e-4,
+                 virial: Optional[EOSVirial2ndOrder] = None,
+                 saturation_margin: float = 0.5, critical_margin: float = 0.2, count_dispatch: bool = False):
+        """
+        Args:
+            cubic: Cubic equation of state used where the cheaper models
+                are not accurate enough. Its critical constants (and
+                accentric factor, if it has one) define the reduced
+                conditions.
+            tol: Accepted relative error in the compressibility factor.
+            virial: Virial equation of state. Defaults to one using the
+                second virial coefficient of the cubic.
+            saturation_margin: Subcritical states with a pressure above
+                this fraction of the estimated vapor pressure use the
+                cubic.
+            critical_margin: States within this distance of the critical
+                point in the :math:`(T_r, P_r)` plane use the cubic.
+            count_dispatch: Count the elements evaluated by each model
+                (see :attr:`dispatch_counts`). Off by default, so that
+                evaluating the EOS has no side effects.
+        """
+        self._cubic = cubic
+        self._Tc, self._Pc = cubic._Tc, cubic._Pc
+        self._omega = getattr(cubic, '_omega', 0.0)
+        self._B = CubicVirialCoefficient(cubic)
+        self._virial = EOSVirial2ndOrder(self._B) if virial is None else virial
+        self._models = (EOSIdeal(), self._virial, cubic)
+        self.tol = tol
+        self.saturation_margin = saturation_margin
+        self.critical_margin = critical_margin
+        self._counts = DispatchCounts(self.MODEL_NAMES) if count_dispatch else None
+
+    @property
+    def dispatch_counts(self) -> Dict[str, int]:
+        """
+        Number of elements evaluated by each model, by name, since the
+        EOS was created or the counts were reset. Requires
+        ``count_dispatch=True``.
+        """
+        if self._counts is None:
+            raise ValueError('Dispatch counts require an AdaptiveEOS created with count_dispatch=True')
+        return self._counts.snapshot()
+
+    def reset_dispatch_counts(self):
+        """
+        Set all counts in :attr:`dispatch_counts` back to zero.
+        """
+        if self._counts is None:
+            raise ValueError('Dispatch counts require an AdaptiveEOS created with count_dispatch=True')
+        self._counts.reset()
+
+    def _Psat_estimate(self, T: np.ndarray) -> np.ndarray:
+        """
+        Edmister estimate of the vapor pressure,
+        :math:`\\log_{10} P_r^\\text{sat} = \\frac{7}{3}(1 + ω)(1 - 1/T_r)`.
+        """
+        return self._Pc * 10 ** (7 / 3 * (1 + self._omega) * (1 - self._Tc / T))
+
+    def _select(self, P: np.ndarray, T: np.ndarray, rho: np.ndarray, B: np.ndarray) -> np.ndarray:
+        """
+        Choose a model for each state from its pressure, temperature,
+        molar density and second virial coefficient, where each of the
+        first three may be an estimate.
+        """
+        B_term, C_term = B * rho, self._B.C(T) * rho ** 2
+        codes = np.where(np.abs(B_term + C_term) <= self.tol, self.IDEAL,
+                         np.where(np.abs(C_term) <= self.tol, self.VIRIAL, self.CUBIC))
+        Tr, Pr = T / self._Tc, P / self._Pc
+        near_saturation = (Tr < 1.0) & (P > self.saturation_margin * self._Psat_estimate(T))
+        near_critical = np.hypot(Tr - 1.0, Pr - 1.0) < self.critical_margin
+        return np.where(near_saturation | near_critical, self.CUBIC, codes)
+
+    @args_must_be_positive('P', 'T')
+    def select(self, P: float, T: float) -> np.ndarray:
+        """
+        Choose the model used for each (P, T) state.
+
+        Args:
+            P: Pressure [Pa]
+            T: Temperature [K]
+
+        Returns:
+            Model codes (:attr:`IDEAL`, :attr:`VIRIAL` or :attr:`CUBIC`)
+        """
+        P, T = np.broadcast_arrays(np.asarray(P, dtype=float), np.asarray(T, dtype=float))
+        B = self._B(T)
+        # Volume of the virial equation; where it has none, the density
+        # is NaN, which no error estimate accepts, so the cubic is used
+        v = R * T / P + B
+        with np.errstate(divide='ignore'):
+            rho = np.where(v > 0.0, 1.0 / v, np.nan)
+        return self._select(P, T, rho, B)
+
+    def _select_Tv(self, T: np.ndarray, v: np.ndarray) -> np.ndarray:
+        T, v = np.broadcast_arrays(np.asarray(T, dtype=float), np.asarray(v, dtype=float))
+        rho, B = 1.0 / v, self._B(T)
+        return self._select(R * T * rho * (1.0 + B * rho), T, rho, B)
+
+    def _dispatch(self, codes: np.ndarray, method: str, *args):
+        """
+        Evaluate `method` of the selected model for each element of the
+        broadcast arguments, and update the dispatch counts if enabled.
+        """
+        flat, shape = _flatten(codes, *args)
+        codes, args = flat[0].astype(int), flat[1:]
+        out, counts = None, {}
+        for code, model in enumerate(self._models):
+            mask = codes == code
+            n = counts[self.MODEL_NAMES[code]] = int(np.count_nonzero(mask))
+            if n == 0:
+                continue
+            result = getattr(model, method)(*(arg[mask] for arg in args))
+            if out is None:
+                is_tuple = isinstance(result, tuple)
+                out = [np.empty(codes.size) for _ in result] if is_tuple else np.empty(codes.size)
+            if is_tuple:
+                for field, value in zip(out, result):
+                    field[mask] = value
+            else:
+                out[mask] = result
+        if self._counts is not None:
+            self._counts.add(counts)
+        if isinstance(out, list):
+            fields = [_restore(field, shape) for field in out]
+            return type(result)._make(fields) if hasattr(result, '_make') else type(result)(fields)
+        return _restore(out, shape)
+
+    @args_must_be_positive('T', 'v')
+    def P(self, T: float, v: float) -> float:
+        return self._dispatch(self._select_Tv(T, v), 'P', T, v)
+
+    @args_must_be_positive('P', 'v')
+    def T(self, P: float, v: float) -> float:
+        # Select on the temperature of the virial equation, from one
+        # fixed-point step on the ideal gas temperature, which is close
+        # enough to the true one wherever the cheaper models are accepted.
+        # Where the step fails, the NaN temperature selects the cubic.
+        P, v = np.broadcast_arrays(np.asarray(P, dtype=float), np.asarray(v, dtype=float))
+        T_ideal = P * v / R
+        z_virial = 1.0 + self._B(T_ideal) / v
+        with np.errstate(divide='ignore'):
+            T_virial = np.where(z_virial > 0.0, T_ideal / z_virial, np.nan)
+        return self._dispatch(self._select(P, T_virial, 1.0 / v, self._B(T_virial)), 'T', P, v)
+
+    @args_must_be_positive('P', 'T')
+    def v(self, P: float, T: float) -> float:
+        return self._dispatch(self.select(P, T), 'v', P, T)
+
+    @args_must_be_positive('T', 'v')
+    def z(self, T: float, v: float) -> float:
+        return self._dispatch(self._select_Tv(T, v), 'z', T, v)
+
+    def _v_lower(self, T: float) -> float:
+        return self._cubic._v_lower(T)
+
+    def spinodal_v(self, T: float) -> Tuple[float, float]:
+        return self._cubic.spinodal_v(T)
+
+    def dP_dT_v(self, T: float, v: float) -> float:
+        return self._dispatch(self._select_Tv(T, v), 'dP_dT_v', T, v)
+
+    def dP_dv_T(self, T: float, v: float) -> float:
+        return self._dispatch(self._select_Tv(T, v), 'dP_dv_T', T, v)
+
+    def d2P_dT2_v(self, T: float, v: float) -> float:
+        return self._dispatch(self._select_Tv(T, v), 'd2P_dT2_v', T, v)
+
+    def d2P_dTdv(self, T: float, v: float) -> float:
+        return self._dispatch(self._select_Tv(T, v), 'd2P_dTdv', T, v)
+
+    def d2P_dv2_T(self, T: float, v: float) -> float:
+        return self._dispatch(self._select_Tv(T, v), 'd2P_dv2_T', T, v)
+
+    def derivatives(self, T: float, v: float) -> PDerivatives:
+        return self._dispatch(self._select_Tv(T, v), 'derivatives', T, v)
+
+    @args_must_be_positive('T', 'v')
+    def residual_properties(self, T: float, v: float) -> ResidualProperties:
+        """
+        Calculate pressure, its first derivatives, and the residual
+        thermodynamic properties with the model selected for each
+        state (see :meth:`HelmholtzEOS.residual_properties`).
+
+        Args:
+            T: Temperature [K]
+            v: Specific Volume [m^3/mol]
+
+        Returns:
+            Residual properties of each state
         """
-        return -self._d2a_dT2(T) / (v * (v + self._b) + self._b * (v - self._b))
+        return self._dispatch(self._select_Tv(T, v), 'residual_properties', T, v)
@@ -1,23 +1,91 @@
-from .eos import PExplicitEOS
-from typing import Optional
-from .prop import TDepCorrelation
-from .data import R
+from .eos import PExplicitEOS, PurePREOS
+from typing import NamedTuple, Optional, Sequence, Tuple
+import numpy as np
+from .prop import AlyLeeCorr, PPDScp_idCorr, TDepCorrelation, corr_from_record
+from .constants import R
+from .data import load_gkkr_substance
+from .state import FluidBatch
+from .util import args_in_bounds, args_must_be_positive
+from .wire import Serializable, register
 
 
-class FluidModel:
+class FluidProperties(NamedTuple):
+    """
+    Thermodynamic properties of a fluid at a state. Residual properties
+    are relative to the ideal gas at the same temperature and pressure.
+    """
+    P: float
+    z: float
+    h_res: float
+    s_res: float
+    cv: float
+    cp: float
+    w: float
+    ln_phi: float
+
+
+@register(50)
+class FluidModel(Serializable):
     def __init__(self, eos: PExplicitEOS,
                  cp_ideal: Optional[TDepCorrelation] = None,
-                 cv_ideal: Optional[TDepCorrelation] = None):
+                 cv_ideal: Optional[TDepCorrelation] = None,
+                 M: Optional[float] = None):
+        """
+        Args:
+            eos: Equation of state of the fluid.
+            cp_ideal: Ideal gas isobaric heat capacity [J/mol/K].
+            cv_ideal: Ideal gas isochoric heat capacity [J/mol/K].
+            M: Molar mass [kg/mol]. Only required for speed of sound.
+        """
         self._eos = eos
+        self._M = M
 
-        if cp_ideal is not None and cv_ideal is None:
-            self._cp_ideal = cp_ideal
-            self._cv_ideal = lambda T: self._cp_ideal(T) - R
-        elif cv_ideal is not None and cp_ideal is None:
-            self._cv_ideal = cv_ideal
-            self._cp_ideal = lambda T: self._cv_ideal(T) + R
-        else:
+        if (cp_ideal is None) == (cv_ideal is None):
             raise ValueError('FluidModel requires exactly one of cp_ideal or cv_ideal')
+        self._cp_ideal, self._cv_ideal = cp_ideal, cv_ideal
+
+    def _wire(self):
+        return (np.nan if self._M is None else self._M,), (self._eos, self._cp_ideal, self._cv_ideal)
+
+    @classmethod
+    def _from_wire(cls, params, children):
+        eos, cp_ideal, cv_ideal = children
+        M = None if np.isnan(params[0]) else params[0]
+        return cls(eos, cp_ideal=cp_ideal, cv_ideal=cv_ideal, M=M)
+
+    @classmethod
+    def from_gkkr(cls, name: str, eos_class=PurePREOS) -> 'FluidModel':
+        """
+        Create a model of a pure fluid from the GKKR data, using its
+        critical constants in a cubic equation of state and its ideal
+        gas heat capacity correlation.
+
+        Args:
+            name: Substance name, e.g. 'Water'
+            eos_class: Cubic equation of state taking ``Pc``, ``Tc``
+                and ``omega``.
+
+        Returns:
+            The fluid model
+        """
+        substance = load_gkkr_substance(name)
+        Tc, Pc = substance['Tc'], substance['Pc'] * 1e5
+        eos = eos_class(Pc=Pc, Tc=Tc, omega=substance['omega'])
+        cp_ideal = corr_from_record(substance['Correlations']['Ideal Gas cp'][0], Tc=Tc, Pc=Pc)
+        return cls(eos, cp_ideal=cp_ideal, M=substance['M'] / 1000)
+
+    @property
+    def eos(self) -> PExplicitEOS:
+        return self._eos
+
+    @property
+    def ideal_gas_T_range(self) -> Tuple[float, float]:
+        """
+        Temperature range of the ideal gas heat capacity correlation,
+        outside which :meth:`properties` raises a ValueError [K].
+        """
+        correlation = self._cv_ideal if self._cp_ideal is None else self._cp_ideal
+        return correlation.T_min, correlation.T_max
 
     def P(self, T: float, v: float) -> float:
         return self._eos.P(T, v)
@@ -32,7 +100,340 @@ class FluidModel:
         return self._eos.z(T, v)
 
     def cp_ideal(self, T: float) -> float:
+        if self._cp_ideal is None:
+            return self._cv_ideal(T) + R
         return self._cp_ideal(T)
 
     def cv_ideal(self, T: float) -> float:
+        if self._cv_ideal is None:
+            return self._cp_ideal(T) - R
         return self._cv_ideal(T)
+
+    def properties(self, T: float, v: float) -> FluidProperties:
+        """
+        Calculate the full set of thermodynamic properties at a state
+        from a single evaluation of the residual Helmholtz energy.
+        Requires a :class:`pytherm.eos.HelmholtzEOS`.
+
+        .. math::
+            c_v = c_{v,\\text{id}} + c_v^r
+
+            c_P = c_v - T \\left(\\frac{∂P}{∂T}\\right)_v^2 \\left/ \\left(\\frac{∂P}{∂v}\\right)_T \\right.
+
+            w^2 = -\\frac{v^2}{M} \\frac{c_P}{c_v} \\left(\\frac{∂P}{∂v}\\right)_T
+
+        Args:
+            T: Temperature [K]
+            v: Specific Volume [m^3/mol]
+
+        Returns:
+            Pressure [Pa], compressibility factor [dimensionless],
+            residual enthalpy [J/mol] and entropy [J/mol/K], heat
+            capacities [J/mol/K], speed of sound [m/s] (NaN if no molar
+            mass was given) and the natural log of the fugacity
+            coefficient [dimensionless].
+        """
+        res = self._eos.residual_properties(T, v)
+        cv = self.cv_ideal(T) + res.cv_res
+        cp = cv - T * res.dP_dT_v ** 2 / res.dP_dv_T
+        M = np.nan if self._M is None else self._M
+        return FluidProperties(P=res.P, z=res.z, h_res=res.h_res, s_res=res.s_res,
+                               cv=cv, cp=cp, w=np.sqrt(-v ** 2 * cp / cv * res.dP_dv_T / M),
+                               ln_phi=res.ln_phi)
+
+    def properties_batch(self, T, v, out: Optional[FluidBatch] = None) -> FluidBatch:
+        """
+        :meth:`properties` at many states, returned as the columns of
+        one buffer instead of a separate array per property. The heat
+        capacities and speed of sound are computed directly into their
+        columns, and the other properties copied from the residual
+        properties of the EOS.
+
+        Args:
+            T: Temperatures [K], a scalar or 1-D column
+            v: Specific volumes [m^3/mol], a scalar or 1-D column
+            out: Batch with the fields of :class:`FluidProperties` and a
+                row per state to fill in place, instead of allocating one
+
+        Returns:
+            The batch
+        """
+        T, v = np.broadcast_arrays(np.atleast_1d(np.asarray(T, dtype=float)), np.asarray(v, dtype=float))
+        if T.ndim != 1:
+            raise ValueError('T and v must be scalars or 1-D columns')
+        res = self._eos.residual_properties(T, v)
+        batch = FluidBatch.empty(FluidProperties._fields, len(T), out)
+        for name in ('P', 'z', 'h_res', 's_res', 'ln_phi'):
+            np.copyto(batch[name], getattr(res, name))
+
+        # As in properties(), operation for operation
+        cv, cp, w = batch['cv'], batch['cp'], batch['w']
+        np.add(self.cv_ideal(T), res.cv_res, out=cv)
+        np.square(res.dP_dT_v, out=cp)
+        np.multiply(T, cp, out=cp)
+        np.divide(cp, res.dP_dv_T, out=cp)
+        np.subtract(cv, cp, out=cp)
+        np.square(v, out=w)
+        np.negative(w, out=w)
+        np.multiply(w, cp, out=w)
+        np.divide(w, cv, out=w)
+        np.multiply(w, res.dP_dv_T, out=w)
+        np.divide(w, np.nan if self._M is None else self._M, out=w)
+        np.sqrt(w, out=w)
+        return batch
+
+
+def _column(correlations: Sequence[TDepCorrelation], name: str) -> np.ndarray:
+    return np.array([getattr(corr, name) for corr in correlations], dtype=float)[:, None]
+
+
+class _StackedAlyLee:
+    """
+    Aly-Lee coefficients of several components as column vectors, so
+    that each is evaluated at every temperature of a row vector at once.
+    """
+    def __init__(self, correlations: Sequence[AlyLeeCorr]):
+        # A, B and D are in J/kmol/K
+        self.A, self.B, self.D = (_column(correlations, name) / 1000 for name in 'ABD')
+        self.C, self.E = _column(correlations, 'C'), _column(correlations, 'E')
+
+    def cp(self, T: np.ndarray) -> np.ndarray:
+        u, w = self.C / T, self.E / T
+        return self.A + self.B * (u / np.sinh(u)) ** 2 + self.D * (w / np.cosh(w)) ** 2
+
+    def h(self, T: np.ndarray) -> np.ndarray:
+        """Antiderivative of cp with respect to T."""
+        return self.A * T + self.B * self.C / np.tanh(self.C / T) - self.D * self.E * np.tanh(self.E / T)
+
+    def s(self, T: np.ndarray) -> np.ndarray:
+        """Antiderivative of cp/T with respect to T."""
+        # Both terms are even in C/T and E/T
+        u, w = np.abs(self.C / T), np.abs(self.E / T)
+        # log(sinh(u)) and log(cosh(w)), without overflow at large u and w
+        log_sinh = u + np.log1p(-np.exp(-2 * u)) - np.log(2)
+        log_cosh = w + np.log1p(np.exp(-2 * w)) - np.log(2)
+        return (self.A * np.log(T) + self.B * (u / np.tanh(u) - log_sinh)
+                - self.D * (w * np.tanh(w) - log_cosh))
+
+
+class _StackedPPDS:
+    """
+    PPDS ideal gas heat capacity coefficients of several components as
+    column vectors, so that each is evaluated at every temperature of a
+    row vector at once.
+    """
+    def __init__(self, correlations: Sequence[PPDScp_idCorr]):
+        self.A, self.B, self.C = (_column(correlations, name) for name in 'ABC')
+        # Coefficients of y^0 ... y^4 in the polynomial D + Ey + ... + Hy^4
+        poly = [_column(correlations, name) for name in 'DEFGH']
+        self.poly = poly
+        # With y = T/(A+T), dT = A dy/(1-y)^2 and the integral of y^n/(1-y)
+        # is -ln(1-y) - sum(y^k/k for k = 1..n), so the integral of
+        # y^2 (1-y) poly(y) dT is A (-ln(1-y) sum(poly) - h_poly(y)) with
+        # h_poly having coefficients of y^0 ... y^6:
+        self.poly_sum = sum(poly)
+        self.h_poly = [0 * poly[0]] + [sum(poly[max(k - 2, 0):]) / k for k in range(1, len(poly) + 3)]
+        # dT/T = dy/(y(1-y)), so that of y^2 (1-y) poly(y) dT/T is
+        # y^2 s_poly(y)
+        self.s_poly = [p / (j + 2) for j, p in enumerate(poly)]
+
+    def cp(self, T: np.ndarray) -> np.ndarray:
+        y = T / (self.A + T)
+        return R * (self.B + (self.C - self.B) * y ** 2 * (1 + (y - 1) * _horner(self.poly, y)))
+
+    def h(self, T: np.ndarray) -> np.ndarray:
+        """Antiderivative of cp with respect to T."""
+        A, y = self.A, T / (self.A + T)
+        tail = np.log1p(T / A) * self.poly_sum - _horner(self.h_poly, y)
+        return R * (self.B * T + (self.C - self.B) * (T - 2 * A * np.log(A + T) - A * (1 - y) - A * tail))
+
+    def s(self, T: np.ndarray) -> np.ndarray:
+        """Antiderivative of cp/T with respect to T."""
+        A, y = self.A, T / (self.A + T)
+        return R * (self.B * np.log(T) + (self.C - self.B) * (np.log(A + T) + 1 - y - y ** 2 * _horner(self.s_poly, y)))
+
+
+def _horner(coeffs, y: np.ndarray) -> np.ndarray:
+    """Polynomial in `y` with coefficients of increasing order."""
+    result = coeffs[-1] * y
+    for c in coeffs[-2:0:-1]:
+        result += c
+        result *= y
+    result += coeffs[0]
+    return result
+
+
+_STACKED_TYPES = {AlyLeeCorr: _StackedAlyLee, PPDScp_idCorr: _StackedPPDS}
+
+
+class IdealGasMixture:
+    """
+    Ideal gas heat capacity, enthalpy and entropy of a mixture.
+
+    The coefficients of the components' correlations are stacked by
+    correlation type, so that every component is evaluated at every
+    temperature in one array operation per type, and the component
+    properties are combined with the mole fractions as a matrix-vector
+    product. The enthalpy and entropy use exact integrals of the same
+    stacked correlations.
+
+    .. math::
+        c_{P,\\text{id}} = \\sum_i x_i c_{P,\\text{id},i}
+
+        h_\\text{id} = \\sum_i x_i \\int_{T_\\text{ref}}^T c_{P,\\text{id},i} \\, dT
+
+        s_\\text{id} = \\sum_i x_i \\int_{T_\\text{ref}}^T \\frac{c_{P,\\text{id},i}}{T} \\, dT
+            - R \\ln\\frac{P}{P_\\text{ref}} - R \\sum_i x_i \\ln x_i
+    """
+    # Temperatures per block, so that the properties of all components at
+    # a block stay in cache
+    _block_size = 1024
+
+    def __init__(self, correlations: Sequence[TDepCorrelation], T_ref: float = 298.15, P_ref: float = 1e5):
+        """
+        Args:
+            correlations: Ideal gas isobaric heat capacity correlation
+                of each component, either :class:`pytherm.prop.AlyLeeCorr`
+                or :class:`pytherm.prop.PPDScp_idCorr`.
+            T_ref: Reference temperature, where the enthalpy and entropy
+                of the pure components are zero [K]
+            P_ref: Reference pressure of the entropy [Pa]
+        """
+        if not correlations:
+            raise ValueError('IdealGasMixture requires at least one component')
+        unsupported = sorted({type(corr).__name__ for corr in correlations if type(corr) not in _STACKED_TYPES})
+        if unsupported:
+            raise ValueError(f'Unsupported ideal gas heat capacity correlations: {", ".join(unsupported)}')
+
+        self.correlations = tuple(correlations)
+        self.T_min = max(corr.T_min for corr in correlations)
+        self.T_max = min(corr.T_max for corr in correlations)
+        self.T_ref, self.P_ref = T_ref, P_ref
+
+        # Components grouped by correlation type, and the mole fraction
+        # index of each row of the stacked properties
+        self._stacks, order = [], []
+        for cls, stacked in _STACKED_TYPES.items():
+            indices = [i for i, corr in enumerate(correlations) if type(corr) is cls]
+            if indices:
+                self._stacks.append(stacked([correlations[i] for i in indices]))
+                order.extend(indices)
+        self._order = np.array(order)
+        self._h_ref = self._stacked('h', np.array([T_ref]))[:, 0]
+        self._s_ref = self._stacked('s', np.array([T_ref]))[:, 0]
+
+    @classmethod
+    def from_gkkr(cls, names: Sequence[str], **kwargs) -> 'IdealGasMixture':
+        """
+        Create a mixture from the ideal gas heat capacity correlations
+        of the GKKR data.
+
+        Args:
+            names: Substance names, e.g. ``['Methane', 'Ethane']``
+            **kwargs: Passed to the constructor
+
+        Returns:
+            The ideal gas mixture
+        """
+        return cls([corr_from_record(load_gkkr_substance(name)['Correlations']['Ideal Gas cp'][0])
+                    for name in names], **kwargs)
+
+    def __len__(self):
+        return len(self.correlations)
+
+    def _stacked(self, prop: str, T: np.ndarray) -> np.ndarray:
+        """Property of each component (in stacking order) at a row of temperatures."""
+        return np.concatenate([getattr(stack, prop)(T[None, :]) for stack in self._stacks])
+
+    def _mix(self, prop: str, T, x, ref: Optional[np.ndarray] = None):
+        """
+        Mole fraction weighted sum of a component property, evaluated in
+        blocks of temperatures small enough for the stacked properties to
+        stay in cache.
+        """
+        T = np.asarray(T, dtype=float)
+        flat, x = T.reshape(-1), self._mole_fractions(x)
+        result = np.empty(flat.size)
+        for start in range(0, flat.size, self._block_size):
+            result[start:start + self._block_size] = x @ self._stacked(prop, flat[start:start + self._block_size])
+        if ref is not None:
+            result -= x @ ref
+        return result.reshape(T.shape)[()]
+
+    def _mole_fractions(self, x) -> np.ndarray:
+        x = np.asarray(x, dtype=float)
+        if x.shape != (len(self),):
+            raise ValueError(f'Expected {len(self)} mole fractions, got shape {x.shape}')
+        return x[self._order]
+
+    @args_in_bounds(T=('T_min', 'T_max'))
+    def cp_components(self, T) -> np.ndarray:
+        """
+        Ideal gas isobaric heat capacity of each component.
+
+        Args:
+            T: Temperature [K]
+
+        Returns:
+            Heat capacities [J/mol/K], with the components along the
+            first axis and the shape of `T` after it
+        """
+        T = np.asarray(T, dtype=float)
+        result = np.empty((len(self), T.size))
+        result[self._order] = self._stacked('cp', T.reshape(-1))
+        return result.reshape((len(self),) + T.shape)
+
+    @args_in_bounds(T=('T_min', 'T_max'))
+    def cp(self, T, x) -> np.ndarray:
+        """
+        Args:
+            T: Temperature [K]
+            x: Mole fraction of each component [dimensionless]
+
+        Returns:
+            Ideal gas isobaric heat capacity of the mixture [J/mol/K]
+        """
+        return self._mix('cp', T, x)
+
+    def cv(self, T, x) -> np.ndarray:
+        """
+        Args:
+            T: Temperature [K]
+            x: Mole fraction of each component [dimensionless]
+
+        Returns:
+            Ideal gas isochoric heat capacity of the mixture [J/mol/K]
+        """
+        return self.cp(T, x) - R
+
+    @args_in_bounds(T=('T_min', 'T_max'))
+    def h(self, T, x) -> np.ndarray:
+        """
+        Args:
+            T: Temperature [K]
+            x: Mole fraction of each component [dimensionless]
+
+        Returns:
+            Ideal gas enthalpy of the mixture relative to the pure
+            components at the reference temperature [J/mol]
+        """
+        return self._mix('h', T, x, self._h_ref)
+
+    @args_in_bounds(T=('T_min', 'T_max'))
+    @args_must_be_positive('P')
+    def s(self, T, P, x) -> np.ndarray:
+        """
+        Args:
+            T: Temperature [K]
+            P: Pressure [Pa]
+            x: Mole fraction of each component [dimensionless]
+
+        Returns:
+            Ideal gas entropy of the mixture, including the entropy of
+            mixing, relative to the pure components at the reference
+            temperature and pressure [J/mol/K]
+        """
+        x = np.asarray(x, dtype=float)
+        nonzero = x[x > 0]
+        mixing = -R * np.sum(nonzero * np.log(nonzero))
+        return self._mix('s', T, x, self._s_ref) - R * np.log(np.asarray(P) / self.P_ref) + mixing
@@ -0,0 +1,298 @@
+"""
+Regression of correlation coefficients against tabulated data.
+
+Coefficients of the :mod:`pytherm.prop` correlations are fitted by
+Levenberg-Marquardt, minimizing the sum of squared relative (or
+absolute) deviations from the data. Many problems are solved at once:
+problems with the same correlation class and fitted coefficients are
+stacked, with coefficient arrays of shape ``(problems, 1)`` and data
+padded to shape ``(problems, points)``, so that each iteration is one
+vectorized evaluation of the correlation for every substance. The
+Jacobian comes out of the same evaluation, with the fitted coefficients
+seeded as first-order jets (see :mod:`pytherm.ad`), so it is exact for
+every correlation form without finite differences. Fits that are
+nonlinear in some coefficient (e.g. ``C`` and ``E`` of the Aly-Lee
+equation) are started from each combination of a few values the
+correlation class lists in ``_fit_start``, and the best one is kept.
+
+Fitted correlations can be written as records in the format of the GKKR
+data (``data/gkkr.json``), and read back with
+:func:`pytherm.prop.corr_from_record`::
+
+    result = fit_correlation(Wagner5Corr, T, P_bar, constants={'Tc': 647.096, 'Pc': 220.64})
+    result.record(source='Lab data 2024')
+"""
+from dataclasses import MISSING, fields
+from types import MappingProxyType
+from typing import Callable, Dict, List, Mapping, NamedTuple, Optional, Sequence, Tuple, Type
+import numpy as np
+from .ad import Jet
+from .prop import CORRELATION_TYPES, TDepCorrelation
+
+# Read-only empty mapping, for defaults shared between calls
+_NO_COEFFS: Mapping[str, float] = MappingProxyType({})
+
+
+class FitProblem(NamedTuple):
+    """
+    Data to fit one correlation to.
+    """
+    cls: Type[TDepCorrelation]
+    T: np.ndarray
+    values: np.ndarray
+    # Fixed coefficients (e.g. Tc and Pc), in the units of the data
+    constants: Mapping[str, float] = _NO_COEFFS
+    # Starting values of fitted coefficients, e.g. a published record
+    initial: Mapping[str, float] = _NO_COEFFS
+    # Coefficients to fit, or None for those of cls._fit_params
+    params: Optional[Sequence[str]] = None
+
+
+class FitResult(NamedTuple):
+    """
+    Fitted correlation and its deviations from the data.
+    """
+    correlation: TDepCorrelation
+    # Root mean square and maximum relative (or absolute) deviation
+    rms: float
+    max_error: float
+    n_points: int
+    iterations: int
+    converged: bool
+    # Median temperature of the data, for the record's verification point
+    T_verify: float
+
+    def record(self, source: str = 'Regression') -> dict:
+        """
+        Correlation record in the format of the GKKR data, with the
+        fitted and fixed coefficients, the temperature range of the data,
+        and a verification point at the median temperature.
+
+        Args:
+            source: Value of the record's 'Source' entry
+
+        Returns:
+            Record for :func:`pytherm.prop.corr_from_record`
+        """
+        corr = self.correlation
+        types = {cls: name for name, cls in CORRELATION_TYPES.items()}
+        record = {field.name: float(getattr(corr, field.name)) for field in fields(corr)}
+        record.update(T_verify=self.T_verify, prop_verify=float(corr(self.T_verify)),
+                      Type=types[type(corr)], Source=source)
+        return record
+
+
+def _levenberg_marquardt(residuals: Callable[[np.ndarray, np.ndarray], Tuple[np.ndarray, np.ndarray]],
+                         p: np.ndarray, max_iter: int, ftol: float, gtol: float, xtol: float):
+    """
+    Minimize the sum of squared residuals of a stack of independent
+    problems. Only the problems that have not converged yet are
+    evaluated in each iteration.
+
+    Args:
+        residuals: Function of the parameters of some of the problems,
+            shape (rows, k), and their row indices, returning the
+            residuals, shape (rows, points), and their Jacobian, shape
+            (rows, points, k)
+        p: Starting parameters, shape (problems, k)
+        max_iter: Maximum number of iterations
+        ftol: Relative reduction of the cost below which a problem has
+            converged
+        gtol: Largest cosine between the residuals and a column of the
+            Jacobian at which a problem has converged
+        xtol: Relative step size below which a problem has converged
+
+    Returns:
+        Parameters, costs, iteration counts and convergence flags, one
+        per problem
+    """
+    p = p.copy()
+    r, J = residuals(p, np.arange(len(p)))
+    cost = np.sum(r ** 2, axis=1)
+    damping, growth = np.full(len(p), 1e-3), np.full(len(p), 2.0)
+    converged = np.zeros(len(p), dtype=bool)
+    iterations = np.zeros(len(p), dtype=int)
+    rows = np.flatnonzero(np.isfinite(cost))
+    r, J = r[rows], J[rows]
+
+    for _ in range(max_iter):
+        if not rows.size:
+            break
+        JtJ = np.einsum('mnk,mnl->mkl', J, J)
+        gradient = np.einsum('mnk,mn->mk', J, r)
+        # Marquardt's scaling by the diagonal, floored so that the system
+        # stays non-singular for coefficients the data cannot determine
+        diag = np.diagonal(JtJ, axis1=1, axis2=2)
+        scale = np.maximum(diag, 1e-12 * diag.max(axis=1, keepdims=True) + 1e-300)
+        lam = damping[rows]
+        step = -np.linalg.solve(JtJ + (lam[:, None] * scale)[..., None] * np.eye(p.shape[1]),
+                                gradient[..., None])[..., 0]
+
+        r_new, J_new = residuals(p[rows] + step, rows)
+        cost_old, cost_new = cost[rows], np.sum(r_new ** 2, axis=1)
+        # Ratio of the actual to the predicted reduction of the cost
+        predicted = np.sum(step * (lam[:, None] * scale * step - gradient), axis=1)
+        gain = (cost_old - cost_new) / np.where(predicted > 0, predicted, np.inf)
+        better = cost_new < cost_old
+
+        # Converged when the residuals are (nearly) orthogonal to every
+        # column of the Jacobian, when both the actual and the predicted
+        # reduction of the cost are negligible, or when the step no
+        # longer changes p
+        cosine = np.max(np.abs(gradient) / np.sqrt(scale * cost_old[:, None]), axis=1)
+        stalled = better & (cost_old - cost_new <= ftol * cost_old) & (predicted <= ftol * cost_old)
+        small_step = np.all(np.abs(step) <= xtol * (np.abs(p[rows]) + xtol), axis=1)
+        done = (cosine <= gtol) | (cost_old == 0) | stalled | small_step
+
+        accepted = rows[better]
+        p[accepted] += step[better]
+        cost[accepted] = cost_new[better]
+        r[better], J[better] = r_new[better], J_new[better]
+        # Nielsen's update of the damping
+        damping[rows] = np.where(better, lam * np.maximum(1 / 3, 1 - (2 * np.clip(gain, 0, 1) - 1) ** 3),
+                                 lam * growth[rows])
+        growth[rows] = np.where(better, 2.0, growth[rows] * 2)
+        iterations[rows] += 1
+        converged[rows[done]] = True
+
+        keep = ~done & (damping[rows] < 1e16)
+        rows, r, J = rows[keep], r[keep], J[keep]
+    return p, cost, iterations, converged
+
+
+def _fit_group(cls: Type[TDepCorrelation], params: Tuple[str, ...], problems: Sequence[FitProblem],
+               relative: bool, max_iter: int, ftol: float, gtol: float,
+               xtol: float) -> List[FitResult]:
+    """
+    Fit problems sharing a correlation class and fitted coefficients,
+    stacked into arrays.
+    """
+    m, n = len(problems), max(problem.T.size for problem in problems)
+    T = np.empty((m, n))
+    values, weights = np.ones((m, n)), np.zeros((m, n))
+    for i, problem in enumerate(problems):
+        k = problem.T.size
+        # Padding repeats the first point, with zero weight
+        T[i] = problem.T[0]
+        T[i, :k] = problem.T
+        values[i, :k] = problem.values
+        weights[i, :k] = 1.0 / np.abs(problem.values) if relative else 1.0
+
+    defaults = {field.name: field.default for field in fields(cls)}
+    constants = {}
+    for name in defaults.keys() - {'T_min', 'T_max'} - set(params):
+        if defaults[name] is MISSING and any(name not in problem.constants for problem in problems):
+            raise ValueError(f'{cls.__name__} needs the constant {name!r}')
+        constants[name] = np.array([[problem.constants.get(name, defaults[name])] for problem in problems])
+    constants['T_min'] = T.min(axis=1, keepdims=True)
+    constants['T_max'] = T.max(axis=1, keepdims=True)
+    # Every combination of the class's starting values is tried, unless
+    # the problem gives its own
+    starts = []
+    for problem in problems:
+        candidates = [np.atleast_1d(np.asarray(problem.initial.get(name, cls._fit_start.get(name, defaults[name])),
+                                               dtype=float))
+                      for name in params]
+        starts.append(np.array(np.meshgrid(*candidates, indexing='ij')).reshape(len(params), -1).T)
+    n_starts = np.array([len(start) for start in starts])
+    owner = np.repeat(np.arange(m), n_starts)
+    T, values, weights = T[owner], values[owner], weights[owner]
+    constants = {name: value[owner] for name, value in constants.items()}
+
+    def residuals(p, rows):
+        coeffs = {name: value[rows] for name, value in constants.items()}
+        coeffs.update(zip(params, Jet.seed(*(p[:, j:j + 1] for j in range(len(params))), order=1)))
+        f = cls(**coeffs)._calc(T[rows])
+        w = weights[rows]
+        return w * (f.val - values[rows]), w[..., None] * np.broadcast_to(f.grad, f.val.shape + (len(params),))
+
+    with np.errstate(all='ignore'):
+        p, cost, iterations, converged = _levenberg_marquardt(residuals, np.concatenate(starts), max_iter,
+                                                              ftol, gtol, xtol)
+        r, _ = residuals(p, np.arange(len(p)))
+    # Best start of each problem
+    cost = np.where(np.isfinite(cost), cost, np.inf)
+    best = np.array([start + np.argmin(cost[start:start + count])
+                     for start, count in zip(np.cumsum(n_starts) - n_starts, n_starts)])
+    p, cost, iterations, converged, r = p[best], cost[best], iterations[best], converged[best], r[best]
+    constants = {name: value[best] for name, value in constants.items()}
+
+    results = []
+    for i, problem in enumerate(problems):
+        k = problem.T.size
+        coeffs = {name: float(value[i, 0]) for name, value in constants.items()}
+        coeffs.update(zip(params, p[i].tolist()))
+        coeffs['T_min'], coeffs['T_max'] = float(problem.T.min()), float(problem.T.max())
+        errors = np.abs(r[i, :k])
+        results.append(FitResult(cls(**coeffs), float(np.sqrt(cost[i] / k)), float(errors.max()), k,
+                                 int(iterations[i]), bool(converged[i]), float(np.median(problem.T))))
+    return results
+
+
+def fit_correlations(problems: Sequence[FitProblem], relative: bool = True, max_iter: int = 500,
+                     ftol: float = 1e-8, gtol: float = 1e-10, xtol: float = 1e-12) -> List[FitResult]:
+    """
+    Fit many correlations, e.g. every property of many substances.
+
+    Problems are grouped by correlation class and fitted coefficients,
+    and each group is solved by one vectorized Levenberg-Marquardt
+    iteration.
+
+    Args:
+        problems: Data, fixed coefficients and starting values for each
+            correlation
+        relative: If True, relative deviations from the data are
+            minimized, otherwise absolute ones
+        max_iter: Maximum number of iterations
+        ftol: Relative reduction of the sum of squares below which a fit
+            has converged
+        gtol: Largest cosine between the residuals and a column of the
+            Jacobian at which a fit has converged
+        xtol: Relative change of the coefficients below which a fit has
+            converged
+
+    Returns:
+        One result per problem, in order
+    """
+    groups: Dict[tuple, List[int]] = {}
+    problems = [problem._replace(T=np.asarray(problem.T, dtype=float).ravel(),
+                                 values=np.asarray(problem.values, dtype=float).ravel()) for problem in problems]
+    for i, problem in enumerate(problems):
+        if problem.T.size != problem.values.size or problem.T.size == 0:
+            raise ValueError(f'Problem {i} needs as many values as temperatures, and at least one')
+        params = tuple(problem.cls._fit_params if problem.params is None else problem.params)
+        if not params:
+            raise ValueError(f'No coefficients to fit for {problem.cls.__name__}')
+        groups.setdefault((problem.cls, params), []).append(i)
+
+    results: List[Optional[FitResult]] = [None] * len(problems)
+    for (cls, params), indices in groups.items():
+        group = _fit_group(cls, params, [problems[i] for i in indices], relative, max_iter, ftol, gtol, xtol)
+        for i, result in zip(indices, group):
+            results[i] = result
+    return results
+
+
+def fit_correlation(cls: Type[TDepCorrelation], T, values, constants: Optional[Mapping[str, float]] = None,
+                    initial: Optional[Mapping[str, float]] = None, params: Optional[Sequence[str]] = None,
+                    relative: bool = True, **kwargs) -> FitResult:
+    """
+    Fit one correlation, see :func:`fit_correlations`.
+
+    Args:
+        cls: Correlation class, e.g. :class:`pytherm.prop.Wagner5Corr`
+        T: Temperatures [K]
+        values: Property values, in the units of the coefficients
+        constants: Fixed coefficients, e.g. ``Tc`` and ``Pc``, if any
+        initial: Starting values of fitted coefficients, if any
+        params: Coefficients to fit. Defaults to those the class lists
+            in ``_fit_params``.
+        relative: If True, relative deviations are minimized
+        **kwargs: Solver options of :func:`fit_correlations`
+
+    Returns:
+        Fitted correlation and its deviations from the data
+    """
+    problem = FitProblem(cls, T, values, _NO_COEFFS if constants is None else constants,
+                         _NO_COEFFS if initial is None else initial, params)
+    return fit_correlations([problem], relative, **kwargs)[0]
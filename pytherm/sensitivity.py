@@ -0,0 +1,162 @@
+"""
+Sensitivities of properties to equation of state parameters.
+
+Parameter regression needs the derivatives of the fitted properties with
+respect to the parameters (e.g. ``Pc``, ``Tc`` and ``omega`` of a cubic
+EOS). Rather than re-instantiating the EOS and repeating every volume
+solve for each perturbed parameter, the EOS is built once with its
+parameters as first-order jets (see :mod:`pytherm.ad`) and evaluated on
+jets seeded in v, which yields the explicit parameter derivatives
+of every property in a single vectorized pass. Derivatives at constant
+pressure follow by implicit differentiation of :math:`P(T, v; θ) = P`,
+
+.. math::
+    \\left(\\frac{∂v}{∂θ}\\right)_{P,T} =
+        -\\frac{(∂P/∂θ)_{T,v}}{(∂P/∂v)_{T,θ}},
+
+so only the one root solve for the state itself is needed::
+
+    sens = sensitivities(PurePREOS, {'Pc': 4.6e6, 'Tc': 190.6, 'omega': 0.011},
+                         T=T, P=P, properties=('v', 'h_res'))
+    sens['v'].d('omega')  # (∂v/∂ω) at constant P and T, one per state
+"""
+from typing import Callable, Dict, Mapping, NamedTuple, Optional, Sequence, Tuple
+import numpy as np
+from .ad import Jet
+from .constants import R
+from .eos import HelmholtzEOS, ResidualProperties
+from .envelope import saturation_point
+
+# Properties available at constant (T, v) and at constant (P, T)
+TV_PROPERTIES = ResidualProperties._fields
+PT_PROPERTIES = ('v',) + tuple(name for name in ResidualProperties._fields if name != 'P')
+
+
+class Sensitivity(NamedTuple):
+    """
+    A property and its derivatives with respect to the EOS parameters.
+    """
+    value: np.ndarray
+    # Derivatives, with the parameter axis last
+    grad: np.ndarray
+    parameters: Tuple[str, ...]
+
+    def d(self, parameter: str) -> np.ndarray:
+        """
+        Derivative with respect to one parameter.
+        """
+        return self.grad[..., self.parameters.index(parameter)][()]
+
+
+def _jet_eos(factory: Callable[..., HelmholtzEOS], names: Sequence[str], jets: Sequence[Jet]) -> HelmholtzEOS:
+    """
+    Build the EOS with its parameters as jets.
+    """
+    eos = factory(**dict(zip(names, jets)))
+    if not isinstance(eos, HelmholtzEOS):
+        raise TypeError(f'Sensitivities need a HelmholtzEOS, got {type(eos).__name__}')
+    return eos
+
+
+def sensitivities(factory: Callable[..., HelmholtzEOS], params: Mapping[str, float], T,
+                  P=None, v=None, properties: Sequence[str] = ('v', 'z', 'h_res', 's_res'),
+                  eos: Optional[HelmholtzEOS] = None) -> Dict[str, Sensitivity]:
+    """
+    Evaluate properties and their derivatives with respect to the EOS
+    parameters, at states given by T and either P or v.
+
+    Args:
+        factory: Function building the EOS from the parameters as keyword
+            arguments, e.g. ``PurePREOS``. Parameters left out of
+            `params` are bound by the factory, e.g.
+            ``lambda Tc, omega: PurePREOS(4.6e6, Tc, omega)``.
+        params: Parameter values by name
+        T: Temperatures [K]
+        P: Pressures [Pa]. Derivatives are at constant P and T.
+        v: Specific volumes [m^3/mol]. Derivatives are at constant T
+            and v. Exactly one of P and v must be given.
+        properties: Names of the properties to evaluate: 'v' (at
+            constant P) and the fields of
+            :class:`pytherm.eos.ResidualProperties` ('P' at constant v)
+        eos: The EOS at `params`, if already built. It is only used to
+            solve for v.
+
+    Returns:
+        Dict of property name to :class:`Sensitivity`
+    """
+    if (P is None) == (v is None):
+        raise ValueError('Exactly one of P and v must be specified')
+    available = PT_PROPERTIES if v is None else TV_PROPERTIES
+    unknown = [name for name in properties if name not in available]
+    if unknown:
+        raise ValueError(f'Unknown properties {unknown}, expected any of {available}')
+
+    if v is None:
+        v = (factory(**params) if eos is None else eos).v(P, T)
+    T, v = np.broadcast_arrays(np.asarray(T, dtype=float), np.asarray(v, dtype=float))
+
+    # T is held constant throughout, so only v and the parameters are seeded
+    names = tuple(params)
+    v_jet, *theta = Jet.seed(v, *params.values(), order=1)
+    jet_eos = _jet_eos(factory, names, theta)
+    if set(properties) <= {'v', 'P'}:
+        props = {'P': jet_eos.P(T, v_jet)}
+    else:
+        props = jet_eos.residual_properties(T, v_jet)._asdict()
+
+    if P is None:
+        return {name: Sensitivity(props[name].val[()], props[name].grad[..., 1:], names) for name in properties}
+
+    # Implicit differentiation of P(T, v; θ) = P, then the chain rule
+    P_jet = props['P']
+    dv = -P_jet.grad[..., 1:] / P_jet.grad[..., :1]
+    result = {}
+    for name in properties:
+        if name == 'v':
+            result[name] = Sensitivity(v[()], dv, names)
+        else:
+            jet = props[name]
+            result[name] = Sensitivity(jet.val[()], jet.grad[..., 1:] + jet.grad[..., :1] * dv, names)
+    return result
+
+
+def saturation_sensitivities(factory: Callable[..., HelmholtzEOS], params: Mapping[str, float],
+                             T) -> Dict[str, Sensitivity]:
+    """
+    Evaluate the saturation pressure and coexisting volumes and their
+    derivatives with respect to the EOS parameters.
+
+    Each state is solved with :func:`pytherm.envelope.saturation_point`.
+    At constant T, equal Gibbs energies of the phases imply
+
+    .. math::
+        \\frac{dP_\\text{sat}}{dθ} = RT\\frac{α^r_θ(v_l) - α^r_θ(v_v)}{v_v - v_l}
+
+    where :math:`α^r_θ` is the derivative at constant T and v, and
+    :math:`dv/dθ = (dP_\\text{sat}/dθ - P_θ)/P_v` for each phase.
+
+    Args:
+        factory: Function building the EOS from the parameters, see
+            :func:`sensitivities`
+        params: Parameter values by name
+        T: Temperatures, below the critical temperature [K]
+
+    Returns:
+        Dict with :class:`Sensitivity` entries 'P', 'v_liq' and 'v_vap'
+    """
+    eos = factory(**params)
+    T = np.asarray(T, dtype=float)
+    states = np.array([saturation_point(eos, T_i) for T_i in T.ravel()]).reshape(T.shape + (3,))
+    P, v_liq, v_vap = np.moveaxis(states, -1, 0)
+
+    names = tuple(params)
+    jet_eos = _jet_eos(factory, names, Jet.seed(*params.values(), order=1))
+    # The reducing parameters may depend on θ, so α^r is evaluated at (T, v)
+    alphar_liq, alphar_vap = jet_eos._alphar_Tv(T, v_liq).alpha, jet_eos._alphar_Tv(T, v_vap).alpha
+    dP = (R * T / (v_vap - v_liq))[..., None] * (alphar_liq.grad - alphar_vap.grad)
+
+    result = {'P': Sensitivity(P[()], dP, names)}
+    for name, v in (('v_liq', v_liq), ('v_vap', v_vap)):
+        dP_dtheta = jet_eos.P(T, v).grad
+        result[name] = Sensitivity(v[()], (dP - dP_dtheta) / eos.dP_dv_T(T, v)[..., None], names)
+    return result
@@ -0,0 +1,161 @@
+"""
+Asyncio front-end for property evaluation with request batching.
+
+Evaluating an equation of state inside an event loop blocks it, and
+evaluating one state at a time wastes the vectorized EOS methods.
+:class:`PropertyService` collects concurrent ``await service.props(P, T)``
+requests for a short time window, evaluates them as one batch in an
+executor thread, and resolves each request with its own row::
+
+    async with PropertyService(FluidModel.from_gkkr('Water')) as service:
+        props = await service.props(1e5, 400.0)
+        props['v'], props['h_res']
+"""
+import asyncio
+from concurrent.futures import Executor, ThreadPoolExecutor
+from typing import Dict, List, NamedTuple, Optional, Sequence, Tuple, Union
+import numpy as np
+from .eos import HelmholtzEOS
+from .model import FluidModel
+from .stream import evaluate
+from .util import check_bounds
+
+
+class ServiceStats(NamedTuple):
+    """
+    Counts of the requests and batches handled by a service.
+
+    Requests retried one at a time after their batch failed are counted
+    in `retries`, not as batches.
+    """
+    requests: int
+    batches: int
+    errors: int
+    retries: int = 0
+
+    @property
+    def mean_batch_size(self) -> float:
+        return self.requests / self.batches if self.batches else float('nan')
+
+
+class PropertyService:
+    """
+    Batches concurrent property requests into vectorized evaluations.
+
+    A batch is evaluated when it reaches `max_batch_size` requests, or
+    `max_latency` seconds after its first request arrived, whichever is
+    first. If a batch fails (e.g. one state is outside a correlation's
+    range), its requests are retried one at a time so that the error
+    only reaches the request that caused it.
+    """
+    def __init__(self, model: Union[FluidModel, HelmholtzEOS],
+                 properties: Sequence[str] = ('v', 'z', 'h_res', 's_res'),
+                 max_batch_size: int = 1024, max_latency: float = 0.002,
+                 executor: Optional[Executor] = None):
+        """
+        Args:
+            model: Fluid model, or an equation of state for residual
+                properties only (see :func:`pytherm.stream.evaluate`)
+            properties: Names of the properties to evaluate
+            max_batch_size: Maximum number of requests per batch
+            max_latency: Maximum time a request waits for its batch to
+                fill [s]
+            executor: Executor to evaluate batches in. Defaults to a
+                single worker thread owned by the service.
+        """
+        if max_batch_size < 1:
+            raise ValueError('max_batch_size must be at least 1')
+        self._model = model
+        self._properties = tuple(properties)
+        self.max_batch_size = max_batch_size
+        self.max_latency = max_latency
+        self._own_executor = executor is None
+        self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix='pytherm-service') \
+            if executor is None else executor
+
+        self._pending: List[Tuple[float, float, asyncio.Future]] = []
+        self._timer: Optional[asyncio.TimerHandle] = None
+        self._tasks = set()
+        self._requests = self._batches = self._errors = self._retries = 0
+
+    @property
+    def stats(self) -> ServiceStats:
+        return ServiceStats(self._requests, self._batches, self._errors, self._retries)
+
+    async def props(self, P: float, T: float) -> Dict[str, float]:
+        """
+        Evaluate the service's properties at one state.
+
+        Args:
+            P: Pressure [Pa]
+            T: Temperature [K]
+
+        Returns:
+            Dict of property name to value
+        """
+        check_bounds('P', P, 0.0, strict=True)
+        check_bounds('T', T, 0.0, strict=True)
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+        self._pending.append((float(P), float(T), future))
+        self._requests += 1
+
+        if len(self._pending) >= self.max_batch_size:
+            self._flush()
+        elif self._timer is None:
+            self._timer = loop.call_later(self.max_latency, self._flush)
+        return await future
+
+    def _flush(self):
+        """
+        Start evaluating the pending requests as one batch.
+        """
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+        batch, self._pending = self._pending, []
+        if batch:
+            task = asyncio.get_running_loop().create_task(self._run_batch(batch))
+            self._tasks.add(task)
+            task.add_done_callback(self._tasks.discard)
+
+    async def _run_batch(self, batch: List[Tuple[float, float, asyncio.Future]], retry: bool = False):
+        loop = asyncio.get_running_loop()
+        P = np.array([request[0] for request in batch])
+        T = np.array([request[1] for request in batch])
+        if retry:
+            self._retries += 1
+        else:
+            self._batches += 1
+        try:
+            result = await loop.run_in_executor(self._executor, evaluate, self._model, P, T, self._properties)
+        except Exception as error:
+            if len(batch) == 1:
+                self._errors += 1
+                future = batch[0][2]
+                if not future.done():
+                    future.set_exception(error)
+            else:
+                # Retry one at a time, so that only the failing requests fail
+                await asyncio.gather(*(self._run_batch([request], retry=True) for request in batch))
+            return
+        for i, (_, _, future) in enumerate(batch):
+            if not future.done():
+                future.set_result({name: float(values[i]) for name, values in result.items()})
+
+    async def close(self):
+        """
+        Evaluate any pending requests, wait for running batches and shut
+        down the executor if the service created it.
+        """
+        self._flush()
+        while self._tasks:
+            await asyncio.gather(*self._tasks)
+        if self._own_executor:
+            self._executor.shutdown(wait=True)
+
+    async def __aenter__(self) -> 'PropertyService':
+        return self
+
+    async def __aexit__(self, *exc_info):
+        await self.close()
@@ -0,0 +1,123 @@
+"""
+Vectorized root-finding routines used to invert equations of state.
+
+All routines operate element-wise on 1-D arrays, so that a whole batch
+of independent scalar problems is solved with one sequence of NumPy
+operations. Elements drop out of the iteration as soon as they
+converge, and the callbacks are only evaluated for the elements that
+are still active.
+"""
+from typing import Callable, Tuple
+import numpy as np
+
+
+def expand_bracket(func: Callable[[np.ndarray, np.ndarray], np.ndarray],
+                   x: np.ndarray, factor: float = 2.0,
+                   maxiter: int = 100) -> np.ndarray:
+    """
+    Scale each element of `x` by `factor` until `func` becomes negative
+    there.
+
+    Used to find the open end of a bracket when only one end is known
+    from the equation of state (e.g. an upper bound on temperature).
+
+    Args:
+        func: Function of ``(x, idx)`` returning the residual for the
+            elements ``idx`` of the problem, evaluated at ``x``.
+        x: Starting points, one per problem.
+        factor: Multiplier applied to `x` on each unsuccessful step.
+        maxiter: Maximum number of expansion steps.
+
+    Returns:
+        Points at which `func` is negative.
+    """
+    x = np.array(x, dtype=float)
+    idx = np.arange(x.size)
+    for _ in range(maxiter):
+        positive = func(x[idx], idx) >= 0.0
+        idx = idx[positive]
+        if idx.size == 0:
+            return x
+        x[idx] *= factor
+    raise RuntimeError('Failed to bracket root')
+
+
+def newton_bracketed(func: Callable[[np.ndarray, np.ndarray], Tuple[np.ndarray, np.ndarray]],
+                     lo: np.ndarray, hi: np.ndarray, sign: np.ndarray,
+                     x0: np.ndarray = None, rtol: float = 1e-12,
+                     maxiter: int = 100,
+                     full_output: bool = False):
+    """
+    Safeguarded Newton iteration on a bracketing interval.
+
+    Each problem must have exactly one sign change of its residual
+    inside ``(lo, hi)``; the endpoints themselves are never evaluated,
+    so they may be singular (e.g. :math:`v = b` for a cubic EOS). A
+    Newton step is taken whenever it stays inside the current bracket
+    and at least halves the residual's expected size, otherwise the
+    bracket is bisected. This keeps the quadratic convergence of
+    Newton's method close to the root while guaranteeing convergence
+    from any starting point.
+
+    Args:
+        func: Function of ``(x, idx)`` returning the residual and its
+            derivative for the elements ``idx`` of the problem,
+            evaluated at ``x``.
+        lo: Lower end of the bracket for each problem.
+        hi: Upper end of the bracket for each problem.
+        sign: Sign of the residual just above `lo` (+1 or -1).
+        x0: Initial guesses. Defaults to the midpoint of the bracket.
+            Guesses outside the bracket are replaced by the midpoint.
+        rtol: Relative tolerance on the root.
+        maxiter: Maximum number of iterations.
+        full_output: If True, also return the number of residual
+            evaluations used for each problem.
+
+    Returns:
+        Roots, and optionally the evaluation counts.
+    """
+    lo = np.array(lo, dtype=float)
+    hi = np.array(hi, dtype=float)
+    sign = np.broadcast_to(np.asarray(sign, dtype=float), lo.shape)
+    mid = 0.5 * (lo + hi)
+    if x0 is None:
+        x = mid
+    else:
+        x = np.asarray(x0, dtype=float)
+        x = np.where((x > lo) & (x < hi), x, mid)
+    n_evals = np.zeros(x.shape, dtype=int)
+    dx_old = hi - lo
+
+    idx = np.arange(x.size)
+    for _ in range(maxiter):
+        xi = x[idx]
+        f, df = func(xi, idx)
+        n_evals[idx] += 1
+
+        above = sign[idx] * f > 0.0
+        lo[idx] = np.where(above, xi, lo[idx])
+        hi[idx] = np.where(above, hi[idx], xi)
+
+        with np.errstate(divide='ignore', invalid='ignore'):
+            step = np.where(f == 0.0, 0.0, f / df)
+        x_new = xi - step
+        converged = np.abs(step) <= rtol * np.abs(xi)
+        use_bisect = ~converged & (
+            ~((x_new > lo[idx]) & (x_new < hi[idx])) |
+            (np.abs(2.0 * f) > np.abs(dx_old[idx] * df)))
+        x_new = np.where(use_bisect, 0.5 * (lo[idx] + hi[idx]), x_new)
+
+        dx = np.abs(x_new - xi)
+        dx_old[idx] = dx
+        x[idx] = x_new
+
+        done = converged | (dx <= rtol * np.abs(x_new))
+        idx = idx[~done]
+        if idx.size == 0:
+            break
+    else:
+        raise RuntimeError(f'Failed to converge after {maxiter} iterations')
+
+    if full_output:
+        return x, n_evals
+    return x
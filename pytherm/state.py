@@ -1,9 +1,12 @@
-from typing import Optional, Callable
+from typing import Dict, Optional, Sequence
 from functools import cached_property
+import numpy as np
 from .eos import EOS
+from .util import args_must_be_positive
 
 
 class FluidState:
+    @args_must_be_positive('P', 'T', 'v')
     def __init__(self, eos: EOS, P: Optional[float] = None, T: Optional[float] = None, v: Optional[float] = None):
         self.eos = eos
 
@@ -11,20 +14,11 @@ class FluidState:
             raise ValueError('At least two of P, T, v must be specified')
 
         if P is not None:
-            if P > 0:
-                self.P = P
-            else:
-                raise ValueError('P must have a positive value')
+            self.P = P
         if T is not None:
-            if T > 0:
-                self.T = T
-            else:
-                raise ValueError('T must have a positive value')
+            self.T = T
         if v is not None:
-            if v > 0:
-                self.v = v
-            else:
-                raise ValueError('v must have a positive value')
+            self.v = v
 
     @cached_property
     def P(self):
@@ -40,4 +34,200 @@ class FluidState:
 
     @cached_property
     def z(self):
-        return self.eos.z(P=self.P, T=self.T, v=self.v)
+        return self.eos.z(T=self.T, v=self.v)
+
+
+class FluidBatch:
+    """
+    Columns of float properties of many states, held in one buffer.
+
+    The buffer is a C-contiguous float64 array of shape
+    ``(len(fields), n)``, so each column is a contiguous row of it.
+    Columns (``batch.cp`` or ``batch['cp']``), :func:`numpy.asarray`,
+    the buffer protocol (:attr:`data`) and :meth:`to_arrow` all share its
+    memory rather than copying it. Batch methods such as
+    :meth:`pytherm.model.FluidModel.properties_batch` take a batch as
+    ``out=`` and write their results into it, so that loops over many
+    evaluations of the same size reuse one result buffer (intermediate
+    arrays are still allocated per call).
+    """
+    def __init__(self, fields: Sequence[str], data: np.ndarray):
+        """
+        Args:
+            fields: Column names
+            data: Buffer of shape ``(len(fields), n)``, which must be
+                C-contiguous float64. It is used as is, not copied.
+        """
+        fields = tuple(fields)
+        if not isinstance(data, np.ndarray) or data.dtype != np.float64 or data.ndim != 2 \
+                or len(data) != len(fields) or not data.flags.c_contiguous:
+            raise ValueError(f'data must be a C-contiguous float64 array of shape ({len(fields)}, n)')
+        self.fields = fields
+        self._index = {name: i for i, name in enumerate(fields)}
+        self._data = data
+
+    @classmethod
+    def empty(cls, fields: Sequence[str], n: int, out: Optional['FluidBatch'] = None) -> 'FluidBatch':
+        """
+        Allocate an uninitialized batch, e.g. to pass as ``out=``.
+
+        Args:
+            fields: Column names
+            n: Number of states
+            out: Existing batch to return instead, after checking that it
+                has these fields and `n` rows
+
+        Returns:
+            The batch
+        """
+        if out is None:
+            return cls(fields, np.empty((len(fields), n)))
+        if out.fields != tuple(fields) or len(out) != n:
+            raise ValueError(f'out must have fields {tuple(fields)} and {n} rows, '
+                             f'not {out.fields} and {len(out)} rows')
+        return out
+
+    @classmethod
+    def from_columns(cls, columns: Dict[str, np.ndarray], n: int,
+                     out: Optional['FluidBatch'] = None) -> 'FluidBatch':
+        """
+        Copy columns into a new batch, or into `out`, broadcasting each to
+        `n` rows.
+
+        Args:
+            columns: Dict of column name to values
+            n: Number of states
+            out: Batch with these columns and `n` rows to fill in place
+
+        Returns:
+            The batch
+        """
+        batch = cls.empty(columns, n, out)
+        for row, values in zip(batch.data, columns.values()):
+            np.copyto(row, values)
+        return batch
+
+    @property
+    def data(self) -> np.ndarray:
+        """
+        The underlying buffer, of shape ``(len(fields), n)``.
+        """
+        return self._data
+
+    def __len__(self):
+        return self._data.shape[1]
+
+    def __repr__(self):
+        return f'{type(self).__name__}(fields={self.fields!r}, n={len(self)})'
+
+    def __getitem__(self, name: str) -> np.ndarray:
+        return self._data[self._index[name]]
+
+    def __getattr__(self, name):
+        # Only called for attributes the batch does not have itself
+        if name.startswith('_') or name == 'fields':
+            raise AttributeError(name)
+        try:
+            return self[name]
+        except KeyError:
+            raise AttributeError(name) from None
+
+    def __array__(self, dtype=None, copy=None):
+        if dtype is None or np.dtype(dtype) == self._data.dtype:
+            return self._data.copy() if copy else self._data
+        if copy is False:
+            raise ValueError(f'Converting a {type(self).__name__} to {np.dtype(dtype)} requires a copy')
+        return self._data.astype(dtype)
+
+    def __buffer__(self, flags):
+        # Buffer protocol on Python 3.12+; use `data` on earlier versions
+        return memoryview(self._data)
+
+    def columns(self) -> Dict[str, np.ndarray]:
+        """
+        Returns:
+            Dict of column name to column, each a view of the buffer
+        """
+        return {name: self._data[i] for i, name in enumerate(self.fields)}
+
+    def to_arrow(self):
+        """
+        Export the batch as an Arrow record batch, whose columns wrap the
+        buffer without copying it (NaN values stay NaN rather than
+        becoming nulls). Requires the optional ``pyarrow`` package.
+
+        Returns:
+            :class:`pyarrow.RecordBatch`
+        """
+        try:
+            import pyarrow
+        except ImportError:
+            raise ImportError('Arrow export requires the pyarrow package') from None
+        arrays = [pyarrow.Array.from_buffers(pyarrow.float64(), len(self), [None, pyarrow.py_buffer(column)])
+                  for column in self._data]
+        return pyarrow.RecordBatch.from_arrays(arrays, names=list(self.fields))
+
+
+class FluidStateBatch:
+    """
+    Many fluid states, specified column-wise.
+
+    Like :class:`FluidState`, each row needs two of P, T and v, but rows
+    may specify different pairs: a missing value is given as NaN (or
+    None), and a column that is missing for every row may be omitted.
+    Rows are grouped by the variable they are missing, and each group is
+    resolved with a single vectorized EOS call when the batch is
+    created.
+    """
+    @args_must_be_positive('P', 'T', 'v')
+    def __init__(self, eos: EOS, P=None, T=None, v=None):
+        """
+        Args:
+            eos: Equation of state relating P, T and v
+            P: Pressures [Pa], NaN where not specified
+            T: Temperatures [K], NaN where not specified
+            v: Specific volumes [m^3/mol], NaN where not specified
+        """
+        self.eos = eos
+
+        columns = [np.nan if column is None else column for column in (P, T, v)]
+        P, T, v = (np.atleast_1d(np.array(column, dtype=float)) for column in np.broadcast_arrays(*columns))
+        if P.ndim != 1:
+            raise ValueError('P, T and v must be scalars or 1-D columns')
+
+        missing_P, missing_T, missing_v = np.isnan(P), np.isnan(T), np.isnan(v)
+        underspecified = np.flatnonzero(missing_P.astype(int) + missing_T + missing_v > 1)
+        if underspecified.size:
+            raise ValueError('At least two of P, T, v must be specified '
+                             f'(rows {underspecified[:10].tolist()})')
+        if missing_P.any():
+            P[missing_P] = eos.P(T=T[missing_P], v=v[missing_P])
+        if missing_T.any():
+            T[missing_T] = eos.T(P=P[missing_T], v=v[missing_T])
+        if missing_v.any():
+            v[missing_v] = eos.v(P=P[missing_v], T=T[missing_v])
+
+        self.P, self.T, self.v = P, T, v
+
+    def __len__(self):
+        return self.P.size
+
+    def __getitem__(self, i: int) -> FluidState:
+        return FluidState(self.eos, P=self.P[i], T=self.T[i], v=self.v[i])
+
+    @cached_property
+    def z(self):
+        return self.eos.z(T=self.T, v=self.v)
+
+    def to_batch(self, out: Optional[FluidBatch] = None) -> FluidBatch:
+        """
+        Collect P, T, v and z into one buffer.
+
+        Args:
+            out: Batch with fields ``('P', 'T', 'v', 'z')`` and a row
+                per state to fill in place, instead of allocating one
+
+        Returns:
+            The batch
+        """
+        return FluidBatch.from_columns({'P': self.P, 'T': self.T, 'v': self.v, 'z': self.z}, len(self), out)
@@ -0,0 +1,360 @@
+"""
+Streaming property evaluation over large tabular files.
+
+Pressure and temperature columns are read from a CSV or Parquet file in
+chunks of bounded size, the requested properties are evaluated for each
+chunk with one vectorized call, and the results are appended to the
+output file (CSV or Parquet) together with the input columns. Reading
+runs in a background thread, a few chunks ahead of the computation, so
+that file I/O and property evaluation overlap.
+
+Parquet support requires the optional ``pyarrow`` package. The format
+of each file is chosen from its extension (``.csv``, ``.parquet`` or
+``.pq``).
+
+Usage::
+
+    python -m pytherm.stream historian.csv results.parquet --substance Water \\
+        --properties v z h_res cp --P-scale 1e5 --T-offset 273.15
+"""
+import argparse
+import csv
+import os
+import queue
+import sys
+import threading
+import time
+from typing import Dict, Iterable, Iterator, NamedTuple, Optional, Sequence, Union
+import numpy as np
+from .eos import HelmholtzEOS
+from .model import FluidModel, FluidProperties
+from .util import skip_validation
+
+
+Chunk = Dict[str, np.ndarray]
+
+# Properties that can be requested, besides the specific volume
+MODEL_PROPERTIES = FluidProperties._fields
+EOS_PROPERTIES = ('z', 'h_res', 's_res', 'u_res', 'cv_res', 'cp_res', 'ln_phi')
+# Fluid model properties that need the ideal gas heat capacity, and so
+# the temperature to be in the range of its correlation
+IDEAL_GAS_PROPERTIES = ('cv', 'cp', 'w')
+
+
+class StreamStats(NamedTuple):
+    """
+    Summary of a streaming run.
+    """
+    rows: int
+    chunks: int
+    seconds: float
+
+    @property
+    def rows_per_second(self) -> float:
+        return self.rows / self.seconds if self.seconds > 0 else float('nan')
+
+
+def _import_pyarrow():
+    try:
+        import pyarrow
+        import pyarrow.parquet
+    except ImportError:
+        raise ImportError('Parquet support requires the pyarrow package') from None
+    return pyarrow
+
+
+def _file_format(path: str) -> str:
+    extension = os.path.splitext(path)[1].lower()
+    if extension == '.csv':
+        return 'csv'
+    if extension in ('.parquet', '.pq'):
+        return 'parquet'
+    raise ValueError(f'Unsupported file type {extension!r}, expected .csv, .parquet or .pq')
+
+
+def _to_column(values: list) -> np.ndarray:
+    """
+    Convert a list of CSV fields to a float array if they are all
+    numeric (empty fields become NaN), or keep them as strings.
+    """
+    try:
+        return np.array([float(value) if value else np.nan for value in values])
+    except ValueError:
+        return np.array(values, dtype=object)
+
+
+def read_csv_chunks(path: str, chunk_size: int) -> Iterator[Chunk]:
+    """
+    Read a CSV file with a header row in chunks of at most `chunk_size`
+    rows.
+
+    Args:
+        path: File path
+        chunk_size: Maximum number of rows per chunk
+
+    Yields:
+        Chunks as dicts of column name to array. Numeric columns are
+        float arrays, others object arrays of strings.
+    """
+    with open(path, newline='') as file:
+        reader = csv.reader(file)
+        header = next(reader)
+        while True:
+            rows = [row for _, row in zip(range(chunk_size), reader)]
+            if not rows:
+                return
+            yield {name: _to_column(list(column)) for name, column in zip(header, zip(*rows))}
+
+
+def read_parquet_chunks(path: str, chunk_size: int) -> Iterator[Chunk]:
+    """
+    Read a Parquet file in chunks of at most `chunk_size` rows.
+
+    Args:
+        path: File path
+        chunk_size: Maximum number of rows per chunk
+
+    Yields:
+        Chunks as dicts of column name to array.
+    """
+    pyarrow = _import_pyarrow()
+    for batch in pyarrow.parquet.ParquetFile(path).iter_batches(batch_size=chunk_size):
+        yield {name: column.to_numpy(zero_copy_only=False)
+               for name, column in zip(batch.schema.names, batch.columns)}
+
+
+class CSVChunkWriter:
+    """
+    Append chunks to a CSV file, writing the header with the first one.
+    """
+    def __init__(self, path: str):
+        self._file = open(path, 'w', newline='')
+        self._writer = csv.writer(self._file)
+        self._header = None
+
+    def write(self, chunk: Chunk):
+        if self._header is None:
+            self._header = list(chunk)
+            self._writer.writerow(self._header)
+        columns = [chunk[name] for name in self._header]
+        self._writer.writerows(zip(*(column.tolist() for column in columns)))
+
+    def close(self):
+        self._file.close()
+
+
+class ParquetChunkWriter:
+    """
+    Append chunks to a Parquet file, one row group per chunk.
+    """
+    def __init__(self, path: str):
+        self._pyarrow = _import_pyarrow()
+        self._path = path
+        self._writer = None
+
+    def write(self, chunk: Chunk):
+        table = self._pyarrow.table(chunk)
+        if self._writer is None:
+            self._writer = self._pyarrow.parquet.ParquetWriter(self._path, table.schema)
+        self._writer.write_table(table)
+
+    def close(self):
+        if self._writer is not None:
+            self._writer.close()
+
+
+def read_chunks(path: str, chunk_size: int) -> Iterator[Chunk]:
+    """
+    Read a CSV or Parquet file in chunks, see :func:`read_csv_chunks`.
+    """
+    if _file_format(path) == 'csv':
+        return read_csv_chunks(path, chunk_size)
+    return read_parquet_chunks(path, chunk_size)
+
+
+def chunk_writer(path: str) -> Union[CSVChunkWriter, ParquetChunkWriter]:
+    """
+    Open a CSV or Parquet chunk writer, chosen by the file extension.
+    """
+    if _file_format(path) == 'csv':
+        return CSVChunkWriter(path)
+    return ParquetChunkWriter(path)
+
+
+_DONE = object()
+
+
+def prefetch(chunks: Iterable[Chunk], depth: int = 2) -> Iterator[Chunk]:
+    """
+    Iterate over `chunks` in a background thread, keeping at most
+    `depth` chunks read ahead of the consumer. Exceptions raised while
+    reading are re-raised in the consuming thread.
+
+    Args:
+        chunks: Chunks to read
+        depth: Maximum number of chunks held in memory ahead of the
+            consumer
+
+    Yields:
+        The chunks, in order
+    """
+    buffer = queue.Queue(maxsize=depth)
+    stop = threading.Event()
+
+    def put(item) -> bool:
+        # Give up if the consumer has stopped, rather than block forever
+        while not stop.is_set():
+            try:
+                buffer.put(item, timeout=0.1)
+                return True
+            except queue.Full:
+                continue
+        return False
+
+    def reader():
+        try:
+            for chunk in chunks:
+                if not put(chunk):
+                    return
+        except BaseException as error:
+            put(error)
+        else:
+            put(_DONE)
+
+    thread = threading.Thread(target=reader, name='pytherm-prefetch', daemon=True)
+    thread.start()
+    try:
+        while True:
+            item = buffer.get()
+            if item is _DONE:
+                return
+            if isinstance(item, BaseException):
+                raise item
+            yield item
+    finally:
+        stop.set()
+        thread.join()
+
+
+def evaluate(model: Union[FluidModel, HelmholtzEOS], P: np.ndarray, T: np.ndarray,
+             properties: Sequence[str]) -> Chunk:
+    """
+    Evaluate properties at a batch of (P, T) states.
+
+    Args:
+        model: Fluid model, or an equation of state for residual
+            properties only
+        P: Pressures [Pa]
+        T: Temperatures [K]
+        properties: Names of the properties to evaluate: 'v' and the
+            fields of :class:`pytherm.model.FluidProperties` for a fluid
+            model, or 'v' and the residual properties of
+            :class:`pytherm.eos.ResidualProperties` for an EOS. Only
+            'cv', 'cp' and 'w' use the ideal gas heat capacity of a
+            fluid model; the others come from its EOS alone, at any
+            temperature.
+
+    Returns:
+        Dict of property name to array
+    """
+    available = MODEL_PROPERTIES if isinstance(model, FluidModel) else EOS_PROPERTIES
+    unknown = [name for name in properties if name != 'v' and name not in available]
+    if unknown:
+        raise ValueError(f'Unknown properties {unknown}, expected any of {("v",) + available}')
+
+    v = model.v(P, T)
+    result = {'v': v}
+    if any(name != 'v' for name in properties):
+        if isinstance(model, FluidModel) and any(name in IDEAL_GAS_PROPERTIES for name in properties):
+            props = model.properties(T, v)
+        else:
+            props = (model.eos if isinstance(model, FluidModel) else model).residual_properties(T, v)
+        result.update(props._asdict())
+    return {name: np.asarray(result[name], dtype=float) for name in properties}
+
+
+def run(input_path: str, output_path: str, model: Union[FluidModel, HelmholtzEOS],
+        properties: Sequence[str] = ('v', 'z', 'h_res', 's_res'),
+        P_column: str = 'P', T_column: str = 'T', P_scale: float = 1.0, T_offset: float = 0.0,
+        chunk_size: int = 100_000, prefetch_depth: int = 2, validate: bool = True,
+        progress: Optional[callable] = None) -> StreamStats:
+    """
+    Evaluate properties for every row of a CSV or Parquet file, and
+    write them with the input columns to a CSV or Parquet file.
+
+    Args:
+        input_path: Input file, with pressure and temperature columns
+        output_path: Output file
+        model: Fluid model or equation of state (see :func:`evaluate`)
+        properties: Names of the properties to evaluate
+        P_column: Name of the pressure column
+        T_column: Name of the temperature column
+        P_scale: Factor converting the pressure column to Pa
+        T_offset: Offset converting the temperature column to K
+        chunk_size: Number of rows per chunk
+        prefetch_depth: Number of chunks read ahead of the computation
+        validate: If False, argument validation is skipped (see
+            :func:`pytherm.util.skip_validation`)
+        progress: Optional function called with the running
+            :class:`StreamStats` after each chunk
+
+    Returns:
+        Row count, chunk count and elapsed time
+    """
+    start = time.perf_counter()
+    rows = n_chunks = 0
+    writer = chunk_writer(output_path)
+    try:
+        for chunk in prefetch(read_chunks(input_path, chunk_size), prefetch_depth):
+            P = np.asarray(chunk[P_column], dtype=float) * P_scale
+            T = np.asarray(chunk[T_column], dtype=float) + T_offset
+            if validate:
+                result = evaluate(model, P, T, properties)
+            else:
+                with skip_validation():
+                    result = evaluate(model, P, T, properties)
+            chunk.update(result)
+            writer.write(chunk)
+
+            rows += P.size
+            n_chunks += 1
+            if progress is not None:
+                progress(StreamStats(rows, n_chunks, time.perf_counter() - start))
+    finally:
+        writer.close()
+    return StreamStats(rows, n_chunks, time.perf_counter() - start)
+
+
+def main(argv: Optional[Sequence[str]] = None):
+    parser = argparse.ArgumentParser(
+        prog='python -m pytherm.stream',
+        description='Evaluate fluid properties for every row of a CSV or Parquet file.')
+    parser.add_argument('input', help='input file (.csv, .parquet or .pq)')
+    parser.add_argument('output', help='output file (.csv, .parquet or .pq)')
+    parser.add_argument('--substance', required=True, help='GKKR substance name, e.g. Water')
+    parser.add_argument('--properties', nargs='+', default=['v', 'z', 'h_res', 's_res'],
+                        choices=('v',) + MODEL_PROPERTIES, metavar='NAME',
+                        help=f'properties to evaluate, any of: {", ".join(("v",) + MODEL_PROPERTIES)}')
+    parser.add_argument('--P-column', default='P', help='pressure column name (default: P)')
+    parser.add_argument('--T-column', default='T', help='temperature column name (default: T)')
+    parser.add_argument('--P-scale', type=float, default=1.0, help='factor converting pressure to Pa')
+    parser.add_argument('--T-offset', type=float, default=0.0, help='offset converting temperature to K')
+    parser.add_argument('--chunk-size', type=int, default=100_000, help='rows per chunk')
+    parser.add_argument('--no-validate', action='store_true', help='skip argument validation')
+    parser.add_argument('--quiet', action='store_true', help='do not report progress')
+    args = parser.parse_args(argv)
+
+    def report(stats: StreamStats):
+        print(f'{stats.rows} rows in {stats.chunks} chunks, {stats.seconds:.2f} s, '
+              f'{stats.rows_per_second:,.0f} rows/s', file=sys.stderr)
+
+    stats = run(args.input, args.output, FluidModel.from_gkkr(args.substance), args.properties,
+                P_column=args.P_column, T_column=args.T_column, P_scale=args.P_scale,
+                T_offset=args.T_offset, chunk_size=args.chunk_size, validate=not args.no_validate,
+                progress=None if args.quiet else report)
+    report(stats)
+    return stats
+
+
+if __name__ == '__main__':
+    main()
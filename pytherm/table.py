@@ -0,0 +1,395 @@
+"""
+Property tables of pure fluids on pressure-temperature grids, in the
+manner of steam tables.
+
+Each node of the grid is labelled liquid, vapor or supercritical from
+the saturation pressure of the equation of state at its temperature (see
+:func:`pytherm.envelope.saturation_pressure`), and its volume is the
+root of the EOS for that phase, so that compressed liquid nodes get the
+liquid volume even where a (metastable) vapor root exists too. Cells of
+the grid that the saturation curve passes through are flagged as
+two-phase.
+
+Rows of the grid (one pressure each) are evaluated in blocks, one
+vectorized call per block, spread over a pool of worker processes. The
+blocks are written to the output file in order as they complete, with
+only a few in flight at a time, so the table never has to fit in memory.
+Tables are written to NumPy ``.npz`` archives, or to HDF5 files (``.h5``
+or ``.hdf5``) with the optional ``h5py`` package. Both hold the axes
+``P`` [Pa] and ``T`` [K], the saturation pressure ``Psat`` [Pa] at each
+temperature (NaN above the critical temperature), the ``phase`` of each
+node (:data:`LIQUID`, :data:`VAPOR` or :data:`SUPERCRITICAL`), the
+``two_phase`` flag of each cell and one array per property, all indexed
+``[i_P, i_T]``. The properties that need the ideal gas heat capacity
+('cv', 'cp' and 'w') are NaN at temperatures outside the range of its
+correlation; the others come from the EOS alone.
+
+Usage::
+
+    python -m pytherm.table Water water.npz --P 0.01 1000 200 --P-log --P-scale 1e5 \\
+        --T 0.01 800 321 --T-offset 273.15 --properties v h_res s_res cp
+"""
+import argparse
+import os
+import shutil
+import sys
+import tempfile
+import time
+import zipfile
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from typing import Dict, Iterable, Iterator, NamedTuple, Optional, Sequence, Tuple, Union
+import numpy as np
+from .eos import CubicEOS
+from .envelope import phase_envelope, saturation_pressure
+from .model import FluidModel
+from .stream import IDEAL_GAS_PROPERTIES, MODEL_PROPERTIES
+from .util import args_must_be_positive, skip_validation
+
+
+LIQUID, VAPOR, SUPERCRITICAL = 0, 1, 2
+
+# Shape and dtype of each array of a table
+Layout = Dict[str, Tuple[Tuple[int, ...], type]]
+
+
+class TableStats(NamedTuple):
+    """
+    Summary of a table run.
+    """
+    nodes: int
+    chunks: int
+    seconds: float
+
+    @property
+    def nodes_per_second(self) -> float:
+        return self.nodes / self.seconds if self.seconds > 0 else float('nan')
+
+
+def _import_h5py():
+    try:
+        import h5py
+    except ImportError:
+        raise ImportError('HDF5 support requires the h5py package') from None
+    return h5py
+
+
+def _file_format(path: str) -> str:
+    extension = os.path.splitext(path)[1].lower()
+    if extension == '.npz':
+        return 'npz'
+    if extension in ('.h5', '.hdf5'):
+        return 'hdf5'
+    raise ValueError(f'Unsupported file type {extension!r}, expected .npz, .h5 or .hdf5')
+
+
+def node_phases(P: np.ndarray, T: np.ndarray, Psat: np.ndarray, T_crit: float) -> np.ndarray:
+    """
+    Phase of each node of a grid.
+
+    Args:
+        P: Pressure axis [Pa]
+        T: Temperature axis [K]
+        Psat: Saturation pressure at each temperature [Pa]
+        T_crit: Critical temperature [K]
+
+    Returns:
+        :data:`LIQUID`, :data:`VAPOR` or :data:`SUPERCRITICAL` (at and
+        above the critical temperature) at each node, indexed
+        ``[i_P, i_T]``
+    """
+    phase = np.where(np.asarray(P)[:, None] > Psat, LIQUID, VAPOR).astype(np.int8)
+    phase[:, np.asarray(T) >= T_crit] = SUPERCRITICAL
+    return phase
+
+
+def two_phase_cells(P: np.ndarray, T: np.ndarray, Psat: np.ndarray, T_crit: float, P_crit: float) -> np.ndarray:
+    """
+    Flag the cells of a grid that the saturation curve passes through.
+    Since the saturation pressure increases with temperature up to the
+    critical point, a cell is crossed if the range of the saturation
+    pressure over its temperatures overlaps its pressures.
+
+    Args:
+        P: Increasing pressure axis [Pa]
+        T: Increasing temperature axis [K]
+        Psat: Saturation pressure at each temperature [Pa]
+        T_crit: Critical temperature [K]
+        P_crit: Critical pressure [Pa]
+
+    Returns:
+        Flag of each cell, indexed ``[i_P, i_T]`` by the node at its
+        lower pressure and temperature
+    """
+    P, T = np.asarray(P), np.asarray(T)
+    Psat_lo, Psat_hi = Psat[:-1], np.where(T[1:] >= T_crit, P_crit, Psat[1:])
+    return (T[:-1] < T_crit) & (Psat_lo <= P[1:, None]) & (Psat_hi >= P[:-1, None])
+
+
+def evaluate_nodes(model: FluidModel, P: np.ndarray, T: np.ndarray, phase: np.ndarray,
+                   properties: Sequence[str]) -> Dict[str, np.ndarray]:
+    """
+    Evaluate properties at the nodes of a grid, with the volume root of
+    the phase of each node.
+
+    Args:
+        model: Fluid model
+        P: Pressure axis [Pa]
+        T: Temperature axis [K]
+        phase: Phase of each node, from :func:`node_phases`
+        properties: Names of the properties to evaluate: 'v' and the
+            fields of :class:`pytherm.model.FluidProperties`
+
+    Returns:
+        Dict of property name to array, indexed ``[i_P, i_T]``. 'cv',
+        'cp' and 'w' are NaN outside the temperature range of the ideal
+        gas heat capacity correlation.
+    """
+    P, T = np.meshgrid(P, T, indexing='ij')
+    if isinstance(model.eos, CubicEOS):
+        v_liq, v_vap = model.eos.v_roots(P, T)
+        v = np.where(phase == LIQUID, v_liq, v_vap)
+    else:
+        v = model.v(P, T)
+    result = {'v': v}
+    if any(name in IDEAL_GAS_PROPERTIES for name in properties):
+        T_min, T_max = model.ideal_gas_T_range
+        inside = (T >= T_min) & (T <= T_max)
+        if inside.all():
+            result.update(model.properties(T, v)._asdict())
+        else:
+            result.update(model.eos.residual_properties(T, v)._asdict())
+            props = model.properties(T[inside], v[inside])
+            for name in IDEAL_GAS_PROPERTIES:
+                result[name] = np.full(T.shape, np.nan)
+                result[name][inside] = getattr(props, name)
+    elif any(name != 'v' for name in properties):
+        result.update(model.eos.residual_properties(T, v)._asdict())
+    return {name: np.asarray(result[name], dtype=float) for name in properties}
+
+
+class NpzTableWriter:
+    """
+    Write a table to a NumPy ``.npz`` archive. Arrays are filled block
+    by block in memory-mapped ``.npy`` files in a temporary directory
+    next to the output, and packed into the archive by :meth:`close`.
+    """
+    def __init__(self, path: str, layout: Layout, compress: bool = False):
+        self._path, self._compress = path, compress
+        self._dir = tempfile.mkdtemp(prefix='.pytherm-table-', dir=os.path.dirname(os.path.abspath(path)))
+        self._arrays = {name: np.lib.format.open_memmap(os.path.join(self._dir, f'{name}.npy'), mode='w+',
+                                                        dtype=dtype, shape=shape)
+                        for name, (shape, dtype) in layout.items()}
+
+    def write(self, name: str, start: int, values: np.ndarray):
+        self._arrays[name][start:start + len(values)] = values
+
+    def close(self):
+        try:
+            for array in self._arrays.values():
+                array.flush()
+            names = list(self._arrays)
+            self._arrays.clear()
+            compression = zipfile.ZIP_DEFLATED if self._compress else zipfile.ZIP_STORED
+            with zipfile.ZipFile(self._path, 'w', compression, allowZip64=True) as archive:
+                for name in names:
+                    archive.write(os.path.join(self._dir, f'{name}.npy'), f'{name}.npy')
+        finally:
+            shutil.rmtree(self._dir, ignore_errors=True)
+
+    def abort(self):
+        self._arrays.clear()
+        shutil.rmtree(self._dir, ignore_errors=True)
+
+
+class HDF5TableWriter:
+    """
+    Write a table to an HDF5 file, with one dataset per array, chunked
+    by blocks of rows.
+    """
+    def __init__(self, path: str, layout: Layout, compress: bool = False, chunk_rows: int = 1):
+        h5py = _import_h5py()
+        self._path = path
+        self._file = h5py.File(path, 'w')
+        for name, (shape, dtype) in layout.items():
+            chunks = (max(1, min(chunk_rows, shape[0])),) + shape[1:] if len(shape) > 1 and all(shape) else None
+            self._file.create_dataset(name, shape=shape, dtype=dtype, chunks=chunks,
+                                      compression='gzip' if compress else None)
+
+    def write(self, name: str, start: int, values: np.ndarray):
+        self._file[name][start:start + len(values)] = values
+
+    def close(self):
+        self._file.close()
+
+    def abort(self):
+        self._file.close()
+        os.remove(self._path)
+
+
+def table_writer(path: str, layout: Layout, compress: bool = False,
+                 chunk_rows: int = 1) -> Union[NpzTableWriter, HDF5TableWriter]:
+    """
+    Open an npz or HDF5 table writer, chosen by the file extension.
+    """
+    if _file_format(path) == 'npz':
+        return NpzTableWriter(path, layout, compress)
+    return HDF5TableWriter(path, layout, compress, chunk_rows)
+
+
+# State of each worker process, set once by the pool initializer
+_worker = {}
+
+
+def _init_worker(model: FluidModel, properties: Sequence[str], validate: bool):
+    _worker.update(model=model, properties=properties, validate=validate)
+
+
+def _evaluate_block(P: np.ndarray, T: np.ndarray, phase: np.ndarray) -> Dict[str, np.ndarray]:
+    if _worker['validate']:
+        return evaluate_nodes(_worker['model'], P, T, phase, _worker['properties'])
+    with skip_validation():
+        return evaluate_nodes(_worker['model'], P, T, phase, _worker['properties'])
+
+
+def _evaluate_blocks(tasks: Iterable[Tuple[np.ndarray, np.ndarray, np.ndarray]], workers: int,
+                     initargs: tuple) -> Iterator[Dict[str, np.ndarray]]:
+    """
+    Evaluate blocks in order, in a pool of `workers` processes with at
+    most two blocks per worker in flight, or in this process if
+    `workers` is 1.
+    """
+    if workers == 1:
+        _init_worker(*initargs)
+        for task in tasks:
+            yield _evaluate_block(*task)
+        return
+
+    with ProcessPoolExecutor(workers, initializer=_init_worker, initargs=initargs) as pool:
+        pending = deque()
+        for task in tasks:
+            if len(pending) >= 2 * workers:
+                yield pending.popleft().result()
+            pending.append(pool.submit(_evaluate_block, *task))
+        while pending:
+            yield pending.popleft().result()
+
+
+@args_must_be_positive('P', 'T')
+def generate(model: FluidModel, path: str, P: np.ndarray, T: np.ndarray,
+             properties: Sequence[str] = ('v', 'h_res', 's_res', 'cp'), workers: Optional[int] = None,
+             chunk_rows: Optional[int] = None, compress: bool = False, validate: bool = True,
+             progress: Optional[callable] = None) -> TableStats:
+    """
+    Evaluate properties at every node of a pressure-temperature grid,
+    and write them to an npz or HDF5 file (see the module docstring).
+
+    Args:
+        model: Fluid model, with an EOS that has a van der Waals loop
+            below its critical temperature
+        path: Output file (.npz, .h5 or .hdf5)
+        P: Strictly increasing pressure axis [Pa]
+        T: Strictly increasing temperature axis [K]
+        properties: Names of the properties to evaluate: 'v' and the
+            fields of :class:`pytherm.model.FluidProperties`
+        workers: Number of worker processes. Defaults to the number of
+            CPUs; 1 evaluates in this process.
+        chunk_rows: Number of grid rows (pressures) per block. Defaults
+            to about 100,000 nodes per block.
+        compress: If True, compress the arrays (deflate or gzip)
+        validate: If False, argument validation is skipped in the
+            property evaluation (see :func:`pytherm.util.skip_validation`)
+        progress: Optional function called with the running
+            :class:`TableStats` after each block
+
+    Returns:
+        Node count, block count and elapsed time
+
+    Raises:
+        ValueError: If an axis is not strictly increasing, a property is
+            unknown or the file type is not supported
+    """
+    start = time.perf_counter()
+    P, T = np.asarray(P, dtype=float), np.asarray(T, dtype=float)
+    for name, axis in (('P', P), ('T', T)):
+        if axis.ndim != 1 or not len(axis) or np.any(np.diff(axis) <= 0):
+            raise ValueError(f'{name} must be a non-empty, strictly increasing 1-D array')
+    unknown = [name for name in properties if name != 'v' and name not in MODEL_PROPERTIES]
+    if unknown:
+        raise ValueError(f'Unknown properties {unknown}, expected any of {("v",) + MODEL_PROPERTIES}')
+    workers = (os.cpu_count() or 1) if workers is None else workers
+    chunk_rows = max(1, 100_000 // len(T)) if chunk_rows is None else chunk_rows
+
+    envelope = phase_envelope(model.eos, T_start=min(T[0], 0.5 * model.eos._T_red))
+    Psat = saturation_pressure(model.eos, T, envelope)
+    T_crit, P_crit = envelope.critical.T, envelope.critical.P
+
+    shape = (len(P), len(T))
+    layout = {'P': (P.shape, float), 'T': (T.shape, float), 'Psat': (T.shape, float), 'phase': (shape, np.int8),
+              'two_phase': ((len(P) - 1, len(T) - 1), bool)}
+    layout.update((name, (shape, float)) for name in properties)
+    blocks = [slice(row, min(row + chunk_rows, len(P))) for row in range(0, len(P), chunk_rows)]
+    tasks = ((P[rows], T, node_phases(P[rows], T, Psat, T_crit)) for rows in blocks)
+
+    writer = table_writer(path, layout, compress, chunk_rows)
+    try:
+        for name, values in (('P', P), ('T', T), ('Psat', Psat)):
+            writer.write(name, 0, values)
+        results = _evaluate_blocks(tasks, workers, (model, tuple(properties), validate))
+        for n_chunks, (rows, result) in enumerate(zip(blocks, results), 1):
+            writer.write('phase', rows.start, node_phases(P[rows], T, Psat, T_crit))
+            # Cells between this block's rows and the first row of the next
+            writer.write('two_phase', rows.start, two_phase_cells(P[rows.start:rows.stop + 1], T, Psat,
+                                                                   T_crit, P_crit))
+            for name, values in result.items():
+                writer.write(name, rows.start, values)
+            if progress is not None:
+                progress(TableStats(rows.stop * len(T), n_chunks, time.perf_counter() - start))
+    except BaseException:
+        writer.abort()
+        raise
+    writer.close()
+    return TableStats(P.size * T.size, len(blocks), time.perf_counter() - start)
+
+
+def main(argv: Optional[Sequence[str]] = None):
+    parser = argparse.ArgumentParser(
+        prog='python -m pytherm.table',
+        description='Generate a pressure-temperature property table of a fluid.')
+    parser.add_argument('substance', help='GKKR substance name, e.g. Water')
+    parser.add_argument('output', help='output file (.npz, .h5 or .hdf5)')
+    parser.add_argument('--P', nargs=3, type=float, required=True, metavar=('MIN', 'MAX', 'N'),
+                        help='pressure range and number of points')
+    parser.add_argument('--T', nargs=3, type=float, required=True, metavar=('MIN', 'MAX', 'N'),
+                        help='temperature range and number of points')
+    parser.add_argument('--P-log', action='store_true', help='space pressures logarithmically')
+    parser.add_argument('--P-scale', type=float, default=1.0, help='factor converting pressure to Pa')
+    parser.add_argument('--T-offset', type=float, default=0.0, help='offset converting temperature to K')
+    parser.add_argument('--properties', nargs='+', default=['v', 'h_res', 's_res', 'cp'],
+                        choices=('v',) + MODEL_PROPERTIES, metavar='NAME',
+                        help=f'properties to evaluate, any of: {", ".join(("v",) + MODEL_PROPERTIES)}')
+    parser.add_argument('--workers', type=int, default=None, help='worker processes (default: CPU count)')
+    parser.add_argument('--chunk-rows', type=int, default=None, help='pressures per block')
+    parser.add_argument('--compress', action='store_true', help='compress the arrays')
+    parser.add_argument('--no-validate', action='store_true', help='skip argument validation')
+    parser.add_argument('--quiet', action='store_true', help='do not report progress')
+    args = parser.parse_args(argv)
+
+    P_min, P_max, n_P = args.P
+    T_min, T_max, n_T = args.T
+    P = (np.geomspace if args.P_log else np.linspace)(P_min, P_max, int(n_P)) * args.P_scale
+    T = np.linspace(T_min, T_max, int(n_T)) + args.T_offset
+
+    def report(stats: TableStats):
+        print(f'{stats.nodes} nodes in {stats.chunks} blocks, {stats.seconds:.2f} s, '
+              f'{stats.nodes_per_second:,.0f} nodes/s', file=sys.stderr)
+
+    stats = generate(FluidModel.from_gkkr(args.substance), args.output, P, T, args.properties,
+                     workers=args.workers, chunk_rows=args.chunk_rows, compress=args.compress,
+                     validate=not args.no_validate, progress=None if args.quiet else report)
+    report(stats)
+    return stats
+
+
+if __name__ == '__main__':
+    main()
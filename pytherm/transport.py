@@ -0,0 +1,243 @@
+"""
+Transport properties of pure fluids: viscosity, thermal conductivity and
+surface tension.
+
+The viscosity and thermal conductivity of the dilute gas come from
+temperature correlations (the GKKR ideal vapor correlations, for
+:meth:`TransportModel.from_gkkr`), and are corrected for density with
+the method of Chung et al. (Ind. Eng. Chem. Res. 27, 671, 1988), at the
+molar volume of each state:
+
+.. math::
+    η = η_\\text{id} \\left(\\frac{1}{G_2} + E_6 y\\right)
+        + η_c E_7 y^2 G_2 \\text{exp}\\left(E_8 + \\frac{E_9}{T^*} + \\frac{E_{10}}{T^{*2}}\\right)
+
+    λ = λ_\\text{id} \\left(\\frac{1}{H_2} + B_6 y\\right) + q B_7 y^2 T_r^{1/2} H_2
+
+    y = \\frac{v_c}{6v}, \\quad T^* = 1.2593 T_r
+
+where :math:`G_2` and :math:`H_2` are functions of :math:`y`, and the
+coefficients :math:`E_i` and :math:`B_i` of the acentric factor,
+reduced dipole moment and association factor. Chung et al. estimate the
+dilute gas properties from the critical constants as well; using the
+correlations in their place makes the corrections vanish at low density,
+where the correlations are more accurate. The same correction applies to
+gas, supercritical and compressed liquid states, but is only accurate to
+10-20 % for liquids.
+"""
+from typing import NamedTuple, Optional
+import numpy as np
+from .data import load_gkkr_substance
+from .eos import CubicEOS, PurePREOS
+from .model import FluidModel
+from .prop import TDepCorrelation, corr_from_record
+from .util import args_must_be_positive
+
+
+class TransportProperties(NamedTuple):
+    """
+    Transport properties of a fluid at a state.
+    """
+    # Viscosity [Pa s]
+    mu: float
+    # Thermal conductivity [W/m/K]
+    k: float
+    # Surface tension [N/m], NaN outside the range of its correlation
+    sigma: float
+
+
+# Coefficients (a, b, c, d) of E_i = a + bω + cμ_r^4 + dκ, i = 1 ... 10
+_CHUNG_VISCOSITY = np.array([
+    [6.324, 50.412, -51.680, 1189.0],
+    [1.210e-3, -1.154e-3, -6.257e-3, 0.03728],
+    [5.283, 254.209, -168.48, 3898.0],
+    [6.623, 38.096, -8.464, 31.42],
+    [19.745, 7.630, -14.354, 31.53],
+    [-1.900, -12.537, 4.985, -18.15],
+    [24.275, 3.450, -11.291, 69.35],
+    [0.7972, 1.117, 0.01235, -4.117],
+    [-0.2382, 0.06770, -0.8163, 4.025],
+    [0.06863, 0.3479, 0.5926, -0.727],
+])
+
+# Coefficients (a, b, c, d) of B_i = a + bω + cμ_r^4 + dκ, i = 1 ... 7
+_CHUNG_CONDUCTIVITY = np.array([
+    [2.4166, 7.4824e-1, -9.1858e-1, 1.2172e2],
+    [-5.0924e-1, -1.5094, -4.9991e1, 6.9983e1],
+    [6.6107, 5.6207, 6.4760e1, 2.7039e1],
+    [1.4543e1, -8.9139, -5.6379, 7.4344e1],
+    [7.9274e-1, 8.2019e-1, -6.9369e-1, 6.3173],
+    [-5.8634, 1.2801e1, 9.5893, 6.5529e1],
+    [9.1089e1, 1.2811e2, -5.4217e1, 5.2381e2],
+])
+
+
+def _chung_G2(coeffs: np.ndarray, y: np.ndarray) -> np.ndarray:
+    """
+    Chung's :math:`G_2(y)` for the coefficients :math:`E_1 ... E_5`
+    (viscosity) or :math:`B_1 ... B_5` (thermal conductivity).
+    """
+    c1, c2, c3, c4, c5 = coeffs[:5]
+    G1 = (1 - 0.5 * y) / (1 - y) ** 3
+    return (-c1 * np.expm1(-c4 * y) / y + (c2 * np.exp(c5 * y) + c3) * G1) / (c1 * c4 + c2 + c3)
+
+
+class TransportModel:
+    def __init__(self, fluid: FluidModel, mu_ideal: TDepCorrelation, k_ideal: TDepCorrelation,
+                 Tc: float, vc: float, omega: float, M: float,
+                 sigma: Optional[TDepCorrelation] = None, dipole_moment: float = 0.0, association: float = 0.0):
+        """
+        Args:
+            fluid: Model of the fluid, for the volume at a pressure and
+                temperature.
+            mu_ideal: Dilute (ideal) gas viscosity [Pa s].
+            k_ideal: Dilute (ideal) gas thermal conductivity [W/m/K].
+            Tc: Critical temperature [K]
+            vc: Critical molar volume [m^3/mol]
+            omega: Acentric factor [dimensionless]
+            M: Molar mass [kg/mol]
+            sigma: Surface tension [N/m].
+            dipole_moment: Dipole moment [debye], for Chung's polar
+                correction.
+            association: Chung's association factor :math:`κ`
+                [dimensionless], e.g. 0.076 for water.
+        """
+        self.fluid = fluid
+        self.mu_ideal, self.k_ideal, self.sigma = mu_ideal, k_ideal, sigma
+        self.Tc, self.vc = Tc, vc
+
+        # Chung's correlations use cm^3/mol and g/mol
+        vc_cm3 = vc * 1e6
+        mu_r = 131.3 * dipole_moment / np.sqrt(vc_cm3 * Tc)
+        factors = np.array([1.0, omega, mu_r ** 4, association])
+        self._E = _CHUNG_VISCOSITY @ factors
+        self._B = _CHUNG_CONDUCTIVITY @ factors
+        # Viscosity scale [Pa s], and q [W/m/K]
+        self._mu_c = 36.344e-7 * np.sqrt(M * 1000 * Tc) / vc_cm3 ** (2 / 3)
+        self._q = 3.586e-3 * np.sqrt(Tc / M) / vc_cm3 ** (2 / 3)
+
+    @classmethod
+    def from_gkkr(cls, name: str, eos_class=PurePREOS, **kwargs) -> 'TransportModel':
+        """
+        Create a transport model of a pure fluid from the GKKR data,
+        with its ideal vapor viscosity and thermal conductivity and
+        surface tension correlations, and the fluid model of
+        :meth:`pytherm.model.FluidModel.from_gkkr`.
+
+        Args:
+            name: Substance name, e.g. 'Methane'
+            eos_class: Cubic equation of state taking ``Pc``, ``Tc``
+                and ``omega``.
+            **kwargs: Passed to the constructor, e.g. ``dipole_moment``
+
+        Returns:
+            The transport model
+        """
+        substance = load_gkkr_substance(name)
+        Tc = substance['Tc']
+
+        def correlation(prop):
+            return corr_from_record(substance['Correlations'][prop][0], Tc=Tc)
+
+        return cls(FluidModel.from_gkkr(name, eos_class), mu_ideal=correlation('Ideal Vapor Viscosity'),
+                   k_ideal=correlation('Vapor Thermal Conductivity'), Tc=Tc, vc=substance['vc'] * 1e-6,
+                   omega=substance['omega'], M=substance['M'] / 1000, sigma=correlation('Surface Tension'),
+                   **kwargs)
+
+    @args_must_be_positive('T', 'v')
+    def mu(self, T, v):
+        """
+        Args:
+            T: Temperature [K]
+            v: Specific volume [m^3/mol]
+
+        Returns:
+            Viscosity [Pa s]
+        """
+        return self._mu(T, self.vc / (6 * np.asarray(v)))
+
+    @args_must_be_positive('T', 'v')
+    def k(self, T, v):
+        """
+        Args:
+            T: Temperature [K]
+            v: Specific volume [m^3/mol]
+
+        Returns:
+            Thermal conductivity [W/m/K]
+        """
+        return self._k(T, self.vc / (6 * np.asarray(v)))
+
+    def surface_tension(self, T):
+        """
+        Args:
+            T: Temperature [K]
+
+        Returns:
+            Surface tension [N/m]
+        """
+        if self.sigma is None:
+            raise ValueError('TransportModel has no surface tension correlation')
+        return self.sigma(T)
+
+    @args_must_be_positive('T', 'v')
+    def properties(self, T, v) -> TransportProperties:
+        """
+        Calculate the viscosity, thermal conductivity and surface
+        tension at arrays of states at once.
+
+        Args:
+            T: Temperature [K]
+            v: Specific Volume [m^3/mol]
+
+        Returns:
+            Viscosity [Pa s], thermal conductivity [W/m/K] and surface
+            tension [N/m], which is NaN where the temperature is outside
+            the range of its correlation (e.g. above the critical
+            temperature) or if the model has none.
+        """
+        T, v = np.broadcast_arrays(np.asarray(T, dtype=float), np.asarray(v, dtype=float))
+        y = self.vc / (6 * v)
+        sigma = np.full(T.shape, np.nan)
+        if self.sigma is not None:
+            inside = (T >= self.sigma.T_min) & (T <= self.sigma.T_max)
+            sigma[inside] = self.sigma(T[inside])
+        return TransportProperties(mu=self._mu(T, y)[()], k=self._k(T, y)[()], sigma=sigma[()])
+
+    @args_must_be_positive('P', 'T')
+    def properties_PT(self, P, T) -> TransportProperties:
+        """
+        :meth:`properties` at a pressure and temperature, e.g. at the
+        nodes of a pipeline. Where a cubic EOS has both a liquid and a
+        vapor root, the stable one (with the lower fugacity) is used, so
+        compressed liquid gets the liquid volume.
+
+        Args:
+            P: Pressure [Pa]
+            T: Temperature [K]
+
+        Returns:
+            Viscosity [Pa s], thermal conductivity [W/m/K] and surface
+            tension [N/m]
+        """
+        return self.properties(T, self._stable_v(P, T))
+
+    def _stable_v(self, P, T):
+        eos = self.fluid.eos
+        if not isinstance(eos, CubicEOS):
+            return self.fluid.v(P, T)
+        v_liq, v_vap = eos.v_roots(P, T)
+        # The stable phase has the lower Gibbs energy, i.e. fugacity
+        liquid = eos.residual_properties(T, v_liq).ln_phi < eos.residual_properties(T, v_vap).ln_phi
+        return np.where(liquid, v_liq, v_vap)[()]
+
+    def _mu(self, T, y):
+        E, T_star = self._E, 1.2593 * np.asarray(T) / self.Tc
+        G2 = _chung_G2(E, y)
+        dense = self._mu_c * E[6] * y ** 2 * G2 * np.exp(E[7] + E[8] / T_star + E[9] / T_star ** 2)
+        return self.mu_ideal(T) * (1 / G2 + E[5] * y) + dense
+
+    def _k(self, T, y):
+        B, Tr = self._B, np.asarray(T) / self.Tc
+        H2 = _chung_G2(B, y)
+        return self.k_ideal(T) * (1 / H2 + B[5] * y) + self._q * B[6] * y ** 2 * np.sqrt(Tr) * H2
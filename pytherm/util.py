@@ -1,18 +1,149 @@
-from typing import Optional, Callable
+"""
+Argument validation for the public API.
+
+Validation is on by default. Setting the environment variable
+``PYTHERM_SKIP_VALIDATION`` (to anything but an empty string) before
+pytherm is imported makes the decorators below return the functions
+they decorate unchanged, so that trusted production code pays no
+overhead at all. Within a process, :func:`skip_validation` turns the
+checks off for a block of code instead.
+"""
+from contextlib import contextmanager
+from contextvars import ContextVar
+import functools
 import inspect
+import os
+from typing import Optional, Tuple, Union
+import numpy as np
+from .ad import Jet
+
+
+SKIP_VALIDATION_ENV_VAR = 'PYTHERM_SKIP_VALIDATION'
+
+_skip_at_import = bool(os.environ.get(SKIP_VALIDATION_ENV_VAR))
+_skip = ContextVar('pytherm_skip_validation', default=False)
+
+
+def validation_enabled() -> bool:
+    """
+    Whether arguments are currently being validated.
+    """
+    return not (_skip_at_import or _skip.get())
+
+
+@contextmanager
+def skip_validation():
+    """
+    Context manager that disables argument validation in the current
+    thread (or asyncio task) for the duration of the block.
+    """
+    token = _skip.set(True)
+    try:
+        yield
+    finally:
+        _skip.reset(token)
+
+
+Bound = Union[float, str, None]
+
+
+def check_bounds(name: str, value, lb: Optional[float] = None, ub: Optional[float] = None,
+                 strict: bool = False) -> None:
+    """
+    Raise a ValueError if any element of `value` is outside the bounds.
 
+    None values are skipped, and NaN elements pass, so that NaN can mark
+    missing values in arrays. Jets are checked on their values.
 
-def args_must_be_positive(*args_to_check: list[bool]):
-    def wrapper(func):
-        params = inspect.signature(func).parameters
-        if len(args_to_check) != len(params):
-            raise ValueError(f'Number of arguments passed to args_must_be_positive does not match signature of {func.__name__}')
+    Args:
+        name: Argument name, for the error message.
+        value: Float, array or jet to check.
+        lb: Lower bound, or None if unbounded below.
+        ub: Upper bound (inclusive), or None if unbounded above.
+        strict: If True, values equal to `lb` are rejected.
+    """
+    if value is None:
+        return
+    if isinstance(value, Jet):
+        value = value.val
+    if isinstance(value, float):
+        too_low = lb is not None and (value <= lb if strict else value < lb)
+        if too_low or (ub is not None and value > ub):
+            raise ValueError(_bounds_message(name, lb, ub, strict))
+        return
 
+    value = np.asarray(value, dtype=float)
+    if lb is not None:
+        bad = value <= lb if strict else value < lb
+        if ub is not None:
+            bad |= value > ub
+    elif ub is not None:
+        bad = value > ub
+    else:
+        return
+    if bad.any():
+        message = _bounds_message(name, lb, ub, strict)
+        if value.ndim == 0:
+            raise ValueError(message)
+        raise ValueError(f'{message} (rows {np.flatnonzero(bad)[:10].tolist()})')
+
+
+def _bounds_message(name: str, lb: Optional[float], ub: Optional[float], strict: bool) -> str:
+    if lb == 0 and strict and ub is None:
+        return f'{name} must have a positive value'
+    if ub is None:
+        return f'{name} must be {"greater than" if strict else "at least"} {lb}'
+    if lb is None:
+        return f'{name} must be at most {ub}'
+    return f'{name} must be between {lb} and {ub}'
+
+
+def args_in_bounds(strict: bool = False, **bounds: Tuple[Bound, Bound]):
+    """
+    Decorator checking that the named arguments of a function are within
+    bounds, e.g. ``@args_in_bounds(T=('T_min', 'T_max'))``.
+
+    Parameter positions are looked up once, when the function is
+    decorated. Bounds given as strings are read from the attributes of
+    the first argument (``self``) at call time.
+
+    Args:
+        strict: If True, lower bounds are exclusive.
+        **bounds: Lower and upper bound for each parameter to check.
+            Either may be None.
+    """
+    def decorator(func):
+        if _skip_at_import:
+            return func
+
+        params = list(inspect.signature(func).parameters)
+        for name in bounds:
+            if name not in params:
+                raise ValueError(f'{func.__name__} has no parameter {name}')
+        checks = [(name, params.index(name), lb, ub) for name, (lb, ub) in bounds.items()]
+
+        @functools.wraps(func)
         def wrapped(*args, **kwargs):
-            for bounds, arg in zip(args_to_check, args + list(kwargs.values())):
-                if bounds is not None:
-                    lb, ub = bounds
-                    if lb is not None and
+            if not _skip.get():
+                for name, index, lb, ub in checks:
+                    value = args[index] if index < len(args) else kwargs.get(name)
+                    if isinstance(lb, str):
+                        lb = getattr(args[0], lb)
+                    if isinstance(ub, str):
+                        ub = getattr(args[0], ub)
+                    check_bounds(name, value, lb, ub, strict)
             return func(*args, **kwargs)
         return wrapped
-    return wrapper
+    return decorator
+
+
+def args_must_be_positive(*names: str):
+    """
+    Decorator checking that the named arguments of a function are
+    positive, e.g. ``@args_must_be_positive('T', 'v')``. See
+    :func:`args_in_bounds`.
+
+    Args:
+        *names: Names of the parameters to check.
+    """
+    return args_in_bounds(strict=True, **{name: (0.0, None) for name in names})
@@ -0,0 +1,180 @@
+"""
+Compact serialization of models, for shipping them to worker processes.
+
+An object is encoded as a type tag and a vector of float parameters,
+followed by the encodings of the objects it is built from (e.g. the
+alpha function and volume shift of a cubic EOS, or the EOS and heat
+capacity correlation of a :class:`pytherm.model.FluidModel`), with no
+attribute names, module paths or derived quantities::
+
+    data = wire.dumps(model)    # or model.to_bytes()
+    model = wire.loads(data)
+
+Registered classes also pickle to the same bytes, so process pools and
+other pickle-based transports use the compact form without any change.
+An object built from parts that are not registered (e.g. a user-defined
+alpha function) pickles the ordinary way instead.
+
+The layout is one format version byte, then for each object a header
+of tag (uint8), number of parameters (uint32) and number of children
+(uint8), followed by the parameters as little-endian float64 and then
+each child. Tag 0 encodes None. Tags are fixed per class, so that
+different versions of pytherm can exchange the classes they share.
+"""
+import importlib
+import struct
+from typing import Dict, Optional, Sequence, Tuple, Type
+
+
+FORMAT_VERSION = 1
+
+_HEADER = struct.Struct('<BIB')
+_NONE = _HEADER.pack(0, 0, 0)
+
+_CLASSES: Dict[int, type] = {}
+_TAGS: Dict[type, int] = {}
+
+# Modules registering classes, imported when decoding meets a tag that is
+# not registered yet (e.g. in a worker that has only unpickled)
+_MODULES = ('.eos', '.prop', '.model')
+
+
+def register(tag: int):
+    """
+    Class decorator registering a :class:`Serializable` class under a
+    type tag, which must be unique and between 1 and 255.
+    """
+    def decorator(cls):
+        if not 0 < tag < 256 or tag in _CLASSES:
+            raise ValueError(f'Invalid or duplicate wire tag {tag} for {cls.__name__}')
+        _CLASSES[tag] = cls
+        _TAGS[cls] = tag
+        return cls
+    return decorator
+
+
+class Serializable:
+    """
+    Mixin for classes with a compact encoding. Registered subclasses
+    implement :meth:`_wire`, and :meth:`_from_wire` if they are not
+    constructed from their parameters and children in order.
+    """
+    def _wire(self) -> Tuple[Sequence[float], Sequence[Optional['Serializable']]]:
+        """
+        Returns:
+            Parameters of the object, and the objects it is built from
+            (each Serializable or None)
+        """
+        raise NotImplementedError
+
+    @classmethod
+    def _from_wire(cls, params: Tuple[float, ...], children: list):
+        return cls(*params, *children)
+
+    def to_bytes(self) -> bytes:
+        """
+        Returns:
+            Compact encoding of the object, see :func:`dumps`
+        """
+        return dumps(self)
+
+    @classmethod
+    def from_bytes(cls, data: bytes):
+        """
+        Args:
+            data: Encoding from :meth:`to_bytes` or :func:`dumps`
+
+        Returns:
+            The decoded object, which must be an instance of the class
+        """
+        obj = loads(data)
+        if not isinstance(obj, cls):
+            raise TypeError(f'Expected {cls.__name__}, got {type(obj).__name__}')
+        return obj
+
+    def __reduce_ex__(self, protocol):
+        try:
+            return loads, (dumps(self),)
+        except TypeError:
+            # Built from unregistered parts
+            return super().__reduce_ex__(protocol)
+
+    def __copy__(self):
+        # Shallow copies share the parts, as they do without the mixin
+        obj = object.__new__(type(self))
+        obj.__dict__.update(self.__dict__)
+        return obj
+
+
+def dumps(obj: Serializable) -> bytes:
+    """
+    Encode an object of a registered class.
+
+    Args:
+        obj: Object to encode
+
+    Returns:
+        The encoding
+
+    Raises:
+        TypeError: If the object, or any object it is built from, is not
+            of a registered class
+    """
+    parts = [bytes([FORMAT_VERSION])]
+    _encode(obj, parts)
+    return b''.join(parts)
+
+
+def loads(data: bytes):
+    """
+    Decode an object encoded by :func:`dumps`.
+
+    Args:
+        data: The encoding
+
+    Returns:
+        The object
+    """
+    data = memoryview(data)
+    if not len(data) or data[0] != FORMAT_VERSION:
+        raise ValueError('Not a pytherm wire encoding, or an unsupported version')
+    obj, end = _decode(data, 1)
+    if end != len(data):
+        raise ValueError(f'{len(data) - end} bytes of trailing data')
+    return obj
+
+
+def _encode(obj, parts: list):
+    if obj is None:
+        parts.append(_NONE)
+        return
+    try:
+        tag = _TAGS[type(obj)]
+    except KeyError:
+        raise TypeError(f'{type(obj).__name__} has no compact encoding') from None
+    params, children = obj._wire()
+    parts.append(_HEADER.pack(tag, len(params), len(children)))
+    parts.append(struct.pack(f'<{len(params)}d', *params))
+    for child in children:
+        _encode(child, parts)
+
+
+def _decode(data: memoryview, offset: int):
+    tag, n_params, n_children = _HEADER.unpack_from(data, offset)
+    offset += _HEADER.size
+    if tag == 0:
+        return None, offset
+    if tag not in _CLASSES:
+        for module in _MODULES:
+            importlib.import_module(module, __package__)
+    try:
+        cls: Type[Serializable] = _CLASSES[tag]
+    except KeyError:
+        raise ValueError(f'Unknown wire tag {tag}') from None
+    params = struct.unpack_from(f'<{n_params}d', data, offset)
+    offset += 8 * n_params
+    children = []
+    for _ in range(n_children):
+        child, offset = _decode(data, offset)
+        children.append(child)
+    return cls._from_wire(params, children), offset
@@ -0,0 +1,61 @@
+import pytest
+import numpy as np
+from pytherm import ad
+from pytherm.ad import Jet
+
+
+class TestJet:
+    @pytest.mark.parametrize('x, y', [(0.5, 2.0), (3.0, 0.25), (1.5, 1.5)])
+    def test_rational_function(self, x, y):
+        X, Y = Jet.seed(x, y)
+        f = (3.0 * X ** 2 * Y - X / Y + 2.0) / (1.0 + X * Y)
+        g = 1.0 + x * y
+        num = 3.0 * x ** 2 * y - x / y + 2.0
+        assert f.val == pytest.approx(num / g)
+        assert f.grad[0] == pytest.approx((6 * x * y - 1 / y) / g - num * y / g ** 2)
+        assert f.grad[1] == pytest.approx((3 * x ** 2 + x / y ** 2) / g - num * x / g ** 2)
+
+    @pytest.mark.parametrize('func, d1, d2', [
+        (ad.exp, np.exp, np.exp),
+        (ad.log, lambda x: 1 / x, lambda x: -1 / x ** 2),
+        (ad.log1p, lambda x: 1 / (1 + x), lambda x: -1 / (1 + x) ** 2),
+        (ad.sqrt, lambda x: 0.5 / np.sqrt(x), lambda x: -0.25 * x ** -1.5),
+        (ad.sinh, np.cosh, np.sinh),
+        (ad.cosh, np.sinh, np.cosh),
+        (ad.tanh, lambda x: 1 / np.cosh(x) ** 2, lambda x: -2 * np.tanh(x) / np.cosh(x) ** 2),
+        (lambda x: x ** 0.35, lambda x: 0.35 * x ** -0.65, lambda x: -0.2275 * x ** -1.65),
+        (lambda x: 2.0 ** x, lambda x: np.log(2) * 2 ** x, lambda x: np.log(2) ** 2 * 2 ** x),
+    ])
+    def test_elementary_functions(self, func, d1, d2):
+        x = np.linspace(0.2, 3.0, 7)
+        (X,) = Jet.seed(x)
+        f = func(X)
+        assert f.grad[:, 0] == pytest.approx(d1(x))
+        assert f.hess[:, 0, 0] == pytest.approx(d2(x))
+
+    def test_numpy_ufuncs_dispatch(self):
+        x = np.linspace(0.5, 2.0, 4)
+        (X,) = Jet.seed(x)
+        f = np.exp(X) * np.ones(4) + np.sinh(X) / np.arange(1.0, 5.0)
+        assert isinstance(f, Jet)
+        assert f.grad[:, 0] == pytest.approx(np.exp(x) + np.cosh(x) / np.arange(1.0, 5.0))
+
+    def test_mixed_second_derivative(self):
+        X, Y = Jet.seed(2.0, 3.0)
+        f = ad.exp(X * Y) / Y
+        # f = exp(xy) / y, ∂²f/∂x∂y = x exp(xy)
+        assert f.hess[0, 1] == pytest.approx(2.0 * np.exp(6.0))
+        assert f.hess[1, 0] == pytest.approx(f.hess[0, 1])
+
+    def test_first_order_only(self):
+        X, Y = Jet.seed(2.0, 3.0, order=1)
+        f = X * Y ** 2
+        assert f.hess is None
+        assert f.grad == pytest.approx([9.0, 12.0])
+
+    def test_broadcasts_scalar_variables_against_arrays(self):
+        X, Y = Jet.seed(2.0, 3.0)
+        f = X + np.arange(3.0)
+        assert f.val.shape == (3,)
+        assert f.grad.shape == (3, 2)
+        assert f.hess.shape == (3, 2, 2)
@@ -0,0 +1,106 @@
+import pytest
+import numpy as np
+from pytherm import eos
+from pytherm.consistency import EOS_CLASSES, check_eos, derivative, main, sample_states
+
+
+class BrokenPREOS(eos.PurePREOS):
+    """
+    Peng-Robinson EOS with a wrong temperature derivative, as a check
+    that the checker catches it.
+    """
+    def dP_dT_v(self, T, v):
+        return super().dP_dT_v(T, v) * (1.0 + 1e-4 * (T > 800.0))
+
+
+class TestDerivative:
+    @pytest.mark.parametrize('points, rel', [(3, 1e-6), (5, 1e-10)])
+    def test_accuracy(self, points, rel):
+        x = np.linspace(0.5, 3.0, 11)
+        assert derivative(np.sin, x, 1e-3, points) == pytest.approx(np.cos(x), rel=rel, abs=rel)
+
+    def test_invalid_stencil(self):
+        with pytest.raises(ValueError):
+            derivative(np.sin, 1.0, 1e-3, points=4)
+
+
+class TestSampleStates:
+    def test_domain(self):
+        pr = eos.PurePREOS(Pc=22064000.0, Tc=647.096, omega=0.3443)
+        T, v = sample_states(pr, 1000, (300.0, 2000.0))
+        assert np.all((T >= 300.0) & (T <= 2000.0))
+        assert np.all(v > pr._v_lower(T))
+        assert np.all(v <= eos.R * T / 1e3)
+
+    def test_seed(self):
+        pr = eos.PurePREOS(Pc=22064000.0, Tc=647.096, omega=0.3443)
+        assert np.array_equal(sample_states(pr, 10, (300.0, 600.0), seed=1)[1],
+                              sample_states(pr, 10, (300.0, 600.0), seed=1)[1])
+
+
+class TestCheckEOS:
+    @pytest.mark.parametrize('test_eos, T_range, P_range', [
+        (eos.PurePREOS(Pc=22064000.0, Tc=647.096, omega=0.3443), (300.0, 2000.0), (1e3, 1e9)),
+        (eos.PurePR78EOS(Pc=1.49e6, Tc=594.6, omega=0.575), (250.0, 2000.0), (1e3, 1e9)),
+        (eos.PureSRKEOS(Pc=4599000.0, Tc=190.56, omega=0.011), (90.0, 1000.0), (1e3, 1e9)),
+        (eos.PureRKEOS(Pc=4599000.0, Tc=190.56), (90.0, 1000.0), (1e3, 1e9)),
+        (eos.PureVdWEOS(Pc=4599000.0, Tc=190.56), (90.0, 1000.0), (1e3, 1e9)),
+        (eos.PurePREOS(Pc=22064000.0, Tc=647.096, omega=0.3443, shift=eos.ConstantShift(3e-6)),
+         (300.0, 2000.0), (1e3, 1e9)),
+        (eos.PurePREOS(Pc=22064000.0, Tc=647.096, omega=0.3443,
+                       alpha=eos.TwuAlpha(647.096, L=0.3569, M=0.8743, N=2.0)), (300.0, 2000.0), (1e3, 1e9)),
+        (eos.EOSVirial2ndOrder(eos.AbbottVirialCoefficient(22064000.0, 647.096, 0.3443)),
+         (300.0, 2000.0), (1e3, 1e7)),
+        (eos.EOSIdeal(), (100.0, 2000.0), (1e3, 1e9)),
+    ])
+    def test_implementations_are_consistent(self, test_eos, T_range, P_range):
+        report = check_eos(test_eos, T_range, n=2000, P_range=P_range)
+        assert report.passed, report.summary()
+
+    def test_helmholtz_checks_included(self):
+        report = check_eos(eos.PurePREOS(Pc=22064000.0, Tc=647.096, omega=0.3443), (300.0, 2000.0), n=100)
+        names = [check.name for check in report.checks]
+        assert 'alphar: alpha_dt' in names
+        assert 'integrate_du_dv_T' in names
+        assert all(check.n_points > 0 for check in report.checks)
+
+    def test_finds_error(self):
+        report = check_eos(BrokenPREOS(Pc=22064000.0, Tc=647.096, omega=0.3443), (300.0, 2000.0), n=2000)
+        assert not report.passed
+        # Checks that difference dP_dT_v fail too, but not the others
+        failure = report.failures[0]
+        assert failure.name == 'dP_dT_v'
+        assert 'dP_dv_T' not in [check.name for check in report.failures]
+        assert failure.max_error == pytest.approx(1e-4, rel=1e-3)
+        assert failure.T > 800.0
+        assert 0 < failure.n_failed < 2000
+        assert 'FAILED' in report.summary()
+
+    def test_failed_inversions_are_reported(self):
+        # A strongly temperature-dependent shift leaves isochores close to
+        # the co-volume undefined at lower temperatures
+        shifted = eos.PurePREOS(Pc=22064000.0, Tc=647.096, omega=0.3443,
+                                shift=eos.PolynomialShift(647.096, [3e-6, 1e-6, 2e-7]))
+        report = check_eos(shifted, (300.0, 1000.0), n=1000)
+        (failure,) = report.failures
+        assert failure.name == 'T(P, v) inverts P(T, v)'
+        assert failure.max_error == np.inf
+
+
+class TestMain:
+    def test_passes(self, capsys):
+        reports = main(['Water', '--eos', 'PR', 'VdW', '--n', '500'])
+        assert [report.eos for report in reports] == ['PurePREOS', 'PureVdWEOS']
+        assert 'Water PurePREOS: passed' in capsys.readouterr().out
+
+    def test_defaults_pass(self, capsys):
+        # Includes dense liquid states with z just above 0.01, where ln φ
+        # varies much faster with volume than further from the co-volume
+        reports = main(['Water'])
+        assert len(reports) == len(EOS_CLASSES)
+        assert all(report.passed for report in reports), capsys.readouterr().out
+
+    def test_exit_code(self):
+        with pytest.raises(SystemExit) as exit_info:
+            main(['Water', '--eos', 'PR', '--n', '500', '--rtol', '1e-20'])
+        assert exit_info.value.code == 1
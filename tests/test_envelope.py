@@ -0,0 +1,133 @@
+import pytest
+import numpy as np
+from pytherm import eos
+from pytherm.eos import R
+from pytherm.envelope import critical_point, phase_envelope, saturation_point, saturation_pressure
+
+
+@pytest.fixture
+def water_pr():
+    return eos.PurePREOS(Pc=22064000.0, Tc=647.096, omega=0.3443)
+
+
+class TestSaturationPoint:
+    @pytest.mark.parametrize('T', [330.0, 400.0, 500.0, 600.0, 645.0])
+    def test_phase_equilibrium(self, water_pr, T):
+        P, v_liq, v_vap = saturation_point(water_pr, T)
+        liq, vap = water_pr.residual_properties(T, v_liq), water_pr.residual_properties(T, v_vap)
+        assert v_liq < v_vap
+        assert liq.P == pytest.approx(P, rel=1e-9)
+        assert vap.P == pytest.approx(P, rel=1e-9)
+        assert liq.ln_phi == pytest.approx(vap.ln_phi, abs=1e-9)
+
+    def test_matches_cubic_roots(self, water_pr):
+        P, v_liq, v_vap = saturation_point(water_pr, 450.0)
+        assert water_pr.v_roots(P, 450.0) == pytest.approx((v_liq, v_vap), rel=1e-8)
+
+    def test_constant_shift_keeps_saturation_pressure(self, water_pr):
+        shift = eos.ConstantShift(3e-6)
+        shifted = eos.PurePREOS(Pc=22064000.0, Tc=647.096, omega=0.3443, shift=shift)
+        P, v_liq, v_vap = saturation_point(water_pr, 450.0)
+        P_shifted, v_liq_shifted, v_vap_shifted = saturation_point(shifted, 450.0)
+        assert P_shifted == pytest.approx(P, rel=1e-8)
+        assert v_liq_shifted == pytest.approx(v_liq - 3e-6, rel=1e-8)
+        assert v_vap_shifted == pytest.approx(v_vap - 3e-6, rel=1e-8)
+
+    def test_supercritical(self, water_pr):
+        with pytest.raises(ValueError):
+            saturation_point(water_pr, 700.0)
+
+
+class TestCriticalPoint:
+    def test_van_der_waals(self):
+        vdw = eos.PureVdWEOS(Pc=4.6e6, Tc=190.6)
+        crit = critical_point(vdw)
+        assert crit.T == pytest.approx(190.6, rel=1e-10)
+        assert crit.P == pytest.approx(4.6e6, rel=1e-10)
+        assert crit.v == pytest.approx(3.0 / 8.0 * R * 190.6 / 4.6e6, rel=1e-10)
+
+    @pytest.mark.parametrize('eos_class, z_c', [
+        (eos.PurePREOS, 0.307401),
+        (eos.PureSRKEOS, 1.0 / 3.0),
+    ])
+    def test_critical_compressibility(self, eos_class, z_c):
+        crit = critical_point(eos_class(Pc=22064000.0, Tc=647.096, omega=0.3443))
+        # The rounded Ω constants put the EOS critical point slightly off
+        # the one it was fitted to
+        assert crit.T == pytest.approx(647.096, rel=1e-4)
+        assert crit.P == pytest.approx(22064000.0, rel=1e-3)
+        assert crit.P * crit.v / (R * crit.T) == pytest.approx(z_c, rel=1e-4)
+
+    def test_spinodals_merge(self, water_pr):
+        crit = critical_point(water_pr)
+        v_liq, v_vap = water_pr.spinodal_v(crit.T * (1.0 - 1e-6))
+        assert v_liq == pytest.approx(crit.v, rel=1e-2)
+        assert v_vap == pytest.approx(crit.v, rel=1e-2)
+        assert np.isnan(water_pr.spinodal_v(crit.T * (1.0 + 1e-6))[0])
+
+
+class TestPhaseEnvelope:
+    @pytest.fixture
+    def envelope(self, water_pr):
+        return phase_envelope(water_pr, T_start=300.0)
+
+    def test_shape(self, envelope):
+        assert envelope.T[0] == pytest.approx(300.0)
+        assert np.all(np.diff(envelope.T) > 0.0)
+        assert np.all(np.diff(envelope.P) > 0.0)
+        assert np.all(envelope.v_liq <= envelope.v_vap)
+        assert envelope.T[-1] == envelope.critical.T
+        assert envelope.v_liq[-1] == envelope.v_vap[-1] == envelope.critical.v
+
+    def test_points_match_saturation_point(self, water_pr, envelope):
+        for T, P, v_liq, v_vap in list(zip(envelope.T, envelope.P, envelope.v_liq, envelope.v_vap))[:-1]:
+            assert saturation_point(water_pr, T) == pytest.approx((P, v_liq, v_vap), rel=1e-7)
+
+    def test_approaches_critical_point(self, envelope):
+        gap = np.log(envelope.v_vap[-2] / envelope.v_liq[-2])
+        assert 0.0 < gap < 0.06
+        assert envelope.critical.T - envelope.T[-2] < 0.1
+
+    def test_critical_point(self, water_pr, envelope):
+        crit = critical_point(water_pr)
+        assert envelope.critical == pytest.approx(crit, rel=1e-9)
+        assert envelope.cricondenbar == pytest.approx((crit.T, crit.P))
+        assert envelope.cricondentherm == pytest.approx((crit.T, crit.P))
+
+    def test_max_step(self, water_pr, envelope):
+        fine = phase_envelope(water_pr, T_start=300.0, max_step=0.1)
+        assert len(fine.T) > len(envelope.T)
+        assert fine.critical == pytest.approx(envelope.critical, rel=1e-9)
+
+    @pytest.mark.parametrize('test_eos', [
+        eos.PureSRKEOS(Pc=4599000.0, Tc=190.56, omega=0.011),
+        eos.PurePR78EOS(Pc=1.49e6, Tc=594.6, omega=0.575),
+        eos.PureVdWEOS(Pc=4599000.0, Tc=190.56),
+    ])
+    def test_other_cubics(self, test_eos):
+        envelope = phase_envelope(test_eos)
+        T, P, v_liq, v_vap = envelope.T[-3], envelope.P[-3], envelope.v_liq[-3], envelope.v_vap[-3]
+        ln_phi_liq = test_eos.residual_properties(T, v_liq).ln_phi
+        ln_phi_vap = test_eos.residual_properties(T, v_vap).ln_phi
+        assert ln_phi_liq == pytest.approx(ln_phi_vap, abs=1e-9)
+        assert envelope.critical.T == pytest.approx(test_eos._T_red, rel=1e-3)
+
+
+class TestSaturationPressure:
+    def test_matches_saturation_point(self, water_pr):
+        T = np.linspace(300.0, 646.0, 50)
+        expected = [saturation_point(water_pr, T_i)[0] for T_i in T]
+        assert saturation_pressure(water_pr, T) == pytest.approx(expected, rel=1e-5)
+
+    def test_envelope(self, water_pr):
+        envelope = phase_envelope(water_pr, T_start=300.0)
+        P = saturation_pressure(water_pr, envelope.T, envelope)
+        assert P[:-1] == pytest.approx(envelope.P[:-1], rel=1e-12)
+        with pytest.raises(ValueError):
+            saturation_pressure(water_pr, 290.0, envelope)
+
+    def test_supercritical(self, water_pr):
+        P = saturation_pressure(water_pr, np.array([400.0, 650.0]))
+        assert np.isfinite(P[0])
+        assert np.isnan(P[1])
+        assert np.ndim(saturation_pressure(water_pr, 400.0)) == 0
@@ -1,126 +1,239 @@
+from concurrent.futures import ThreadPoolExecutor
 import pytest
-from scipy.misc import derivative
+import numpy as np
+from pytherm.consistency import derivative
 from scipy import integrate
 from pytherm import eos
 from pytherm.eos import R
-#
-#
-# class TestEOSIdeal:
-#     @pytest.fixture
-#     def test_eos(self):
-#         return eos.EOSIdeal()
-#
-#     @pytest.mark.parametrize('T, v', [
-#         (450.0, 0.002),
-#         (500.0, 0.008),
-#         (2000.0, 0.001),
-#         (100.0, 0.02),
-#     ])
-#     def test_P_examples(self, test_eos, T, v):
-#         assert test_eos.P(T, v) * v == pytest.approx(R * T)
-#
-#     @pytest.mark.parametrize('P, v', [
-#         (100.0, 0.002),
-#         (1000.0, 0.008),
-#         (1e6, 0.001),
-#         (1e5, 0.02),
-#     ])
-#     def test_T_examples(self, test_eos, P, v):
-#         assert P * v == pytest.approx(R * test_eos.T(P, v))
-#
-#     @pytest.mark.parametrize('P, T', [
-#         (100.0, 450.0),
-#         (1000.0, 500.0),
-#         (1e6, 100.0),
-#         (1e5, 2000.0),
-#     ])
-#     def test_v_examples(self, test_eos, P, T):
-#         assert P * test_eos.v(P, T) == pytest.approx(R * T)
-#
-#     @pytest.mark.parametrize('P, T, v', [
-#         (100.0, 450.0, None),
-#         (1000.0, None, 0.008),
-#         (None, 100.0, 0.02),
-#     ])
-#     def test_z_examples(self, test_eos, P, T, v):
-#         assert test_eos.z(P=P, T=T, v=v) == 1.0
-#
-#
-# B_val = -0.0001
-#
-#
-# class TestEOSVirial2ndOrder:
-#     @pytest.fixture
-#     def test_eos(self):
-#         B = lambda T: B_val
-#         return eos.EOSVirial2ndOrder(B)
-#
-#     @pytest.mark.parametrize('P, T, v', [
-#         (1e7, 2532.049707189404, 0.002),
-#         (1e5, 97.43583683361759, 0.008),
-#         (1e8, 13363.595676832967, 0.001),
-#         (1e6, 2417.534896311491, 0.02),
-#     ])
-#     def test_P_examples(self, test_eos, P, T, v):
-#         assert test_eos.P(T, v) == pytest.approx(P)
-#
-#     @pytest.mark.parametrize('T, v, z', [
-#         (2532.049707189404, 0.002, 0.95),
-#         (97.43583683361759, 0.008, 0.9875),
-#         (13363.595676832967, 0.001, 0.9),
-#     ])
-#     def test_P_real_gas_law(self, test_eos, T, v, z):
-#         assert test_eos.P(T=T, v=v) == pytest.approx(z * R * T / v)
-#
-#     @pytest.mark.parametrize('P, T, v', [
-#         (1e7, 2532.049707189404, 0.002),
-#         (1e5, 97.43583683361759, 0.008),
-#         (1e8, 13363.595676832967, 0.001),
-#         (1e6, 2417.534896311491, 0.02),
-#     ])
-#     def test_T_examples(self, test_eos, P, T, v):
-#         assert test_eos.T(P, v) == pytest.approx(T)
-#
-#     @pytest.mark.parametrize('P, v, z', [
-#         (1e7, 0.002, 0.95),
-#         (1e5, 0.008, 0.9875),
-#         (1e8, 0.001, 0.9),
-#     ])
-#     def test_T_real_gas_law(self, test_eos, P, v, z):
-#         assert test_eos.T(P=P, v=v) == pytest.approx(P * v / z / R)
-#
-#     @pytest.mark.parametrize('P, T, v', [
-#         (1e7, 2532.049707189404, 0.002),
-#         (1e5, 97.43583683361759, 0.008),
-#         (1e8, 13363.595676832967, 0.001),
-#         (1e6, 2417.534896311491, 0.02),
-#     ])
-#     def test_v_examples(self, test_eos, P, T, v):
-#         assert test_eos.v(P, T) == pytest.approx(v)
-#
-#     @pytest.mark.parametrize('P, T, z', [
-#         (1e7, 2532.049707189404, 0.95),
-#         (1e5, 97.43583683361759, 0.9875),
-#         (1e8, 13363.595676832967, 0.9),
-#     ])
-#     def test_v_real_gas_law(self, test_eos, P, T, z):
-#         assert test_eos.v(P=P, T=T) == pytest.approx(z * R * T / P)
-#
-#     @pytest.mark.parametrize('P, T, v, z', [
-#         (1e7, 2532.049707189404, 0.002, 0.95),
-#         (1e5, 97.43583683361759, 0.008, 0.9875),
-#         (1e8, 13363.595676832967, 0.001, 0.9),
-#     ])
-#     def test_z_examples(self, test_eos, P, T, v, z):
-#         assert test_eos.z(P=P, T=T, v=v) == pytest.approx(z)
-#
-#     @pytest.mark.parametrize('P, T, v', [
-#         (1e7, 2532.049707189404, 0.002),
-#         (1e5, 97.43583683361759, 0.008),
-#         (1e8, 13363.595676832967, 0.001),
-#     ])
-#     def test_z_virial_eqn(self, test_eos, P, T, v):
-#         assert test_eos.z(P=P, T=T, v=v) == pytest.approx(1 + B_val / v)
+
+
+class TestEOSIdeal:
+    @pytest.fixture
+    def test_eos(self):
+        return eos.EOSIdeal()
+
+    @pytest.mark.parametrize('T, v', [
+        (450.0, 0.002),
+        (500.0, 0.008),
+        (2000.0, 0.001),
+        (100.0, 0.02),
+    ])
+    def test_P_examples(self, test_eos, T, v):
+        assert test_eos.P(T, v) * v == pytest.approx(R * T)
+
+    @pytest.mark.parametrize('P, v', [
+        (100.0, 0.002),
+        (1000.0, 0.008),
+        (1e6, 0.001),
+        (1e5, 0.02),
+    ])
+    def test_T_examples(self, test_eos, P, v):
+        assert P * v == pytest.approx(R * test_eos.T(P, v))
+
+    @pytest.mark.parametrize('P, T', [
+        (100.0, 450.0),
+        (1000.0, 500.0),
+        (1e6, 100.0),
+        (1e5, 2000.0),
+    ])
+    def test_v_examples(self, test_eos, P, T):
+        assert P * test_eos.v(P, T) == pytest.approx(R * T)
+
+    @pytest.mark.parametrize('T, v', [
+        (450.0, 0.002),
+        (100.0, 0.02),
+    ])
+    def test_z_examples(self, test_eos, T, v):
+        assert test_eos.z(T=T, v=v) == 1.0
+
+    def test_vectorized(self, test_eos):
+        T, v = np.array([300.0, 400.0, 500.0]), np.array([0.01, 0.02, 0.03])
+        P = test_eos.P(T, v)
+        assert test_eos.T(P, v) == pytest.approx(T)
+        assert test_eos.v(P, T) == pytest.approx(v)
+        assert test_eos.z(T, v) == pytest.approx(np.ones(3))
+
+    def test_residual_properties_are_zero(self, test_eos):
+        res = test_eos.residual_properties(400.0, 0.01)
+        for name in ['u_res', 'h_res', 's_res', 'cv_res', 'cp_res', 'ln_phi']:
+            assert getattr(res, name) == pytest.approx(0.0, abs=1e-12)
+
+    def test_analytic_derivatives_match_automatic(self, test_eos):
+        T, v = np.linspace(300.0, 900.0, 5), np.geomspace(1e-4, 1e-2, 5)
+        auto = eos.PExplicitEOS.derivatives(test_eos, T, v)
+        for name in auto._fields[1:]:
+            assert getattr(test_eos, name)(T, v) == pytest.approx(getattr(auto, name), abs=1e-12)
+
+
+B_val = -0.0001
+
+
+class TestEOSVirial2ndOrder:
+    @pytest.fixture
+    def test_eos(self):
+        B = lambda T: B_val
+        return eos.EOSVirial2ndOrder(B)
+
+    @pytest.mark.parametrize('P, T, v', [
+        (1e7, 2532.049707189404, 0.002),
+        (1e5, 97.43583683361759, 0.008),
+        (1e8, 13363.595676832967, 0.001),
+        (1e6, 2417.534896311491, 0.02),
+    ])
+    def test_P_examples(self, test_eos, P, T, v):
+        assert test_eos.P(T, v) == pytest.approx(P)
+
+    @pytest.mark.parametrize('T, v, z', [
+        (2532.049707189404, 0.002, 0.95),
+        (97.43583683361759, 0.008, 0.9875),
+        (13363.595676832967, 0.001, 0.9),
+    ])
+    def test_P_real_gas_law(self, test_eos, T, v, z):
+        assert test_eos.P(T=T, v=v) == pytest.approx(z * R * T / v)
+
+    @pytest.mark.parametrize('P, T, v', [
+        (1e7, 2532.049707189404, 0.002),
+        (1e5, 97.43583683361759, 0.008),
+        (1e8, 13363.595676832967, 0.001),
+        (1e6, 2417.534896311491, 0.02),
+    ])
+    def test_T_examples(self, test_eos, P, T, v):
+        assert test_eos.T(P, v) == pytest.approx(T)
+
+    @pytest.mark.parametrize('P, v, z', [
+        (1e7, 0.002, 0.95),
+        (1e5, 0.008, 0.9875),
+        (1e8, 0.001, 0.9),
+    ])
+    def test_T_real_gas_law(self, test_eos, P, v, z):
+        assert test_eos.T(P=P, v=v) == pytest.approx(P * v / z / R)
+
+    @pytest.mark.parametrize('P, T, v', [
+        (1e7, 2532.049707189404, 0.002),
+        (1e5, 97.43583683361759, 0.008),
+        (1e8, 13363.595676832967, 0.001),
+        (1e6, 2417.534896311491, 0.02),
+    ])
+    def test_v_examples(self, test_eos, P, T, v):
+        assert test_eos.v(P, T) == pytest.approx(v)
+
+    @pytest.mark.parametrize('P, T, z', [
+        (1e7, 2532.049707189404, 0.95),
+        (1e5, 97.43583683361759, 0.9875),
+        (1e8, 13363.595676832967, 0.9),
+    ])
+    def test_v_real_gas_law(self, test_eos, P, T, z):
+        assert test_eos.v(P=P, T=T) == pytest.approx(z * R * T / P)
+
+    @pytest.mark.parametrize('T, v, z', [
+        (2532.049707189404, 0.002, 0.95),
+        (97.43583683361759, 0.008, 0.9875),
+        (13363.595676832967, 0.001, 0.9),
+    ])
+    def test_z_examples(self, test_eos, T, v, z):
+        assert test_eos.z(T=T, v=v) == pytest.approx(z)
+
+    @pytest.mark.parametrize('T, v', [
+        (2532.049707189404, 0.002),
+        (97.43583683361759, 0.008),
+        (13363.595676832967, 0.001),
+    ])
+    def test_z_virial_eqn(self, test_eos, T, v):
+        assert test_eos.z(T=T, v=v) == pytest.approx(1 + B_val / v)
+
+    def test_vectorized(self, test_eos):
+        P = np.array([1e7, 1e5, 1e8, 1e6])
+        T = np.array([2532.049707189404, 97.43583683361759, 13363.595676832967, 2417.534896311491])
+        v = np.array([0.002, 0.008, 0.001, 0.02])
+        assert test_eos.v(P, T) == pytest.approx(v)
+        assert test_eos.T(P, v) == pytest.approx(T)
+
+    def test_v_nan_without_real_root(self, test_eos):
+        assert np.isnan(test_eos.v(1e8, 300.0))
+
+
+class TestAbbottVirialCoefficient:
+    water = dict(Pc=22064000.0, Tc=647.096, omega=0.3443)
+
+    @pytest.mark.parametrize('T', [400.0, 647.096, 1000.0])
+    def test_examples(self, T):
+        B = eos.AbbottVirialCoefficient(**self.water)
+        Tr = T / 647.096
+        B0, B1 = 0.083 - 0.422 / Tr ** 1.6, 0.139 - 0.172 / Tr ** 4.2
+        assert B(T) == pytest.approx(R * 647.096 / 22064000.0 * (B0 + 0.3443 * B1))
+
+    @pytest.mark.parametrize('T', [400.0, 647.096, 1000.0])
+    def test_analytic_derivatives(self, T):
+        B = eos.AbbottVirialCoefficient(**self.water)
+        assert B.dB_dT(T) == pytest.approx(eos.VirialCoefficient.dB_dT(B, T))
+        assert B.d2B_dT2(T) == pytest.approx(eos.VirialCoefficient.d2B_dT2(B, T))
+
+    def test_callable_B_derivatives(self):
+        virial = eos.EOSVirial2ndOrder(lambda T: -1e-4 + 2e-7 * T)
+        assert virial.dP_dT_v(400.0, 0.01) == \
+               pytest.approx(derivative(lambda T: virial.P(T, 0.01), x0=400.0, dx=1e-3))
+
+    @pytest.mark.parametrize('T, v', [(400.0, 0.01), (700.0, 1e-3)])
+    def test_virial_eos_derivatives(self, T, v):
+        virial = eos.EOSVirial2ndOrder(eos.AbbottVirialCoefficient(**self.water))
+        auto = eos.PExplicitEOS.derivatives(virial, T, v)
+        for name in auto._fields[1:]:
+            assert getattr(virial, name)(T, v) == pytest.approx(getattr(auto, name))
+        assert virial.T(virial.P(T, v), v) == pytest.approx(T)
+
+    @pytest.mark.parametrize('T, v', [(400.0, 0.01), (700.0, 1e-3)])
+    def test_virial_residual_properties(self, T, v):
+        virial = eos.EOSVirial2ndOrder(eos.AbbottVirialCoefficient(**self.water))
+        res = virial.residual_properties(T, v)
+        B, dB_dT = virial._B(T), virial._B.dB_dT(T)
+        assert res.P == pytest.approx(virial.P(T, v))
+        assert res.u_res == pytest.approx(-R * T ** 2 * dB_dT / v)
+        assert res.cv_res == pytest.approx(-T * virial.d2P_dT2_v(T, v) * v)
+        assert res.ln_phi == pytest.approx(2 * B / v - np.log(1 + B / v))
+
+
+
+class VanDerWaalsEOS(eos.PExplicitEOS):
+    """
+    Minimal EOS defining only P(T, v), to exercise the default
+    (automatically differentiated) derivatives.
+    """
+    a, b = 0.5536, 3.049e-5
+
+    def P(self, T, v):
+        return R * T / (v - self.b) - self.a / v ** 2
+
+
+class TestPExplicitEOSDerivatives:
+    @pytest.mark.parametrize('T, v', [(300.0, 0.001), (500.0, 0.0001), (650.0, 5e-5)])
+    def test_default_derivatives(self, T, v):
+        example_eos = VanDerWaalsEOS()
+        a, b = example_eos.a, example_eos.b
+        assert example_eos.dP_dT_v(T, v) == pytest.approx(R / (v - b))
+        assert example_eos.dP_dv_T(T, v) == pytest.approx(-R * T / (v - b) ** 2 + 2 * a / v ** 3)
+        assert example_eos.d2P_dT2_v(T, v) == pytest.approx(0.0)
+        assert example_eos.d2P_dTdv(T, v) == pytest.approx(-R / (v - b) ** 2)
+        assert example_eos.d2P_dv2_T(T, v) == pytest.approx(2 * R * T / (v - b) ** 3 - 6 * a / v ** 4)
+
+    @pytest.mark.parametrize('T, v', [(300.0, 0.001), (500.0, 0.0001), (650.0, 5e-5)])
+    def test_derivatives_match_individual_methods(self, T, v):
+        for example_eos in [VanDerWaalsEOS(), eos.PurePREOS(Pc=22064000.0, Tc=647.096, omega=0.3443)]:
+            derivs = example_eos.derivatives(T, v)
+            assert derivs.P == pytest.approx(example_eos.P(T, v))
+            for name in derivs._fields[1:]:
+                assert getattr(derivs, name) == pytest.approx(getattr(example_eos, name)(T, v))
+
+    def test_analytic_overrides_match_automatic_derivatives(self):
+        example_eos = eos.PurePREOS(Pc=22064000.0, Tc=647.096, omega=0.3443)
+        T, v = np.linspace(300.0, 900.0, 5), np.geomspace(3e-5, 1e-2, 5)
+        for name in ['dP_dT_v', 'dP_dv_T', 'd2P_dT2_v']:
+            assert getattr(example_eos, name)(T, v) == \
+                   pytest.approx(getattr(eos.PExplicitEOS, name)(example_eos, T, v))
+
+    def test_inversions_use_default_derivatives(self):
+        example_eos = VanDerWaalsEOS()
+        a, b = example_eos.a, example_eos.b
+        assert example_eos.T(P=1e5, v=0.02) == pytest.approx((1e5 + a / 0.02 ** 2) * (0.02 - b) / R)
 
 
 class TestPurePREOS:
@@ -233,3 +346,476 @@ class TestPurePREOS:
     def test_integrate_du_dv_T_examples(self, example_eos, T, v1, v2):
         assert example_eos.integrate_du_dv_T(T=T, v1=v1, v2=v2) == \
                pytest.approx(integrate.quad(lambda v_est: example_eos.du_dv_T(T=T, v=v_est), a=v1, b=v2)[0])
+
+    @pytest.mark.parametrize('T', [300.0, 400.0, 493.15, 640.0])
+    def test_spinodal_v_stationary_points(self, T):
+        example_eos = eos.PurePREOS(Pc=22064000.0, Tc=647.096, omega=0.3443)
+        v_liq, v_vap = example_eos.spinodal_v(T)
+        assert example_eos._b < v_liq < v_vap
+        assert example_eos.dP_dv_T(T, v_liq) * v_liq == pytest.approx(0.0, abs=1e-6 * abs(example_eos.P(T, v_liq)))
+        assert example_eos.dP_dv_T(T, v_vap) * v_vap == pytest.approx(0.0, abs=1e-6 * example_eos.P(T, v_vap))
+
+    def test_spinodal_v_supercritical(self):
+        example_eos = eos.PurePREOS(Pc=22064000.0, Tc=647.096, omega=0.3443)
+        v_liq, v_vap = example_eos.spinodal_v(700.0)
+        assert np.isnan(v_liq) and np.isnan(v_vap)
+
+    @pytest.mark.parametrize('P, T', [
+        (1e8, 300.0),
+        (3e7, 400.0),
+        (5e7, 600.0),
+    ])
+    def test_v_liquid_root(self, P, T):
+        example_eos = eos.PurePREOS(Pc=22064000.0, Tc=647.096, omega=0.3443)
+        v = example_eos.v(P, T)
+        assert example_eos._b < v < example_eos.spinodal_v(T)[0]
+        assert example_eos.P(T, v) == pytest.approx(P)
+
+    def test_inversions_vectorized(self):
+        example_eos = eos.PurePREOS(Pc=22064000.0, Tc=647.096, omega=0.3443)
+        P, T = np.meshgrid(np.geomspace(1e3, 1e8, 20), np.linspace(280.0, 1200.0, 20))
+        v = example_eos.v(P, T)
+        assert v.shape == P.shape
+        assert example_eos.P(T, v) == pytest.approx(P)
+        assert example_eos.T(P, v) == pytest.approx(T)
+
+    def test_T_at_volume_below_co_volume(self):
+        example_eos = eos.PurePREOS(Pc=22064000.0, Tc=647.096, omega=0.3443)
+        for v in (example_eos._b, 0.5 * example_eos._b, np.array([1e-3, 0.9 * example_eos._b])):
+            with pytest.raises(ValueError, match='co-volume'):
+                example_eos.T(1e5, v)
+
+    residual_test_cases = 'example_eos, T, v', [
+        (eos.PurePREOS(Pc=22064000.0, Tc=647.096, omega=0.3443), 493.15, 0.0018015),
+        (eos.PurePREOS(Pc=22064000.0, Tc=647.096, omega=0.3443), 400.0, 2.2e-5),
+        (eos.PurePREOS(Pc=22064000.0, Tc=700.0, omega=0.3), 800.0, 0.0001),
+        (eos.PurePREOS(Pc=22064000.0, Tc=647.096, omega=0.3443,
+                       shift=eos.PolynomialShift(Tc=647.096, coeffs=[3e-6, -2e-6, 1.5e-6])), 493.15, 0.0018015),
+        (eos.PurePREOS(Pc=22064000.0, Tc=647.096, omega=0.3443,
+                       shift=eos.PolynomialShift(Tc=647.096, coeffs=[3e-6, -2e-6, 1.5e-6])), 400.0, 1.96e-5),
+    ]
+
+    @staticmethod
+    def integrate_to_ideal_gas(func, v):
+        # Integrate from v to infinite volume, substituting x = 1/v
+        return integrate.quad(lambda x: func(1 / x) / x ** 2, 0.0, 1 / v, epsabs=1e-12)[0]
+
+    @pytest.mark.parametrize(*residual_test_cases)
+    def test_residual_properties_pressure(self, example_eos, T, v):
+        res = example_eos.residual_properties(T, v)
+        assert res.P == pytest.approx(example_eos.P(T, v))
+        assert res.z == pytest.approx(example_eos.z(T, v))
+        assert res.dP_dT_v == pytest.approx(example_eos.dP_dT_v(T, v))
+        assert res.dP_dv_T == pytest.approx(example_eos.dP_dv_T(T, v))
+
+    @pytest.mark.parametrize(*residual_test_cases)
+    def test_residual_properties_against_integrals(self, example_eos, T, v):
+        res = example_eos.residual_properties(T, v)
+        u_res = -self.integrate_to_ideal_gas(lambda v_est: example_eos.du_dv_T(T, v_est), v)
+        assert res.u_res == pytest.approx(u_res)
+        assert res.h_res == pytest.approx(u_res + R * T * (res.z - 1))
+        s_res = -self.integrate_to_ideal_gas(lambda v_est: example_eos.dP_dT_v(T, v_est) - R / v_est, v) + \
+            R * np.log(res.z)
+        assert res.s_res == pytest.approx(s_res)
+        cv_res = -T * self.integrate_to_ideal_gas(lambda v_est: example_eos.d2P_dT2_v(T, v_est), v)
+        assert res.cv_res == pytest.approx(cv_res)
+        ln_phi = res.z - 1 - np.log(res.z) + \
+            self.integrate_to_ideal_gas(lambda v_est: example_eos.P(T, v_est) / R / T - 1 / v_est, v)
+        assert res.ln_phi == pytest.approx(ln_phi)
+
+    @pytest.mark.parametrize(*residual_test_cases)
+    def test_alphar_derivatives(self, example_eos, T, v):
+        tau, delta = example_eos._Tc / T, example_eos._b / v
+        a = example_eos.alphar(tau, delta)
+        d_tau, d_delta = tau * 1e-6, delta * 1e-6
+        assert a.alpha_d == pytest.approx(derivative(lambda x: example_eos.alphar(tau, x).alpha, delta, d_delta))
+        assert a.alpha_dd == pytest.approx(derivative(lambda x: example_eos.alphar(tau, x).alpha_d, delta, d_delta))
+        assert a.alpha_t == pytest.approx(derivative(lambda x: example_eos.alphar(x, delta).alpha, tau, d_tau))
+        assert a.alpha_tt == pytest.approx(derivative(lambda x: example_eos.alphar(x, delta).alpha_t, tau, d_tau))
+        assert a.alpha_dt == pytest.approx(derivative(lambda x: example_eos.alphar(x, delta).alpha_d, tau, d_tau))
+
+
+class TestAlphaFunctions:
+    @pytest.mark.parametrize('alpha', [
+        eos.SoaveAlpha(Tc=647.096, m=0.8),
+        eos.RKAlpha(Tc=647.096),
+        eos.ConstantAlpha(),
+        eos.TwuAlpha(Tc=647.096, L=0.4, M=0.87, N=2.0),
+        eos.MathiasCopemanAlpha(Tc=647.096, c1=0.9, c2=-0.3, c3=0.5)])
+    @pytest.mark.parametrize('T', [250.0, 493.15, 800.0])
+    def test_analytic_derivatives(self, alpha, T):
+        assert alpha.dalpha_dT(T) == \
+               pytest.approx(derivative(alpha, x0=T, dx=T*1e-5), abs=1e-12)
+        assert alpha.d2alpha_dT2(T) == \
+               pytest.approx(derivative(alpha.dalpha_dT, x0=T, dx=T*1e-5), rel=1e-5, abs=1e-12)
+
+    @pytest.mark.parametrize('T', [300.0, 493.15, 800.0])
+    def test_automatic_derivatives(self, T):
+        alpha = eos.TwuAlpha(Tc=647.096, L=0.4, M=0.87, N=2.0)
+        assert alpha.dalpha_dT(T) == pytest.approx(eos.AlphaFunction.dalpha_dT(alpha, T))
+        assert alpha.d2alpha_dT2(T) == pytest.approx(eos.AlphaFunction.d2alpha_dT2(alpha, T))
+
+    def test_twu_alpha_unity_at_critical_point(self):
+        assert eos.TwuAlpha(Tc=647.096, L=0.4, M=0.87, N=2.0)(647.096) == pytest.approx(1.0)
+
+
+class TestCubicEOS:
+    water = dict(Pc=22064000.0, Tc=647.096)
+    cubic_eos_cases = [
+        eos.PurePREOS(omega=0.3443, **water),
+        eos.PurePR78EOS(omega=0.6, **water),
+        eos.PureSRKEOS(omega=0.3443, **water),
+        eos.PureRKEOS(**water),
+        eos.PureVdWEOS(**water),
+        eos.PurePREOS(omega=0.3443, alpha=eos.TwuAlpha(Tc=647.096, L=0.4, M=0.87, N=2.0), **water),
+    ]
+
+    @pytest.mark.parametrize('example_eos', cubic_eos_cases)
+    def test_critical_point(self, example_eos):
+        Tc, Pc = self.water['Tc'], self.water['Pc']
+        v_liq, v_vap = example_eos.spinodal_v(np.array([0.999 * Tc, 1.001 * Tc]))
+        assert np.isfinite(v_liq[0]) and np.isfinite(v_vap[0])
+        assert np.isnan(v_liq[1]) and np.isnan(v_vap[1])
+        # The Omega constants place the critical point at (Tc, Pc)
+        v_c = 0.5 * (v_liq[0] + v_vap[0])
+        assert example_eos.P(0.999 * Tc, v_c) == pytest.approx(Pc, rel=1e-2)
+
+    @pytest.mark.parametrize('example_eos', cubic_eos_cases)
+    def test_analytic_derivatives_match_automatic(self, example_eos):
+        T, v = np.linspace(300.0, 900.0, 5), np.geomspace(1e-4, 1e-2, 5)
+        auto = eos.PExplicitEOS.derivatives(example_eos, T, v)
+        for name in auto._fields[1:]:
+            assert getattr(example_eos, name)(T, v) == pytest.approx(getattr(auto, name))
+
+    @pytest.mark.parametrize('example_eos', cubic_eos_cases)
+    def test_all_derivatives_match_automatic(self, example_eos):
+        T, v = np.linspace(300.0, 900.0, 5), np.geomspace(1e-4, 1e-2, 5)
+        assert_fields_approx(example_eos.derivatives(T, v), eos.PExplicitEOS.derivatives(example_eos, T, v))
+
+    @pytest.mark.parametrize('example_eos', cubic_eos_cases)
+    def test_alphar_matches_pressure(self, example_eos):
+        T, v = 450.0, 5e-4
+        alpha_d = example_eos.alphar(example_eos._T_red / T, example_eos._b / v).alpha_d
+        assert R * T / v * (1 + example_eos._b / v * alpha_d) == pytest.approx(example_eos.P(T, v))
+
+    @pytest.mark.parametrize('example_eos', cubic_eos_cases)
+    @pytest.mark.parametrize('P, T', [(1e5, 300.0), (1e5, 450.0), (3e6, 500.0), (5e7, 700.0)])
+    def test_v_roots_satisfy_eos(self, example_eos, P, T):
+        v_liq, v_vap = example_eos.v_roots(P, T)
+        assert example_eos._b < v_liq <= v_vap
+        assert example_eos.P(T, v_liq) == pytest.approx(P, rel=1e-9)
+        assert example_eos.P(T, v_vap) == pytest.approx(P, rel=1e-9)
+        assert example_eos.dP_dv_T(T, v_liq) < 0 and example_eos.dP_dv_T(T, v_vap) < 0
+
+    @pytest.mark.parametrize('example_eos', cubic_eos_cases)
+    def test_v_matches_bracketed_solve(self, example_eos):
+        P, T = np.geomspace(1e4, 5e7, 40), np.linspace(250.0, 900.0, 40)
+        assert example_eos.v(P, T) == pytest.approx(eos.PExplicitEOS.v(example_eos, P, T), rel=1e-9)
+
+    def test_srk_reduces_to_rk_with_rk_alpha(self):
+        srk = eos.PureSRKEOS(omega=0.0, alpha=eos.RKAlpha(Tc=647.096), **self.water)
+        rk = eos.PureRKEOS(**self.water)
+        assert srk.P(400.0, 1e-3) == pytest.approx(rk.P(400.0, 1e-3))
+
+    def test_pr78_matches_pr_for_light_components(self):
+        pr = eos.PurePREOS(omega=0.3443, **self.water)
+        pr78 = eos.PurePR78EOS(omega=0.3443, **self.water)
+        assert pr78.P(400.0, 1e-3) == pytest.approx(pr.P(400.0, 1e-3))
+
+
+class TestVolumeTranslation:
+    untranslated = eos.PurePREOS(Pc=11359200.0, Tc=405.5, omega=0.256)
+    shifts = [
+        eos.ConstantShift(c=3e-6),
+        eos.PolynomialShift(Tc=405.5, coeffs=[3e-6, -2e-6, 1.5e-6]),
+    ]
+
+    @pytest.mark.parametrize('shift', shifts)
+    @pytest.mark.parametrize('T, v', [(300.0, 3e-5), (400.0, 1e-3), (600.0, 1e-4)])
+    def test_P_is_shifted_cubic(self, shift, T, v):
+        translated = eos.PurePREOS(Pc=11359200.0, Tc=405.5, omega=0.256, shift=shift)
+        assert translated.P(T, v) == pytest.approx(self.untranslated.P(T, v + shift(T)))
+
+    @pytest.mark.parametrize('shift', shifts)
+    @pytest.mark.parametrize('P, T', [(1e6, 300.0), (5e5, 350.0), (2e7, 500.0)])
+    def test_v_roots_are_shifted(self, shift, P, T):
+        translated = eos.PurePREOS(Pc=11359200.0, Tc=405.5, omega=0.256, shift=shift)
+        for v, v_untranslated in zip(translated.v_roots(P, T), self.untranslated.v_roots(P, T)):
+            assert v == pytest.approx(v_untranslated - shift(T), rel=1e-10)
+        assert translated.v(P, T) == pytest.approx(eos.PExplicitEOS.v(translated, P, T), rel=1e-9)
+
+    @pytest.mark.parametrize('shift', shifts)
+    def test_spinodal_v_is_shifted(self, shift):
+        translated = eos.PurePREOS(Pc=11359200.0, Tc=405.5, omega=0.256, shift=shift)
+        T = np.array([250.0, 350.0])
+        for v, v_untranslated in zip(translated.spinodal_v(T), self.untranslated.spinodal_v(T)):
+            assert v == pytest.approx(v_untranslated - shift(T))
+
+    @pytest.mark.parametrize('shift', shifts)
+    def test_analytic_derivatives_match_automatic(self, shift):
+        translated = eos.PurePREOS(Pc=11359200.0, Tc=405.5, omega=0.256, shift=shift)
+        T, v = np.linspace(250.0, 700.0, 5), np.geomspace(5e-5, 1e-2, 5)
+        auto = eos.PExplicitEOS.derivatives(translated, T, v)
+        for name in auto._fields[1:]:
+            assert getattr(translated, name)(T, v) == pytest.approx(getattr(auto, name))
+
+    @pytest.mark.parametrize('shift', shifts)
+    def test_all_derivatives_match_automatic(self, shift):
+        translated = eos.PurePREOS(Pc=11359200.0, Tc=405.5, omega=0.256, shift=shift)
+        T, v = np.linspace(250.0, 700.0, 5), np.geomspace(5e-5, 1e-2, 5)
+        assert_fields_approx(translated.derivatives(T, v), eos.PExplicitEOS.derivatives(translated, T, v))
+
+    def test_shift_derivatives(self):
+        shift = eos.PolynomialShift(Tc=405.5, coeffs=[3e-6, -2e-6, 1.5e-6])
+        assert shift.dc_dT(350.0) == pytest.approx(eos.VolumeShift.dc_dT(shift, 350.0))
+        assert shift.d2c_dT2(350.0) == pytest.approx(eos.VolumeShift.d2c_dT2(shift, 350.0))
+
+    def test_peneloux_shift(self):
+        shift = eos.PurePREOS.peneloux_shift(Pc=11359200.0, Tc=405.5, omega=0.256)
+        z_ra = 0.29056 - 0.08775 * 0.256
+        assert shift(300.0) == pytest.approx(0.50033 * (0.25969 - z_ra) * R * 405.5 / 11359200.0)
+        with pytest.raises(ValueError, match='PureRKEOS'):
+            eos.PureRKEOS.peneloux_shift(Pc=11359200.0, Tc=405.5, omega=0.256)
+
+    def test_fit_to_liquid_density(self):
+        # Ammonia, from the GKKR vapor pressure and liquid density correlations
+        from pytherm.prop import Wagner5Corr, PPDSLiquidDensityCorr
+        Psat = Wagner5Corr(T_min=196.0, T_max=405.5, Pc=113.592, Tc=405.5,
+                           A=-7.303825, B=1.649953, C=-2.021615, D=-1.960295)
+        rho_liq = PPDSLiquidDensityCorr(T_min=196.0, T_max=405.5, Tc=405.5, rho_c=224.78,
+                                        A=533.0864, B=-39.199, C=271.407, D=-72.5196)
+        T = np.linspace(200.0, 360.0, 17)
+        P = np.array([Psat(T_i) for T_i in T]) * 1e5
+        v_liq = 0.017031 / np.array([rho_liq(T_i) for T_i in T])
+
+        v_untranslated = self.untranslated.v_roots(P, T)[0]
+        shift = eos.PolynomialShift.fit(self.untranslated, T, P, v_liq, degree=2)
+        translated = eos.PurePREOS(Pc=11359200.0, Tc=405.5, omega=0.256, shift=shift)
+        v_translated = translated.v_roots(P, T)[0]
+
+        error_untranslated = np.max(np.abs(v_untranslated / v_liq - 1))
+        error_translated = np.max(np.abs(v_translated / v_liq - 1))
+        assert error_untranslated > 0.05
+        assert error_translated < 0.01
+
+
+def assert_fields_approx(actual, expected, **kwargs):
+    for name in expected._fields:
+        assert getattr(actual, name) == pytest.approx(getattr(expected, name), **kwargs), name
+
+
+class CountingAlpha(eos.SoaveAlpha):
+    """
+    Soave alpha function counting its evaluations.
+    """
+    calls = 0
+
+    def __call__(self, T):
+        CountingAlpha.calls += 1
+        return super().__call__(T)
+
+    def dalpha_dT(self, T):
+        CountingAlpha.calls += 1
+        return super().dalpha_dT(T)
+
+    def d2alpha_dT2(self, T):
+        CountingAlpha.calls += 1
+        return super().d2alpha_dT2(T)
+
+
+class TestIsotherm:
+    ammonia = dict(Pc=11359200.0, Tc=405.5, omega=0.256)
+    eos_cases = [
+        eos.PurePREOS(**ammonia),
+        eos.PureSRKEOS(**ammonia),
+        eos.PurePREOS(**ammonia, shift=eos.PurePREOS.peneloux_shift(**ammonia)),
+        eos.PurePREOS(**ammonia, shift=eos.PolynomialShift(Tc=405.5, coeffs=[3e-6, -2e-6, 1.5e-6])),
+        eos.PurePREOS(**ammonia, alpha=eos.TwuAlpha(Tc=405.5, L=0.4, M=0.87, N=2.0)),
+    ]
+    v = np.geomspace(5e-5, 1e-1, 9)
+
+    @pytest.mark.parametrize('example_eos', eos_cases)
+    @pytest.mark.parametrize('T', [300.0, 500.0])
+    def test_matches_eos(self, example_eos, T):
+        isotherm = example_eos.at_T(T)
+        assert isotherm.P(self.v) == pytest.approx(example_eos.P(T, self.v), rel=1e-14)
+        assert_fields_approx(isotherm.derivatives(self.v), example_eos.derivatives(T, self.v), rel=1e-14)
+        for name in ('z', 'dP_dT_v', 'dP_dv_T', 'd2P_dT2_v', 'd2P_dTdv', 'd2P_dv2_T'):
+            assert getattr(isotherm, name)(self.v) == pytest.approx(getattr(example_eos, name)(T, self.v),
+                                                                   rel=1e-12)
+        # Volumes with z > 0, where ln z and so s_res are defined
+        v = self.v[-4:]
+        assert_fields_approx(isotherm.residual_properties(v), example_eos.residual_properties(T, v),
+                             rel=1e-12, abs=1e-12)
+        P = np.geomspace(1e4, 5e7, 9)
+        assert isotherm.v(P) == pytest.approx(example_eos.v(P, T), rel=1e-14)
+        assert isotherm.spinodal_v() == pytest.approx(example_eos.spinodal_v(T), rel=1e-14, nan_ok=True)
+
+    @pytest.mark.parametrize('example_eos', eos_cases)
+    def test_derivatives_on_jets(self, example_eos):
+        # Jets see the temperature-only terms expanded about T, so the
+        # derivatives they give are still exact
+        isotherm = example_eos.at_T(350.0)
+        auto = eos.PExplicitEOS.derivatives(isotherm._eos, 350.0, self.v)
+        assert_fields_approx(auto, example_eos.derivatives(350.0, self.v), rel=1e-12)
+
+    def test_temperature_terms_computed_once(self):
+        cubic = eos.PurePREOS(**self.ammonia, alpha=CountingAlpha(Tc=405.5, m=0.7))
+        isotherm = cubic.at_T(350.0)
+        # Derivatives of a(T) are computed on first use
+        isotherm.v(1e6)
+        isotherm.derivatives(self.v[0])
+        isotherm.residual_properties(self.v[-1])
+        calls = CountingAlpha.calls
+        for v in self.v:
+            isotherm.P(v)
+            isotherm.derivatives(v)
+            isotherm.v(1e6)
+        isotherm.residual_properties(self.v[-1])
+        assert CountingAlpha.calls == calls
+
+    def test_scalar_volume(self):
+        isotherm = self.eos_cases[0].at_T(300.0)
+        assert np.ndim(isotherm.P(1e-3)) == 0
+        assert np.ndim(isotherm.derivatives(1e-3).d2P_dv2_T) == 0
+
+    def test_generic_eos(self):
+        virial = eos.EOSVirial2ndOrder(eos.AbbottVirialCoefficient(**self.ammonia))
+        isotherm = virial.at_T(400.0)
+        assert type(isotherm) is eos.Isotherm
+        assert isotherm.P(self.v[-3:]) == pytest.approx(virial.P(400.0, self.v[-3:]))
+
+    def test_invalid_arguments(self):
+        with pytest.raises(ValueError):
+            self.eos_cases[0].at_T(np.array([300.0, 400.0]))
+        with pytest.raises(ValueError):
+            self.eos_cases[0].at_T(-300.0)
+        with pytest.raises(ValueError):
+            self.eos_cases[0].at_T(300.0).P(-1e-3)
+
+
+class TestIsochore:
+    eos_cases = TestIsotherm.eos_cases
+    T = np.linspace(420.0, 600.0, 8)
+
+    @pytest.mark.parametrize('example_eos', eos_cases)
+    @pytest.mark.parametrize('v', [1e-4, 1e-2])
+    def test_matches_eos(self, example_eos, v):
+        isochore = example_eos.at_v(v)
+        assert isochore.P(self.T) == pytest.approx(example_eos.P(self.T, v), rel=1e-13)
+        assert_fields_approx(isochore.derivatives(self.T), example_eos.derivatives(self.T, v), rel=1e-12)
+        for name in ('z', 'dP_dT_v', 'dP_dv_T', 'd2P_dT2_v', 'd2P_dTdv', 'd2P_dv2_T'):
+            assert getattr(isochore, name)(self.T) == pytest.approx(getattr(example_eos, name)(self.T, v),
+                                                                   rel=1e-12)
+        assert isochore.T(isochore.P(self.T)) == pytest.approx(self.T, rel=1e-10)
+
+    def test_volume_terms_cached_for_constant_shift(self):
+        assert type(self.eos_cases[2].at_v(1e-3)).__name__ == '_CubicIsochore'
+        assert type(self.eos_cases[3].at_v(1e-3)) is eos.Isochore
+
+    def test_invalid_arguments(self):
+        with pytest.raises(ValueError):
+            self.eos_cases[0].at_v(np.array([1e-3, 1e-2]))
+        with pytest.raises(ValueError):
+            self.eos_cases[0].at_v(1e-3).P(-300.0)
+
+
+class TestCubicVirialCoefficient:
+    @pytest.mark.parametrize('cubic', [
+        eos.PurePREOS(Pc=22064000.0, Tc=647.096, omega=0.3443),
+        eos.PureSRKEOS(Pc=22064000.0, Tc=647.096, omega=0.3443,
+                       shift=eos.PolynomialShift(Tc=647.096, coeffs=[3e-6, -2e-6, 1.5e-6])),
+    ])
+    @pytest.mark.parametrize('T', [400.0, 800.0])
+    def test_low_density_limit(self, cubic, T):
+        B = eos.CubicVirialCoefficient(cubic)
+        v = 10.0
+        assert (cubic.z(T, v) - 1 - B(T) / v) * v ** 2 == pytest.approx(B.C(T), rel=1e-3)
+        assert B.dB_dT(T) == pytest.approx(eos.VirialCoefficient.dB_dT(B, T))
+        assert B.d2B_dT2(T) == pytest.approx(eos.VirialCoefficient.d2B_dT2(B, T))
+
+
+class TestAdaptiveEOS:
+    cubic = eos.PurePREOS(Pc=22064000.0, Tc=647.096, omega=0.3443)
+    P_grid, T_grid = np.meshgrid(np.geomspace(1e3, 5e7, 40), np.linspace(300.0, 1200.0, 40))
+
+    @pytest.mark.parametrize('tol', [1e-3, 1e-4, 1e-6])
+    def test_accuracy_against_cubic(self, tol):
+        adaptive = eos.AdaptiveEOS(self.cubic, tol=tol)
+        v = self.cubic.v(self.P_grid, self.T_grid)
+        assert np.max(np.abs(adaptive.z(self.T_grid, v) - self.cubic.z(self.T_grid, v))) <= tol
+        assert np.max(np.abs(adaptive.v(self.P_grid, self.T_grid) / v - 1)) <= 2 * tol
+        assert adaptive.P(self.T_grid, v) == pytest.approx(self.P_grid, rel=2 * tol)
+
+    def test_dispatch_counts(self):
+        adaptive = eos.AdaptiveEOS(self.cubic, tol=1e-4, count_dispatch=True)
+        adaptive.v(self.P_grid, self.T_grid)
+        counts = adaptive.dispatch_counts
+        assert sum(counts.values()) == self.P_grid.size
+        assert all(count > 0 for count in counts.values())
+        assert all(type(count) is int for count in counts.values())
+        codes = adaptive.select(self.P_grid, self.T_grid)
+        for code, name in enumerate(eos.AdaptiveEOS.MODEL_NAMES):
+            assert counts[name] == np.count_nonzero(codes == code)
+        adaptive.reset_dispatch_counts()
+        assert sum(adaptive.dispatch_counts.values()) == 0
+
+    def test_dispatch_counts_off_by_default(self):
+        adaptive = eos.AdaptiveEOS(self.cubic, tol=1e-4)
+        adaptive.v(self.P_grid, self.T_grid)
+        assert adaptive._counts is None
+        with pytest.raises(ValueError):
+            adaptive.dispatch_counts
+        with pytest.raises(ValueError):
+            adaptive.reset_dispatch_counts()
+
+    def test_dispatch_counts_across_threads(self):
+        adaptive = eos.AdaptiveEOS(self.cubic, tol=1e-4, count_dispatch=True)
+        with ThreadPoolExecutor(4) as executor:
+            list(executor.map(lambda _: adaptive.v(self.P_grid, self.T_grid), range(40)))
+        assert sum(adaptive.dispatch_counts.values()) == 40 * self.P_grid.size
+
+    def test_same_model_from_any_pair(self):
+        # Every method selects on the same density, so a state is routed
+        # the same way whether it is given by (P, T), (T, v) or (P, v)
+        adaptive = eos.AdaptiveEOS(self.cubic, tol=1e-4, count_dispatch=True)
+        v = adaptive.v(self.P_grid, self.T_grid)
+        by_PT = adaptive.dispatch_counts
+        adaptive.reset_dispatch_counts()
+        adaptive.P(self.T_grid, v)
+        assert adaptive.dispatch_counts == by_PT
+        adaptive.reset_dispatch_counts()
+        adaptive.T(self.P_grid, v)
+        assert adaptive.dispatch_counts == by_PT
+
+    def test_low_pressure_uses_ideal_gas(self):
+        adaptive = eos.AdaptiveEOS(self.cubic, tol=1e-3)
+        assert adaptive.select(100.0, 1000.0) == eos.AdaptiveEOS.IDEAL
+        assert adaptive.v(100.0, 1000.0) == R * 1000.0 / 100.0
+
+    @pytest.mark.parametrize('P, T', [
+        (0.9 * 3.5e5, 410.0),  # just below the vapor pressure
+        (1e6, 350.0),  # compressed liquid
+        (22064000.0, 647.096),  # critical point
+    ])
+    def test_falls_back_to_cubic(self, P, T):
+        adaptive = eos.AdaptiveEOS(self.cubic, tol=0.5)
+        assert adaptive.select(P, T) == eos.AdaptiveEOS.CUBIC
+        assert adaptive.v(P, T) == self.cubic.v(P, T)
+
+    def test_T_inversion(self):
+        adaptive = eos.AdaptiveEOS(self.cubic, tol=1e-6)
+        v = adaptive.v(self.P_grid, self.T_grid)
+        assert adaptive.T(self.P_grid, v) == pytest.approx(self.T_grid, rel=1e-5)
+
+    def test_tuple_results(self):
+        adaptive = eos.AdaptiveEOS(self.cubic, tol=1e-4)
+        T, v = np.array([1000.0, 500.0, 350.0]), np.array([10.0, 0.01, 2e-5])
+        derivs = adaptive.derivatives(T, v)
+        assert isinstance(derivs, eos.PDerivatives)
+        assert derivs.dP_dv_T[2] == pytest.approx(self.cubic.dP_dv_T(350.0, 2e-5))
+        res = adaptive.residual_properties(T, v)
+        assert isinstance(res, eos.ResidualProperties)
+        assert res.h_res[2] == pytest.approx(self.cubic.residual_properties(350.0, 2e-5).h_res)
+        assert res.h_res[0] == pytest.approx(self.cubic.residual_properties(1000.0, 10.0).h_res, abs=1e-4 * R * 1000.0)
+        assert np.ndim(adaptive.P(500.0, 0.01)) == 0
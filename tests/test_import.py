@@ -0,0 +1,52 @@
+import os
+import subprocess
+import sys
+import pytest
+import pytherm
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(pytherm.__file__)))
+
+
+def import_times(code):
+    """Run code in a fresh interpreter under ``-X importtime``, returning {module: (self, cumulative)} in s."""
+    env = dict(os.environ, PYTHONPATH=os.pathsep.join(filter(None, [ROOT, os.environ.get('PYTHONPATH')])))
+    result = subprocess.run([sys.executable, '-X', 'importtime', '-c', code],
+                            capture_output=True, text=True, check=True, cwd=ROOT, env=env)
+    times = {}
+    for line in result.stderr.splitlines():
+        if not line.startswith('import time:') or 'self [us]' in line:
+            continue
+        self_us, cumulative_us, name = line[len('import time:'):].split('|')
+        times[name.strip()] = (int(self_us) * 1e-6, int(cumulative_us) * 1e-6)
+    return times
+
+
+class TestImport:
+    @pytest.mark.parametrize('code', [
+        'from pytherm.eos import PurePREOS\n'
+        'eos = PurePREOS(4.6e6, 190.6, 0.011)\n'
+        'eos.v(1e6, 200.0); eos.derivatives(200.0, 1e-3); eos.residual_properties(200.0, 1e-3)\n'
+        'eos.at_T(200.0).P(1e-3); eos.at_v(1e-3).P(200.0)',
+        'from pytherm.data import R, load_gkkr_substance\n'
+        'from pytherm.prop import corr_from_record\n'
+        'water = load_gkkr_substance("Water")\n'
+        'corr_from_record(water["Correlations"]["Vapor Pressure"][0], Tc=water["Tc"], Pc=water["Pc"])(373.15)',
+        'import pytherm.model, pytherm.envelope, pytherm.sensitivity, pytherm.regress, pytherm.state\n'
+        'import pytherm.transport',
+    ])
+    def test_analytic_paths_do_not_import_scipy(self, code):
+        modules = import_times(code)
+        assert 'pytherm' in modules
+        assert not [name for name in modules if name.split('.')[0] == 'scipy']
+
+    def test_eos_import_time(self):
+        # Generous, since bytecode may not be cached; SciPy alone used to take several times this
+        modules = import_times('import pytherm.eos')
+        own = modules['pytherm.eos'][1] - sum(modules[name][1] for name in modules if name.split('.')[0] == 'numpy'
+                                              and '.' not in name)
+        assert own < 0.25
+
+    def test_numerical_fallback_imports_scipy(self):
+        modules = import_times('from pytherm.eos import PurePREOS\n'
+                               'PurePREOS(4.6e6, 190.6, 0.011).integrate_dh_dP_T(200.0, 1e-3, 1e-2)')
+        assert 'scipy.integrate' in modules
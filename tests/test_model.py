@@ -0,0 +1,140 @@
+import pytest
+import numpy as np
+from pytherm.eos import PurePREOS
+from pytherm.model import FluidModel, IdealGasMixture
+from pytherm.prop import AlyLeeCorr, Wagner5Corr
+from pytherm.data import R
+
+
+@pytest.fixture
+def water():
+    cp_ideal = AlyLeeCorr(A=33484.75, B=9275.30, C=1218.48, D=20241.42, E=2919.59, T_min=278, T_max=1273)
+    return FluidModel(PurePREOS(Pc=22064000.0, Tc=647.096, omega=0.3443), cp_ideal=cp_ideal, M=0.018015)
+
+
+class TestFluidModel:
+    def test_requires_one_heat_capacity(self):
+        with pytest.raises(ValueError):
+            FluidModel(PurePREOS(Pc=22064000.0, Tc=647.096, omega=0.3443))
+
+    def test_properties_ideal_gas_limit(self, water):
+        T, v = 500.0, 100.0
+        props = water.properties(T, v)
+        assert props.cp == pytest.approx(water.cp_ideal(T), rel=1e-5)
+        assert props.cv == pytest.approx(water.cp_ideal(T) - R, rel=1e-5)
+        assert props.w == pytest.approx(np.sqrt(props.cp / props.cv * R * T / 0.018015), rel=1e-5)
+        assert props.h_res == pytest.approx(0.0, abs=0.1)
+        assert props.ln_phi == pytest.approx(0.0, abs=1e-5)
+
+    @pytest.mark.parametrize('T, v', [(493.15, 0.0018015), (800.0, 1e-4)])
+    def test_properties_cp_from_enthalpy(self, water, T, v):
+        # cp = (∂h/∂T)_P, with P held constant by re-solving for v
+        P = water.P(T, v)
+        dT = T * 1e-5
+
+        def h(T_est):
+            return water.properties(T_est, water.v(P, T_est)).h_res
+
+        cp_res = (h(T + dT) - h(T - dT)) / (2 * dT)
+        assert water.properties(T, v).cp == pytest.approx(water.cp_ideal(T) + cp_res, rel=1e-3)
+
+    def test_speed_of_sound_requires_molar_mass(self):
+        model = FluidModel(PurePREOS(Pc=22064000.0, Tc=647.096, omega=0.3443),
+                           cp_ideal=AlyLeeCorr(A=33484.75, B=9275.30, C=1218.48, D=20241.42, E=2919.59,
+                                               T_min=278, T_max=1273))
+        assert np.isnan(model.properties(500.0, 0.01).w)
+
+
+class TestFromGKKR:
+    def test_water(self, water):
+        model = FluidModel.from_gkkr('water')
+        assert model.v(1e5, 500.0) == pytest.approx(water.v(1e5, 500.0))
+        assert model.cp_ideal(500.0) == pytest.approx(water.cp_ideal(500.0))
+
+    def test_unknown_substance(self):
+        with pytest.raises(KeyError):
+            FluidModel.from_gkkr('Unobtainium')
+
+    def test_properties_batch(self, water):
+        T = np.linspace(300.0, 900.0, 40)
+        v = water.v(1e5, T)
+        batch = water.properties_batch(T, v)
+        expected = water.properties(T, v)
+        assert batch.fields == expected._fields
+        for name, values in expected._asdict().items():
+            assert np.array_equal(batch[name], values), name
+
+        address = batch.data.ctypes.data
+        assert water.properties_batch(T[::-1], v[::-1], out=batch) is batch
+        assert batch.data.ctypes.data == address
+        assert np.array_equal(batch.cp, expected.cp[::-1])
+        with pytest.raises(ValueError):
+            water.properties_batch(T[:10], v[:10], out=batch)
+        with pytest.raises(ValueError):
+            water.properties_batch(np.full((2, 2), 400.0), 1e-2)
+        assert len(water.properties_batch(400.0, 1e-2)) == 1
+
+
+@pytest.fixture(scope='module')
+def mixture():
+    # Aly-Lee (including negative C) and PPDS correlations
+    return IdealGasMixture.from_gkkr(['Methane', 'Ethane', 'Propane', 'Nitrogen', 'Carbon dioxide', 'Acetone'])
+
+
+def quadrature(func, T1, T2, order=40):
+    nodes, weights = np.polynomial.legendre.leggauss(order)
+    half = (T2 - T1) / 2
+    return half * sum(w * func(T1 + half * (1 + x)) for x, w in zip(nodes, weights))
+
+
+class TestIdealGasMixture:
+    T = np.linspace(300.0, 1000.0, 8)
+
+    def test_components(self, mixture):
+        cp = mixture.cp_components(self.T)
+        assert cp.shape == (len(mixture), len(self.T))
+        for row, corr in zip(cp, mixture.correlations):
+            assert row == pytest.approx(corr(self.T), rel=1e-13)
+
+    @pytest.mark.parametrize('i', range(6))
+    def test_pure_components_match_quadrature(self, mixture, i):
+        corr, x = mixture.correlations[i], np.eye(len(mixture))[i]
+        assert mixture.h(self.T, x) == pytest.approx(quadrature(corr, 298.15, self.T), rel=1e-12, abs=1e-8)
+        assert mixture.s(self.T, 1e5, x) == pytest.approx(quadrature(lambda T: corr(T) / T, 298.15, self.T),
+                                                          rel=1e-12, abs=1e-10)
+
+    def test_mixing(self, mixture):
+        x = np.array([0.8, 0.1, 0.05, 0.03, 0.02, 0.0])
+        cp = mixture.cp_components(self.T)
+        assert mixture.cp(self.T, x) == pytest.approx(x @ cp, rel=1e-14)
+        assert mixture.cv(self.T, x) == pytest.approx(x @ cp - R, rel=1e-14)
+        pure = [mixture.h(self.T, e) for e in np.eye(len(mixture))]
+        assert mixture.h(self.T, x) == pytest.approx(x @ pure, rel=1e-12)
+
+    def test_reference_state(self, mixture):
+        x = np.full(len(mixture), 1 / len(mixture))
+        assert mixture.h(298.15, x) == pytest.approx(0.0, abs=1e-8)
+        assert mixture.s(298.15, 1e5, x) == pytest.approx(R * np.log(len(mixture)), rel=1e-12)
+        assert mixture.s(298.15, 2e5, x) == pytest.approx(R * np.log(len(mixture) / 2), rel=1e-12)
+
+    def test_shapes(self, mixture):
+        x = np.eye(len(mixture))[0]
+        assert np.ndim(mixture.cp(500.0, x)) == 0
+        assert mixture.h(self.T.reshape(2, 4), x).shape == (2, 4)
+        assert mixture.s(self.T, np.full(8, 1e5), x).shape == (8,)
+
+    def test_range_is_common_to_components(self, mixture):
+        assert mixture.T_min == max(corr.T_min for corr in mixture.correlations)
+        assert mixture.T_max == min(corr.T_max for corr in mixture.correlations)
+        with pytest.raises(ValueError):
+            mixture.cp(mixture.T_max + 1, np.eye(len(mixture))[0])
+
+    def test_invalid_arguments(self, mixture):
+        with pytest.raises(ValueError):
+            mixture.cp(500.0, [0.5, 0.5])
+        with pytest.raises(ValueError):
+            mixture.s(500.0, -1.0, np.eye(len(mixture))[0])
+        with pytest.raises(ValueError):
+            IdealGasMixture([Wagner5Corr(Tc=647.096, Pc=220.64, T_min=273, T_max=647)])
+        with pytest.raises(ValueError):
+            IdealGasMixture([])
@@ -1,4 +1,5 @@
 import pytest
+import numpy as np
 from pytherm.prop import *
 
 
@@ -202,3 +203,224 @@ class TestAlyLeeCorr:
         corr = PPDScp_idCorr(T_min=T_min, T_max=T_max, A=A, B=B, C=C, D=D, E=E)
         with pytest.raises(ValueError):
             corr(T)
+
+
+class TestPPDSLiquidDensityCorr:
+    @pytest.mark.parametrize('substance, Tc, rho_c, A, B, C, D, T, prop', [
+        ('Ammonia', 405.5, 224.78, 533.0864, -39.199, 271.407, -72.5196, 310.15, 584.33),
+        ('Methane', 190.564, 162.66, 267.8594, 129.3958, -73.607, 69.9714, 133.15, 388.78),
+        ('n-Hexane', 507.795, 222.82, 537.4149, 87.8736, -283.5449, 344.6594, 293.15, 659.38),
+        ('Ethanol', 513.9, 276.0, 748.619, -412.3645, 776.4385, -436.6754, 343.15, 744.74),
+        ('Benzene', 562.014, 306.28, 502.4341, 531.5958, -663.9853, 469.5977, 343.15, 825.92),
+    ])
+    def test_examples(self, substance, Tc, rho_c, A, B, C, D, T, prop):
+        corr = PPDSLiquidDensityCorr(T_min=0.5 * Tc, T_max=Tc, Tc=Tc, rho_c=rho_c, A=A, B=B, C=C, D=D)
+        assert corr(T) == pytest.approx(prop, rel=5e-5), f'Validate using GKKR data for {substance}'
+
+    def test_raises_error_when_extrapolating(self):
+        corr = PPDSLiquidDensityCorr(T_min=196.0, T_max=405.5, Tc=405.5, rho_c=224.78,
+                                     A=533.0864, B=-39.199, C=271.407, D=-72.5196)
+        with pytest.raises(ValueError):
+            corr(450.0)
+
+
+class TestVectorizedCorrelations:
+    def test_array_input(self):
+        corr = Wagner5Corr(T_min=274, T_max=647.096, Pc=220.64, Tc=647.096,
+                           A=-7.870154, B=1.906774, C=-2.31033, D=-2.06339)
+        T = np.array([300.0, 393.15, 500.0])
+        assert corr(T) == pytest.approx([corr(T_i) for T_i in T])
+
+    def test_array_input_extrapolating(self):
+        corr = Wagner5Corr(T_min=274, T_max=647.096, Pc=220.64, Tc=647.096,
+                           A=-7.870154, B=1.906774, C=-2.31033, D=-2.06339)
+        with pytest.raises(ValueError):
+            corr(np.array([300.0, 700.0]))
+
+
+class TestInverse:
+    @pytest.fixture
+    def water_psat(self):
+        return Wagner5Corr(T_min=274, T_max=647.096, Pc=220.64, Tc=647.096,
+                           A=-7.870154, B=1.906774, C=-2.31033, D=-2.06339)
+
+    @pytest.fixture
+    def ammonia_rho(self):
+        return PPDSLiquidDensityCorr(T_min=196.0, T_max=405.5, Tc=405.5, rho_c=224.78,
+                                     A=533.0864, B=-39.199, C=271.407, D=-72.5196)
+
+    @pytest.mark.parametrize(*TestWagner5Corr.wagner5cases)
+    def test_wagner_round_trip(self, substance, T_min, T_max, Tc, Pc, A, B, C, D, T, prop):
+        corr = Wagner5Corr(T_min=T_min, T_max=T_max, Pc=Pc, Tc=Tc, A=A, B=B, C=C, D=D)
+        assert corr.inverse(corr(T)) == pytest.approx(T, rel=1e-12)
+        assert corr.inverse(prop) == pytest.approx(T, rel=1e-4)
+
+    def test_normal_boiling_point(self, water_psat):
+        assert water_psat.inverse(1.01325) == pytest.approx(373.12, abs=0.02)
+
+    @pytest.mark.parametrize('T', [274.0, 300.0, 500.0, 647.0])
+    def test_derivative(self, water_psat, T):
+        h = 1e-4
+        T_lo, T_hi = max(T - h, 274.0), min(T + h, 647.096)
+        slope = (water_psat(T_hi) - water_psat(T_lo)) / (T_hi - T_lo)
+        assert water_psat._dcalc_dT(T) == pytest.approx(slope, rel=1e-5)
+
+    def test_array_round_trip(self, water_psat, ammonia_rho):
+        for corr in (water_psat, ammonia_rho):
+            T = np.linspace(corr.T_min, corr.T_max, 1001)
+            assert corr.inverse(corr(T)) == pytest.approx(T, rel=1e-11)
+
+    def test_decreasing_correlation(self, ammonia_rho):
+        assert ammonia_rho.inverse(ammonia_rho(310.15)) == pytest.approx(310.15, rel=1e-12)
+        assert ammonia_rho.inverse(224.78) == pytest.approx(405.5, rel=1e-9)
+
+    def test_out_of_range(self, water_psat, ammonia_rho):
+        with pytest.raises(ValueError):
+            water_psat.inverse(250.0)
+        with pytest.raises(ValueError):
+            ammonia_rho.inverse(np.array([600.0, 800.0]))
+
+    def test_build_inverse(self, water_psat, ammonia_rho):
+        for corr in (water_psat, ammonia_rho):
+            T = np.linspace(corr.T_min, corr.T_max, 10001)
+            value = corr(T)
+            T_newton = corr.inverse(value)
+            assert corr.build_inverse(tol=1e-9) is corr
+            assert np.max(np.abs(corr.inverse(value) - T_newton)) < 2e-9
+            assert corr.inverse(value[5000]) == pytest.approx(T[5000], abs=2e-9)
+
+    def test_build_inverse_keeps_equality(self, water_psat):
+        other = Wagner5Corr(T_min=274, T_max=647.096, Pc=220.64, Tc=647.096,
+                            A=-7.870154, B=1.906774, C=-2.31033, D=-2.06339)
+        assert water_psat.build_inverse() == other
+
+
+class TestSurrogate:
+    @pytest.fixture
+    def water_psat(self):
+        return Wagner5Corr(T_min=274, T_max=647.096, Pc=220.64, Tc=647.096,
+                           A=-7.870154, B=1.906774, C=-2.31033, D=-2.06339)
+
+    @pytest.fixture
+    def water_cp(self):
+        return AlyLeeCorr(T_min=278, T_max=1273, A=33484.75, B=9275.30, C=1218.48, D=20241.42, E=2919.59)
+
+    @pytest.fixture
+    def ammonia_rho(self):
+        return PPDSLiquidDensityCorr(T_min=196.0, T_max=405.5, Tc=405.5, rho_c=224.78,
+                                     A=533.0864, B=-39.199, C=271.407, D=-72.5196)
+
+    @pytest.mark.parametrize('tol', [1e-6, 1e-10, 1e-13])
+    def test_relative_error(self, water_psat, water_cp, tol):
+        for corr in (water_psat, water_cp):
+            T = np.random.default_rng(0).uniform(corr.T_min, corr.T_max, 100000)
+            surrogate = compile_surrogate(corr, tol)
+            assert np.max(np.abs(surrogate(T) / corr(T) - 1)) < tol
+
+    def test_absolute_error(self, water_psat):
+        T = np.linspace(274, 647.096, 100001)
+        surrogate = compile_surrogate(water_psat, 1e-9, relative=False)
+        assert np.max(np.abs(surrogate(T) - water_psat(T))) < 1e-9
+
+    def test_scalar_input(self, water_psat):
+        surrogate = compile_surrogate(water_psat)
+        for T in (274.0, 373.15, np.float64(500.0), np.array(647.096)):
+            assert surrogate(T) == pytest.approx(water_psat(T), rel=1e-12)
+            assert np.ndim(surrogate(T)) == 0
+
+    def test_refined_cells(self, water_psat):
+        # Pieces next to the critical point are finer than the grid of
+        # cells, and are evaluated piece by piece
+        surrogate = compile_surrogate(water_psat)
+        assert surrogate._table._any_refined
+        T = np.concatenate([647.096 - np.geomspace(1e-9, 1.0, 1000), [274.0, 647.096]])
+        result = surrogate(T)
+        assert np.max(np.abs(result / water_psat(T) - 1)) < 1e-12
+        assert [surrogate(float(x)) for x in T] == pytest.approx(result, rel=1e-14)
+        # The cells are the same polynomials as the pieces
+        table, T = surrogate._table, np.random.default_rng(0).uniform(274.0, 647.096, 10000)
+        assert table(T) == pytest.approx(table._call_pieces(T), rel=1e-13)
+        assert surrogate.derivative(T) == pytest.approx(table._clenshaw(table._derivatives[1], *table._locate(T)),
+                                                        rel=1e-10)
+
+    def test_derivative(self, water_psat):
+        surrogate = compile_surrogate(water_psat)
+        T = np.linspace(274, 640, 101)
+        assert surrogate.derivative(T) == pytest.approx(water_psat._dcalc_dT(T), rel=1e-8)
+        h = 1e-3
+        second = (water_psat._dcalc_dT(T + h) - water_psat._dcalc_dT(T - h)) / (2 * h)
+        assert surrogate.derivative(T, order=2) == pytest.approx(second, rel=1e-5)
+
+    def test_integral(self, water_cp):
+        def enthalpy(T):
+            # Exact antiderivative of the Aly-Lee equation
+            return (water_cp.A * T + water_cp.B * water_cp.C / np.tanh(water_cp.C / T) -
+                    water_cp.D * water_cp.E * np.tanh(water_cp.E / T)) / 1000
+
+        surrogate = compile_surrogate(water_cp)
+        T1, T2 = np.array([278.0, 300.0, 1000.0]), np.array([1273.0, 301.0, 400.0])
+        assert surrogate.integral(T1, T2) == pytest.approx(enthalpy(T2) - enthalpy(T1), rel=1e-12)
+        assert surrogate.integral(300.0, 300.0) == 0.0
+
+    def test_jet_input(self, water_psat):
+        from pytherm.ad import Jet
+        surrogate = compile_surrogate(water_psat)
+        T = Jet.seed(np.array([300.0, 500.0]))[0]
+        expected, result = water_psat(T), surrogate(T)
+        assert result.val == pytest.approx(expected.val, rel=1e-12)
+        assert result.grad == pytest.approx(expected.grad, rel=1e-8)
+        assert result.hess == pytest.approx(expected.hess, rel=1e-5)
+
+    def test_interchangeable(self, water_psat):
+        surrogate = compile_surrogate(water_psat)
+        assert isinstance(surrogate, TDepCorrelation)
+        assert (surrogate.T_min, surrogate.T_max, surrogate.Tc, surrogate.Pc) == (274, 647.096, 647.096, 220.64)
+        assert surrogate.inverse(1.01325) == pytest.approx(373.12, abs=0.02)
+        with pytest.raises(ValueError):
+            surrogate(700.0)
+        with pytest.raises(ValueError):
+            surrogate.integral(300.0, 700.0)
+        with pytest.raises(AttributeError):
+            surrogate.rho_c
+
+    def test_narrower_range(self, ammonia_rho):
+        surrogate = compile_surrogate(ammonia_rho, 1e-12, T_max=400.0)
+        assert surrogate.T_max == 400.0
+        T = np.linspace(196.0, 400.0, 10001)
+        assert np.max(np.abs(surrogate(T) / ammonia_rho(T) - 1)) < 1e-12
+        with pytest.raises(ValueError):
+            compile_surrogate(ammonia_rho, T_max=410.0)
+
+    def test_unreachable_tolerance(self, ammonia_rho):
+        # The derivative is infinite at the critical point
+        with pytest.raises(ValueError):
+            compile_surrogate(ammonia_rho, 1e-12)
+
+
+class TestCorrFromRecord:
+    def test_gkkr_verification_points(self):
+        from pytherm.data import load_gkkr_data
+        from pytherm.util import skip_validation
+        # Verification values given in other units than the correlations return
+        units = {'Liquid Viscosity': 1e-3, 'Ideal Vapor Viscosity': 1e-6, 'Surface Tension': 1e-3}
+        n_checked = 0
+        for name, substance in load_gkkr_data().items():
+            for prop, records in substance['Correlations'].items():
+                for record in records:
+                    if record['Type'] not in CORRELATION_TYPES:
+                        continue
+                    corr = corr_from_record(record, Tc=substance['Tc'], Pc=substance['Pc'])
+                    expected = record['prop_verify'] * units.get(prop, 1.0)
+                    # Some verification values are rounded to three significant figures
+                    decimals = len(repr(float(record['prop_verify'])).partition('.')[2])
+                    rounding = 0.5 * 10.0 ** -decimals * units.get(prop, 1.0)
+                    # Some GKKR liquid density ranges are misaligned with their substances
+                    with skip_validation():
+                        assert corr(record['T_verify']) == pytest.approx(expected, rel=1e-3, abs=rounding), \
+                            f'{name}: {record["Type"]}'
+                    n_checked += 1
+        assert n_checked > 100
+
+    def test_unknown_type(self):
+        with pytest.raises(ValueError):
+            corr_from_record({'Type': 'Antoine', 'A': 1.0})
@@ -0,0 +1,126 @@
+import pytest
+import numpy as np
+from pytherm.data import load_gkkr_substance
+from pytherm.prop import *
+from pytherm.regress import FitProblem, fit_correlation, fit_correlations
+
+
+def gkkr_corr(substance, name):
+    data = load_gkkr_substance(substance)
+    return corr_from_record(data['Correlations'][name][0], Tc=data['Tc'], Pc=data['Pc'])
+
+
+def sample(corr, n=40, noise=0.0, seed=0):
+    T_max = min(corr.T_max, getattr(corr, 'Tc', np.inf) - 1e-3)
+    T = np.linspace(corr.T_min, T_max, n)
+    return T, corr(T) * (1 + noise * np.random.default_rng(seed).standard_normal(n))
+
+
+class TestFitCorrelation:
+    def test_wagner(self):
+        corr = gkkr_corr('Water', 'Vapor Pressure')
+        result = fit_correlation(Wagner5Corr, *sample(corr), constants={'Tc': corr.Tc, 'Pc': corr.Pc})
+        assert result.converged
+        assert result.max_error < 1e-10
+        for name in 'ABCD':
+            assert getattr(result.correlation, name) == pytest.approx(getattr(corr, name), rel=1e-6)
+
+    def test_liquid_density(self):
+        corr = gkkr_corr('Methanol', 'Liquid Density')
+        result = fit_correlation(PPDSLiquidDensityCorr, *sample(corr),
+                                 constants={'Tc': corr.Tc, 'rho_c': corr.rho_c})
+        assert result.converged
+        assert result.max_error < 1e-5
+
+    @pytest.mark.parametrize('substance', ['Water', 'Nitrogen', 'Acetone'])
+    def test_aly_lee_from_default_starts(self, substance):
+        corr = gkkr_corr(substance, 'Ideal Gas cp')
+        result = fit_correlation(AlyLeeCorr, *sample(corr))
+        assert result.converged
+        assert result.rms < 1e-8
+
+    def test_ppds_cp_from_similar_fluid(self):
+        corr = gkkr_corr('Propane', 'Ideal Gas cp')
+        ethane = gkkr_corr('Ethane', 'Ideal Gas cp')
+        result = fit_correlation(PPDScp_idCorr, *sample(corr, noise=1e-4),
+                                 initial={name: getattr(ethane, name) for name in 'ABCDEFG'})
+        assert result.rms < 1.5e-4
+
+    def test_noisy_data(self):
+        corr = gkkr_corr('Ammonia', 'Vapor Pressure')
+        T, values = sample(corr, n=200, noise=1e-3)
+        result = fit_correlation(Wagner5Corr, T, values, constants={'Tc': corr.Tc, 'Pc': corr.Pc})
+        assert result.converged
+        assert result.rms == pytest.approx(1e-3, rel=0.2)
+        assert result.correlation(T) == pytest.approx(corr(T), rel=1e-3)
+
+    def test_subset_of_coefficients(self):
+        corr = gkkr_corr('Water', 'Vapor Pressure')
+        result = fit_correlation(Wagner5Corr, *sample(corr), params=('A', 'B'),
+                                 constants={'Tc': corr.Tc, 'Pc': corr.Pc, 'C': corr.C, 'D': corr.D})
+        assert (result.correlation.C, result.correlation.D) == (corr.C, corr.D)
+        assert result.correlation.A == pytest.approx(corr.A, rel=1e-6)
+
+    def test_absolute_deviations(self):
+        corr = gkkr_corr('Ethanol', 'Liquid Density')
+        T, values = sample(corr, noise=1e-3)
+        relative = fit_correlation(PPDSLiquidDensityCorr, T, values, constants={'Tc': corr.Tc, 'rho_c': corr.rho_c})
+        absolute = fit_correlation(PPDSLiquidDensityCorr, T, values, constants={'Tc': corr.Tc, 'rho_c': corr.rho_c},
+                                   relative=False)
+        assert np.sum((absolute.correlation(T) - values) ** 2) <= np.sum((relative.correlation(T) - values) ** 2)
+        assert absolute.rms == pytest.approx(np.sqrt(np.mean((absolute.correlation(T) - values) ** 2)), rel=1e-9)
+
+    def test_range_from_data(self):
+        corr = gkkr_corr('Water', 'Vapor Pressure')
+        T, values = sample(corr)
+        result = fit_correlation(Wagner5Corr, T[5:30], values[5:30], constants={'Tc': corr.Tc, 'Pc': corr.Pc})
+        assert (result.correlation.T_min, result.correlation.T_max) == (T[5], T[29])
+        assert result.n_points == 25
+
+    def test_missing_constant(self):
+        corr = gkkr_corr('Water', 'Vapor Pressure')
+        with pytest.raises(ValueError):
+            fit_correlation(Wagner5Corr, *sample(corr), constants={'Tc': corr.Tc})
+
+    def test_mismatched_data(self):
+        with pytest.raises(ValueError):
+            fit_correlation(Wagner5Corr, [300.0, 400.0], [1.0], constants={'Tc': 647.096, 'Pc': 220.64})
+
+    def test_default_mappings_are_read_only(self):
+        problem = FitProblem(Wagner5Corr, np.array([300.0]), np.array([1.0]))
+        with pytest.raises(TypeError):
+            problem.constants['Tc'] = 647.096
+        with pytest.raises(TypeError):
+            problem.initial['A'] = -7.8
+
+
+class TestFitCorrelations:
+    def test_batch_matches_single_fits(self):
+        problems = []
+        for substance in ('Water', 'Methane', 'n-Hexane'):
+            corr = gkkr_corr(substance, 'Vapor Pressure')
+            # Different numbers of points, so the batch is padded
+            problems.append(FitProblem(Wagner5Corr, *sample(corr, n=20 + 10 * len(problems), noise=1e-4),
+                                       constants={'Tc': corr.Tc, 'Pc': corr.Pc}))
+            corr = gkkr_corr(substance, 'Ideal Gas cp')
+            problems.append(FitProblem(type(corr), *sample(corr, noise=1e-4)))
+
+        results = fit_correlations(problems)
+        assert [type(result.correlation) for result in results] == [problem.cls for problem in problems]
+        for problem, result in zip(problems, results):
+            single = fit_correlations([problem])[0]
+            assert result.rms == pytest.approx(single.rms, rel=1e-6)
+            assert result.n_points == problem.T.size
+
+
+class TestRecord:
+    def test_round_trip(self):
+        corr = gkkr_corr('Water', 'Vapor Pressure')
+        T, values = sample(corr, noise=1e-4)
+        result = fit_correlation(Wagner5Corr, T, values, constants={'Tc': corr.Tc, 'Pc': corr.Pc})
+        record = result.record(source='Lab data')
+        assert record['Type'] == 'Wagner 2.5-5 Form'
+        assert record['Source'] == 'Lab data'
+        assert record['T_verify'] == pytest.approx(np.median(T))
+        assert corr_from_record(record)(record['T_verify']) == pytest.approx(record['prop_verify'], rel=1e-12)
+        assert corr_from_record(record)(T) == pytest.approx(result.correlation(T), rel=1e-12)
@@ -0,0 +1,101 @@
+import pytest
+import numpy as np
+from pytherm import eos
+from pytherm.consistency import derivative
+from pytherm.envelope import saturation_point
+from pytherm.sensitivity import saturation_sensitivities, sensitivities
+
+
+METHANE = {'Pc': 4599000.0, 'Tc': 190.56, 'omega': 0.011}
+WATER = {'Pc': 22064000.0, 'Tc': 647.096, 'omega': 0.3443}
+
+
+def shifted_pr(Pc, Tc, omega):
+    return eos.PurePREOS(Pc, Tc, omega, shift=eos.PurePREOS.peneloux_shift(Pc, Tc, omega))
+
+
+def finite_difference(factory, params, name, func):
+    """
+    Derivative of func(eos) with respect to one parameter, rebuilding the
+    EOS for each perturbation.
+    """
+    def f(x):
+        return func(factory(**dict(params, **{name: x})))
+    return derivative(f, params[name], dx=1e-4 * abs(params[name]))
+
+
+class TestSensitivities:
+    T = np.array([150.0, 200.0, 300.0, 450.0])
+    P = np.array([1e5, 5e6, 2e7, 1e6])
+
+    @pytest.mark.parametrize('factory', [eos.PurePREOS, eos.PurePR78EOS, eos.PureSRKEOS, shifted_pr])
+    @pytest.mark.parametrize('name', ['Pc', 'Tc', 'omega'])
+    def test_constant_pressure(self, factory, name):
+        sens = sensitivities(factory, METHANE, self.T, P=self.P, properties=('v', 'z', 'h_res', 'ln_phi'))
+        expected_v = finite_difference(factory, METHANE, name, lambda e: e.v(self.P, self.T))
+        assert sens['v'].d(name) == pytest.approx(expected_v, rel=1e-6)
+        for prop in ('z', 'h_res', 'ln_phi'):
+            expected = finite_difference(
+                factory, METHANE, name,
+                lambda e: getattr(e.residual_properties(self.T, e.v(self.P, self.T)), prop))
+            assert sens[prop].d(name) == pytest.approx(expected, rel=1e-5, abs=1e-9)
+
+    @pytest.mark.parametrize('name', ['Pc', 'Tc', 'omega'])
+    def test_constant_volume(self, name):
+        v = np.array([4e-5, 1e-4, 1e-3, 1e-2])
+        sens = sensitivities(eos.PurePREOS, METHANE, self.T, v=v, properties=('P', 's_res'))
+        expected = finite_difference(eos.PurePREOS, METHANE, name, lambda e: e.P(self.T, v))
+        assert sens['P'].d(name) == pytest.approx(expected, rel=1e-6)
+        assert sens['P'].value == pytest.approx(eos.PurePREOS(**METHANE).P(self.T, v), rel=1e-12)
+
+    def test_values_match_eos(self):
+        sens = sensitivities(eos.PurePREOS, METHANE, self.T, P=self.P)
+        pr = eos.PurePREOS(**METHANE)
+        v = pr.v(self.P, self.T)
+        props = pr.residual_properties(self.T, v)
+        assert sens['v'].value == pytest.approx(v, rel=1e-12)
+        assert sens['h_res'].value == pytest.approx(props.h_res, rel=1e-12)
+        assert sens['v'].grad.shape == (4, 3)
+
+    def test_bound_parameters(self):
+        sens = sensitivities(lambda Tc, omega: eos.PurePREOS(4599000.0, Tc, omega),
+                             {'Tc': 190.56, 'omega': 0.011}, self.T, P=self.P, properties=('v',))
+        full = sensitivities(eos.PurePREOS, METHANE, self.T, P=self.P, properties=('v',))
+        assert sens['v'].parameters == ('Tc', 'omega')
+        assert sens['v'].grad == pytest.approx(full['v'].grad[:, 1:], rel=1e-12)
+
+    def test_scalar_state(self):
+        sens = sensitivities(eos.PurePREOS, METHANE, 200.0, P=5e6, properties=('v',))
+        assert np.ndim(sens['v'].value) == 0
+        assert np.ndim(sens['v'].d('Tc')) == 0
+
+    def test_pr78_heavy_component(self):
+        params = {'Pc': 2100000.0, 'Tc': 617.7, 'omega': 0.49 + 0.002}
+        sens = sensitivities(eos.PurePR78EOS, params, 500.0, P=1e6, properties=('v',))
+        expected = finite_difference(eos.PurePR78EOS, params, 'omega', lambda e: e.v(1e6, 500.0))
+        assert sens['v'].d('omega') == pytest.approx(expected, rel=1e-6)
+
+    def test_invalid_arguments(self):
+        with pytest.raises(ValueError):
+            sensitivities(eos.PurePREOS, METHANE, self.T)
+        with pytest.raises(ValueError):
+            sensitivities(eos.PurePREOS, METHANE, self.T, P=self.P, properties=('P',))
+        with pytest.raises(ValueError):
+            sensitivities(eos.PurePREOS, METHANE, self.T, v=self.P, properties=('v',))
+
+
+class TestSaturationSensitivities:
+    @pytest.mark.parametrize('factory', [eos.PurePREOS, eos.PureSRKEOS, shifted_pr])
+    @pytest.mark.parametrize('name', ['Pc', 'Tc', 'omega'])
+    def test_finite_differences(self, factory, name):
+        T = np.array([350.0, 450.0, 600.0])
+        sens = saturation_sensitivities(factory, WATER, T)
+        for i, key in enumerate(('P', 'v_liq', 'v_vap')):
+            expected = finite_difference(
+                factory, WATER, name, lambda e: np.array([saturation_point(e, T_i)[i] for T_i in T]))
+            assert sens[key].d(name) == pytest.approx(expected, rel=1e-5)
+
+    def test_scalar_temperature(self):
+        sens = saturation_sensitivities(eos.PurePREOS, WATER, 450.0)
+        assert sens['P'].value == pytest.approx(saturation_point(eos.PurePREOS(**WATER), 450.0)[0], rel=1e-12)
+        assert np.ndim(sens['P'].d('omega')) == 0
@@ -0,0 +1,86 @@
+import asyncio
+import pytest
+import numpy as np
+from pytherm.model import FluidModel
+from pytherm.service import PropertyService
+
+
+@pytest.fixture
+def water():
+    return FluidModel.from_gkkr('Water')
+
+
+def run(coroutine):
+    return asyncio.run(coroutine)
+
+
+class TestPropertyService:
+    def test_single_request(self, water):
+        async def client():
+            async with PropertyService(water, properties=['v', 'cp']) as service:
+                return await service.props(1e5, 500.0)
+
+        props = run(client())
+        assert props['v'] == pytest.approx(water.v(1e5, 500.0))
+        assert props['cp'] == pytest.approx(water.properties(500.0, props['v']).cp)
+
+    def test_concurrent_requests_are_batched(self, water):
+        P, T = np.geomspace(1e4, 1e6, 50), np.linspace(500.0, 900.0, 50)
+
+        async def client():
+            async with PropertyService(water, properties=['v'], max_latency=0.05) as service:
+                results = await asyncio.gather(*(service.props(P_i, T_i) for P_i, T_i in zip(P, T)))
+            return results, service.stats
+
+        results, stats = run(client())
+        assert [props['v'] for props in results] == pytest.approx(water.v(P, T))
+        assert stats.requests == 50
+        assert stats.batches == 1
+
+    def test_max_batch_size(self, water):
+        async def client():
+            async with PropertyService(water, properties=['v'], max_batch_size=8, max_latency=0.05) as service:
+                await asyncio.gather(*(service.props(1e5, 500.0 + i) for i in range(20)))
+            return service.stats
+
+        stats = run(client())
+        # Two full batches, then the remaining four after max_latency
+        assert stats.batches == 3
+        assert stats.requests == 20
+
+    def test_max_latency(self, water):
+        async def client():
+            async with PropertyService(water, properties=['v'], max_latency=0.001) as service:
+                first = await service.props(1e5, 500.0)
+                second = await service.props(1e5, 600.0)
+            return first, second, service.stats
+
+        first, second, stats = run(client())
+        assert first['v'] < second['v']
+        assert stats.batches == 2
+
+    def test_errors_reach_only_failing_requests(self, water):
+        async def client():
+            async with PropertyService(water, properties=['v', 'cp']) as service:
+                results = await asyncio.gather(service.props(1e5, 500.0), service.props(1e5, 5000.0),
+                                               service.props(1e5, 600.0), return_exceptions=True)
+            return results, service.stats
+
+        results, stats = run(client())
+        assert (stats.requests, stats.batches, stats.retries, stats.errors) == (3, 1, 3, 1)
+        assert stats.mean_batch_size == 3
+        assert isinstance(results[1], ValueError)
+        assert results[0]['v'] == pytest.approx(water.v(1e5, 500.0))
+        assert results[2]['v'] == pytest.approx(water.v(1e5, 600.0))
+
+    def test_invalid_arguments_rejected_immediately(self, water):
+        async def client():
+            async with PropertyService(water) as service:
+                await service.props(-1e5, 500.0)
+
+        with pytest.raises(ValueError):
+            run(client())
+
+    def test_invalid_batch_size(self, water):
+        with pytest.raises(ValueError):
+            PropertyService(water, max_batch_size=0)
@@ -0,0 +1,36 @@
+import pytest
+import numpy as np
+from pytherm.solve import expand_bracket, newton_bracketed
+
+
+class TestExpandBracket:
+    def test_expands_until_negative(self):
+        x = expand_bracket(lambda x, idx: 10.0 - x, np.array([1.0, 20.0]))
+        assert x[0] > 10.0
+        assert x[1] == 20.0
+
+    def test_raises_error_when_unbounded(self):
+        with pytest.raises(RuntimeError):
+            expand_bracket(lambda x, idx: np.ones_like(x), np.array([1.0]), maxiter=10)
+
+
+class TestNewtonBracketed:
+    @pytest.mark.parametrize('target', [1e-6, 0.5, 2.0, 1e6])
+    def test_cube_root(self, target):
+        root = newton_bracketed(lambda x, idx: (x ** 3 - target, 3 * x ** 2),
+                                lo=np.array([0.0]), hi=np.array([max(target, 1.0)]), sign=-1.0)
+        assert root[0] == pytest.approx(target ** (1 / 3), rel=1e-12)
+
+    def test_vectorized(self):
+        targets = np.linspace(1.0, 100.0, 50)
+        roots = newton_bracketed(lambda x, idx: (x ** 2 - targets[idx], 2 * x),
+                                 lo=np.zeros(50), hi=np.full(50, 100.0), sign=-1.0)
+        assert roots == pytest.approx(targets ** 0.5, rel=1e-12)
+
+    def test_guess_outside_bracket_is_ignored(self):
+        # Newton's method on arctan diverges from x0 = 2, bisection rescues it
+        root, n_evals = newton_bracketed(lambda x, idx: (np.arctan(x), 1 / (1 + x ** 2)),
+                                         lo=np.array([-10.0]), hi=np.array([3.0]), sign=-1.0,
+                                         x0=np.array([2.0]), full_output=True)
+        assert root[0] == pytest.approx(0.0, abs=1e-12)
+        assert n_evals[0] < 20
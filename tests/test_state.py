@@ -0,0 +1,150 @@
+import sys
+import pytest
+import numpy as np
+from pytherm import eos
+from pytherm.state import FluidBatch, FluidState, FluidStateBatch
+
+
+@pytest.fixture
+def water():
+    return eos.PurePREOS(Pc=22064000.0, Tc=647.096, omega=0.3443)
+
+
+class TestFluidState:
+    @pytest.mark.parametrize('P, T, v', [
+        (1e5, 400.0, None),
+        (1e5, None, 0.0331),
+        (None, 400.0, 0.0331),
+    ])
+    def test_resolves_missing_variable(self, water, P, T, v):
+        state = FluidState(water, P=P, T=T, v=v)
+        assert water.P(state.T, state.v) == pytest.approx(state.P)
+        assert state.z == pytest.approx(state.P * state.v / eos.R / state.T)
+
+    def test_two_variables_required(self, water):
+        with pytest.raises(ValueError):
+            FluidState(water, P=1e5)
+
+    @pytest.mark.parametrize('P, T, v', [
+        (-1e5, 400.0, None),
+        (1e5, 0.0, None),
+        (None, 400.0, -0.0331),
+    ])
+    def test_positive_values_required(self, water, P, T, v):
+        with pytest.raises(ValueError):
+            FluidState(water, P=P, T=T, v=v)
+
+
+class TestFluidStateBatch:
+    def test_mixed_pairs(self, water):
+        P = np.array([1e5, 1e5, np.nan, 2e6, 5e7])
+        T = np.array([400.0, np.nan, 400.0, 500.0, np.nan])
+        v = np.array([np.nan, 0.0331, 0.0331, np.nan, 3e-5])
+        batch = FluidStateBatch(water, P=P, T=T, v=v)
+        assert len(batch) == 5
+        for i in range(5):
+            state = FluidState(water, **{name: column[i] for name, column in zip('PTv', (P, T, v))
+                                         if not np.isnan(column[i])})
+            assert (batch.P[i], batch.T[i], batch.v[i]) == \
+                   pytest.approx((state.P, state.T, state.v), rel=1e-9)
+            assert batch[i].z == pytest.approx(batch.z[i])
+
+    def test_columns_may_be_omitted(self, water):
+        T = np.linspace(300.0, 900.0, 50)
+        batch = FluidStateBatch(water, P=1e5, T=T)
+        assert batch.v == pytest.approx(water.v(1e5, T))
+        assert batch.P == pytest.approx(np.full(50, 1e5))
+
+    def test_none_marks_missing(self, water):
+        batch = FluidStateBatch(water, P=[1e5, None], T=[400.0, 400.0], v=[None, 0.0331])
+        assert not np.isnan(batch.v[0]) and not np.isnan(batch.P[1])
+
+    def test_underspecified_rows(self, water):
+        with pytest.raises(ValueError, match=r'rows \[1\]'):
+            FluidStateBatch(water, P=[1e5, np.nan], T=[400.0, np.nan], v=[np.nan, 0.0331])
+
+    def test_positive_values_required(self, water):
+        with pytest.raises(ValueError, match=r'T must have a positive value \(rows \[0, 2\]\)'):
+            FluidStateBatch(water, P=[1e5, 1e5, 1e5], T=[-400.0, 400.0, 0.0])
+
+    def test_specified_values_are_kept(self, water):
+        batch = FluidStateBatch(water, P=[1e5], T=[400.0], v=[0.01])
+        assert (batch.P[0], batch.T[0], batch.v[0]) == (1e5, 400.0, 0.01)
+
+    def test_to_batch(self, water):
+        states = FluidStateBatch(water, P=1e5, T=np.linspace(300.0, 900.0, 50))
+        batch = states.to_batch()
+        assert batch.fields == ('P', 'T', 'v', 'z')
+        assert np.array_equal(batch.v, states.v) and np.array_equal(batch.z, states.z)
+        assert states.to_batch(out=batch) is batch
+        with pytest.raises(ValueError):
+            states.to_batch(out=FluidBatch.empty(('P', 'T', 'v', 'z'), 49))
+
+
+class TestFluidBatch:
+    @pytest.fixture
+    def batch(self):
+        data = np.arange(12, dtype=float).reshape(3, 4)
+        return FluidBatch(('P', 'T', 'v'), data)
+
+    def test_columns_share_buffer(self, batch):
+        assert len(batch) == 4
+        assert np.array_equal(batch.T, [4.0, 5.0, 6.0, 7.0])
+        assert batch['v'] is not None and np.shares_memory(batch['v'], batch.data)
+        for name, column in batch.columns().items():
+            assert column.flags.c_contiguous
+            assert np.shares_memory(column, batch.data)
+            assert np.array_equal(column, batch[name])
+        batch.P[:] = -1.0
+        assert np.all(batch.data[0] == -1.0)
+        with pytest.raises(AttributeError):
+            batch.cp
+        with pytest.raises(KeyError):
+            batch['cp']
+
+    def test_array_interface(self, batch):
+        assert np.asarray(batch) is batch.data
+        assert np.shares_memory(np.array(batch, copy=False), batch.data)
+        assert not np.shares_memory(np.array(batch), batch.data)
+        assert np.asarray(batch, dtype=np.float32).dtype == np.float32
+        with pytest.raises(ValueError):
+            np.array(batch, dtype=np.float32, copy=False)
+        view = memoryview(batch.data)
+        assert view.format == 'd' and view.shape == (3, 4) and view.c_contiguous
+
+    @pytest.mark.skipif(sys.version_info < (3, 12), reason='buffer protocol for classes requires Python 3.12')
+    def test_buffer_protocol(self, batch):
+        view = memoryview(batch)
+        assert view.shape == (3, 4)
+        assert np.shares_memory(np.asarray(view), batch.data)
+
+    def test_from_columns(self, batch):
+        columns = {'P': 1e5, 'T': np.arange(4.0), 'v': [1.0, 2.0, 3.0, 4.0]}
+        new = FluidBatch.from_columns(columns, 4)
+        assert new.fields == ('P', 'T', 'v')
+        assert np.array_equal(new.P, np.full(4, 1e5)) and np.array_equal(new.v, columns['v'])
+        assert FluidBatch.from_columns(columns, 4, out=batch) is batch
+        assert np.array_equal(batch.data, new.data)
+        assert FluidBatch.empty(('P', 'T', 'v'), 4, out=batch) is batch
+        with pytest.raises(ValueError):
+            FluidBatch.empty(('P', 'T'), 4, out=batch)
+        with pytest.raises(ValueError):
+            FluidBatch.from_columns(columns, 5, out=batch)
+
+    def test_invalid_buffer(self):
+        with pytest.raises(ValueError):
+            FluidBatch(('P', 'T'), np.zeros((3, 4)))
+        with pytest.raises(ValueError):
+            FluidBatch(('P', 'T'), np.zeros((4, 2)).T)
+        with pytest.raises(ValueError):
+            FluidBatch(('P', 'T'), np.zeros((2, 4), dtype=np.float32))
+
+    def test_to_arrow(self, batch):
+        pyarrow = pytest.importorskip('pyarrow')
+        record_batch = batch.to_arrow()
+        assert record_batch.schema.names == ['P', 'T', 'v']
+        assert record_batch.num_rows == 4
+        column = record_batch.column('T')
+        assert column.type == pyarrow.float64()
+        assert column.buffers()[1].address == batch.T.ctypes.data
+        assert np.array_equal(column.to_numpy(), batch.T)
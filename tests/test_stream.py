@@ -0,0 +1,128 @@
+import csv
+import pytest
+import numpy as np
+from pytherm import eos, stream
+from pytherm.model import FluidModel
+
+
+@pytest.fixture
+def water():
+    return FluidModel.from_gkkr('Water')
+
+
+@pytest.fixture
+def historian(tmp_path):
+    path = tmp_path / 'historian.csv'
+    P = np.geomspace(1e4, 1e6, 25)
+    T = np.linspace(500.0, 900.0, 25)
+    with open(path, 'w', newline='') as file:
+        writer = csv.writer(file)
+        writer.writerow(['timestamp', 'P', 'T'])
+        for i, (P_i, T_i) in enumerate(zip(P, T)):
+            writer.writerow([f'2021-01-01T00:{i:02d}', P_i, T_i])
+    return path, P, T
+
+
+class TestStream:
+    @pytest.mark.parametrize('chunk_size', [1, 7, 25, 100])
+    def test_csv_round_trip(self, water, historian, tmp_path, chunk_size):
+        path, P, T = historian
+        output = tmp_path / 'out.csv'
+        stats = stream.run(str(path), str(output), water, properties=['v', 'z', 'cp'], chunk_size=chunk_size)
+        assert stats.rows == 25
+        assert stats.chunks == -(-25 // chunk_size)
+        assert stats.rows_per_second > 0
+
+        with open(output, newline='') as file:
+            rows = list(csv.DictReader(file))
+        assert [row['timestamp'] for row in rows] == [f'2021-01-01T00:{i:02d}' for i in range(25)]
+        v = water.v(P, T)
+        assert np.array([float(row['v']) for row in rows]) == pytest.approx(v)
+        assert np.array([float(row['cp']) for row in rows]) == pytest.approx(water.properties(T, v).cp)
+
+    def test_unit_conversion(self, water, historian, tmp_path):
+        path, P, T = historian
+        output = tmp_path / 'out.csv'
+        stream.run(str(path), str(output), water, properties=['v'], P_scale=2.0, T_offset=10.0)
+        with open(output, newline='') as file:
+            v = np.array([float(row['v']) for row in csv.DictReader(file)])
+        assert v == pytest.approx(water.v(2.0 * P, T + 10.0))
+
+    def test_eos_residual_properties(self, historian, tmp_path):
+        path, P, T = historian
+        pr = eos.PurePREOS(Pc=22064000.0, Tc=647.096, omega=0.3443)
+        output = tmp_path / 'out.csv'
+        stream.run(str(path), str(output), pr, properties=['v', 'h_res'])
+        with open(output, newline='') as file:
+            h_res = np.array([float(row['h_res']) for row in csv.DictReader(file)])
+        assert h_res == pytest.approx(pr.residual_properties(T, pr.v(P, T)).h_res)
+
+    def test_unknown_property(self, water):
+        with pytest.raises(ValueError):
+            stream.evaluate(water, np.array([1e5]), np.array([500.0]), ['viscosity'])
+
+    def test_validation(self, water, tmp_path):
+        path = tmp_path / 'bad.csv'
+        path.write_text('P,T\n1e5,500\n1e5,5000\n')
+        with pytest.raises(ValueError):
+            stream.run(str(path), str(tmp_path / 'out.csv'), water, properties=['v', 'cp'])
+        stats = stream.run(str(path), str(tmp_path / 'out.csv'), water, properties=['v', 'cp'], validate=False)
+        assert stats.rows == 2
+
+    def test_eos_properties_outside_correlation_range(self, water, tmp_path):
+        # Above the range of the heat capacity correlation (278 - 1273 K)
+        P, T = np.array([1e5, 1e6]), np.array([2000.0, 250.0])
+        result = stream.evaluate(water, P, T, ['v', 'z', 'h_res', 's_res', 'ln_phi'])
+        expected = water.eos.residual_properties(T, water.v(P, T))
+        assert result['z'] == pytest.approx(expected.z)
+        assert result['h_res'] == pytest.approx(expected.h_res)
+        with pytest.raises(ValueError):
+            stream.evaluate(water, P, T, ['z', 'cp'])
+
+        path = tmp_path / 'hot.csv'
+        path.write_text('P,T\n1e5,500\n1e5,2000\n')
+        stats = stream.run(str(path), str(tmp_path / 'out.csv'), water, properties=['v', 'z'])
+        assert stats.rows == 2
+
+    def test_unsupported_format(self, water, historian, tmp_path):
+        path, _, _ = historian
+        with pytest.raises(ValueError):
+            stream.run(str(path), str(tmp_path / 'out.xlsx'), water)
+
+    def test_parquet_round_trip(self, water, historian, tmp_path):
+        pytest.importorskip('pyarrow')
+        path, P, T = historian
+        parquet = tmp_path / 'out.parquet'
+        stream.run(str(path), str(parquet), water, properties=['v'], chunk_size=10)
+        stream.run(str(parquet), str(tmp_path / 'again.csv'), water, properties=['z'], chunk_size=10)
+        with open(tmp_path / 'again.csv', newline='') as file:
+            rows = list(csv.DictReader(file))
+        assert np.array([float(row['v']) for row in rows]) == pytest.approx(water.v(P, T))
+
+    def test_cli(self, historian, tmp_path, capsys):
+        path, P, T = historian
+        output = tmp_path / 'out.csv'
+        stats = stream.main([str(path), str(output), '--substance', 'water', '--properties', 'v', 'w',
+                             '--chunk-size', '10', '--quiet'])
+        assert stats.rows == 25
+        assert 'rows/s' in capsys.readouterr().err
+        with open(output, newline='') as file:
+            assert list(csv.DictReader(file))[0].keys() == {'timestamp', 'P', 'T', 'v', 'w'}
+
+
+class TestPrefetch:
+    def test_order_preserved(self):
+        assert list(stream.prefetch(iter(range(100)), depth=3)) == list(range(100))
+
+    def test_reader_errors_are_raised(self):
+        def chunks():
+            yield 1
+            raise OSError('disk error')
+
+        with pytest.raises(OSError, match='disk error'):
+            list(stream.prefetch(chunks()))
+
+    def test_consumer_may_stop_early(self):
+        for item in stream.prefetch(iter(range(100)), depth=1):
+            if item == 2:
+                break
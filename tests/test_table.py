@@ -0,0 +1,139 @@
+import os
+import pytest
+import numpy as np
+from pytherm import table
+from pytherm.envelope import critical_point, saturation_point
+from pytherm.model import FluidModel
+
+
+@pytest.fixture(scope='module')
+def water():
+    return FluidModel.from_gkkr('Water')
+
+
+@pytest.fixture(scope='module')
+def grid():
+    return np.geomspace(1e3, 1e8, 23), np.linspace(300.0, 900.0, 19)
+
+
+def load(path):
+    with np.load(path) as data:
+        return dict(data)
+
+
+class TestTable:
+    def test_npz(self, water, grid, tmp_path):
+        P, T = grid
+        path = str(tmp_path / 'water.npz')
+        stats = table.generate(water, path, P, T, properties=['v', 'h_res', 'cp'], workers=1, chunk_rows=5)
+        assert stats.nodes == P.size * T.size
+        assert stats.chunks == 5
+        assert not [name for name in os.listdir(tmp_path) if name != 'water.npz']
+
+        data = load(path)
+        assert data.keys() == {'P', 'T', 'Psat', 'phase', 'two_phase', 'v', 'h_res', 'cp'}
+        assert np.array_equal(data['P'], P) and np.array_equal(data['T'], T)
+        assert data['v'].shape == data['phase'].shape == (P.size, T.size)
+        assert data['two_phase'].shape == (P.size - 1, T.size - 1)
+
+        v_liq, v_vap = water.eos.v_roots(P[:, None], T)
+        expected_v = np.where(data['phase'] == table.LIQUID, v_liq, v_vap)
+        assert data['v'] == pytest.approx(expected_v, rel=1e-14)
+        assert data['cp'] == pytest.approx(water.properties(T, expected_v).cp, rel=1e-12)
+
+    def test_phases(self, water, grid, tmp_path):
+        P, T = grid
+        path = str(tmp_path / 'water.npz')
+        table.generate(water, path, P, T, properties=['v'], workers=1)
+        data = load(path)
+        crit = critical_point(water.eos)
+        below = T < crit.T
+        Psat = np.array([saturation_point(water.eos, T_i)[0] for T_i in T[below]])
+        assert data['Psat'][below] == pytest.approx(Psat, rel=1e-5)
+        assert np.all(np.isnan(data['Psat'][~below]))
+
+        phase = data['phase']
+        assert np.all(phase[:, ~below] == table.SUPERCRITICAL)
+        assert np.all((phase[:, below] == table.LIQUID) == (P[:, None] > Psat))
+        # Liquid volumes are well below vapor volumes at the same temperature
+        liquid, vapor = phase == table.LIQUID, phase == table.VAPOR
+        assert np.max(data['v'][liquid]) < np.min(data['v'][vapor])
+
+        # The curve crosses every column of cells below the critical
+        # temperature once, between a vapor and a liquid node
+        cells = data['two_phase']
+        for j in np.flatnonzero(T[1:] < crit.T):
+            rows = np.flatnonzero(cells[:, j])
+            assert len(rows) >= 1
+            assert phase[rows[0], j] == table.VAPOR or phase[rows[0], j + 1] == table.VAPOR
+            assert phase[rows[-1] + 1, j] == table.LIQUID or phase[rows[-1] + 1, j + 1] == table.LIQUID
+        assert not cells[:, T[:-1] >= crit.T].any()
+
+    def test_chunks_and_workers(self, water, grid, tmp_path):
+        P, T = grid
+        table.generate(water, str(tmp_path / 'one.npz'), P, T, workers=1, chunk_rows=100)
+        table.generate(water, str(tmp_path / 'pool.npz'), P, T, workers=2, chunk_rows=3, compress=True)
+        one, pool = load(tmp_path / 'one.npz'), load(tmp_path / 'pool.npz')
+        for name in one:
+            assert np.array_equal(one[name], pool[name], equal_nan=True), name
+
+    def test_hdf5(self, water, grid, tmp_path):
+        h5py = pytest.importorskip('h5py')
+        P, T = grid
+        table.generate(water, str(tmp_path / 'water.h5'), P, T, properties=['v', 'z'], workers=1, chunk_rows=4)
+        table.generate(water, str(tmp_path / 'water.npz'), P, T, properties=['v', 'z'], workers=1)
+        expected = load(tmp_path / 'water.npz')
+        with h5py.File(tmp_path / 'water.h5', 'r') as file:
+            assert file['v'].chunks == (4, T.size)
+            for name, values in expected.items():
+                assert np.array_equal(file[name][()], values, equal_nan=True), name
+
+    def test_invalid_arguments(self, water, grid, tmp_path):
+        P, T = grid
+        path = str(tmp_path / 'water.npz')
+        with pytest.raises(ValueError):
+            table.generate(water, path, P[::-1], T, workers=1)
+        with pytest.raises(ValueError):
+            table.generate(water, path, P, T, properties=['viscosity'], workers=1)
+        with pytest.raises(ValueError):
+            table.generate(water, str(tmp_path / 'water.xlsx'), P, T, workers=1)
+        assert not os.listdir(tmp_path)
+
+    def test_outside_correlation_range(self, water, tmp_path):
+        # The heat capacity correlation of water starts at 278 K
+        P, T = np.geomspace(1e4, 1e7, 6), np.array([273.16, 275.0, 300.0, 1300.0, 2000.0])
+        path = str(tmp_path / 'water.npz')
+        table.generate(water, path, P, T, properties=['v', 'z', 'h_res', 'cp', 'w'], workers=1)
+        data = load(path)
+        inside = (T >= 278.0) & (T <= 1273.0)
+        assert np.all(np.isnan(data['cp'][:, ~inside])) and np.all(np.isnan(data['w'][:, ~inside]))
+        assert np.all(np.isfinite(data['cp'][:, inside]))
+        assert np.all(np.isfinite(data['z'])) and np.all(np.isfinite(data['h_res']))
+        residual = water.eos.residual_properties(T, data['v'])
+        assert data['h_res'] == pytest.approx(residual.h_res, rel=1e-12)
+        assert data['cp'][:, inside] == pytest.approx(water.properties(T[inside], data['v'][:, inside]).cp,
+                                                      rel=1e-12)
+
+    def test_documented_example(self, tmp_path, monkeypatch):
+        # The usage example of the module docstring, run as documented
+        usage = table.__doc__.split('Usage::')[1].replace('\\\n', ' ').split()
+        assert usage[:3] == ['python', '-m', 'pytherm.table']
+        monkeypatch.chdir(tmp_path)
+        stats = table.main(usage[3:] + ['--workers', '1', '--quiet'])
+        assert stats.nodes == 200 * 321
+        data = load(tmp_path / 'water.npz')
+        assert data['T'][0] == pytest.approx(273.16)
+        assert np.all(np.isfinite(data['h_res']))
+        assert np.isnan(data['cp'][0, 0]) and np.isfinite(data['cp'][0, -1])
+
+    def test_cli(self, tmp_path, capsys):
+        path = tmp_path / 'water.npz'
+        stats = table.main(['water', str(path), '--P', '0.1', '100', '10', '--P-log', '--P-scale', '1e5',
+                            '--T', '25', '400', '16', '--T-offset', '273.15', '--properties', 'v', 'w',
+                            '--workers', '1', '--quiet'])
+        assert stats.nodes == 160
+        assert 'nodes/s' in capsys.readouterr().err
+        data = load(path)
+        assert data['P'] == pytest.approx(np.geomspace(1e4, 1e7, 10))
+        assert data['T'][0] == pytest.approx(298.15)
+        assert data.keys() >= {'v', 'w'}
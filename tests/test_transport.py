@@ -0,0 +1,101 @@
+import pytest
+import numpy as np
+from pytherm.data import load_gkkr_substance
+from pytherm.prop import corr_from_record
+from pytherm.transport import TransportModel, TransportProperties
+
+
+@pytest.fixture(scope='module')
+def methane():
+    return TransportModel.from_gkkr('Methane')
+
+
+def gkkr_corr(substance, name):
+    data = load_gkkr_substance(substance)
+    return corr_from_record(data['Correlations'][name][0], Tc=data['Tc'], Pc=data['Pc'])
+
+
+class TestTransportModel:
+    def test_dilute_limit(self, methane):
+        T = np.linspace(150.0, 600.0, 10)
+        assert methane.mu(T, 1e3) == pytest.approx(methane.mu_ideal(T), rel=1e-6)
+        assert methane.k(T, 1e3) == pytest.approx(methane.k_ideal(T), rel=1e-6)
+
+    def test_low_pressure_gas(self, methane):
+        # Reference values from Setzmann & Wagner based correlations (NIST)
+        props = methane.properties_PT(1e5, 300.0)
+        assert props.mu == pytest.approx(11.19e-6, rel=0.01)
+        assert props.k == pytest.approx(34.4e-3, rel=0.02)
+
+    def test_increases_with_density(self, methane):
+        v = np.geomspace(1e-2, 5e-5, 20)
+        props = methane.properties(300.0, v)
+        assert np.all(np.diff(props.mu) > 0)
+        assert np.all(np.diff(props.k) > 0)
+
+    @pytest.mark.parametrize('substance', ['Methane', 'Nitrogen', 'Propane'])
+    def test_saturated_liquid(self, substance):
+        model = TransportModel.from_gkkr(substance)
+        rho, M = gkkr_corr(substance, 'Liquid Density'), load_gkkr_substance(substance)['M'] / 1000
+        mu_liquid = gkkr_corr(substance, 'Liquid Viscosity')
+        k_liquid = gkkr_corr(substance, 'Liquid Thermal Conductivity')
+        T_min = max(rho.T_min, mu_liquid.T_min, k_liquid.T_min, model.mu_ideal.T_min, model.k_ideal.T_min)
+        T_max = min(rho.T_max, mu_liquid.T_max, k_liquid.T_max, 0.9 * model.Tc)
+        T = np.linspace(T_min, T_max, 5)
+        props = model.properties(T, M / rho(T))
+        # Chung's correction is only approximate for liquids
+        assert props.mu == pytest.approx(mu_liquid(T), rel=0.25)
+        assert props.k == pytest.approx(k_liquid(T), rel=0.25)
+
+    def test_properties(self, methane):
+        T, v = np.array([[120.0, 150.0], [180.0, 300.0]]), np.array([4e-5, 1e-3])
+        props = methane.properties(T, v)
+        assert isinstance(props, TransportProperties)
+        assert props.mu == pytest.approx(methane.mu(T, v), rel=1e-14)
+        assert props.k == pytest.approx(methane.k(T, v), rel=1e-14)
+        assert props.sigma[:, 0] == pytest.approx(methane.surface_tension(T[:, 0]), rel=1e-14)
+        # Above the range of the surface tension correlation
+        assert np.isnan(props.sigma[1, 1])
+        assert np.ndim(methane.properties(300.0, 1e-3).mu) == 0
+
+    def test_properties_PT(self, methane):
+        P, T = np.array([1e5, 5e6, 2e7]), np.array([300.0, 150.0, 250.0])
+        expected = methane.properties(T, methane.fluid.v(P, T))
+        for actual, value in zip(methane.properties_PT(P, T), expected):
+            assert actual == pytest.approx(value, rel=1e-12, nan_ok=True)
+
+    def test_properties_PT_compressed_liquid(self):
+        water = TransportModel.from_gkkr('Water')
+        # Between the saturation pressure (3.5 kPa) and the vapor spinodal,
+        # where the EOS also has a metastable vapor root
+        P, T = np.array([5e5, 5e5, 1e4]), np.array([300.0, 450.0, 400.0])
+        v_liq, v_vap = water.fluid.eos.v_roots(P, T)
+        assert np.all(v_liq < v_vap)
+        props = water.properties_PT(P, T)
+        expected = water.properties(T, np.array([v_liq[0], v_vap[1], v_vap[2]]))
+        for actual, value in zip(props, expected):
+            assert actual == pytest.approx(value, rel=1e-12, nan_ok=True)
+        # Liquid-like, rather than the vapor viscosity of ~1e-5 Pa s
+        assert props.mu[0] > 1e-4
+
+    def test_polar_correction(self):
+        water = TransportModel.from_gkkr('Water')
+        polar = TransportModel.from_gkkr('Water', dipole_moment=1.8, association=0.076)
+        assert polar.mu(500.0, 1e3) == pytest.approx(water.mu(500.0, 1e3), rel=1e-6)
+        assert polar.mu(500.0, 2e-5) != pytest.approx(water.mu(500.0, 2e-5), rel=1e-3)
+
+    def test_no_surface_tension(self, methane):
+        model = TransportModel(methane.fluid, methane.mu_ideal, methane.k_ideal, Tc=methane.Tc, vc=methane.vc,
+                               omega=0.011, M=0.016043)
+        assert np.isnan(model.properties(150.0, 1e-3).sigma)
+        with pytest.raises(ValueError):
+            model.surface_tension(150.0)
+
+    def test_invalid_arguments(self, methane):
+        with pytest.raises(ValueError):
+            methane.mu(300.0, -1e-3)
+        with pytest.raises(ValueError):
+            # Outside the range of the dilute gas correlation
+            methane.mu(2000.0, 1e-3)
+        with pytest.raises(KeyError):
+            TransportModel.from_gkkr('Unobtainium')
@@ -0,0 +1,100 @@
+import os
+import subprocess
+import sys
+import pytest
+import numpy as np
+from pytherm import eos
+from pytherm.ad import Jet
+from pytherm.util import args_in_bounds, args_must_be_positive, skip_validation, validation_enabled
+
+
+@args_must_be_positive('T', 'v')
+def example(T, v=None, scale=1.0):
+    return T * scale
+
+
+class Example:
+    T_min, T_max = 200.0, 400.0
+
+    @args_in_bounds(T=('T_min', 'T_max'))
+    def __call__(self, T):
+        return T
+
+
+class TestArgsMustBePositive:
+    @pytest.mark.parametrize('args, kwargs', [
+        ((300.0,), {}),
+        ((300.0, 0.01), {}),
+        ((), {'T': 300.0, 'v': 0.01}),
+        ((np.array([300.0, 400.0]),), {'v': np.array([0.01, np.nan])}),
+        ((Jet.seed(300.0)[0],), {}),
+    ])
+    def test_valid(self, args, kwargs):
+        example(*args, **kwargs)
+
+    @pytest.mark.parametrize('args, kwargs', [
+        ((-300.0,), {}),
+        ((300.0, 0.0), {}),
+        ((), {'T': 300.0, 'v': -0.01}),
+        ((np.array([300.0, -400.0]),), {}),
+        ((Jet.seed(-300.0)[0],), {}),
+    ])
+    def test_invalid(self, args, kwargs):
+        with pytest.raises(ValueError, match='must have a positive value'):
+            example(*args, **kwargs)
+
+    def test_reports_rows(self):
+        with pytest.raises(ValueError, match=r'T must have a positive value \(rows \[1, 3\]\)'):
+            example(np.array([300.0, -1.0, 300.0, 0.0]))
+
+    def test_unknown_parameter(self):
+        with pytest.raises(ValueError):
+            args_must_be_positive('P')(example)
+
+    def test_preserves_metadata(self):
+        assert example.__name__ == 'example'
+
+
+class TestArgsInBounds:
+    @pytest.mark.parametrize('T', [200.0, 300.0, 400.0, np.array([250.0, 350.0])])
+    def test_attribute_bounds_valid(self, T):
+        assert Example()(T) is T
+
+    @pytest.mark.parametrize('T', [199.0, 401.0, np.array([250.0, 450.0])])
+    def test_attribute_bounds_invalid(self, T):
+        with pytest.raises(ValueError, match='T must be between 200.0 and 400.0'):
+            Example()(T)
+
+
+class TestSkipValidation:
+    def test_context_manager(self):
+        assert validation_enabled()
+        with skip_validation():
+            assert not validation_enabled()
+            assert example(-300.0) == -300.0
+        assert validation_enabled()
+        with pytest.raises(ValueError):
+            example(-300.0)
+
+    def test_environment_variable_removes_wrappers(self):
+        code = 'from pytherm import eos, util; print(hasattr(eos.CubicEOS.v, "__wrapped__"), ' \
+               'util.validation_enabled())'
+        env = dict(os.environ, PYTHERM_SKIP_VALIDATION='1')
+        output = subprocess.run([sys.executable, '-c', code], env=env, capture_output=True, text=True,
+                                cwd=os.path.dirname(os.path.dirname(__file__)), check=True).stdout
+        assert output.split() == ['False', 'False']
+
+
+class TestValidatedAPI:
+    water = eos.PurePREOS(Pc=22064000.0, Tc=647.096, omega=0.3443)
+
+    @pytest.mark.parametrize('method, args', [
+        ('P', (-300.0, 0.01)),
+        ('T', (1e5, np.array([0.01, -0.01]))),
+        ('v', (0.0, 300.0)),
+        ('z', (300.0, -0.01)),
+        ('residual_properties', (300.0, -0.01)),
+    ])
+    def test_eos_rejects_nonpositive_arguments(self, method, args):
+        with pytest.raises(ValueError, match='must have a positive value'):
+            getattr(self.water, method)(*args)
@@ -0,0 +1,114 @@
+import pickle
+import subprocess
+import sys
+import pytest
+import numpy as np
+from pytherm import wire
+from pytherm.data import load_gkkr_data, load_gkkr_substance
+from pytherm.eos import (AlphaFunction, ConstantShift, MathiasCopemanAlpha, PolynomialShift, PurePR78EOS, PurePREOS,
+                         PureRKEOS, PureSRKEOS, PureVdWEOS, TwuAlpha)
+from pytherm.model import FluidModel
+from pytherm.prop import AlyLeeCorr, compile_surrogate, corr_from_record
+
+
+EOS_CASES = [
+    PurePREOS(Pc=4.599e6, Tc=190.564, omega=0.011),
+    PurePR78EOS(Pc=22.064e6, Tc=647.096, omega=0.3443),
+    PureSRKEOS(Pc=4.599e6, Tc=190.564, omega=0.011),
+    PureRKEOS(Pc=4.599e6, Tc=190.564),
+    PureVdWEOS(Pc=4.599e6, Tc=190.564),
+    PurePREOS(Pc=4.599e6, Tc=190.564, omega=0.011, alpha=TwuAlpha(190.564, 0.1473, 0.9074, 1.8253),
+              shift=ConstantShift(-3e-6)),
+    PureSRKEOS(Pc=4.599e6, Tc=190.564, omega=0.011, alpha=MathiasCopemanAlpha(190.564, 0.55, 0.1, -0.05),
+               shift=PolynomialShift(190.564, [-3e-6, 1e-6])),
+]
+
+
+def gkkr_correlations():
+    for name, substance in load_gkkr_data().items():
+        for prop, records in substance['Correlations'].items():
+            try:
+                corr = corr_from_record(records[0], Tc=substance['Tc'], Pc=substance['Pc'])
+            except ValueError:
+                continue
+            yield pytest.param(corr, id=f'{name}-{prop}')
+
+
+class CustomAlpha(AlphaFunction):
+    def __call__(self, T):
+        return 1.5 - 0.5 * T / 190.564
+
+
+class TestWire:
+    @pytest.mark.parametrize('eos', EOS_CASES)
+    def test_eos_round_trip(self, eos):
+        T, v = np.array([150.0, 300.0]), np.array([1e-3, 1e-2])
+        for copy in (wire.loads(wire.dumps(eos)), pickle.loads(pickle.dumps(eos))):
+            assert type(copy) is type(eos)
+            assert np.array_equal(copy.P(T, v), eos.P(T, v))
+            assert np.array_equal(copy.residual_properties(T, v), eos.residual_properties(T, v))
+
+    @pytest.mark.parametrize('corr', list(gkkr_correlations()))
+    def test_correlation_round_trip(self, corr):
+        copy = pickle.loads(pickle.dumps(corr))
+        assert copy == corr
+        assert type(corr).from_bytes(corr.to_bytes()) == corr
+
+    def test_surrogate_round_trip(self):
+        surrogate = compile_surrogate(AlyLeeCorr(A=33484.75, B=9275.30, C=1218.48, D=20241.42, E=2919.59,
+                                                 T_min=278, T_max=1273))
+        copy = pickle.loads(pickle.dumps(surrogate))
+        T = np.linspace(278.0, 1273.0, 1001)
+        assert len(copy) == len(surrogate)
+        assert np.array_equal(copy(T), surrogate(T))
+        assert copy.derivative(500.0) == surrogate.derivative(500.0)
+        assert copy.integral(300.0, 900.0) == surrogate.integral(300.0, 900.0)
+        assert copy.correlation == surrogate.correlation
+        assert (copy.tol, copy.relative) == (surrogate.tol, surrogate.relative)
+
+    @pytest.mark.parametrize('M', [0.018015, None])
+    def test_fluid_model_round_trip(self, M):
+        data = load_gkkr_substance('Water')
+        cp_ideal = corr_from_record(data['Correlations']['Ideal Gas cp'][0])
+        for model in (FluidModel(EOS_CASES[1], cp_ideal=cp_ideal, M=M),
+                      FluidModel(EOS_CASES[1], cv_ideal=cp_ideal, M=M)):
+            copy = pickle.loads(pickle.dumps(model))
+            assert copy.properties(500.0, 1e-3) == pytest.approx(model.properties(500.0, 1e-3), rel=0, nan_ok=True)
+            assert copy.cp_ideal(500.0) == model.cp_ideal(500.0)
+
+    def test_compact(self):
+        model = FluidModel.from_gkkr('Methane')
+        data = model.to_bytes()
+        # Tag, counts and float parameters only
+        assert len(data) < 200
+        assert len(pickle.dumps(model)) < len(data) + 64
+
+    def test_unregistered_parts(self):
+        eos = PurePREOS(Pc=4.599e6, Tc=190.564, omega=0.011, alpha=CustomAlpha())
+        with pytest.raises(TypeError):
+            wire.dumps(eos)
+        copy = pickle.loads(pickle.dumps(eos))
+        assert isinstance(copy._alpha, CustomAlpha)
+        assert copy.P(300.0, 1e-3) == eos.P(300.0, 1e-3)
+        # Isotherms freeze the alpha function in a copy of the EOS
+        isotherm = EOS_CASES[0].at_T(150.0)
+        assert pickle.loads(pickle.dumps(isotherm)).P(1e-3) == isotherm.P(1e-3)
+
+    def test_invalid_data(self):
+        data = wire.dumps(EOS_CASES[0])
+        with pytest.raises(ValueError):
+            wire.loads(b'\x00' + data[1:])
+        with pytest.raises(ValueError):
+            wire.loads(data + b'\x00')
+        with pytest.raises(ValueError):
+            wire.loads(data[:1] + bytes([255]) + data[2:])
+        with pytest.raises(TypeError):
+            FluidModel.from_bytes(data)
+
+    def test_loads_in_new_process(self):
+        data = FluidModel.from_gkkr('Methane').to_bytes()
+        code = ('import sys; from pytherm import wire; '
+                'print(wire.loads(bytes.fromhex(sys.argv[1])).properties(200.0, 1e-3).z)')
+        result = subprocess.run([sys.executable, '-c', code, data.hex()], capture_output=True, text=True, check=True)
+        assert float(result.stdout) == pytest.approx(FluidModel.from_gkkr('Methane').properties(200.0, 1e-3).z,
+                                                     rel=1e-15)